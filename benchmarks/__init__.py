@@ -0,0 +1,6 @@
+"""Performance benchmarks for Rosetta.
+
+Run ``python -m benchmarks.run --help`` from the repository root. Workbooks are
+generated on the fly and translated by an offline backend, so no API key or network
+access is needed.
+"""
@@ -0,0 +1,132 @@
+"""Load test of a running API server with many concurrent uploads.
+
+Point the server at the mock API (``rosetta.mock_api``) to measure Rosetta itself
+under load, including its reaction to rate limits and slow responses::
+
+    python -m rosetta.mock_api --latency lognormal:1.5,0.6 --rate-limited 0.05 &
+    ROSETTA_API_BASE_URL=http://127.0.0.1:8787 ANTHROPIC_API_KEY=mock \\
+        uvicorn rosetta.api.app:app --port 8000 &
+    PYTHONPATH=src python -m benchmarks.load --uploads 200 --concurrency 50
+
+Each upload is a distinct workbook (different seed), so the result cache does not
+answer them.
+"""
+
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import click
+import httpx
+
+from benchmarks.workbook import WorkbookSpec, generate_workbook
+
+
+async def _upload(
+    client: httpx.AsyncClient, endpoint: str, name: str, content: bytes, poll: float
+) -> tuple[str, float]:
+    """Upload one workbook and wait for its translation; return the outcome and seconds."""
+    started = time.perf_counter()
+    files = {"file": (name, content)}
+    try:
+        response = await client.post(endpoint, files=files, data={"target_lang": "french"})
+        if endpoint == "/jobs" and response.status_code == 202:
+            job = response.json()
+            while job.get("status") not in ("completed", "failed"):
+                await asyncio.sleep(poll)
+                job = (await client.get(job["status_url"])).json()
+            outcome = job["status"]
+        else:
+            outcome = str(response.status_code)
+    except httpx.HTTPError as e:
+        outcome = type(e).__name__
+    return outcome, time.perf_counter() - started
+
+
+async def run_load(
+    url: str,
+    workbooks: list[Path],
+    uploads: int,
+    concurrency: int,
+    endpoint: str = "/translate",
+    poll: float = 0.5,
+) -> dict:
+    """Upload ``uploads`` workbooks, ``concurrency`` at a time, and summarize the outcomes."""
+    contents = [(path.name, path.read_bytes()) for path in workbooks]
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, timeout=None, limits=limits) as client:
+
+        async def one(number: int) -> tuple[str, float]:
+            async with semaphore:
+                name, content = contents[number % len(contents)]
+                return await _upload(client, endpoint, name, content, poll)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(number) for number in range(uploads)))
+        seconds = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    quantiles = (
+        statistics.quantiles(latencies, n=100, method="inclusive")
+        if len(latencies) > 1
+        else latencies * 99
+    )
+    return {
+        "uploads": uploads,
+        "concurrency": concurrency,
+        "endpoint": endpoint,
+        "seconds": round(seconds, 3),
+        "uploads_per_second": round(uploads / seconds, 2),
+        "outcomes": dict(Counter(outcome for outcome, _ in results)),
+        "latency": {
+            "p50": round(quantiles[49], 3),
+            "p95": round(quantiles[94], 3),
+            "p99": round(quantiles[98], 3),
+            "max": round(latencies[-1], 3),
+        },
+    }
+
+
+@click.command()
+@click.option("--url", default="http://127.0.0.1:8000", show_default=True, help="API server")
+@click.option("--uploads", type=int, default=100, show_default=True)
+@click.option("--concurrency", type=int, default=20, show_default=True)
+@click.option("--rows", type=int, default=50, show_default=True, help="Rows of each workbook")
+@click.option("--cols", type=int, default=4, show_default=True, help="Columns of each workbook")
+@click.option("--jobs", is_flag=True, help="Upload to /jobs and poll instead of /translate")
+@click.option("--output", type=click.Path(path_type=Path), help="Write results as JSON here")
+def main(
+    url: str,
+    uploads: int,
+    concurrency: int,
+    rows: int,
+    cols: int,
+    jobs: bool,
+    output: Optional[Path],
+) -> None:
+    """Upload generated workbooks concurrently and report throughput and latency."""
+    with tempfile.TemporaryDirectory(prefix="rosetta-load-") as directory:
+        workbooks = [
+            generate_workbook(
+                WorkbookSpec(rows=rows, cols=cols, seed=seed), Path(directory) / f"load{seed}.xlsx"
+            )
+            for seed in range(uploads)
+        ]
+        results = asyncio.run(
+            run_load(url, workbooks, uploads, concurrency, "/jobs" if jobs else "/translate")
+        )
+
+    if output is not None:
+        output.write_text(json.dumps(results, indent=2) + "\n")
+    click.echo(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
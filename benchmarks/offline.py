@@ -0,0 +1,67 @@
+"""Offline translation backend for benchmarks.
+
+``OfflineClient`` stands in for the Anthropic client: it answers the translator's
+prompts with the deterministic translations of the mock API server
+(``rosetta.mock_api``), in process, after an optional simulated latency. The real
+``Translator`` builds the prompts and parses the responses, so everything but the
+network round trip is measured.
+"""
+
+import time
+from types import SimpleNamespace
+from typing import Optional
+from unittest.mock import patch
+
+from rosetta.core.config import Config
+from rosetta.mock_api import mock_translation
+from rosetta.services.estimator import estimate_tokens
+from rosetta.services.translator import Translator
+
+
+class OfflineClient:
+    """Answers ``messages.create`` calls locally, like a (very fast) Anthropic API."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """Initialize the client.
+
+        Args:
+            latency: Seconds each request takes, to model the API's response time
+        """
+        self.latency = latency
+        self.requests = 0
+        self.messages = SimpleNamespace(create=self._create)
+        self.models = SimpleNamespace(list=lambda **kwargs: [])
+
+    def with_options(self, **kwargs) -> "OfflineClient":
+        return self
+
+    def close(self) -> None:
+        pass
+
+    def _create(self, model: str, max_tokens: int, messages: list[dict]) -> SimpleNamespace:
+        prompt = messages[-1]["content"]
+        text = mock_translation(prompt)
+        if self.latency:
+            time.sleep(self.latency)
+        self.requests += 1
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=text)],
+            usage=SimpleNamespace(
+                input_tokens=estimate_tokens(prompt), output_tokens=estimate_tokens(text)
+            ),
+        )
+
+
+def offline_translator(config: Optional[Config] = None, latency: float = 0.0) -> Translator:
+    """Return a Translator answered by an ``OfflineClient``."""
+    return Translator(config or Config(anthropic_api_key="offline"), client=OfflineClient(latency))
+
+
+def offline_clients(latency: float = 0.0):
+    """Patch ``Translator`` so that every client it builds is an ``OfflineClient``.
+
+    For the CLI and API, which build their own translator from the configuration.
+    """
+    return patch.object(
+        Translator, "_build_client", staticmethod(lambda config: OfflineClient(latency))
+    )
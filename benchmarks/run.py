@@ -0,0 +1,327 @@
+"""Run the benchmark suite and write machine-readable results.
+
+Each case runs in a fresh process, so its peak RSS is its own and no import or
+cache from another case skews it. Translations are answered by the offline backend.
+
+Usage (from the repository root)::
+
+    PYTHONPATH=src python -m benchmarks.run --preset medium --output results.json
+    PYTHONPATH=src python -m benchmarks.run --compare results.json --max-regression 0.2
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Optional
+
+import click
+
+from benchmarks.workbook import WorkbookSpec, generate_workbook
+
+# Version of the results format
+SCHEMA = 1
+
+PRESETS = {
+    "small": WorkbookSpec(sheets=1, rows=2000, cols=5),
+    "medium": WorkbookSpec(sheets=4, rows=10000, cols=5, images=4),
+    "large": WorkbookSpec(sheets=4, rows=50000, cols=5, images=8),
+}
+
+CASES = ("inspect", "extract", "enrich", "write", "cli", "api")
+
+
+def _inspect(input_file: Path, work_dir: Path, latency: float) -> Callable[[], int]:
+    """Read sheet names and translatable cells from the package XML."""
+    from rosetta.services.inspector import inspect_workbook
+
+    return lambda: inspect_workbook(input_file).cell_count
+
+
+def _extract(input_file: Path, work_dir: Path, latency: float) -> Callable[[], int]:
+    """Stream translatable cells with openpyxl."""
+    from rosetta.services.extractor import ExcelExtractor
+
+    def run() -> int:
+        with ExcelExtractor(input_file) as extractor:
+            return sum(1 for _ in extractor.extract_cells())
+
+    return run
+
+
+def _enrich(input_file: Path, work_dir: Path, latency: float) -> Callable[[], int]:
+    """Attach rich text runs to extracted cells (extraction itself is not timed)."""
+    from rosetta.main import RichTextLookup
+    from rosetta.services.extractor import ExcelExtractor
+
+    with ExcelExtractor(input_file) as extractor:
+        cells = list(extractor.extract_cells())
+
+    def run() -> int:
+        lookup = RichTextLookup(input_file)
+        for cell in cells:
+            lookup.enrich(cell)
+        return len(cells)
+
+    return run
+
+
+def _write(input_file: Path, work_dir: Path, latency: float) -> Callable[[], int]:
+    """Write translated cells and dropdowns to a copy of the workbook."""
+    from rosetta.main import _extract_dropdown_validations, write_translations
+    from rosetta.services.extractor import ExcelExtractor
+
+    with ExcelExtractor(input_file) as extractor:
+        cells = list(extractor.extract_cells())
+    for cell in cells:
+        cell.value = f"[french] {cell.value}"
+    dropdowns = _extract_dropdown_validations(input_file, None)
+    for dropdown in dropdowns:
+        dropdown.translated_values = [f"[french] {value}" for value in dropdown.values]
+
+    def run() -> int:
+        write_translations(input_file, work_dir / "written.xlsx", cells, dropdowns)
+        return len(cells)
+
+    return run
+
+
+def _cli(input_file: Path, work_dir: Path, latency: float) -> Callable[[], int]:
+    """Translate with the ``rosetta`` command, as a user would."""
+    from click.testing import CliRunner
+
+    from benchmarks.offline import offline_clients
+    from rosetta.main import cli
+    from rosetta.services.inspector import inspect_workbook
+
+    os.environ["ANTHROPIC_API_KEY"] = "offline"
+    cell_count = inspect_workbook(input_file).cell_count
+    output = work_dir / "cli.xlsx"
+
+    def run() -> int:
+        with offline_clients(latency):
+            result = CliRunner().invoke(cli, [str(input_file), "-t", "french", "-o", str(output)])
+        if result.exit_code != 0:
+            raise RuntimeError(f"CLI failed: {result.output}")
+        return cell_count
+
+    return run
+
+
+def _api(input_file: Path, work_dir: Path, latency: float) -> Callable[[], int]:
+    """Translate with a background job on the API server, in process.
+
+    Jobs are the API's path for workbooks above the synchronous ``/translate`` limit.
+    Timed from the upload to the downloaded result, without server startup.
+    """
+    # Read at import: lift the limits sized for shared servers, keep state in work_dir
+    os.environ.update(
+        ANTHROPIC_API_KEY="offline",
+        ROSETTA_MAX_JOB_CELLS=str(10**9),
+        ROSETTA_TOKEN_BUDGET=str(10**12),
+        ROSETTA_CLIENT_TOKEN_QUOTA=str(10**12),
+        ROSETTA_JOBS_DIR=str(work_dir / "jobs"),
+        ROSETTA_WORK_DIR=str(work_dir / "work"),
+        ROSETTA_RESULT_CACHE_DIR=str(work_dir / "results"),
+    )
+    from fastapi.testclient import TestClient
+
+    from benchmarks.offline import offline_clients
+    from rosetta.api.app import app
+    from rosetta.services.inspector import inspect_workbook
+
+    cell_count = inspect_workbook(input_file).cell_count
+    content = input_file.read_bytes()
+
+    def run() -> int:
+        with (
+            offline_clients(latency),
+            TestClient(app) as client,
+        ):
+            started = time.perf_counter()
+            job = client.post(
+                "/jobs", files={"file": (input_file.name, content)}, data={"target_lang": "french"}
+            ).json()
+            while job.get("status") not in ("completed", "failed", None):
+                time.sleep(0.01)
+                job = client.get(job["status_url"]).json()
+            if job.get("status") != "completed":
+                raise RuntimeError(f"API job failed: {job}")
+            client.get(job["result_url"]).raise_for_status()
+            run.seconds = time.perf_counter() - started
+        return cell_count
+
+    return run
+
+
+SETUPS = {
+    "inspect": _inspect,
+    "extract": _extract,
+    "enrich": _enrich,
+    "write": _write,
+    "cli": _cli,
+    "api": _api,
+}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process and its finished children, in MB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case(case: str, input_file: Path, latency: float = 0.0) -> dict:
+    """Run one case in the current process and return its measurements."""
+    with tempfile.TemporaryDirectory(prefix="rosetta-bench-") as work_dir:
+        run = SETUPS[case](input_file, Path(work_dir), latency)
+        setup_rss = _peak_rss_mb()
+        started, cpu_started = time.perf_counter(), time.process_time()
+        items = run()
+        seconds = getattr(run, "seconds", time.perf_counter() - started)
+        cpu_seconds = time.process_time() - cpu_started
+        return {
+            "seconds": round(seconds, 4),
+            "cpu_seconds": round(cpu_seconds, 4),
+            "items": items,
+            "items_per_second": round(items / seconds) if seconds else None,
+            "setup_rss_mb": setup_rss,
+            "peak_rss_mb": _peak_rss_mb(),
+        }
+
+
+def run_isolated(case: str, input_file: Path, latency: float = 0.0, repeat: int = 1) -> dict:
+    """Run a case ``repeat`` times, each in a fresh process; keep the fastest run."""
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            runs.append(pool.submit(run_case, case, input_file, latency).result())
+    best = min(runs, key=lambda result: result["seconds"])
+    best["peak_rss_mb"] = max((r["peak_rss_mb"] or 0 for r in runs), default=None) or None
+    best["runs"] = [r["seconds"] for r in runs]
+    return best
+
+
+def _git_revision() -> dict:
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    try:
+        return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain"))}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def compare(results: dict, baseline: dict) -> dict[str, float]:
+    """Return each case's duration relative to the baseline (1.25 = 25% slower)."""
+    return {
+        case: round(result["seconds"] / baseline["results"][case]["seconds"], 3)
+        for case, result in results["results"].items()
+        if case in baseline.get("results", {}) and baseline["results"][case]["seconds"]
+    }
+
+
+@click.command()
+@click.option("--preset", type=click.Choice(sorted(PRESETS)), default="small", show_default=True)
+@click.option("--sheets", type=int, help="Override the preset's number of sheets")
+@click.option("--rows", type=int, help="Override the preset's rows per sheet")
+@click.option("--cols", type=int, help="Override the preset's columns per sheet")
+@click.option("--duplicate-ratio", type=float, help="Share of cells repeating an earlier text")
+@click.option("--rich-text-ratio", type=float, help="Share of unique texts with rich text")
+@click.option("--dropdowns", type=int, help="Inline dropdown lists per sheet")
+@click.option("--images", type=int, help="Images per sheet")
+@click.option(
+    "--case",
+    "cases",
+    type=click.Choice(CASES),
+    multiple=True,
+    help="Case to run (repeatable; all by default)",
+)
+@click.option("--repeat", type=int, default=3, show_default=True, help="Runs per case (best kept)")
+@click.option(
+    "--latency", type=float, default=0.0, show_default=True, help="Simulated seconds per request"
+)
+@click.option("--output", type=click.Path(path_type=Path), help="Write results as JSON here")
+@click.option(
+    "--compare",
+    "baseline_file",
+    type=click.Path(exists=True, path_type=Path),
+    help="Results of an earlier run to compare against",
+)
+@click.option(
+    "--max-regression",
+    type=float,
+    help="With --compare: fail if a case is slower than this fraction (0.2 = 20%)",
+)
+def main(
+    preset: str,
+    cases: tuple[str, ...],
+    repeat: int,
+    latency: float,
+    output: Optional[Path],
+    baseline_file: Optional[Path],
+    max_regression: Optional[float],
+    **overrides,
+) -> None:
+    """Generate a workbook, time each case and print or write the results."""
+    spec = replace(
+        PRESETS[preset], **{name: value for name, value in overrides.items() if value is not None}
+    )
+
+    with tempfile.TemporaryDirectory(prefix="rosetta-bench-") as directory:
+        input_file = generate_workbook(spec, Path(directory) / "benchmark.xlsx")
+        results = {
+            "schema": SCHEMA,
+            **_git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "preset": preset,
+            "workbook": {**spec.to_dict(), "bytes": input_file.stat().st_size},
+            "latency": latency,
+            "results": {},
+        }
+        for case in cases or CASES:
+            result = run_isolated(case, input_file, latency, repeat)
+            results["results"][case] = result
+            click.echo(
+                f"{case:<8} {result['seconds']:>9.3f}s"
+                f" {result['items_per_second'] or 0:>10} items/s"
+                f" {result['peak_rss_mb'] or 0:>8.1f} MB peak",
+                err=True,
+            )
+
+    if output is not None:
+        output.write_text(json.dumps(results, indent=2) + "\n")
+    else:
+        click.echo(json.dumps(results, indent=2))
+
+    if baseline_file is not None:
+        ratios = compare(results, json.loads(baseline_file.read_text()))
+        for case, ratio in ratios.items():
+            click.echo(f"{case:<8} {ratio:>6.2f}x baseline", err=True)
+        if max_regression is not None:
+            slower = [case for case, ratio in ratios.items() if ratio > 1 + max_regression]
+            if slower:
+                raise click.ClickException(f"Slower than baseline: {', '.join(slower)}")
+
+
+if __name__ == "__main__":
+    main()
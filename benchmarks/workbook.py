@@ -0,0 +1,281 @@
+"""Synthetic workbook generator for benchmarks.
+
+Workbooks are written straight to the xlsx package, the way Excel saves them: text
+cells reference a shared strings table, rich text lives in that table, dropdowns are
+inline ``dataValidation`` lists and images are drawing parts. Writing the XML
+directly keeps generation fast enough for workbooks with millions of cells.
+"""
+
+import random
+import struct
+import zipfile
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+WORDS = (
+    "account amount approved balance budget category comment contract customer date "
+    "delivery department description discount employee invoice item manager margin "
+    "note order payment pending period price product project quantity quarter region "
+    "report revenue sales shipment status summary supplier target task total unit"
+).split()
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>\n'
+    '<Default Extension="xml" ContentType="application/xml"/>\n'
+    '<Default Extension="png" ContentType="image/png"/>\n'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>\n'
+    '<Override PartName="/xl/sharedStrings.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>\n'
+    "{overrides}\n"
+    "</Types>"
+)
+
+SHEET_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+DRAWING_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.drawing+xml"
+
+ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\n'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>\n'
+    "</Relationships>"
+)
+
+RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+{relationships}
+</Relationships>"""
+
+REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/{}"
+
+WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">\n'
+    "<sheets>{sheets}</sheets>\n"
+    "</workbook>"
+)
+
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    "<sheetData>"
+)
+
+DRAWING = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<xdr:wsDr xmlns:xdr="http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    "{anchors}</xdr:wsDr>"
+)
+
+ANCHOR = (
+    "<xdr:oneCellAnchor><xdr:from><xdr:col>{col}</xdr:col><xdr:colOff>0</xdr:colOff>"
+    "<xdr:row>{row}</xdr:row><xdr:rowOff>0</xdr:rowOff></xdr:from>"
+    '<xdr:ext cx="{size}" cy="{size}"/><xdr:pic><xdr:nvPicPr>'
+    '<xdr:cNvPr id="{id}" name="Image {id}"/><xdr:cNvPicPr/></xdr:nvPicPr>'
+    '<xdr:blipFill><a:blip r:embed="rId{id}"/><a:stretch><a:fillRect/></a:stretch>'
+    '</xdr:blipFill><xdr:spPr><a:prstGeom prst="rect"><a:avLst/></a:prstGeom></xdr:spPr>'
+    "</xdr:pic><xdr:clientData/></xdr:oneCellAnchor>"
+)
+
+
+@dataclass
+class WorkbookSpec:
+    """Shape of a generated workbook."""
+
+    sheets: int = 1
+    rows: int = 1000
+    cols: int = 5
+    duplicate_ratio: float = 0.3  # Share of text cells repeating an earlier text
+    rich_text_ratio: float = 0.05  # Share of unique texts with bold/plain runs
+    dropdowns: int = 2  # Inline list validations per sheet
+    dropdown_values: int = 5
+    images: int = 0  # Images per sheet
+    image_kb: int = 64  # Approximate size of each image
+    words_per_cell: int = 4
+    seed: int = 0
+
+    @property
+    def cell_count(self) -> int:
+        return self.sheets * self.rows * self.cols
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def generate_workbook(spec: WorkbookSpec, path: Path) -> Path:
+    """Write a workbook with the given shape and return its path.
+
+    The same spec always produces the same workbook.
+    """
+    rng = random.Random(spec.seed)
+    strings = _SharedStrings(rng, spec)
+    images = _png(spec.image_kb, rng) if spec.images else b""
+
+    overrides = []
+    workbook_rels = []
+    sheet_entries = []
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        image_number = 0
+        for number in range(1, spec.sheets + 1):
+            sheet_path = f"xl/worksheets/sheet{number}.xml"
+            overrides.append(_override(sheet_path, SHEET_CONTENT_TYPE))
+            workbook_rels.append(
+                _relationship(number, "worksheet", f"worksheets/sheet{number}.xml")
+            )
+            sheet_entries.append(
+                f'<sheet name="Sheet{number}" sheetId="{number}" r:id="rId{number}"/>'
+            )
+
+            with zf.open(sheet_path, "w") as f:
+                f.write(SHEET_START.encode())
+                for row in range(1, spec.rows + 1):
+                    cells = "".join(
+                        f'<c r="{_column(col)}{row}" t="s"><v>{strings.next_index()}</v></c>'
+                        for col in range(1, spec.cols + 1)
+                    )
+                    f.write(f'<row r="{row}">{cells}</row>'.encode())
+                f.write(b"</sheetData>")
+                f.write(_data_validations(spec, rng).encode())
+                if spec.images:
+                    f.write(b'<drawing r:id="rId1"/>')
+                f.write(b"</worksheet>")
+
+            if spec.images:
+                drawing_path = f"xl/drawings/drawing{number}.xml"
+                overrides.append(_override(drawing_path, DRAWING_CONTENT_TYPE))
+                zf.writestr(
+                    f"xl/worksheets/_rels/sheet{number}.xml.rels",
+                    RELS.format(
+                        relationships=_relationship(
+                            1, "drawing", f"../drawings/drawing{number}.xml"
+                        )
+                    ),
+                )
+                anchors = []
+                image_rels = []
+                for image in range(1, spec.images + 1):
+                    image_number += 1
+                    zf.writestr(f"xl/media/image{image_number}.png", images)
+                    image_rels.append(
+                        _relationship(image, "image", f"../media/image{image_number}.png")
+                    )
+                    anchors.append(
+                        ANCHOR.format(col=spec.cols + 1, row=(image - 1) * 5, size=609600, id=image)
+                    )
+                zf.writestr(drawing_path, DRAWING.format(anchors="".join(anchors)))
+                zf.writestr(
+                    f"xl/drawings/_rels/drawing{number}.xml.rels",
+                    RELS.format(relationships="".join(image_rels)),
+                )
+
+        shared_strings_rel = spec.sheets + 1
+        workbook_rels.append(
+            _relationship(shared_strings_rel, "sharedStrings", "sharedStrings.xml")
+        )
+        zf.writestr("xl/sharedStrings.xml", strings.to_xml(spec.cell_count))
+        zf.writestr("[Content_Types].xml", CONTENT_TYPES.format(overrides="\n".join(overrides)))
+        zf.writestr("_rels/.rels", ROOT_RELS)
+        zf.writestr("xl/workbook.xml", WORKBOOK.format(sheets="".join(sheet_entries)))
+        zf.writestr(
+            "xl/_rels/workbook.xml.rels", RELS.format(relationships="\n".join(workbook_rels))
+        )
+    return path
+
+
+class _SharedStrings:
+    """Builds the shared strings table while cells are generated."""
+
+    def __init__(self, rng: random.Random, spec: WorkbookSpec) -> None:
+        self.rng = rng
+        self.spec = spec
+        self.items: list[str] = []
+
+    def next_index(self) -> int:
+        """Return the shared string index of the next cell: a repeat or a new text."""
+        if self.items and self.rng.random() < self.spec.duplicate_ratio:
+            return self.rng.randrange(len(self.items))
+        words = [self.rng.choice(WORDS) for _ in range(self.spec.words_per_cell)]
+        # Numbered so new texts are unique
+        text = f"{' '.join(words).capitalize()} {len(self.items) + 1}"
+        if self.rng.random() < self.spec.rich_text_ratio:
+            head, _, tail = text.partition(" ")
+            self.items.append(
+                f"<si><r><rPr><b/></rPr><t>{escape(head)}</t></r>"
+                f'<r><t xml:space="preserve"> {escape(tail)}</t></r></si>'
+            )
+        else:
+            self.items.append(f"<si><t>{escape(text)}</t></si>")
+        return len(self.items) - 1
+
+    def to_xml(self, count: int) -> str:
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            f'count="{count}" uniqueCount="{len(self.items)}">{"".join(self.items)}</sst>'
+        )
+
+
+def _data_validations(spec: WorkbookSpec, rng: random.Random) -> str:
+    if not spec.dropdowns:
+        return ""
+    validations = []
+    for number in range(spec.dropdowns):
+        column = _column(number % spec.cols + 1)
+        values = [
+            f"{rng.choice(WORDS).capitalize()} {number}-{i}" for i in range(spec.dropdown_values)
+        ]
+        validations.append(
+            f'<dataValidation type="list" allowBlank="1" sqref="{column}2:{column}{spec.rows}">'
+            f"<formula1>{escape(chr(34) + ','.join(values) + chr(34))}</formula1></dataValidation>"
+        )
+    return f'<dataValidations count="{spec.dropdowns}">{"".join(validations)}</dataValidations>'
+
+
+def _png(size_kb: int, rng: random.Random) -> bytes:
+    """Return a valid RGB PNG of roughly ``size_kb`` kilobytes of noise (incompressible)."""
+    side = max(1, int((size_kb * 1024 / 3) ** 0.5))
+    raw = b"".join(b"\x00" + rng.randbytes(side * 3) for _ in range(side))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+        )
+
+    header = struct.pack(">IIBBBBB", side, side, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw, 1))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _column(number: int) -> str:
+    """Column letters of a 1-based column number (1 -> A, 27 -> AA)."""
+    letters = ""
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _override(part: str, content_type: str) -> str:
+    return f'<Override PartName="/{part}" ContentType="{content_type}"/>'
+
+
+def _relationship(number: int, kind: str, target: str) -> str:
+    return f'<Relationship Id="rId{number}" Type="{REL_TYPE.format(kind)}" Target="{target}"/>'
@@ -0,0 +1,203 @@
+"""Admission control: a global budget of in-flight tokens and per-client quotas."""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from rosetta.core.exceptions import OverloadedError, QuotaExceededError
+
+
+class Admission:
+    """Tokens of the global budget held by one translation until ``release``."""
+
+    def __init__(
+        self, controller: "AdmissionController", tokens: int, loop: asyncio.AbstractEventLoop
+    ) -> None:
+        self.tokens = tokens
+        self._controller = controller
+        self._loop = loop
+        self._released = False
+
+    def release(self) -> None:
+        """Return the tokens to the budget. Safe to call from any thread, and twice."""
+        if self._released:
+            return
+        self._released = True
+        try:
+            self._loop.call_soon_threadsafe(self._controller._release, self.tokens)
+        except RuntimeError:
+            # The event loop is closed: nobody is waiting any more
+            pass
+
+    async def __aenter__(self) -> "Admission":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """Decides whether translations may start, based on their estimated token cost.
+
+    Two limits apply:
+
+    - A global budget of tokens in flight. A translation that does not fit waits
+      (first come, first served) until running ones finish; if too many are
+      waiting already, or it waits too long, it is rejected with OverloadedError.
+      A translation larger than the whole budget is admitted once nothing else runs.
+    - A per-client quota, refilled continuously at ``client_quota`` tokens per
+      ``quota_window`` seconds (a token bucket). Clients over their quota are
+      rejected with QuotaExceededError until enough has been refilled. Estimates
+      are charged up front and corrected with the actual usage by ``settle``.
+
+    A limit of 0 disables it. Waiting happens on the event loop; quotas may be
+    charged and settled from any thread.
+    """
+
+    def __init__(
+        self,
+        token_budget: int,
+        client_quota: int,
+        quota_window: float = 3600.0,
+        max_wait: Optional[float] = 30.0,
+        max_waiting: int = 50,
+        retry_after: float = 30.0,
+    ) -> None:
+        """Initialize the controller.
+
+        Args:
+            token_budget: Estimated tokens allowed in flight across all translations
+            client_quota: Tokens a client may use per quota_window
+            quota_window: Seconds over which the quota refills completely
+            max_wait: Seconds a translation may wait for the budget (None: no limit)
+            max_waiting: Translations allowed to wait at the same time
+            retry_after: Seconds clients are told to wait when the budget is exhausted
+        """
+        self.token_budget = token_budget
+        self.client_quota = client_quota
+        self.quota_window = quota_window
+        self.max_wait = max_wait
+        self.max_waiting = max_waiting
+        self.retry_after = retry_after
+        self.in_flight_tokens = 0
+        self._waiters: deque[tuple[int, asyncio.Future]] = deque()
+        self._quota_lock = threading.Lock()
+        # client -> (tokens available, time of last refill)
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    @property
+    def waiting(self) -> int:
+        """Number of translations waiting for the budget."""
+        return len(self._waiters)
+
+    def charge(self, client: str, tokens: int) -> None:
+        """Take a translation's estimated tokens from the client's quota.
+
+        Raises:
+            QuotaExceededError: If the quota does not cover it yet
+        """
+        if self.client_quota <= 0:
+            return
+        # A full bucket admits any single translation, however large
+        cost = min(tokens, self.client_quota)
+        with self._quota_lock:
+            available = self._refill(client)
+            if available < cost:
+                retry_after = (cost - available) / self._refill_rate
+                raise QuotaExceededError(
+                    f"Token quota exceeded for {client}, try again later",
+                    retry_after=math.ceil(retry_after),
+                )
+            self._buckets[client] = (available - cost, time.monotonic())
+
+    def settle(self, client: str, charged: int, used: int) -> None:
+        """Correct a charge with the tokens a translation actually used."""
+        if self.client_quota <= 0:
+            return
+        with self._quota_lock:
+            available = self._refill(client)
+            # May go negative: the client then waits longer for its next request
+            available = min(self.client_quota, available + min(charged, self.client_quota) - used)
+            self._buckets[client] = (available, time.monotonic())
+
+    def _refill(self, client: str) -> float:
+        """Return the client's available tokens, refilled up to now (lock held)."""
+        now = time.monotonic()
+        available, updated = self._buckets.get(client, (self.client_quota, now))
+        available = min(self.client_quota, available + (now - updated) * self._refill_rate)
+        if available >= self.client_quota:
+            # A full bucket is the same as no bucket; keeps the table small
+            self._buckets.pop(client, None)
+        return available
+
+    @property
+    def _refill_rate(self) -> float:
+        return self.client_quota / self.quota_window
+
+    async def admit(self, tokens: int, background: bool = False) -> Admission:
+        """Wait until a translation of ``tokens`` fits in the global budget.
+
+        Use the returned admission as an async context manager, or call its
+        ``release`` once the translation is done.
+
+        Args:
+            tokens: Estimated cost of the translation
+            background: Wait as long as needed, without counting against
+                        ``max_waiting`` (for jobs, whose queue is bounded already)
+
+        Raises:
+            OverloadedError: If too many translations are waiting, or waiting
+                takes longer than ``max_wait``
+        """
+        loop = asyncio.get_running_loop()
+        if self.token_budget <= 0 or tokens <= 0:
+            return Admission(self, 0, loop)
+
+        cost = min(tokens, self.token_budget)
+        if not self._waiters and self._fits(cost):
+            self.in_flight_tokens += cost
+            return Admission(self, cost, loop)
+
+        if not background and len(self._waiters) >= self.max_waiting:
+            raise OverloadedError("Server is busy, try again later", retry_after=self.retry_after)
+
+        future = loop.create_future()
+        waiter = (cost, future)
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(future, None if background else self.max_wait)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # Admitted just as the wait ended: hand the tokens back
+                self._release(cost)
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                raise OverloadedError(
+                    "Server is busy, try again later", retry_after=self.retry_after
+                ) from None
+            raise
+        return Admission(self, cost, loop)
+
+    def _fits(self, cost: int) -> bool:
+        return self.in_flight_tokens == 0 or self.in_flight_tokens + cost <= self.token_budget
+
+    def _release(self, tokens: int) -> None:
+        """Return tokens to the budget and admit waiters in order (on the event loop)."""
+        self.in_flight_tokens -= tokens
+        while self._waiters:
+            cost, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._fits(cost):
+                break
+            self._waiters.popleft()
+            self.in_flight_tokens += cost
+            future.set_result(None)
@@ -1,25 +1,59 @@
 """FastAPI application for Rosetta translation service."""
 
+import asyncio
+import concurrent.futures
+import hashlib
+import math
 import os
 import tempfile
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-import requests
-from dotenv import load_dotenv
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi import FastAPI, File, Form, HTTPException, Request, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from openpyxl import load_workbook
-
-from rosetta.services.translation_service import count_cells, translate_file
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.middleware.base import RequestResponseEndpoint
+
+from rosetta.api.admission import AdmissionController
+from rosetta.api.executors import Offloader
+from rosetta.api.jobs import QUEUED, JobManager, JobRecord, JobRunner, JobStore, format_sse
+from rosetta.api.recaptcha import RecaptchaVerifier
+from rosetta.api.results import BYPASS, ResultCache, result_key
+from rosetta.api.storage import TemporaryFileResponse, Workspace, disk_usage
+from rosetta.api.uploads import (
+    FORM_OVERHEAD,
+    BodySizeLimitMiddleware,
+    SavedUpload,
+    UploadTooLargeError,
+    save_upload,
+)
+from rosetta.core.config import Config, load_env
+from rosetta.core.exceptions import (
+    CircuitOpenError,
+    JobQueueFullError,
+    OverloadedError,
+    QuotaExceededError,
+)
+from rosetta.services import Translator
+from rosetta.services.batch_size import AdaptiveBatchSize
+from rosetta.services.estimator import TranslationEstimate, estimate_file
+from rosetta.services.inspector import WorkbookInspection, inspect_workbook
+from rosetta.services.metrics import CACHE_LOOKUPS, REGISTRY
+from rosetta.services.progress import COMPLETED, FAILED, ProgressCallback
+from rosetta.services.scheduler import BatchScheduler
+from rosetta.services.translation_service import list_sheets, translate_file
+from rosetta.services.translator import BatchTranslator
 
 # Load environment variables from .env file
-load_dotenv()
+load_env()
 
 # reCAPTCHA configuration
 RECAPTCHA_SECRET_KEY = os.getenv("RECAPTCHA_SECRET_KEY")
-RECAPTCHA_VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
+RECAPTCHA_VERIFY_URL = os.getenv(
+    "RECAPTCHA_VERIFY_URL", "https://www.google.com/recaptcha/api/siteverify"
+)
 
 # CORS configuration - allow frontend origins
 FRONTEND_URL = os.getenv("FRONTEND_URL", "")
@@ -33,12 +67,217 @@ if FRONTEND_URL:
 # Limits
 # Keep in sync with frontend validation/copy (50MB).
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+FILE_TOO_LARGE = f"File too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB"
 MAX_CELLS = 5000
+# Request header asking for a profile of the translation (see translate_file's profile)
+PROFILE_HEADER = "X-Rosetta-Profile"
+# Background jobs do not hold a connection open, so they can be much larger
+MAX_JOB_CELLS = int(os.getenv("ROSETTA_MAX_JOB_CELLS", "50000"))
+
+# Background jobs: persistent store location and worker pool size
+JOBS_DIR = Path(os.getenv("ROSETTA_JOBS_DIR", Path(tempfile.gettempdir()) / "rosetta-jobs"))
+JOB_WORKERS = int(os.getenv("ROSETTA_JOB_WORKERS", "2"))
+MAX_QUEUED_JOBS = int(os.getenv("ROSETTA_MAX_QUEUED_JOBS", "100"))
+# Finished jobs and their files are deleted this many seconds after they ended (0: never)
+JOB_TTL = float(os.getenv("ROSETTA_JOB_TTL", str(7 * 24 * 60 * 60)))
+
+# Uploads and outputs of synchronous requests live in one directory per request,
+# removed once the response has been sent
+WORK_DIR = Path(os.getenv("ROSETTA_WORK_DIR", Path(tempfile.gettempdir()) / "rosetta-work"))
+workspace = Workspace(WORK_DIR)
+
+# Translated workbooks of /translate, reused for identical requests (same file,
+# languages, context, sheets and model). A size of 0 disables the cache.
+RESULT_CACHE_DIR = Path(
+    os.getenv("ROSETTA_RESULT_CACHE_DIR", Path(tempfile.gettempdir()) / "rosetta-results")
+)
+RESULT_CACHE_MB = int(os.getenv("ROSETTA_RESULT_CACHE_MB", "1024"))
+RESULT_CACHE_TTL = float(os.getenv("ROSETTA_RESULT_CACHE_TTL", str(24 * 60 * 60)))
+results = ResultCache(
+    RESULT_CACHE_DIR, max_bytes=RESULT_CACHE_MB * 1024 * 1024, ttl=RESULT_CACHE_TTL
+)
+
+# Admission control, based on the estimated tokens of each translation: a budget
+# of tokens in flight across the server, and a quota per client (API key or IP)
+# refilled over ROSETTA_QUOTA_WINDOW seconds. 0 disables a limit.
+TOKEN_BUDGET = int(os.getenv("ROSETTA_TOKEN_BUDGET", "1000000"))
+CLIENT_TOKEN_QUOTA = int(os.getenv("ROSETTA_CLIENT_TOKEN_QUOTA", "2000000"))
+QUOTA_WINDOW = float(os.getenv("ROSETTA_QUOTA_WINDOW", "3600"))
+ADMISSION_WAIT = float(os.getenv("ROSETTA_ADMISSION_WAIT", "30"))
+ADMISSION_QUEUE = int(os.getenv("ROSETTA_ADMISSION_QUEUE", "50"))
+# Keys identifying clients in the X-API-Key header; other clients count by IP
+API_KEYS = {key.strip() for key in os.getenv("ROSETTA_API_KEYS", "").split(",") if key.strip()}
+# Profiling skips the result cache and slows the server down, so only clients with
+# an API key may ask for it, unless ROSETTA_ALLOW_PROFILING opens it to everyone
+ALLOW_PROFILING = os.getenv("ROSETTA_ALLOW_PROFILING", "").strip().lower() in ("1", "true", "yes")
+admission = AdmissionController(
+    token_budget=TOKEN_BUDGET,
+    client_quota=CLIENT_TOKEN_QUOTA,
+    quota_window=QUOTA_WINDOW,
+    max_wait=ADMISSION_WAIT,
+    max_waiting=ADMISSION_QUEUE,
+)
+
+# Texts of concurrent translations with the same languages and context are sent
+# together: a text waits up to ROSETTA_BATCH_WINDOW seconds for others to fill its
+# request. 0 sends each translation's batches as they are.
+BATCH_WINDOW = float(os.getenv("ROSETTA_BATCH_WINDOW", "0.05"))
+
+# Blocking work is kept off the event loop: workbook parsing runs in a process
+# pool, file and network I/O (including translations) in a thread pool
+CPU_WORKERS = int(os.getenv("ROSETTA_CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+IO_WORKERS = int(os.getenv("ROSETTA_IO_WORKERS", "16"))
+offloader = Offloader(cpu_workers=CPU_WORKERS, io_workers=IO_WORKERS)
+
+# Server metrics, exposed at /metrics along with those of the translation pipeline
+TRANSLATE_IN_FLIGHT = REGISTRY.gauge(
+    "rosetta_translate_requests_in_flight", "Synchronous /translate requests in progress."
+)
+ADMISSION_REJECTIONS = REGISTRY.counter(
+    "rosetta_admission_rejections_total",
+    "Translations rejected by admission control (quota or busy).",
+    ["reason"],
+)
+REGISTRY.gauge(
+    "rosetta_admission_tokens_in_flight",
+    "Estimated tokens of the translations admitted and not finished.",
+    function=lambda: admission.in_flight_tokens,
+)
+REGISTRY.gauge(
+    "rosetta_admission_waiting",
+    "Translations waiting for the admission budget.",
+    function=lambda: admission.waiting,
+)
+REGISTRY.gauge(
+    "rosetta_active_workdirs",
+    "Request working directories still on disk.",
+    function=lambda: workspace.active,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Create one translator for the whole process and warm its connection pool.
+
+    The translator (and its Anthropic HTTP client) is shared by all requests and
+    worker threads, so connections and TLS sessions are reused across translations.
+    """
+    try:
+        translator: Optional[Translator] = Translator(Config.from_env())
+    except ValueError:
+        # No API key configured: translate_file will report the error per request
+        translator = None
+
+    app.state.translator = translator
+    # What translations send their batches to. With ROSETTA_ADAPTIVE_BATCH_SIZE the
+    # scheduler also sizes the requests of all translations together.
+    app.state.scheduler = translator
+    if translator is not None and (BATCH_WINDOW > 0 or translator.config.adaptive_batch_size):
+        app.state.scheduler = BatchScheduler(
+            translator,
+            window=BATCH_WINDOW,
+            batch_sizer=(
+                AdaptiveBatchSize(translator.config.batch_size)
+                if translator.config.adaptive_batch_size
+                else None
+            ),
+        )
+    # One pooled async client for reCAPTCHA checks, shared by all requests
+    app.state.recaptcha = RecaptchaVerifier(RECAPTCHA_SECRET_KEY, RECAPTCHA_VERIFY_URL)
+    store = JobStore(JOBS_DIR)
+    app.state.jobs = JobManager(
+        store,
+        _job_runner(app.state.scheduler, asyncio.get_running_loop()),
+        workers=JOB_WORKERS,
+        max_queued=MAX_QUEUED_JOBS,
+        ttl=JOB_TTL,
+    )
+    # Pick up jobs interrupted by a restart
+    app.state.jobs.recover()
+    warmup_task = None
+    if translator is not None:
+        # Warm up in the background so startup is not blocked on the network
+        warmup_task = asyncio.create_task(asyncio.to_thread(translator.warmup))
+
+    try:
+        yield
+    finally:
+        if warmup_task is not None:
+            warmup_task.cancel()
+        if translator is not None:
+            translator.close()
+        app.state.translator = None
+        app.state.scheduler = None
+        await app.state.recaptcha.aclose()
+        app.state.recaptcha = None
+        app.state.jobs.close()
+        offloader.shutdown()
+
+
+def _job_runner(
+    translator: Optional[BatchTranslator], loop: asyncio.AbstractEventLoop
+) -> JobRunner:
+    """Build the function that translates one background job on a worker thread.
+
+    Jobs wait on the event loop until their estimated tokens fit in the admission
+    budget, then settle their client's quota with the tokens actually used (none
+    if the job failed).
+    """
+
+    def run(
+        record: JobRecord, input_path: Path, output_path: Path, on_progress: ProgressCallback
+    ) -> dict:
+        tokens = record.estimated_tokens or 0
+        # A job that fails or never starts gives its client's charge back
+        used = 0
+        try:
+            pending = asyncio.run_coroutine_threadsafe(
+                admission.admit(tokens, background=True), loop
+            )
+            while True:
+                try:
+                    admitted = pending.result(timeout=1.0)
+                    break
+                except concurrent.futures.TimeoutError:
+                    if loop.is_closed() or not loop.is_running():
+                        pending.cancel()
+                        raise RuntimeError("Server shut down before the job could start")
+
+            try:
+                result = translate_file(
+                    input_file=input_path,
+                    output_file=output_path,
+                    target_lang=record.target_lang,
+                    source_lang=record.source_lang,
+                    context=record.context,
+                    sheets=set(record.sheets) if record.sheets else None,
+                    translator=translator,
+                    checkpoint=False,
+                    on_progress=on_progress,
+                    profile=bool(record.profile),
+                )
+            finally:
+                admitted.release()
+            used = result.get("input_tokens", 0) + result.get("output_tokens", 0)
+            return result
+        finally:
+            if record.client is not None:
+                admission.settle(record.client, tokens, used)
+
+    return run
+
 
 app = FastAPI(
     title="Rosetta",
     description="Excel translation API that preserves formatting, formulas, and data integrity",
     version="0.1.0",
+    lifespan=lifespan,
+)
+
+# Stop oversized uploads while they are received, not after spooling them. Added
+# first, so CORS (added after it, outermost) puts its headers on the rejections.
+app.add_middleware(
+    BodySizeLimitMiddleware, max_body_size=MAX_FILE_SIZE + FORM_OVERHEAD, detail=FILE_TOO_LARGE
 )
 
 # CORS middleware for frontend
@@ -51,19 +290,55 @@ app.add_middleware(
 )
 
 
-@app.get("/")
-async def root() -> dict:
-    """Health check endpoint."""
-    return {"status": "ok", "service": "rosetta"}
+@app.middleware("http")
+async def account_cpu_time(request: Request, call_next: RequestResponseEndpoint) -> Response:
+    """Report the CPU time of work offloaded for a request in a Server-Timing header.
 
+    Endpoints can add their own entries (e.g. profiled stages) to
+    ``request.state.server_timing``.
+    """
+    request.state.cpu_seconds = 0.0
+    request.state.server_timing = []
+    response = await call_next(request)
+    response.headers["Server-Timing"] = ", ".join(
+        [f"cpu;dur={request.state.cpu_seconds * 1000:.1f}", *request.state.server_timing]
+    )
+    return response
 
-@app.post("/sheets")
-async def get_sheets(
-    file: UploadFile = File(..., description="Excel file to get sheet names from"),
-) -> dict:
-    """Get sheet names from an Excel file.
 
-    Returns a list of sheet names in the uploaded Excel file.
+def _wants_profile(request: Request) -> bool:
+    """Whether the client asked for a profile of the translation (``X-Rosetta-Profile: 1``).
+
+    The header is ignored for clients without a known API key, unless profiling is
+    open to everyone (``ALLOW_PROFILING``).
+    """
+    if request.headers.get(PROFILE_HEADER, "").strip().lower() not in ("1", "true", "yes"):
+        return False
+    return ALLOW_PROFILING or request.headers.get("X-API-Key") in API_KEYS
+
+
+def _profile_headers(request: Request, profile: dict) -> dict[str, str]:
+    """Summarize a profile in response headers: per-stage Server-Timing entries and JSON.
+
+    The per-batch measurements are left out to keep the headers small; profile a
+    background job to get them in the job's result.
+    """
+    import json
+
+    request.state.server_timing.extend(
+        f"{name};dur={stage['wall_seconds'] * 1000:.1f}"
+        for name, stage in profile["stages"].items()
+    )
+    summary = {key: value for key, value in profile.items() if key not in ("batches", "dumps")}
+    return {PROFILE_HEADER: json.dumps(summary, separators=(",", ":"))}
+
+
+async def _receive_upload(request: Request, file: UploadFile) -> SavedUpload:
+    """Validate an uploaded Excel file and stream it into a new working directory.
+
+    The file is copied and hashed in chunks, so memory use does not depend on its
+    size. The caller owns (and must remove) the working directory, which is the
+    parent of the returned file.
     """
     # Validate file type
     if not file.filename:
@@ -75,72 +350,213 @@ async def get_sheets(
             detail="Invalid file type. Only Excel files (.xlsx, .xlsm, .xltx, .xltm) are supported",
         )
 
-    # Read file content
-    content = await file.read()
-
-    # Check file size
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB",
+    workdir = workspace.create()
+    try:
+        return await offloader.run_io(
+            request, save_upload, file.file, MAX_FILE_SIZE, workdir / "input.xlsx"
         )
+    except UploadTooLargeError:
+        workspace.remove(workdir)
+        raise HTTPException(status_code=400, detail=FILE_TOO_LARGE)
+    except BaseException:
+        workspace.remove(workdir)
+        raise
 
-    # Save to temp file for processing
-    with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp_input:
-        tmp_input.write(content)
-        input_path = Path(tmp_input.name)
 
-    try:
-        # Load workbook and get sheet names
-        wb = load_workbook(input_path, read_only=True, data_only=True)
-        sheet_names = wb.sheetnames
-        wb.close()
+@app.get("/")
+async def root() -> dict:
+    """Health check endpoint."""
+    return {"status": "ok", "service": "rosetta"}
+
+
+@app.get("/storage")
+async def storage(request: Request) -> dict:
+    """Disk usage gauge: space used by request working directories, jobs and cached results.
 
+    ``active_workdirs`` counts requests whose files are still on disk; it should
+    fall back to zero when the server is idle.
+    """
+    work = await offloader.run_io(request, workspace.usage)
+    jobs = await offloader.run_io(request, disk_usage, JOBS_DIR)
+    cached = await offloader.run_io(request, disk_usage, results.root)
+    return {
+        "active_workdirs": workspace.active,
+        "work": work.to_dict(),
+        "jobs": jobs.to_dict(),
+        "results": cached.to_dict(),
+    }
+
+
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    """Metrics in the Prometheus text exposition format.
+
+    Covers processing stage and API request latencies, batch sizes, tokens,
+    retries, parse failures, cache lookups and work in flight.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/sheets")
+async def get_sheets(
+    request: Request,
+    file: UploadFile = File(..., description="Excel file to get sheet names from"),
+) -> dict:
+    """Get sheet names from an Excel file.
+
+    Returns a list of sheet names in the uploaded Excel file.
+    """
+    input_path = (await _receive_upload(request, file)).path
+
+    try:
+        # Reads only xl/workbook.xml, so a thread will do
+        sheet_names = await offloader.run_io(request, list_sheets, input_path)
         return {"sheets": sheet_names}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read file: {str(e)}")
     finally:
-        input_path.unlink(missing_ok=True)
+        await offloader.run_io(request, workspace.remove, input_path.parent)
 
 
-def verify_recaptcha(token: Optional[str]) -> bool:
-    """Verify reCAPTCHA token with Google's API."""
-    if not RECAPTCHA_SECRET_KEY:
-        # If no secret key is configured, skip verification (for development)
-        return True
-    
-    if not token:
-        return False
-    
+@app.post("/estimate")
+async def estimate(
+    request: Request,
+    file: UploadFile = File(..., description="Excel file to estimate"),
+    target_lang: str = Form(..., description="Target language (e.g., french, spanish)"),
+    source_lang: Optional[str] = Form(None, description="Source language (auto-detect if omitted)"),
+    context: Optional[str] = Form(None, description="Additional context for accurate translations"),
+    sheets: Optional[str] = Form(None, description="Comma-separated sheet names (all if omitted)"),
+    concurrency: Optional[int] = Form(None, description="Batches translated in parallel"),
+) -> dict:
+    """Estimate the requests, tokens and time a translation would take.
+
+    Runs extraction, deduplication and batch planning locally; no API calls are made.
+    """
+    if concurrency is None:
+        concurrency = int(os.getenv("ROSETTA_CONCURRENCY", str(Config.concurrency)))
+    if concurrency < 1:
+        raise HTTPException(status_code=400, detail="concurrency must be at least 1")
+
+    sheets_set = None
+    if sheets:
+        sheets_set = {s.strip() for s in sheets.split(",") if s.strip()}
+
+    input_path = (await _receive_upload(request, file)).path
+
     try:
-        response = requests.post(
-            RECAPTCHA_VERIFY_URL,
-            data={
-                "secret": RECAPTCHA_SECRET_KEY,
-                "response": token,
-            },
-            timeout=5,
+        result = await offloader.run_cpu(
+            request,
+            estimate_file,
+            input_path,
+            target_lang=target_lang,
+            source_lang=source_lang,
+            context=context,
+            sheets=sheets_set,
+            concurrency=concurrency,
         )
-        response.raise_for_status()
-        result = response.json()
-        success = result.get("success", False)
-        
-        # Log error details if verification failed
-        if not success:
-            error_codes = result.get("error-codes", [])
-            print(f"reCAPTCHA verification failed. Error codes: {error_codes}")
-            print(f"Response: {result}")
-        
-        return success
+        return {
+            **result.to_dict(),
+            "max_cells": MAX_CELLS,
+            "exceeds_cell_limit": result.cell_count > MAX_CELLS,
+            "max_job_cells": MAX_JOB_CELLS,
+        }
+
     except Exception as e:
-        # If verification fails due to network/API issues, reject the request
-        print(f"reCAPTCHA verification error: {e}")
-        return False
+        raise HTTPException(status_code=500, detail=f"Failed to read file: {str(e)}")
+    finally:
+        await offloader.run_io(request, workspace.remove, input_path.parent)
+
+
+async def verify_recaptcha(request: Request, token: Optional[str]) -> bool:
+    """Verify reCAPTCHA token with Google's API, without blocking the event loop."""
+    verifier: Optional[RecaptchaVerifier] = getattr(request.app.state, "recaptcha", None)
+    if verifier is not None:
+        return await verifier.verify(token)
+
+    # Lifespan not run (e.g. a test client used without a with block)
+    verifier = RecaptchaVerifier(RECAPTCHA_SECRET_KEY, RECAPTCHA_VERIFY_URL)
+    try:
+        return await verifier.verify(token)
+    finally:
+        await verifier.aclose()
+
+
+async def _estimate_work(
+    request: Request,
+    input_path: Path,
+    target_lang: str,
+    source_lang: Optional[str],
+    context: Optional[str],
+    sheets: Optional[set[str]],
+    max_cells: int = MAX_CELLS,
+) -> tuple[WorkbookInspection, TranslationEstimate]:
+    """Estimate a translation's cost, rejecting files with no cells or more than ``max_cells``.
+
+    The cells are counted from the package XML before anything else, so invalid
+    files are rejected in milliseconds. The inspection is returned for the
+    translation to reuse.
+    """
+    inspection = await offloader.run_cpu(request, inspect_workbook, input_path, sheets)
+    cell_count = inspection.cell_count
+    if cell_count > max_cells:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many cells ({cell_count}). Maximum is {max_cells} cells per request",
+        )
+
+    if cell_count == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="No translatable content found in the file",
+        )
+
+    estimate = await offloader.run_cpu(
+        request,
+        estimate_file,
+        input_path,
+        target_lang=target_lang,
+        source_lang=source_lang,
+        context=context,
+        sheets=sheets,
+        inspection=inspection,
+    )
+    return inspection, estimate
+
+
+def _client_id(request: Request) -> str:
+    """Identify the client for quotas: a known API key, else the client's IP address."""
+    api_key = request.headers.get("X-API-Key")
+    if api_key and api_key in API_KEYS:
+        return f"key:{hashlib.sha256(api_key.encode()).hexdigest()[:16]}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def _overloaded(error: OverloadedError) -> HTTPException:
+    """429 for a client over its quota, 503 for a busy server or model, with Retry-After."""
+    quota = isinstance(error, QuotaExceededError)
+    if quota:
+        ADMISSION_REJECTIONS.inc(reason="quota")
+    elif not isinstance(error, CircuitOpenError):
+        ADMISSION_REJECTIONS.inc(reason="busy")
+    status_code = 429 if quota else 503
+    return HTTPException(
+        status_code=status_code,
+        detail=str(error),
+        headers={"Retry-After": str(math.ceil(error.retry_after))},
+    )
+
+
+def _model_name(translator: Optional[Translator]) -> str:
+    """Model the translations of a request are made with, for result cache keys."""
+    if translator is not None:
+        return translator.config.model
+    return os.getenv("ROSETTA_MODEL", Config.model)
 
 
 @app.post("/translate")
 async def translate(
+    request: Request,
     file: UploadFile = File(..., description="Excel file to translate"),
     target_lang: str = Form(..., description="Target language (e.g., french, spanish)"),
     source_lang: Optional[str] = Form(None, description="Source language (auto-detect if omitted)"),
@@ -152,85 +568,282 @@ async def translate(
 
     Upload an Excel file and receive the translated version.
     Preserves all formatting, formulas, images, and data validations.
+    The response is streamed from disk in chunks; the uploaded and translated
+    files are deleted once it has been sent, or the client has gone away.
+
+    Results are cached by the file's content hash and the translation options.
+    Repeated requests are served from the cache, and identical requests arriving
+    while one is in progress wait for its result instead of translating again.
+    The ``X-Cache`` header tells which happened (HIT, MISS or COALESCED).
+
+    With an ``X-Rosetta-Profile: 1`` request header the file is translated again
+    (X-Cache: BYPASS) and profiled: the time, CPU, peak memory and calls of each
+    stage are returned in the ``X-Rosetta-Profile`` and ``Server-Timing`` headers.
     """
     # Verify reCAPTCHA token
-    if not verify_recaptcha(recaptcha_token):
+    if not await verify_recaptcha(request, recaptcha_token):
         raise HTTPException(
             status_code=400,
             detail="reCAPTCHA verification failed. Please complete the reCAPTCHA challenge.",
         )
     
-    # Validate file type
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No filename provided")
-
-    if not file.filename.lower().endswith((".xlsx", ".xlsm", ".xltx", ".xltm")):
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid file type. Only Excel files (.xlsx, .xlsm, .xltx, .xltm) are supported",
-        )
-
-    # Read file content
-    content = await file.read()
-
-    # Check file size
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB",
-        )
-
     # Parse sheets parameter
     sheets_set = None
     if sheets:
         sheets_set = {s.strip() for s in sheets.split(",") if s.strip()}
 
-    # Save to temp file for processing
-    with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp_input:
-        tmp_input.write(content)
-        input_path = Path(tmp_input.name)
+    upload = await _receive_upload(request, file)
+    input_path = upload.path
+    workdir = input_path.parent
+    translator = getattr(request.app.state, "translator", None)
+    key = result_key(
+        upload.sha256, target_lang, source_lang, context, sheets_set, _model_name(translator)
+    )
+
+    profile = _wants_profile(request)
+    client = _client_id(request)
+    loop = asyncio.get_running_loop()
+
+    def produce(output_path: Path) -> dict:
+        """Validate, charge and translate the file, on a worker thread.
+
+        Only called when no cached or in-progress result can be used: cached
+        results already passed validation and cost nothing.
+        """
+        inspection, estimate = asyncio.run_coroutine_threadsafe(
+            _estimate_work(request, input_path, target_lang, source_lang, context, sheets_set),
+            loop,
+        ).result()
+        tokens = estimate.input_tokens + estimate.output_tokens
+        admission.charge(client, tokens)
+        # Refund the charge for work that was never done, e.g. a failed translation
+        used = 0
+        try:
+            admitted = asyncio.run_coroutine_threadsafe(admission.admit(tokens), loop).result()
+            try:
+                # Translate (waits on the API; the shared translator cannot leave this process)
+                result = translate_file(
+                    input_file=input_path,
+                    output_file=output_path,
+                    target_lang=target_lang,
+                    source_lang=source_lang,
+                    context=context,
+                    sheets=sheets_set,
+                    translator=getattr(request.app.state, "scheduler", translator),
+                    checkpoint=False,
+                    inspection=inspection,
+                    profile=profile,
+                )
+            finally:
+                admitted.release()
+            used = result.get("input_tokens", 0) + result.get("output_tokens", 0)
+            return result
+        finally:
+            admission.settle(client, tokens, used)
 
     try:
-        # Check cell count
-        cell_count = count_cells(input_path, sheets_set)
-        if cell_count > MAX_CELLS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Too many cells ({cell_count}). Maximum is {MAX_CELLS} cells per request",
-            )
-
-        if cell_count == 0:
-            raise HTTPException(
-                status_code=400,
-                detail="No translatable content found in the file",
-            )
-
         # Create output path
-        output_path = input_path.with_name(f"{input_path.stem}_translated.xlsx")
-
-        # Translate
-        result = translate_file(
-            input_file=input_path,
-            output_file=output_path,
-            target_lang=target_lang,
-            source_lang=source_lang,
-            context=context,
-            sheets=sheets_set,
-        )
+        output_path = workdir / "output.xlsx"
+
+        with TRANSLATE_IN_FLIGHT.track_in_progress():
+            if profile:
+                # A cached result has nothing to profile
+                result = await offloader.run_io(request, produce, output_path)
+                cache_status = BYPASS
+            else:
+                result, cache_status = await offloader.run_io(
+                    request, results.fetch, key, output_path, produce
+                )
+                CACHE_LOOKUPS.inc(cache="result", result=cache_status.lower())
 
         # Return translated file
         output_filename = file.filename.replace(".xlsx", f"_{target_lang}.xlsx")
-        return FileResponse(
+        return TemporaryFileResponse(
             path=output_path,
             filename=output_filename,
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"X-Cells-Translated": str(result["cell_count"])},
+            headers={
+                "X-Cells-Translated": str(result["cell_count"]),
+                "X-Cache": cache_status,
+                "ETag": f'"{key}"',
+                "Cache-Control": (
+                    f"private, max-age={int(results.ttl)}" if results.enabled else "no-store"
+                ),
+                **(_profile_headers(request, result["profile"]) if "profile" in result else {}),
+            },
+            # Removes the input and output files once the response has been sent
+            background=BackgroundTask(workspace.remove, workdir),
         )
 
     except HTTPException:
+        await offloader.run_io(request, workspace.remove, workdir)
         raise
+    except OverloadedError as e:
+        await offloader.run_io(request, workspace.remove, workdir)
+        raise _overloaded(e)
     except Exception as e:
+        await offloader.run_io(request, workspace.remove, workdir)
         raise HTTPException(status_code=500, detail=f"Translation failed: {str(e)}")
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    request: Request,
+    file: UploadFile = File(..., description="Excel file to translate"),
+    target_lang: str = Form(..., description="Target language (e.g., french, spanish)"),
+    source_lang: Optional[str] = Form(None, description="Source language (auto-detect if omitted)"),
+    context: Optional[str] = Form(None, description="Additional context for accurate translations"),
+    sheets: Optional[str] = Form(None, description="Comma-separated sheet names (all if omitted)"),
+    recaptcha_token: Optional[str] = Form(None, description="reCAPTCHA token for verification"),
+) -> dict:
+    """Queue an Excel file for translation in the background.
+
+    Jobs are stored on disk and run by a bounded pool of workers, so the request
+    returns at once and the job survives client disconnects and server restarts.
+    Poll ``status_url``, follow ``events_url`` (Server-Sent Events) and download the
+    translated file from ``result_url`` once the job has completed.
+
+    With an ``X-Rosetta-Profile: 1`` request header the job is profiled; the profile,
+    including every API request, is in the ``profile`` key of the job's result.
+    """
+    if not await verify_recaptcha(request, recaptcha_token):
+        raise HTTPException(
+            status_code=400,
+            detail="reCAPTCHA verification failed. Please complete the reCAPTCHA challenge.",
+        )
+
+    sheets_set = None
+    if sheets:
+        sheets_set = {s.strip() for s in sheets.split(",") if s.strip()}
+
+    upload = await _receive_upload(request, file)
+    jobs: JobManager = request.app.state.jobs
+    try:
+        job = await offloader.run_io(
+            request,
+            jobs.create,
+            file.filename,
+            upload,
+            target_lang,
+            source_lang,
+            context,
+            sheets_set,
+            _wants_profile(request),
+        )
     finally:
-        # Cleanup input file (output file cleaned up after response is sent)
-        input_path.unlink(missing_ok=True)
+        await offloader.run_io(request, workspace.remove, upload.path.parent)
+    client = _client_id(request)
+    charged = 0
+    started = False
+    try:
+        _, estimate = await _estimate_work(
+            request,
+            jobs.store.input_path(job.id),
+            target_lang,
+            source_lang,
+            context,
+            sheets_set,
+            max_cells=MAX_JOB_CELLS,
+        )
+        tokens = estimate.input_tokens + estimate.output_tokens
+        admission.charge(client, tokens)
+        charged = tokens
+        await offloader.run_io(
+            request, jobs.store.update, job.id, client=client, estimated_tokens=tokens
+        )
+        jobs.start(job.id)
+        started = True
+    except HTTPException:
+        raise
+    except QuotaExceededError as e:
+        raise _overloaded(e)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read file: {str(e)}")
+    finally:
+        # A job that did not start is dropped, and its client's charge given back
+        if not started:
+            jobs.discard(job.id)
+            admission.settle(client, charged, 0)
+
+    return _job_response(job)
+
+
+def _job_response(job: JobRecord) -> dict:
+    """Public view of a job: its state, latest progress and URLs."""
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "filename": job.filename,
+        "input_sha256": job.input_sha256,
+        "target_lang": job.target_lang,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.error,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events",
+        "result_url": f"/jobs/{job.id}/result",
+    }
+
+
+async def _get_job(request: Request, job_id: str) -> JobRecord:
+    """Look up a job or raise 404."""
+    jobs: JobManager = request.app.state.jobs
+    job = await offloader.run_io(request, jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(request: Request, job_id: str) -> dict:
+    """Get a job's status and latest progress (queued, running, completed or failed)."""
+    return _job_response(await _get_job(request, job_id))
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(request: Request, job_id: str) -> StreamingResponse:
+    """Stream a job's progress events as Server-Sent Events.
+
+    Past events are replayed first, so clients can connect at any time. The
+    stream ends after the ``completed`` or ``failed`` event. For jobs that
+    finished before the server last restarted, only the final event is sent.
+    """
+    job = await _get_job(request, job_id)
+    live = request.app.state.jobs.events(job_id)
+
+    async def stream() -> AsyncIterator[str]:
+        if live is not None:
+            async for event in live.follow():
+                yield format_sse(event)
+        elif job.progress is not None:
+            yield format_sse(job.progress)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(request: Request, job_id: str) -> FileResponse:
+    """Download the translated file of a completed job."""
+    job = await _get_job(request, job_id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=409, detail=f"Translation failed: {job.error}")
+    if job.status != COMPLETED:
+        detail = "Job is queued" if job.status == QUEUED else "Translation is still running"
+        raise HTTPException(status_code=409, detail=detail)
+    assert job.result is not None  # Stored with the COMPLETED status
+
+    output_filename = job.filename.replace(".xlsx", f"_{job.target_lang}.xlsx")
+    return FileResponse(
+        path=request.app.state.jobs.store.output_path(job.id),
+        filename=output_filename,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"X-Cells-Translated": str(job.result["cell_count"])},
+    )
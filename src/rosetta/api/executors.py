@@ -0,0 +1,138 @@
+"""Run blocking work off the event loop, with per-request CPU time accounting."""
+
+import asyncio
+import functools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar, cast
+
+from starlette.requests import Request
+
+from rosetta.services.metrics import REGISTRY, MetricUpdate
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _timed_in_process(
+    fn: Callable[..., T], *args: Any, **kwargs: Any
+) -> tuple[tuple[Optional[T], Optional[Exception], list[MetricUpdate]], float]:
+    """Call ``fn`` in a pool process and return its outcome with the CPU time it used.
+
+    The outcome is the result, or the exception ``fn`` raised, and the metric
+    updates it made, which would otherwise stay in the pool process.
+    """
+    started = time.process_time()
+    result, error = None, None
+    with REGISTRY.recording() as updates:
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            error = e
+    return (result, error, updates), time.process_time() - started
+
+
+def _timed_in_thread(fn: Callable[..., T], *args: Any, **kwargs: Any) -> tuple[T, float]:
+    """Call ``fn`` on a pool thread and return its result with that thread's CPU time."""
+    started = time.thread_time()
+    result = fn(*args, **kwargs)
+    return result, time.thread_time() - started
+
+
+class Offloader:
+    """Process pool for CPU-bound stages and thread pool for I/O-bound ones.
+
+    CPU-bound work (zip/XML parsing of whole workbooks) runs in separate processes
+    so it neither blocks the event loop nor contends for the GIL with request
+    handling; its functions and arguments must be picklable. I/O-bound work
+    (file writes, HTTP calls, translations waiting on the API) runs on threads.
+
+    The CPU time of every offloaded call is added to ``request.state.cpu_seconds``,
+    and the metrics updated in a pool process are updated in this one.
+    Pools are created on first use and re-created after ``shutdown``.
+    """
+
+    def __init__(self, cpu_workers: int, io_workers: int) -> None:
+        """Initialize the offloader.
+
+        Args:
+            cpu_workers: Size of the process pool. 0 runs CPU-bound work on the
+                         thread pool instead (e.g. where processes are unavailable).
+            io_workers: Size of the thread pool
+        """
+        self.cpu_workers = cpu_workers
+        self.io_workers = io_workers
+        self._lock = threading.Lock()
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+
+    async def run_cpu(
+        self, request: Optional[Request], fn: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        """Run a CPU-bound, picklable function in the process pool."""
+        if self.cpu_workers <= 0:
+            return await self.run_io(request, fn, *args, **kwargs)
+        result, error, updates = await self._run(
+            request, self._process_pool(), _timed_in_process, fn, args, kwargs
+        )
+        # Stage timings and parse failures recorded in the pool process
+        REGISTRY.apply(updates)
+        if error is not None:
+            raise error
+        return cast(T, result)
+
+    async def run_io(
+        self, request: Optional[Request], fn: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        """Run an I/O-bound function in the thread pool.
+
+        Only the CPU time of the pool thread itself is accounted; threads started
+        by ``fn`` (such as the translation pipeline's workers) are not.
+        """
+        return await self._run(request, self._thread_pool(), _timed_in_thread, fn, args, kwargs)
+
+    def shutdown(self) -> None:
+        """Shut both pools down without waiting for running work."""
+        with self._lock:
+            processes, self._processes = self._processes, None
+            threads, self._threads = self._threads, None
+        for pool in (processes, threads):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(
+        self,
+        request: Optional[Request],
+        pool: Executor,
+        timed: Callable[..., tuple[R, float]],
+        fn: Callable[..., Any],
+        args: tuple,
+        kwargs: dict,
+    ) -> R:
+        loop = asyncio.get_running_loop()
+        result, cpu_seconds = await loop.run_in_executor(
+            pool, functools.partial(timed, fn, *args, **kwargs)
+        )
+        if request is not None:
+            request.state.cpu_seconds = getattr(request.state, "cpu_seconds", 0.0) + cpu_seconds
+        return result
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._processes is None:
+                # "spawn" is safe in a multi-threaded server, unlike fork
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.cpu_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._processes
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(
+                    max_workers=self.io_workers, thread_name_prefix="rosetta-io"
+                )
+            return self._threads
@@ -0,0 +1,411 @@
+"""Persistent background translation jobs run by a bounded worker pool."""
+
+import asyncio
+import json
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
+
+from rosetta.api.uploads import SavedUpload, move_upload
+from rosetta.core.exceptions import JobQueueFullError
+from rosetta.services.metrics import REGISTRY
+from rosetta.services.progress import COMPLETED, FAILED, ProgressCallback, ProgressEvent
+
+# Job status values (COMPLETED and FAILED are shared with the progress events)
+QUEUED = "queued"
+RUNNING = "running"
+
+JOBS_IN_FLIGHT = REGISTRY.gauge(
+    "rosetta_jobs_in_flight", "Background jobs queued or running in this process."
+)
+JOBS_FINISHED = REGISTRY.counter(
+    "rosetta_jobs_finished_total", "Background jobs finished, by status.", ["status"]
+)
+
+
+@dataclass
+class JobRecord:
+    """Persisted state of a job."""
+
+    id: str
+    status: str
+    filename: str
+    target_lang: str
+    source_lang: Optional[str] = None
+    context: Optional[str] = None
+    sheets: Optional[list[str]] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    progress: Optional[dict] = None  # Latest progress event
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    input_sha256: Optional[str] = None
+    client: Optional[str] = None  # Who submitted the job, for quota accounting
+    estimated_tokens: Optional[int] = None
+    profile: bool = False  # Profile the translation (stats under result["profile"])
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# Columns stored as JSON text
+_JSON_COLUMNS = {"sheets", "progress", "result"}
+
+
+class JobStore:
+    """SQLite table of job records, plus one directory per job for its files.
+
+    Records survive restarts, so queued and interrupted jobs can be picked up again
+    and finished results stay downloadable.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(root / "jobs.sqlite3", check_same_thread=False)
+        names = [f.name for f in fields(JobRecord)]
+        columns = ", ".join(f"{name} TEXT PRIMARY KEY" if name == "id" else name for name in names)
+        with self._lock, self._db:
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS jobs ({columns})")
+            # Add columns introduced since the store was created
+            existing = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+            for name in names:
+                if name not in existing:
+                    self._db.execute(f"ALTER TABLE jobs ADD COLUMN {name}")
+
+    def workdir(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def input_path(self, job_id: str) -> Path:
+        return self.workdir(job_id) / "input.xlsx"
+
+    def output_path(self, job_id: str) -> Path:
+        return self.workdir(job_id) / "output.xlsx"
+
+    def add(self, record: JobRecord) -> None:
+        values = self._encode(record.to_dict())
+        placeholders = ", ".join("?" for _ in values)
+        with self._lock, self._db:
+            self._db.execute(
+                f"INSERT INTO jobs ({', '.join(values)}) VALUES ({placeholders})",
+                list(values.values()),
+            )
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        with self._lock:
+            cursor = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+            names = [column[0] for column in cursor.description]
+        if row is None:
+            return None
+        return self._decode(dict(zip(names, row)))
+
+    def update(self, job_id: str, **changes: object) -> None:
+        changes["updated_at"] = time.time()
+        values = self._encode(changes)
+        assignments = ", ".join(f"{name} = ?" for name in values)
+        with self._lock, self._db:
+            self._db.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?", [*values.values(), job_id]
+            )
+
+    def unfinished(self) -> list[JobRecord]:
+        """Return queued and running jobs, oldest first."""
+        with self._lock:
+            cursor = self._db.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            )
+            rows = cursor.fetchall()
+            names = [column[0] for column in cursor.description]
+        return [self._decode(dict(zip(names, row))) for row in rows]
+
+    def finished_before(self, cutoff: float) -> list[str]:
+        """Return the ids of completed and failed jobs last updated before ``cutoff``."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (COMPLETED, FAILED, cutoff),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete(self, job_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        shutil.rmtree(self.workdir(job_id), ignore_errors=True)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _encode(values: dict) -> dict:
+        return {
+            name: json.dumps(value) if name in _JSON_COLUMNS and value is not None else value
+            for name, value in values.items()
+        }
+
+    @staticmethod
+    def _decode(row: dict) -> JobRecord:
+        for name in _JSON_COLUMNS:
+            if row[name] is not None:
+                row[name] = json.loads(row[name])
+        # SQLite stores booleans as integers; rows from before the column was added hold NULL
+        row["profile"] = bool(row.get("profile"))
+        return JobRecord(**row)
+
+
+class JobEvents:
+    """Progress events of a job run by this process, for Server-Sent Events clients.
+
+    Events are published from the worker thread and appended on the event loop,
+    so any number of clients can replay and follow them.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.events: list[dict] = []
+        self.finished = False
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    def publish(self, event: ProgressEvent) -> None:
+        """Record a progress event. Safe to call from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._append, event)
+        except RuntimeError:
+            # The event loop is closed: the server shut down, nobody is listening
+            pass
+
+    def _append(self, event: ProgressEvent) -> None:
+        self.events.append(event.to_dict())
+        if event.is_final:
+            self.finished = True
+        self._changed.set()
+
+    async def follow(self) -> AsyncIterator[dict]:
+        """Yield all events so far, then new ones as they arrive, until the job ends."""
+        index = 0
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.finished:
+                return
+            # No await between the checks above and clear(), so no event is missed
+            self._changed.clear()
+            await self._changed.wait()
+
+
+def format_sse(event: dict) -> str:
+    """Format an event for a text/event-stream response."""
+    return f"event: {event['kind']}\ndata: {json.dumps(event)}\n\n"
+
+
+JobRunner = Callable[[JobRecord, Path, Path, ProgressCallback], dict]
+
+
+class JobManager:
+    """Queues jobs in the store and runs them on a bounded pool of worker threads.
+
+    At most ``workers`` jobs translate at once and at most ``max_queued`` more wait
+    for a worker; further submissions are rejected with JobQueueFullError.
+
+    Live events are kept while a job runs: clients following a job keep their
+    ``JobEvents`` until they have read its final event, later clients get the final
+    event from the store. Finished jobs, with their files, are deleted ``ttl``
+    seconds after they ended, checked whenever a job is created or recovered.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        run: JobRunner,
+        workers: int = 2,
+        max_queued: int = 100,
+        ttl: float = 0,
+    ) -> None:
+        """Initialize the manager. Must be called on the event loop.
+
+        Args:
+            store: Persistent job store
+            run: Runs one job: called on a worker thread with (record, input path,
+                 output path, progress callback); returns the translation stats
+            workers: Number of jobs translated at the same time
+            max_queued: Number of jobs allowed to wait for a worker
+            ttl: Seconds finished jobs are kept (0 keeps them forever)
+        """
+        self.store = store
+        self.run = run
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self._loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="rosetta-job"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0  # Jobs queued or running in this process
+        self._events: dict[str, JobEvents] = {}
+
+    def create(
+        self,
+        filename: str,
+        upload: SavedUpload,
+        target_lang: str,
+        source_lang: Optional[str] = None,
+        context: Optional[str] = None,
+        sheets: Optional[set[str]] = None,
+        profile: bool = False,
+    ) -> JobRecord:
+        """Store a new job, moving the uploaded file into it. It runs once ``start`` is called."""
+        self.purge()
+        now = time.time()
+        record = JobRecord(
+            id=uuid.uuid4().hex,
+            status=QUEUED,
+            filename=filename,
+            target_lang=target_lang,
+            source_lang=source_lang,
+            context=context,
+            sheets=sorted(sheets) if sheets else None,
+            created_at=now,
+            updated_at=now,
+            input_sha256=upload.sha256,
+            profile=profile,
+        )
+        self.store.workdir(record.id).mkdir(parents=True)
+        move_upload(upload, self.store.input_path(record.id))
+        self.store.add(record)
+        return record
+
+    def start(self, job_id: str) -> None:
+        """Queue a created job for a worker.
+
+        Raises:
+            JobQueueFullError: If too many jobs are already waiting
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.max_queued:
+                raise JobQueueFullError("Too many jobs in progress, try again later")
+            self._pending += 1
+        JOBS_IN_FLIGHT.inc()
+        self._events[job_id] = JobEvents(self._loop)
+        self._executor.submit(self._execute, job_id)
+
+    def discard(self, job_id: str) -> None:
+        """Delete a job that was created but never started."""
+        self._events.pop(job_id, None)
+        self.store.delete(job_id)
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        return self.store.get(job_id)
+
+    def events(self, job_id: str) -> Optional[JobEvents]:
+        """Return the live events of a job started by this process, if any."""
+        return self._events.get(job_id)
+
+    def purge(self) -> int:
+        """Delete finished jobs older than the TTL, with their files.
+
+        Returns:
+            Number of jobs deleted
+        """
+        if self.ttl <= 0:
+            return 0
+        expired = self.store.finished_before(time.time() - self.ttl)
+        for job_id in expired:
+            self.store.delete(job_id)
+        return len(expired)
+
+    def recover(self) -> int:
+        """Re-queue jobs left queued or running by a previous process.
+
+        Returns:
+            Number of jobs re-queued
+        """
+        self.purge()
+        records = self.store.unfinished()
+        for record in records:
+            self.store.update(record.id, status=QUEUED)
+            # Recovered jobs are not counted against the queue limit
+            with self._lock:
+                self._pending += 1
+            JOBS_IN_FLIGHT.inc()
+            self._events[record.id] = JobEvents(self._loop)
+            self._executor.submit(self._execute, record.id)
+        return len(records)
+
+    def close(self) -> None:
+        """Stop accepting work without waiting for running jobs.
+
+        Jobs still running keep recording their outcome in the store; jobs that are
+        cut short by the process exiting are recovered on the next start.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _execute(self, job_id: str) -> None:
+        """Run one job on a worker thread, recording its progress and outcome."""
+        events = self._events[job_id]
+        finished = False
+
+        def on_progress(event: ProgressEvent) -> None:
+            nonlocal finished
+            # Persist the outcome before clients can see the final event
+            progress = event.to_dict()
+            if event.kind == COMPLETED:
+                self.store.update(job_id, status=COMPLETED, result=event.result, progress=progress)
+                JOBS_FINISHED.inc(status=COMPLETED)
+                finished = True
+            elif event.kind == FAILED:
+                self.store.update(job_id, status=FAILED, error=event.error, progress=progress)
+                JOBS_FINISHED.inc(status=FAILED)
+                finished = True
+            else:
+                self.store.update(job_id, progress=progress)
+            events.publish(event)
+
+        try:
+            record = self.store.get(job_id)
+            if record is None:
+                return
+            self.store.update(job_id, status=RUNNING)
+            self.run(
+                record,
+                self.store.input_path(job_id),
+                self.store.output_path(job_id),
+                on_progress,
+            )
+        except Exception as e:
+            # Failures before translation started have no final event yet
+            if not finished:
+                on_progress(
+                    ProgressEvent(
+                        kind=FAILED,
+                        message=f"Translation failed: {e}",
+                        elapsed=0.0,
+                        error=str(e),
+                    )
+                )
+        finally:
+            with self._lock:
+                self._pending -= 1
+            JOBS_IN_FLIGHT.dec()
+            self._forget(job_id)
+
+    def _forget(self, job_id: str) -> None:
+        """Drop a finished job's live events once its last event has been appended.
+
+        Scheduled after the final event's append, so followers holding the
+        ``JobEvents`` still read it; clients arriving later get it from the store.
+        """
+        try:
+            self._loop.call_soon_threadsafe(self._events.pop, job_id, None)
+        except RuntimeError:
+            # The event loop is closed: nobody is following
+            self._events.pop(job_id, None)
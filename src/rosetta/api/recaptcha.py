@@ -0,0 +1,117 @@
+"""Asynchronous reCAPTCHA verification with a pooled HTTP client."""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RECAPTCHA_VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
+
+# Google accepts a token for two minutes; remembering outcomes for as long lets
+# clients retry a request with the same token instead of failing as a duplicate
+TOKEN_CACHE_SECONDS = 120.0
+MAX_CACHED_TOKENS = 10000
+
+
+class RecaptchaVerifier:
+    """Verifies reCAPTCHA tokens without blocking the event loop.
+
+    One ``httpx.AsyncClient`` is shared by all requests, so connections to the
+    verification endpoint are reused. Outcomes are cached per token for a short
+    time, and concurrent checks of the same token share one HTTP call.
+    """
+
+    def __init__(
+        self,
+        secret_key: Optional[str],
+        verify_url: str = RECAPTCHA_VERIFY_URL,
+        timeout: float = 5.0,
+        cache_seconds: float = TOKEN_CACHE_SECONDS,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        """Initialize the verifier. Must be used on a single event loop.
+
+        Args:
+            secret_key: Site secret; None skips verification (for development)
+            verify_url: Verification endpoint, e.g. a local stub in tests
+            timeout: Seconds to wait for the endpoint before rejecting the token
+            cache_seconds: How long outcomes are remembered per token
+            client: HTTP client to use (one with a connection pool is created if None)
+        """
+        self.secret_key = secret_key
+        self.verify_url = verify_url
+        self.cache_seconds = cache_seconds
+        self._client = client or httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        self._cache: dict[str, tuple[float, bool]] = {}  # token -> (expires at, success)
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+    async def verify(self, token: Optional[str]) -> bool:
+        """Return whether a token is valid. Network and API errors reject it."""
+        if not self.secret_key:
+            # If no secret key is configured, skip verification (for development)
+            return True
+
+        if not token:
+            return False
+
+        now = time.monotonic()
+        cached = self._cache.get(token)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        task = self._in_flight.get(token)
+        if task is None:
+            # Not tied to this request, so a client disconnecting does not cancel
+            # the check for others waiting on the same token
+            task = asyncio.ensure_future(self._check(token))
+            self._in_flight[token] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(token, None))
+        return await asyncio.shield(task)
+
+    async def _check(self, token: str) -> bool:
+        try:
+            response = await self._client.post(
+                self.verify_url,
+                data={
+                    "secret": self.secret_key,
+                    "response": token,
+                },
+            )
+            response.raise_for_status()
+            result = response.json()
+        except Exception as e:
+            # If verification fails due to network/API issues, reject the request.
+            # Not cached: the token may still pass once the endpoint recovers.
+            logger.warning("reCAPTCHA verification error: %s", e)
+            return False
+
+        success = bool(result.get("success", False))
+
+        # Log error details if verification failed
+        if not success:
+            error_codes = result.get("error-codes", [])
+            logger.warning(
+                "reCAPTCHA verification failed. Error codes: %s. Response: %s", error_codes, result
+            )
+
+        self._remember(token, success)
+        return success
+
+    def _remember(self, token: str, success: bool) -> None:
+        now = time.monotonic()
+        if len(self._cache) >= MAX_CACHED_TOKENS:
+            self._cache = {t: entry for t, entry in self._cache.items() if entry[0] > now}
+            if len(self._cache) >= MAX_CACHED_TOKENS:
+                # Still full of live entries: drop the oldest
+                del self._cache[next(iter(self._cache))]
+        self._cache[token] = (now + self.cache_seconds, success)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
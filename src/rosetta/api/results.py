@@ -0,0 +1,242 @@
+"""Content-addressed cache of translated workbooks, shared by identical requests."""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+# How a cached result was obtained, reported in the X-Cache response header
+HIT = "HIT"
+MISS = "MISS"
+COALESCED = "COALESCED"  # Waited for an identical request that was in progress
+BYPASS = "BYPASS"  # Not looked up: the request needs a fresh translation (e.g. profiling)
+
+
+def result_key(
+    input_sha256: str,
+    target_lang: str,
+    source_lang: Optional[str],
+    context: Optional[str],
+    sheets: Optional[set[str]],
+    model: str,
+) -> str:
+    """Hash everything that determines a translated workbook into a cache key."""
+    parts = {
+        "input": input_sha256,
+        "target_lang": target_lang,
+        "source_lang": source_lang,
+        "context": context,
+        "sheets": sorted(sheets) if sheets else None,
+        "model": model,
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+@dataclass
+class CachedResult:
+    """A translated workbook stored in the cache."""
+
+    key: str
+    path: Path
+    result: dict  # Stats returned by translate_file
+    created_at: float
+
+
+class ResultCache:
+    """Translated workbooks on local disk, keyed by ``result_key``.
+
+    Entries expire ``ttl`` seconds after they were stored. When the files exceed
+    ``max_bytes``, the least recently used entries are evicted. Concurrent requests
+    for the same key share one translation: the first produces it, the others wait
+    for its outcome (single flight). Failures are not cached.
+
+    Methods block (on disk I/O or on another request's translation), so call them
+    from worker threads.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, ttl: float) -> None:
+        """Initialize the cache.
+
+        Args:
+            root: Directory holding the cached files (created on first store)
+            max_bytes: Total size of cached workbooks to keep; 0 disables the cache
+            ttl: Seconds an entry stays valid
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl > 0
+
+    def contains(self, key: str) -> bool:
+        """Whether ``key`` is cached or being produced by another request.
+
+        Only a hint: the entry may be evicted before it is fetched.
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            return key in self._in_flight or self._load(key) is not None
+
+    def fetch(self, key: str, output: Path, produce: Callable[[Path], dict]) -> tuple[dict, str]:
+        """Put the translated workbook for ``key`` at ``output``, producing it if needed.
+
+        Whether the workbook is cached, being produced or must be produced is
+        decided under the cache's lock, so ``produce`` runs exactly when nothing
+        can be reused. Cached workbooks are hard-linked (or copied) to ``output``,
+        so the caller can delete it without touching the cache.
+
+        Args:
+            key: Cache key from ``result_key``
+            output: Where the caller wants the workbook
+            produce: Writes the translated workbook to the given path and returns
+                     its stats. Called at most once at a time for identical requests.
+
+        Returns:
+            The translation stats and how they were obtained (HIT, MISS or COALESCED)
+
+        Raises:
+            Whatever ``produce`` raised. A request that waited for another one which
+            failed produces the workbook itself instead of sharing its error.
+        """
+        if not self.enabled:
+            return produce(output), MISS
+
+        status = HIT
+        while True:
+            with self._lock:
+                entry = self._load(key)
+                waiting = self._in_flight.get(key) if entry is None else None
+                if entry is None and waiting is None:
+                    future: Future = Future()
+                    self._in_flight[key] = future
+                    break
+            if entry is not None:
+                try:
+                    _link_or_copy(entry.path, output)
+                except FileNotFoundError:
+                    continue  # Evicted before it could be copied
+                return entry.result, status
+            # Another request is producing it: wait, then look again
+            if waiting is not None and waiting.exception() is None:
+                status = COALESCED
+
+        try:
+            result = produce(output)
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        try:
+            self._store(key, output, result)
+        except OSError:
+            # The translation itself succeeded; it is just not cached
+            pass
+        with self._lock:
+            del self._in_flight[key]
+        future.set_result(result)
+        return result, MISS
+
+    def _store(self, key: str, output: Path, result: dict) -> None:
+        """Add a produced workbook, then evict.
+
+        The files are written to temporary paths first; only renaming them into
+        place holds the lock.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        data_tmp, meta_tmp = self._temp_path(), self._temp_path()
+        try:
+            _link_or_copy(output, data_tmp)
+            meta_tmp.write_text(json.dumps({"result": result, "created_at": time.time()}))
+            with self._lock:
+                os.replace(data_tmp, self._data_path(key))
+                os.replace(meta_tmp, self._meta_path(key))
+        finally:
+            data_tmp.unlink(missing_ok=True)
+            meta_tmp.unlink(missing_ok=True)
+        self._evict()
+
+    def _temp_path(self) -> Path:
+        with tempfile.NamedTemporaryFile(dir=self.root, suffix=".tmp") as tmp:
+            return Path(tmp.name)
+
+    def _data_path(self, key: str) -> Path:
+        return self.root / f"{key}.xlsx"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def _load(self, key: str) -> Optional[CachedResult]:
+        """Read an entry while holding the lock, dropping it if it has expired."""
+        path = self._data_path(key)
+        try:
+            meta = json.loads(self._meta_path(key).read_text())
+            # The access time of the data file orders entries for eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        if time.time() - meta["created_at"] > self.ttl:
+            self._remove(key)
+            return None
+        return CachedResult(
+            key=key, path=path, result=meta["result"], created_at=meta["created_at"]
+        )
+
+    def _remove(self, key: str) -> None:
+        self._meta_path(key).unlink(missing_ok=True)
+        self._data_path(key).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones until under max_bytes.
+
+        The directory is scanned without the lock, which is only held to remove
+        entries. An entry used or replaced meanwhile may still be dropped: that
+        costs a cache miss, and a request copying it looks it up again.
+        """
+        now = time.time()
+        doomed: list[str] = []
+        entries = []
+        for meta_path in self.root.glob("*.json"):
+            key = meta_path.stem
+            try:
+                created_at = json.loads(meta_path.read_text())["created_at"]
+                stat = self._data_path(key).stat()
+            except (OSError, ValueError, KeyError):
+                doomed.append(key)
+                continue
+            if now - created_at > self.ttl:
+                doomed.append(key)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, key))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            doomed.append(key)
+            total -= size
+
+        if doomed:
+            with self._lock:
+                for key in doomed:
+                    self._remove(key)
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    """Hard-link a file, or copy it where links are not possible (another filesystem)."""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
@@ -0,0 +1,105 @@
+"""Per-request working directories and a gauge of the disk space they use."""
+
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+
+@dataclass
+class DiskUsage:
+    """Space used under a directory and left on its filesystem."""
+
+    path: str
+    used_bytes: int
+    files: int
+    free_bytes: int
+    total_bytes: int
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def disk_usage(root: Path) -> DiskUsage:
+    """Measure the files under ``root`` and the free space of its filesystem.
+
+    Files removed while the tree is walked are skipped. A missing ``root`` counts
+    as empty, with the space of the nearest existing parent.
+    """
+    used = files = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            try:
+                used += os.stat(os.path.join(dirpath, name)).st_size
+            except FileNotFoundError:
+                continue
+            files += 1
+
+    existing = root
+    while not existing.exists() and existing != existing.parent:
+        existing = existing.parent
+    space = shutil.disk_usage(existing)
+    return DiskUsage(
+        path=str(root),
+        used_bytes=used,
+        files=files,
+        free_bytes=space.free,
+        total_bytes=space.total,
+    )
+
+
+class Workspace:
+    """Creates a private directory per request and removes it once the request is done.
+
+    Uploads and translated files of a request live in one directory, so a single
+    ``remove`` deletes everything it wrote, and the space in use can be measured.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._lock = threading.Lock()
+        self._active: set[Path] = set()  # Directories created and not removed yet
+
+    def create(self) -> Path:
+        """Create a new, empty working directory."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        workdir = Path(tempfile.mkdtemp(prefix="request-", dir=self.root))
+        with self._lock:
+            self._active.add(workdir)
+        return workdir
+
+    def remove(self, workdir: Path) -> None:
+        """Delete a working directory and everything in it. Safe to call twice."""
+        with self._lock:
+            self._active.discard(workdir)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    @property
+    def active(self) -> int:
+        """Number of working directories in use."""
+        with self._lock:
+            return len(self._active)
+
+    def usage(self) -> DiskUsage:
+        return disk_usage(self.root)
+
+
+class TemporaryFileResponse(FileResponse):
+    """Stream a file in chunks, then run the background task even if the client left.
+
+    ``FileResponse`` skips its background task when sending fails, e.g. after a
+    client disconnects mid-download, which would leave the file on disk.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        background, self.background = self.background, None
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if background is not None:
+                await background()
@@ -0,0 +1,153 @@
+"""Bounded-memory handling of uploaded workbooks."""
+
+import hashlib
+import json
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Size of the chunks uploads are copied and hashed in
+CHUNK_SIZE = 1024 * 1024
+
+# Allowance for multipart boundaries and form fields on top of the file itself
+FORM_OVERHEAD = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the maximum size."""
+
+
+@dataclass
+class SavedUpload:
+    """An upload written to disk, with its size and content hash."""
+
+    path: Path
+    size: int
+    sha256: str
+
+
+def save_upload(source: BinaryIO, max_size: int, destination: Optional[Path] = None) -> SavedUpload:
+    """Copy an upload to disk in chunks, hashing it and enforcing the size limit.
+
+    Only one chunk is held in memory at a time. The partial file is removed as
+    soon as the limit is crossed.
+
+    Args:
+        source: The uploaded file object (spooled to disk by the multipart parser)
+        max_size: Maximum accepted size in bytes
+        destination: Where to write the file (a new temporary .xlsx file if None)
+
+    Raises:
+        UploadTooLargeError: If the upload is larger than max_size
+    """
+    if destination is None:
+        with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp:
+            destination = Path(tmp.name)
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(destination, "wb") as out:
+            while chunk := source.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLargeError(f"Upload exceeds {max_size} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+    return SavedUpload(path=destination, size=size, sha256=digest.hexdigest())
+
+
+def move_upload(upload: SavedUpload, destination: Path) -> SavedUpload:
+    """Move a saved upload, e.g. from a temporary file into a job's directory."""
+    shutil.move(upload.path, destination)
+    return SavedUpload(path=destination, size=upload.size, sha256=upload.sha256)
+
+
+class BodySizeLimitMiddleware:
+    """Reject request bodies larger than a limit while they are being received.
+
+    Without it, the multipart parser spools the whole body to disk before the
+    endpoint can look at the file size. Bodies announcing a larger Content-Length
+    are rejected before reading; others (e.g. chunked uploads) are cut off as soon
+    as the limit is crossed. Either way the client gets a 400 with ``detail``, as
+    it does for a malformed Content-Length.
+
+    Add it before CORSMiddleware, so the CORS middleware wraps it and its
+    rejections carry CORS headers that browsers can read.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int, detail: str) -> None:
+        self.app = app
+        self.max_body_size = max_body_size
+        self.detail = detail
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None:
+            try:
+                declared = int(content_length)
+            except ValueError:
+                await self._reject(send, "Invalid Content-Length header")
+                return
+            if declared > self.max_body_size:
+                await self._reject(send, self.detail)
+                return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # Looks like a disconnect to the parser, which stops reading
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            if exceeded:
+                return  # Replaced by the rejection below
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not response_started:
+            await self._reject(send, self.detail)
+
+    async def _reject(self, send: Send, detail: str) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 400,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"connection", b"close"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
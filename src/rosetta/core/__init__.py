@@ -1,6 +1,21 @@
 """Core configuration and utilities for Rosetta."""
 
 from rosetta.core.config import Config
-from rosetta.core.exceptions import RosettaError, TranslationError, ExcelError
+from rosetta.core.exceptions import (
+    ExcelError,
+    JobQueueFullError,
+    OverloadedError,
+    QuotaExceededError,
+    RosettaError,
+    TranslationError,
+)
 
-__all__ = ["Config", "RosettaError", "TranslationError", "ExcelError"]
+__all__ = [
+    "Config",
+    "RosettaError",
+    "TranslationError",
+    "ExcelError",
+    "JobQueueFullError",
+    "OverloadedError",
+    "QuotaExceededError",
+]
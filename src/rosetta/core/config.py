@@ -2,11 +2,21 @@
 
 import os
 from dataclasses import dataclass
+from functools import cache
 from typing import Optional
 
-from dotenv import load_dotenv
 
-load_dotenv()
+@cache
+def load_env() -> None:
+    """Load variables from a ``.env`` file into the environment, once per process.
+
+    Called on demand by ``Config.from_env`` rather than at import, so commands that
+    never read the configuration (``--help``, ``--version``) do not pay for it.
+    Variables already set in the environment take precedence.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
 
 
 @dataclass
@@ -17,10 +27,32 @@ class Config:
     batch_size: int = 50
     model: str = "claude-sonnet-4-20250514"
     max_retries: int = 3
+    # Number of batches translated in parallel
+    concurrency: int = 4
+    # HTTP connection pool for the Anthropic client (shared across threads)
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    # Messages API endpoint, e.g. a local mock server (None: the SDK's default)
+    base_url: Optional[str] = None
+    # Grow and shrink batch_size with the latency and outcome of each request
+    adaptive_batch_size: bool = False
+    # Send a request again once it has run longer than this percentile of recent
+    # request latencies, and use the first answer (None: no hedging)
+    hedge_percentile: Optional[float] = None
+    # Hedges allowed per request (0.05: at most 5% more requests)
+    hedge_budget: float = 0.05
+    # Stop sending requests to the model after this many consecutive overload,
+    # server or connection errors (0: never), and probe it again after the cooldown
+    breaker_threshold: int = 5
+    breaker_cooldown: float = 30.0
+    # Model used while the circuit of ``model`` is open (None: fail those batches)
+    fallback_model: Optional[str] = None
 
     @classmethod
     def from_env(cls) -> "Config":
-        """Load configuration from environment variables."""
+        """Load configuration from environment variables (and ``.env``)."""
+        load_env()
         api_key = os.getenv("ANTHROPIC_API_KEY")
         if not api_key:
             raise ValueError(
@@ -33,4 +65,16 @@ class Config:
             batch_size=int(os.getenv("ROSETTA_BATCH_SIZE", "50")),
             model=os.getenv("ROSETTA_MODEL", "claude-sonnet-4-20250514"),
             max_retries=int(os.getenv("ROSETTA_MAX_RETRIES", "3")),
+            concurrency=int(os.getenv("ROSETTA_CONCURRENCY", "4")),
+            max_connections=int(os.getenv("ROSETTA_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("ROSETTA_MAX_KEEPALIVE_CONNECTIONS", "10")),
+            keepalive_expiry=float(os.getenv("ROSETTA_KEEPALIVE_EXPIRY", "60")),
+            base_url=os.getenv("ROSETTA_API_BASE_URL") or None,
+            adaptive_batch_size=os.getenv("ROSETTA_ADAPTIVE_BATCH_SIZE", "").lower()
+            in ("1", "true", "yes"),
+            hedge_percentile=float(os.getenv("ROSETTA_HEDGE_PERCENTILE") or 0) or None,
+            hedge_budget=float(os.getenv("ROSETTA_HEDGE_BUDGET", "0.05")),
+            breaker_threshold=int(os.getenv("ROSETTA_BREAKER_THRESHOLD", "5")),
+            breaker_cooldown=float(os.getenv("ROSETTA_BREAKER_COOLDOWN", "30")),
+            fallback_model=os.getenv("ROSETTA_FALLBACK_MODEL") or None,
         )
@@ -13,7 +13,39 @@ class TranslationError(RosettaError):
     pass
 
 
+class TruncatedResponseError(TranslationError):
+    """Raised when a response was cut off by the output token limit."""
+
+    pass
+
+
 class ExcelError(RosettaError):
     """Raised when Excel file operations fail."""
 
     pass
+
+
+class JobQueueFullError(RosettaError):
+    """Raised when the job queue cannot accept more work."""
+
+    pass
+
+
+class OverloadedError(RosettaError):
+    """Raised when the server has no capacity for more work right now."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QuotaExceededError(OverloadedError):
+    """Raised when a client has used up its token quota."""
+
+    pass
+
+
+class CircuitOpenError(TranslationError, OverloadedError):
+    """Raised instead of sending a request to a model whose circuit breaker is open."""
+
+    pass
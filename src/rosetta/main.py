@@ -1,18 +1,54 @@
 """CLI entry point for Rosetta."""
 
+import re
+import zipfile
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import click
-from openpyxl import load_workbook
 
-from rosetta.core.config import Config
+from rosetta.core.config import Config, load_env
 from rosetta.core.exceptions import RosettaError
 from rosetta.models import Cell, DropdownValidation, RichTextRun, TranslationBatch
-from rosetta.services import ExcelExtractor, Translator
+from rosetta.services import Translator
+from rosetta.services.inspector import SPREADSHEET_NS, WorkbookInspection
+from rosetta.services.journal import journal_path_for
+from rosetta.services.metrics import STAGE_SECONDS, timed_stage
+from rosetta.services.progress import (
+    BATCH_DONE,
+    EXTRACT,
+    INFO,
+    STAGE_FINISHED,
+    STAGE_STARTED,
+    ProgressEvent,
+)
+from rosetta.services.translation_service import translate_file
+
+if TYPE_CHECKING:
+    from xml.etree import ElementTree as ET
+
+
+class _DefaultCommandGroup(click.Group):
+    """Command group that runs ``translate`` when no subcommand is named.
+
+    Keeps ``rosetta input.xlsx -t french`` working alongside ``rosetta translate-dir``.
+    """
+
+    default_command = "translate"
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
 
 
-@click.command()
+@click.group(cls=_DefaultCommandGroup)
+def cli() -> None:
+    """Translate Excel files while preserving formatting and formulas."""
+
+
+@cli.command("translate")
 @click.argument("input_file", type=click.Path(exists=True, path_type=Path))
 @click.option(
     "--target-lang",
@@ -40,6 +76,13 @@ from rosetta.services import ExcelExtractor, Translator
     default=50,
     help="Number of cells to translate in each batch",
 )
+@click.option(
+    "--adaptive-batch-size",
+    is_flag=True,
+    default=False,
+    help="Grow or shrink the batch size (starting at --batch-size) with the latency and "
+    "errors of each request (or set ROSETTA_ADAPTIVE_BATCH_SIZE=1).",
+)
 @click.option(
     "--sheets",
     multiple=True,
@@ -52,19 +95,95 @@ from rosetta.services import ExcelExtractor, Translator
     default=None,
     help="Additional context for more accurate translations (e.g., 'This is a medical document' or 'Marketing content for a tech company').",
 )
-def cli(
+@click.option(
+    "--concurrency",
+    "-j",
+    type=int,
+    default=None,
+    help="Number of batches translated in parallel (default: 4, or ROSETTA_CONCURRENCY)",
+)
+@click.option(
+    "--hedge-percentile",
+    type=click.FloatRange(0, 100, min_open=True, max_open=True),
+    default=None,
+    help="Send a batch again once it runs longer than this percentile of recent batch "
+    "latencies, e.g. 95 (or set ROSETTA_HEDGE_PERCENTILE).",
+)
+@click.option(
+    "--previous-source",
+    type=click.Path(exists=True, path_type=Path),
+    default=None,
+    help="Earlier version of INPUT_FILE that was already translated (use with --previous-output).",
+)
+@click.option(
+    "--previous-output",
+    type=click.Path(exists=True, path_type=Path),
+    default=None,
+    help="Translated output of --previous-source. Unchanged text reuses its translation.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Resume an interrupted translation from its journal, skipping completed batches.",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    default=False,
+    help="Estimate requests, tokens and duration without calling the API.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Report time, CPU, peak memory and calls of each stage (slows the run down).",
+)
+@click.option(
+    "--profile-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="With --profile: write profile.json and cProfile dumps of the hot stages here.",
+)
+def translate(
     input_file: Path,
     target_lang: str,
     source_lang: Optional[str],
     output: Optional[Path],
     batch_size: int,
+    adaptive_batch_size: bool,
     sheets: tuple[str, ...],
     context: Optional[str],
+    concurrency: Optional[int],
+    hedge_percentile: Optional[float],
+    previous_source: Optional[Path],
+    previous_output: Optional[Path],
+    resume: bool,
+    dry_run: bool,
+    profile: bool,
+    profile_dir: Optional[Path],
 ) -> None:
-    """Translate Excel files while preserving formatting and formulas.
+    """Translate one Excel file (the default command).
 
     INPUT_FILE: Path to the Excel file to translate
     """
+    if (previous_source is None) != (previous_output is None):
+        raise click.UsageError("--previous-source and --previous-output must be used together")
+
+    if dry_run:
+        _echo_estimate(
+            input_file,
+            target_lang=target_lang,
+            source_lang=source_lang,
+            context=context,
+            sheets=set(sheets) if sheets else None,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            previous_source=previous_source,
+            previous_output=previous_output,
+        )
+        return
+
     try:
         # Determine output path
         if output is None:
@@ -77,164 +196,487 @@ def cli(
         # Load configuration
         config = Config.from_env()
         config.batch_size = batch_size
+        if concurrency is not None:
+            config.concurrency = concurrency
+        if hedge_percentile is not None:
+            config.hedge_percentile = hedge_percentile
+        batch_sizer = None
+        if adaptive_batch_size or config.adaptive_batch_size:
+            from rosetta.services.batch_size import AdaptiveBatchSize
 
-        # Extract translatable cells (including rich text info)
-        sheets_filter = set(sheets) if sheets else None
-        with ExcelExtractor(input_file, sheets=sheets_filter) as extractor:
-            cells = list(extractor.extract_cells())
+            batch_sizer = AdaptiveBatchSize(config.batch_size)
 
-        # Enrich cells with rich text information from the xlsx
-        _extract_rich_text_info(input_file, cells, sheets_filter)
+        sheets_filter = set(sheets) if sheets else None
+        result = translate_file(
+            input_file=input_file,
+            output_file=output,
+            target_lang=target_lang,
+            source_lang=source_lang,
+            context=context,
+            sheets=sheets_filter,
+            batch_size=config.batch_size,
+            translator=Translator(config),
+            resume=resume,
+            on_progress=_echo_progress,
+            previous_source=previous_source,
+            previous_output=previous_output,
+            profile=profile,
+            profile_dir=profile_dir,
+            batch_sizer=batch_sizer,
+        )
 
-        if not cells:
+        if result["status"] == "no_content":
             click.echo("No translatable content found in the file.")
             return
 
-        click.echo(f"Found {len(cells)} cells to translate")
+        click.echo(f"✓ Translation complete! Output: {output}")
+        if profile:
+            _echo_profile(result["profile"], profile_dir)
 
-        # Translate in batches
-        translator = Translator(config)
-        translated_cells = []
+    except RosettaError as e:
+        click.echo(f"Error: {e}", err=True)
+        _echo_resume_hint(output)
+        raise click.Abort()
+    except Exception as e:
+        click.echo(f"Unexpected error: {e}", err=True)
+        _echo_resume_hint(output)
+        raise click.Abort()
 
-        for i in range(0, len(cells), config.batch_size):
-            batch_cells = cells[i : i + config.batch_size]
-            batch = TranslationBatch(
-                cells=batch_cells,
-                source_lang=source_lang,
-                target_lang=target_lang,
-                context=context,
-            )
 
-            click.echo(
-                f"Translating batch {i // config.batch_size + 1} "
-                f"({len(batch_cells)} cells)..."
-            )
+def _echo_progress(event: ProgressEvent) -> None:
+    """Render a translate_file progress event as a line of CLI output."""
+    if event.kind == BATCH_DONE:
+        total = f"/{event.batches_total}" if event.batches_total is not None else ""
+        line = (
+            f"Batch {event.batches_done}{total} done "
+            f"({event.batch_cells} cells, {event.batch_seconds:.1f}s"
+        )
+        if event.output_tokens:
+            line += f", {event.input_tokens + event.output_tokens} tokens so far"
+        line += ")"
+        if event.eta_seconds:
+            line += f" - about {event.eta_seconds:.0f}s left"
+        click.echo(line)
+    elif event.kind in (INFO, STAGE_STARTED) or (
+        event.kind == STAGE_FINISHED and event.stage == EXTRACT
+    ):
+        click.echo(event.message)
+
+
+def _echo_profile(report: dict, profile_dir: Optional[Path]) -> None:
+    """Print a profile report as a table of stages, and save it with the dumps."""
+    import json
+
+    click.echo(
+        f"Profile: {report['wall_seconds']:.2f}s wall, {report['cpu_seconds']:.2f}s CPU, "
+        f"{report['peak_memory_mb']:.1f} MB peak traced memory"
+    )
+    click.echo(f"  {'stage':<10} {'calls':>7} {'wall s':>9} {'cpu s':>9} {'peak MB':>9}")
+    for name, stage in report["stages"].items():
+        click.echo(
+            f"  {name:<10} {stage['calls']:>7} {stage['wall_seconds']:>9.3f} "
+            f"{stage['cpu_seconds']:>9.3f} {stage['peak_memory_mb']:>9.1f}"
+        )
+    if profile_dir is not None:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        path = profile_dir / "profile.json"
+        path.write_text(json.dumps(report, indent=2))
+        click.echo(f"Profile written to {path}")
+        for name, dump in report["dumps"].items():
+            click.echo(f"  {name}: python -m pstats {dump}")
+
+
+def _echo_estimate(
+    input_file: Path,
+    target_lang: str,
+    source_lang: Optional[str],
+    context: Optional[str],
+    sheets: Optional[set[str]],
+    batch_size: int,
+    concurrency: Optional[int],
+    previous_source: Optional[Path],
+    previous_output: Optional[Path],
+) -> None:
+    """Print an offline estimate of the translation (no API key needed)."""
+    import os
 
-            translations = translator.translate_batch(batch)
+    from rosetta.services.estimator import estimate_file
 
-            # Update cell values with translations
-            for cell, translation in zip(batch_cells, translations):
-                cell.value = translation
-                translated_cells.append(cell)
+    if concurrency is None:
+        load_env()
+        concurrency = int(os.getenv("ROSETTA_CONCURRENCY", str(Config.concurrency)))
 
-        # For rich text cells, translate each run separately
-        rich_text_cells = [c for c in translated_cells if c.rich_text_runs]
-        if rich_text_cells:
-            click.echo(f"Translating {len(rich_text_cells)} rich text cells with formatting...")
-            _translate_rich_text_runs(rich_text_cells, translator, source_lang, target_lang, config.batch_size, context)
+    try:
+        estimate = estimate_file(
+            input_file,
+            target_lang=target_lang,
+            source_lang=source_lang,
+            context=context,
+            sheets=sheets,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            previous_source=previous_source,
+            previous_output=previous_output,
+        )
+    except (RosettaError, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
 
-        # Extract and translate inline dropdown values
-        dropdowns = _extract_dropdown_validations(input_file, sheets_filter)
-        if dropdowns:
-            click.echo(f"Translating {len(dropdowns)} dropdown lists...")
-            _translate_dropdowns(dropdowns, translator, source_lang, target_lang, config.batch_size, context)
+    click.echo(f"Estimate for {input_file} (no API calls made):")
+    click.echo(
+        f"  Items:    {estimate.item_count} ({estimate.cell_count} cells, "
+        f"{estimate.rich_text_cells} rich text, {estimate.dropdown_count} dropdowns)"
+    )
+    click.echo(
+        f"  To send:  {estimate.unique_count} unique texts"
+        + (f", {estimate.reused_count} reused" if estimate.reused_count else "")
+    )
+    click.echo(f"  Requests: {estimate.batch_count}")
+    click.echo(f"  Tokens:   ~{estimate.input_tokens} input, ~{estimate.output_tokens} output")
+    click.echo(
+        f"  Time:     ~{estimate.wall_seconds / 60:.1f} min at concurrency {estimate.concurrency}"
+    )
+    if estimate.truncation_risk_batches:
+        click.echo(
+            f"  Warning:  {estimate.truncation_risk_batches} batches may exceed the output "
+            "limit; consider a smaller --batch-size",
+            err=True,
+        )
 
-        # Write translations back to Excel
-        click.echo(f"Writing translations to {output}...")
-        write_translations(input_file, output, translated_cells, dropdowns)
 
-        click.echo(f"✓ Translation complete! Output: {output}")
+def _echo_resume_hint(output: Optional[Path]) -> None:
+    """Tell the user how to continue if a journal was left behind."""
+    if output is not None and journal_path_for(output).exists():
+        click.echo("Progress was saved. Re-run with --resume to continue.", err=True)
 
-    except RosettaError as e:
+
+@cli.command("translate-dir")
+@click.argument("source")
+@click.argument("output_dir", type=click.Path(file_okay=False, path_type=Path))
+@click.option(
+    "--target-lang",
+    "-t",
+    required=True,
+    help="Target language for translation (e.g., french, spanish, german)",
+)
+@click.option(
+    "--source-lang",
+    "-s",
+    default=None,
+    help="Source language (auto-detected if not specified)",
+)
+@click.option(
+    "--batch-size",
+    "-b",
+    type=int,
+    default=50,
+    help="Number of cells to translate in each batch",
+)
+@click.option(
+    "--sheets",
+    multiple=True,
+    default=None,
+    help="Sheet names to translate (can be used multiple times). Translates all sheets if not "
+    "specified.",
+)
+@click.option(
+    "--context",
+    "-c",
+    default=None,
+    help="Additional context for more accurate translations.",
+)
+@click.option(
+    "--concurrency",
+    "-j",
+    type=int,
+    default=None,
+    help="Maximum API requests in flight across all files (default: 4, or ROSETTA_CONCURRENCY)",
+)
+@click.option(
+    "--files",
+    "-f",
+    "max_files",
+    type=int,
+    default=4,
+    help="Number of files processed at the same time",
+)
+@click.option(
+    "--report",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write a JSON report of per-file status and timings to this path.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Resume files left unfinished by an interrupted run.",
+)
+def translate_dir(
+    source: str,
+    output_dir: Path,
+    target_lang: str,
+    source_lang: Optional[str],
+    batch_size: int,
+    sheets: tuple[str, ...],
+    context: Optional[str],
+    concurrency: Optional[int],
+    max_files: int,
+    report: Optional[Path],
+    resume: bool,
+) -> None:
+    """Translate every Excel file in a directory or matching a glob.
+
+    SOURCE: Directory of Excel files, or a quoted glob such as "in/**/*.xlsx"
+
+    OUTPUT_DIR: Directory for the translated files (sub-directories are mirrored)
+
+    All files share one API client, one translation cache (text repeated across
+    files is translated once) and one limit on concurrent API requests.
+    """
+    import json
+    import time
+
+    from rosetta.services.bulk import FileResult, collect_inputs, translate_files
+
+    inputs = collect_inputs(source)
+    if not inputs:
+        raise click.UsageError(f"No Excel files found in {source}")
+
+    try:
+        config = Config.from_env()
+    except ValueError as e:
         click.echo(f"Error: {e}", err=True)
         raise click.Abort()
-    except Exception as e:
-        click.echo(f"Unexpected error: {e}", err=True)
-        raise click.Abort()
+    config.batch_size = batch_size
+    if concurrency is not None:
+        config.concurrency = concurrency
 
+    click.echo(f"Translating {len(inputs)} files to {target_lang}...")
+    translator = Translator(config)
+    started = time.perf_counter()
 
-def _extract_rich_text_info(input_file: Path, cells: list[Cell], sheets_filter: Optional[set[str]]) -> None:
-    """Extract rich text run information from the xlsx file.
+    def on_file_done(result: FileResult) -> None:
+        if result.status == "failed":
+            click.echo(f"✗ {result.input_file}: {result.error}", err=True)
+        else:
+            click.echo(f"✓ {result.input_file} ({result.cell_count} cells, {result.seconds:.1f}s)")
 
-    This reads the shared strings XML to identify cells with rich text formatting
-    and stores the individual runs for separate translation.
-    """
-    import zipfile
+    try:
+        results = translate_files(
+            inputs,
+            output_dir,
+            target_lang=target_lang,
+            translator=translator,
+            source_lang=source_lang,
+            context=context,
+            sheets=set(sheets) if sheets else None,
+            batch_size=config.batch_size,
+            max_requests=config.concurrency,
+            max_files=max_files,
+            resume=resume,
+            on_file_done=on_file_done,
+        )
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    finally:
+        translator.close()
+
+    elapsed = time.perf_counter() - started
+    failed = [r for r in results if r.status == "failed"]
+    click.echo(
+        f"Done in {elapsed:.1f}s: {len(results) - len(failed)} succeeded, {len(failed)} failed."
+    )
+
+    if report is not None:
+        report.parent.mkdir(parents=True, exist_ok=True)
+        report.write_text(
+            json.dumps(
+                {
+                    "target_lang": target_lang,
+                    "seconds": elapsed,
+                    "succeeded": len(results) - len(failed),
+                    "failed": len(failed),
+                    "files": [r.to_dict() for r in results],
+                },
+                indent=2,
+            )
+        )
+        click.echo(f"Report written to {report}")
+
+    if failed:
+        raise SystemExit(1)
+
+
+RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PACKAGE_RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+def _read_sheet_paths(zf: zipfile.ZipFile) -> dict[str, str]:
+    """Map sheet names to their XML part paths inside an open xlsx archive."""
     from xml.etree import ElementTree as ET
 
-    ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
-    ns_r = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
-    ns_pkg = "http://schemas.openxmlformats.org/package/2006/relationships"
+    ns, ns_r, ns_pkg = SPREADSHEET_NS, RELATIONSHIPS_NS, PACKAGE_RELATIONSHIPS_NS
 
-    with zipfile.ZipFile(input_file, "r") as zf:
-        # Read shared strings
-        if "xl/sharedStrings.xml" not in zf.namelist():
-            return
+    workbook_xml = ET.fromstring(zf.read("xl/workbook.xml"))
+    rels_xml = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
 
-        shared_strings_xml = ET.fromstring(zf.read("xl/sharedStrings.xml"))
-        si_elements = shared_strings_xml.findall(f"{{{ns}}}si")
-
-        # Build a map of shared string index -> rich text runs
-        rich_text_map: dict[int, list[RichTextRun]] = {}
-        for idx, si in enumerate(si_elements):
-            runs = si.findall(f"{{{ns}}}r")
-            if runs:
-                # This is a rich text entry
-                run_texts = []
-                for r in runs:
-                    t = r.find(f"{{{ns}}}t")
-                    text = t.text if t is not None and t.text else ""
-                    run_texts.append(RichTextRun(text=text))
-                rich_text_map[idx] = run_texts
-
-        if not rich_text_map:
-            return
+    rid_file_map = {}
+    for rel in rels_xml.findall(f".//{{{ns_pkg}}}Relationship"):
+        target = rel.get("Target")
+        # Handle both absolute paths (/xl/worksheets/...) and relative paths (worksheets/...)
+        if target.startswith("/"):
+            rid_file_map[rel.get("Id")] = target[1:]
+        elif target.startswith("xl/"):
+            rid_file_map[rel.get("Id")] = target
+        else:
+            rid_file_map[rel.get("Id")] = "xl/" + target
 
-        # Read workbook structure
-        workbook_xml = ET.fromstring(zf.read("xl/workbook.xml"))
-        rels_xml = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
-
-        # Build sheet name -> file path mapping
-        sheet_rid_map = {}
-        for sheet in workbook_xml.findall(f".//{{{ns}}}sheet"):
-            sheet_rid_map[sheet.get("name")] = sheet.get(f"{{{ns_r}}}id")
-
-        rid_file_map = {}
-        for rel in rels_xml.findall(f".//{{{ns_pkg}}}Relationship"):
-            target = rel.get("Target")
-            if target.startswith("/"):
-                rid_file_map[rel.get("Id")] = target[1:]
-            elif target.startswith("xl/"):
-                rid_file_map[rel.get("Id")] = target
-            else:
-                rid_file_map[rel.get("Id")] = "xl/" + target
+    sheet_paths = {}
+    for sheet in workbook_xml.findall(f".//{{{ns}}}sheet"):
+        sheet_path = rid_file_map.get(sheet.get(f"{{{ns_r}}}id"))
+        if sheet_path:
+            sheet_paths[sheet.get("name")] = sheet_path
+    return sheet_paths
 
-        # Build cell coordinate -> shared string index mapping
-        cell_ss_map: dict[tuple[str, str], int] = {}  # (sheet, coord) -> ss_index
 
-        for sheet_name, rid in sheet_rid_map.items():
-            if sheets_filter and sheet_name not in sheets_filter:
-                continue
+def _read_rich_text_map(zf: zipfile.ZipFile) -> dict[int, list[RichTextRun]]:
+    """Map shared string indices to their runs, for rich text entries only."""
+    from xml.etree import ElementTree as ET
 
-            sheet_path = rid_file_map.get(rid)
-            if not sheet_path or sheet_path not in zf.namelist():
-                continue
+    ns = SPREADSHEET_NS
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return {}
+
+    shared_strings_xml = ET.fromstring(zf.read("xl/sharedStrings.xml"))
+    rich_text_map: dict[int, list[RichTextRun]] = {}
+    for idx, si in enumerate(shared_strings_xml.findall(f"{{{ns}}}si")):
+        runs = si.findall(f"{{{ns}}}r")
+        if runs:
+            # This is a rich text entry
+            run_texts = []
+            for r in runs:
+                t = r.find(f"{{{ns}}}t")
+                text = t.text if t is not None and t.text else ""
+                run_texts.append(RichTextRun(text=text))
+            rich_text_map[idx] = run_texts
+    return rich_text_map
 
-            sheet_xml = ET.fromstring(zf.read(sheet_path))
-            sheet_data = sheet_xml.find(f".//{{{ns}}}sheetData")
-            if sheet_data is None:
+
+def _read_cell_shared_strings(zf: zipfile.ZipFile, sheet_path: str) -> dict[str, int]:
+    """Map cell references to shared string indices for one sheet.
+
+    The sheet XML is parsed incrementally, so memory stays flat on large sheets.
+    """
+    from xml.etree import ElementTree as ET
+
+    ns = SPREADSHEET_NS
+    cell_tag, value_tag = f"{{{ns}}}c", f"{{{ns}}}v"
+
+    cell_ss_map: dict[str, int] = {}
+    with zf.open(sheet_path) as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag != cell_tag:
                 continue
+            if elem.get("t") == "s":  # Shared string
+                v = elem.find(value_tag)
+                if v is not None and v.text:
+                    try:
+                        cell_ss_map[elem.get("r")] = int(v.text)
+                    except ValueError:
+                        pass
+            elem.clear()
+    return cell_ss_map
+
+
+class RichTextLookup:
+    """Attaches shared string indices and rich text runs to extracted cells.
+
+    The shared strings table is read up front; each sheet's cell -> shared string
+    map is only read when the first cell of that sheet is enriched, so cells can
+    be enriched one at a time while they are being extracted. Every cell of a
+    workbook with a shared strings table gets its index, which lets
+    ``TranslationWriter`` apply it as soon as it is translated. Given the
+    workbook's inspection, the tables it already read are reused.
+    """
 
-            for row in sheet_data.findall(f"{{{ns}}}row"):
-                for c in row.findall(f"{{{ns}}}c"):
-                    if c.get("t") == "s":  # Shared string
-                        v = c.find(f"{{{ns}}}v")
-                        if v is not None and v.text:
-                            try:
-                                ss_idx = int(v.text)
-                                cell_ref = c.get("r")
-                                cell_ss_map[(sheet_name, cell_ref)] = ss_idx
-                            except ValueError:
-                                pass
-
-    # Enrich cells with rich text info
-    for cell in cells:
-        key = (cell.sheet, cell.coordinate)
-        if key in cell_ss_map:
-            ss_idx = cell_ss_map[key]
+    def __init__(
+        self,
+        input_file: Path,
+        inspection: Optional[WorkbookInspection] = None,
+        with_indices: bool = True,
+    ) -> None:
+        """Initialize the lookup.
+
+        Args:
+            input_file: Path to the Excel file
+            inspection: The workbook's inspection, if it was already inspected
+            with_indices: Set shared string indices on all cells; if False, only
+                          rich text cells are looked up (e.g. to count their runs)
+        """
+        self.input_file = input_file
+        self._cell_maps: dict[str, dict[str, int]] = {}
+        if inspection is not None:
+            # Already read when the workbook was inspected
+            self.rich_text_map = inspection.rich_text_map
+            self.sheet_paths = inspection.sheet_paths
+            self.has_shared_strings = None  # Checked when the first sheet is loaded
+        else:
+            # Reading the tables is the costly part, recorded as the "rich_text" stage
+            with STAGE_SECONDS.time(stage="rich_text"), zipfile.ZipFile(input_file, "r") as zf:
+                self.rich_text_map = _read_rich_text_map(zf)
+                self.has_shared_strings = "xl/sharedStrings.xml" in zf.namelist()
+                self.sheet_paths = _read_sheet_paths(zf) if self.has_shared_strings else {}
+        if not (with_indices or self.rich_text_map):
+            self.has_shared_strings = False
+
+    def enrich(self, cell: Cell) -> None:
+        """Set shared_string_index and rich_text_runs on a cell, if applicable."""
+        if self.has_shared_strings is False:
+            return
+
+        cell_ss_map = self._cell_maps.get(cell.sheet)
+        if cell_ss_map is None:
+            cell_ss_map = self._load_sheet(cell.sheet)
+
+        ss_idx = cell_ss_map.get(cell.coordinate)
+        if ss_idx is not None:
             cell.shared_string_index = ss_idx
-            if ss_idx in rich_text_map:
-                cell.rich_text_runs = rich_text_map[ss_idx]
+            if ss_idx in self.rich_text_map:
+                cell.rich_text_runs = self.rich_text_map[ss_idx]
+
+    def _load_sheet(self, sheet_name: str) -> dict[str, int]:
+        cell_ss_map: dict[str, int] = {}
+        sheet_path = self.sheet_paths.get(sheet_name)
+        with STAGE_SECONDS.time(stage="rich_text"), zipfile.ZipFile(self.input_file, "r") as zf:
+            if self.has_shared_strings is None:
+                self.has_shared_strings = "xl/sharedStrings.xml" in zf.namelist()
+            if self.has_shared_strings and sheet_path and sheet_path in zf.namelist():
+                cell_ss_map = _read_cell_shared_strings(zf, sheet_path)
+        self._cell_maps[sheet_name] = cell_ss_map
+        return cell_ss_map
+
+
+def _extract_rich_text_info(
+    input_file: Path, cells: list[Cell], sheets_filter: Optional[set[str]]
+) -> None:
+    """Extract rich text run information from the xlsx file.
+
+    This reads the shared strings XML to identify cells with rich text formatting
+    and stores the individual runs for separate translation.
+    """
+    lookup = RichTextLookup(input_file)
+    for cell in cells:
+        if sheets_filter and cell.sheet not in sheets_filter:
+            continue
+        lookup.enrich(cell)
+
+
+def _split_whitespace(text: str) -> tuple[str, str]:
+    """Return the leading and trailing whitespace of a text."""
+    leading_ws = text[: len(text) - len(text.lstrip())]
+    trailing_ws = text[len(text.rstrip()) :]
+    return leading_ws, trailing_ws
 
 
 def _translate_rich_text_runs(
@@ -257,8 +699,7 @@ def _translate_rich_text_runs(
             for i, run in enumerate(cell.rich_text_runs):
                 if run.text.strip():  # Only translate non-empty runs
                     # Capture leading and trailing whitespace
-                    leading_ws = run.text[: len(run.text) - len(run.text.lstrip())]
-                    trailing_ws = run.text[len(run.text.rstrip()) :]
+                    leading_ws, trailing_ws = _split_whitespace(run.text)
                     runs_to_translate.append((cell, i, run, leading_ws, trailing_ws))
 
     if not runs_to_translate:
@@ -299,6 +740,7 @@ def _translate_rich_text_runs(
         run.translated_text = leading_ws + run_cell.value.strip() + trailing_ws
 
 
+@timed_stage("dropdowns")
 def _extract_dropdown_validations(
     input_file: Path, sheets_filter: Optional[set[str]]
 ) -> list[DropdownValidation]:
@@ -307,81 +749,67 @@ def _extract_dropdown_validations(
     Only extracts validations with type="list" and inline values (formula1 starts with quotes).
     Range-based dropdowns are skipped as their source cells are already translated.
     """
-    import zipfile
-    from xml.etree import ElementTree as ET
-
-    ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
-    ns_r = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
-    ns_pkg = "http://schemas.openxmlformats.org/package/2006/relationships"
+    ns = SPREADSHEET_NS
 
     dropdowns: list[DropdownValidation] = []
 
     with zipfile.ZipFile(input_file, "r") as zf:
-        # Read workbook structure
-        workbook_xml = ET.fromstring(zf.read("xl/workbook.xml"))
-        rels_xml = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
-
-        # Build sheet name -> file path mapping
-        sheet_rid_map = {}
-        for sheet in workbook_xml.findall(f".//{{{ns}}}sheet"):
-            sheet_rid_map[sheet.get("name")] = sheet.get(f"{{{ns_r}}}id")
-
-        rid_file_map = {}
-        for rel in rels_xml.findall(f".//{{{ns_pkg}}}Relationship"):
-            target = rel.get("Target")
-            if target.startswith("/"):
-                rid_file_map[rel.get("Id")] = target[1:]
-            elif target.startswith("xl/"):
-                rid_file_map[rel.get("Id")] = target
-            else:
-                rid_file_map[rel.get("Id")] = "xl/" + target
-
         # Check each sheet for data validations
-        for sheet_name, rid in sheet_rid_map.items():
+        for sheet_name, sheet_path in _read_sheet_paths(zf).items():
             if sheets_filter and sheet_name not in sheets_filter:
                 continue
 
-            sheet_path = rid_file_map.get(rid)
-            if not sheet_path or sheet_path not in zf.namelist():
+            if sheet_path not in zf.namelist():
                 continue
 
-            sheet_xml = ET.fromstring(zf.read(sheet_path))
+            # Parse only the data validations, not the whole sheet
+            xml_data = zf.read(sheet_path)
+            block = _find_data_validations(xml_data)
+            if block is None:
+                continue
 
-            # Find data validations
-            for dv in sheet_xml.findall(f".//{{{ns}}}dataValidation"):
-                if dv.get("type") != "list":
-                    continue
+            for dv in block.parse(xml_data).findall(f"{{{ns}}}dataValidation"):
+                dropdown = _parse_dropdown(dv, sheet_name)
+                if dropdown is not None:
+                    dropdowns.append(dropdown)
 
-                formula1 = dv.find(f"{{{ns}}}formula1")
-                if formula1 is None or not formula1.text:
-                    continue
+    return dropdowns
 
-                # Check if this is an inline list (starts with quote)
-                formula_text = formula1.text.strip()
-                if not formula_text.startswith('"'):
-                    # This is a range reference, skip it
-                    continue
 
-                # Parse the inline values: "Value1,Value2,Value3"
-                # Remove surrounding quotes and split by comma
-                values_str = formula_text.strip('"')
-                values = [v.strip() for v in values_str.split(",")]
-
-                # Filter out empty values and values that are just numbers
-                translatable_values = [
-                    v for v in values if v and not _is_number(v)
-                ]
-
-                if translatable_values:
-                    dropdowns.append(
-                        DropdownValidation(
-                            sheet=sheet_name,
-                            cell_range=dv.get("sqref", ""),
-                            values=values,  # Keep all original values
-                        )
-                    )
+def _parse_dropdown(dv: "ET.Element", sheet_name: str) -> Optional[DropdownValidation]:
+    """Return the inline dropdown of a dataValidation element, or None if it has none."""
+    ns = SPREADSHEET_NS
 
-    return dropdowns
+    if dv.get("type") != "list":
+        return None
+
+    formula1 = dv.find(f"{{{ns}}}formula1")
+    if formula1 is None or not formula1.text:
+        return None
+
+    # Check if this is an inline list (starts with quote)
+    formula_text = formula1.text.strip()
+    if not formula_text.startswith('"'):
+        # This is a range reference, skip it
+        return None
+
+    # Parse the inline values: "Value1,Value2,Value3"
+    # Remove surrounding quotes and split by comma
+    values_str = formula_text.strip('"')
+    values = [v.strip() for v in values_str.split(",")]
+
+    # Filter out empty values and values that are just numbers
+    translatable_values = [
+        v for v in values if v and not _is_number(v)
+    ]
+    if not translatable_values:
+        return None
+
+    return DropdownValidation(
+        sheet=sheet_name,
+        cell_range=dv.get("sqref", ""),
+        values=values,  # Keep all original values
+    )
 
 
 def _is_number(s: str) -> bool:
@@ -445,6 +873,142 @@ def _translate_dropdowns(
         ]
 
 
+class TranslationWriter:
+    """Streams translated cells into the shared strings table and writes the output.
+
+    The package structure and shared strings are loaded on the first update, so a
+    writer can be fed one translated batch at a time while extraction and
+    translation are still running. The output archive is written by ``save``.
+    """
+
+    def __init__(self, input_file: Path, output_file: Path) -> None:
+        """Initialize the writer.
+
+        Args:
+            input_file: Original Excel file (never modified)
+            output_file: Path for the translated copy
+        """
+        self.input_file = input_file
+        self.output_file = output_file
+        self._loaded = False
+        self._sheet_paths: dict[str, str] = {}
+        self._shared_strings: Optional["ET.Element"] = None
+        self._si_elements: list["ET.Element"] = []
+        self._shared_strings_updated = False
+        # Cells whose shared string index is not known yet: {sheet_name: {cell_ref: cell}}
+        self._unresolved: dict[str, dict[str, Cell]] = {}
+        # Rich text cells are applied at save time, once all their runs are translated
+        self._rich_text_updates: dict[int, Cell] = {}
+
+    def _load(self) -> None:
+        from xml.etree import ElementTree as ET
+
+        with zipfile.ZipFile(self.input_file, "r") as zf:
+            self._sheet_paths = _read_sheet_paths(zf)
+            if "xl/sharedStrings.xml" in zf.namelist():
+                ET.register_namespace("", SPREADSHEET_NS)
+                self._shared_strings = ET.fromstring(zf.read("xl/sharedStrings.xml"))
+                self._si_elements = self._shared_strings.findall(f"{{{SPREADSHEET_NS}}}si")
+        self._loaded = True
+
+    def add_cells(self, cells: list[Cell]) -> None:
+        """Apply translated cells to the shared strings table."""
+        if not self._loaded:
+            self._load()
+
+        for cell in cells:
+            if cell.shared_string_index is not None:
+                self._apply(cell.shared_string_index, cell)
+            else:
+                self._unresolved.setdefault(cell.sheet, {})[cell.coordinate] = cell
+
+    def _apply(self, index: int, cell: Cell) -> None:
+        if index >= len(self._si_elements):
+            return
+        if cell.rich_text_runs:
+            self._rich_text_updates[index] = cell
+            return
+        _update_shared_string_item(self._si_elements[index], cell, SPREADSHEET_NS)
+        self._shared_strings_updated = True
+
+    def save(self, dropdowns: Optional[list[DropdownValidation]] = None) -> None:
+        """Write the translated workbook, preserving every other part of the package.
+
+        The archive is written to a temporary file next to the output and renamed
+        into place, so a failed write leaves neither a partial output nor a stray
+        file in the system temp directory. Its duration is recorded as the "write"
+        stage.
+        """
+        with STAGE_SECONDS.time(stage="write"):
+            self._save(dropdowns)
+
+    def _save(self, dropdowns: Optional[list[DropdownValidation]]) -> None:
+        import os
+        import tempfile
+        from xml.etree import ElementTree as ET
+
+        if not self._loaded:
+            self._load()
+        ns = SPREADSHEET_NS
+
+        with zipfile.ZipFile(self.input_file, "r") as zf_in:
+            # Look up shared string indices for cells that did not carry one
+            for sheet_name, updates_for_sheet in self._unresolved.items():
+                sheet_path = self._sheet_paths.get(sheet_name)
+                if not sheet_path or sheet_path not in zf_in.namelist():
+                    continue
+                cell_ss_map = _read_cell_shared_strings(zf_in, sheet_path)
+                for ref, cell in updates_for_sheet.items():
+                    if ref in cell_ss_map:
+                        self._apply(cell_ss_map[ref], cell)
+            self._unresolved.clear()
+
+            for index, cell in self._rich_text_updates.items():
+                _update_shared_string_item(self._si_elements[index], cell, ns)
+                self._shared_strings_updated = True
+
+            updated_shared_strings = None
+            if self._shared_strings is not None and self._shared_strings_updated:
+                updated_shared_strings = ET.tostring(
+                    self._shared_strings, encoding="UTF-8", xml_declaration=True
+                )
+
+            # Build dropdown updates by sheet path
+            dropdown_updates: dict[str, list[DropdownValidation]] = {}
+            for dropdown in dropdowns or []:
+                if dropdown.translated_values:
+                    sheet_path = self._sheet_paths.get(dropdown.sheet)
+                    if sheet_path:
+                        dropdown_updates.setdefault(sheet_path, []).append(dropdown)
+
+            # Rewrite the zip file with updated shared strings and dropdowns
+            output_file = Path(self.output_file)
+            with tempfile.NamedTemporaryFile(
+                delete=False, suffix=".xlsx", dir=output_file.parent
+            ) as tmp:
+                tmp_path = tmp.name
+
+            try:
+                with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zf_out:
+                    for item in zf_in.infolist():
+                        data = zf_in.read(item.filename)
+
+                        # Update shared strings file
+                        if item.filename == "xl/sharedStrings.xml" and updated_shared_strings:
+                            data = updated_shared_strings
+
+                        # Update sheet XML with translated dropdown values
+                        if item.filename in dropdown_updates:
+                            data = _update_sheet_dropdowns(data, dropdown_updates[item.filename])
+
+                        zf_out.writestr(item, data)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+        os.replace(tmp_path, output_file)
+
+
 def write_translations(
     input_file: Path,
     output_file: Path,
@@ -457,155 +1021,111 @@ def write_translations(
     and rich text formatting (bold, colors, fonts) from the original file by
     updating the shared strings table directly.
     """
-    import shutil
-    import zipfile
-    import tempfile
-    from xml.etree import ElementTree as ET
+    writer = TranslationWriter(input_file, output_file)
+    writer.add_cells(translated_cells)
+    writer.save(dropdowns)
 
-    # Copy the original file to preserve all content
-    shutil.copy2(input_file, output_file)
-
-    ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
-    ns_r = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
-    ns_pkg = "http://schemas.openxmlformats.org/package/2006/relationships"
-
-    # Group cells by sheet
-    cells_by_sheet: dict[str, list] = {}
-    for cell in translated_cells:
-        if cell.sheet not in cells_by_sheet:
-            cells_by_sheet[cell.sheet] = []
-        cells_by_sheet[cell.sheet].append(cell)
-
-    # Build cell ref -> new value mapping
-    cell_updates: dict[str, dict] = {}  # {sheet_name: {cell_ref: cell}}
-    for cell in translated_cells:
-        if cell.sheet not in cell_updates:
-            cell_updates[cell.sheet] = {}
-        col_letter = _col_num_to_letter(cell.col)
-        cell_ref = f"{col_letter}{cell.row}"
-        cell_updates[cell.sheet][cell_ref] = cell
-
-    # Read necessary XML files from the archive
-    with zipfile.ZipFile(output_file, "r") as zf:
-        workbook_xml = ET.fromstring(zf.read("xl/workbook.xml"))
-        rels_xml = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
-
-        # Read shared strings if it exists
-        shared_strings_data = None
-        if "xl/sharedStrings.xml" in zf.namelist():
-            shared_strings_data = zf.read("xl/sharedStrings.xml")
-
-    # Build sheet name -> rId mapping
-    sheet_rid_map = {}
-    for sheet in workbook_xml.findall(f".//{{{ns}}}sheet"):
-        sheet_rid_map[sheet.get("name")] = sheet.get(f"{{{ns_r}}}id")
 
-    # Get rId -> file path mapping
-    rid_file_map = {}
-    for rel in rels_xml.findall(f".//{{{ns_pkg}}}Relationship"):
-        target = rel.get("Target")
-        # Handle both absolute paths (/xl/worksheets/...) and relative paths (worksheets/...)
-        if target.startswith("/"):
-            # Absolute path - remove leading slash
-            rid_file_map[rel.get("Id")] = target[1:]
-        elif target.startswith("xl/"):
-            # Already has xl/ prefix
-            rid_file_map[rel.get("Id")] = target
-        else:
-            # Relative path - add xl/ prefix
-            rid_file_map[rel.get("Id")] = "xl/" + target
+# Namespace declarations of the worksheet element, copied to parse a block on its own
+_NS_DECLARATION = re.compile(rb"""\sxmlns(?::([\w.-]+))?\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+_SQREF = re.compile(rb"""\ssqref\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+_TAG_NAME = re.compile(rb"<(?:([\w.-]+):)?([\w.-]+)")
 
-    # Build sheet name -> sheet XML path mapping
-    sheet_xml_paths = {}
-    for sheet_name in cells_by_sheet.keys():
-        rid = sheet_rid_map.get(sheet_name)
-        if rid:
-            sheet_xml_paths[sheet_name] = rid_file_map.get(rid)
-
-    # Collect which shared string indices need updating
-    # Format: {index: Cell} - we pass the whole cell to access rich_text_runs
-    shared_string_updates: dict[int, Cell] = {}
-
-    # Read each sheet to find shared string indices for cells we need to update
-    with zipfile.ZipFile(output_file, "r") as zf:
-        for sheet_name, sheet_path in sheet_xml_paths.items():
-            if not sheet_path:
-                continue
-            sheet_xml = ET.fromstring(zf.read(sheet_path))
-            sheet_data = sheet_xml.find(f".//{{{ns}}}sheetData")
-            if sheet_data is None:
-                continue
 
-            updates_for_sheet = cell_updates.get(sheet_name, {})
-            for row in sheet_data.findall(f"{{{ns}}}row"):
-                for c in row.findall(f"{{{ns}}}c"):
-                    ref = c.get("r")
-                    if ref in updates_for_sheet:
-                        cell = updates_for_sheet[ref]
-                        # Check if this is a shared string reference
-                        if c.get("t") == "s":
-                            v = c.find(f"{{{ns}}}v")
-                            if v is not None and v.text:
-                                try:
-                                    ss_index = int(v.text)
-                                    shared_string_updates[ss_index] = cell
-                                except ValueError:
-                                    pass
-
-    # Update shared strings XML, preserving rich text formatting
-    updated_shared_strings = None
-    if shared_strings_data and shared_string_updates:
-        updated_shared_strings = _update_shared_strings(
-            shared_strings_data, shared_string_updates
-        )
+@dataclass
+class _DataValidationsBlock:
+    """Location of a sheet's ``<dataValidations>`` element in the raw sheet XML."""
 
-    # Build dropdown updates by sheet path
-    dropdown_updates: dict[str, list[DropdownValidation]] = {}
-    if dropdowns:
-        for dropdown in dropdowns:
-            if dropdown.translated_values:
-                rid = sheet_rid_map.get(dropdown.sheet)
-                if rid:
-                    sheet_path = rid_file_map.get(rid)
-                    if sheet_path:
-                        if sheet_path not in dropdown_updates:
-                            dropdown_updates[sheet_path] = []
-                        dropdown_updates[sheet_path].append(dropdown)
+    start: int
+    end: int
+    prefix: bytes  # Prefix of the spreadsheet namespace, with its colon (b"" if default)
+    namespaces: bytes  # Namespace declarations of the worksheet element
 
-    # Rewrite the zip file with updated shared strings and dropdowns
-    with zipfile.ZipFile(output_file, "r") as zf_in:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp:
-            tmp_path = tmp.name
+    def parse(self, xml_data: bytes) -> "ET.Element":
+        """Parse the block alone into an element, with the worksheet's namespaces."""
+        from xml.etree import ElementTree as ET
 
-        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zf_out:
-            for item in zf_in.infolist():
-                data = zf_in.read(item.filename)
+        wrapped = b"<wrapper" + self.namespaces + b">" + xml_data[self.start : self.end]
+        return ET.fromstring(wrapped + b"</wrapper>")[0]
 
-                # Update shared strings file
-                if item.filename == "xl/sharedStrings.xml" and updated_shared_strings:
-                    data = updated_shared_strings
 
-                # Update sheet XML with translated dropdown values
-                if item.filename in dropdown_updates:
-                    data = _update_sheet_dropdowns(data, dropdown_updates[item.filename], ns)
+def _find_data_validations(xml_data: bytes) -> Optional[_DataValidationsBlock]:
+    """Locate the ``<dataValidations>`` element of a sheet without parsing the sheet.
 
-                zf_out.writestr(item, data)
+    The element follows ``sheetData``, near the end of the sheet, so it is searched
+    for from the end. Data validations of Excel 2010 extensions (``x14:``) live in
+    another namespace and are not matched.
+
+    Returns:
+        The element's location, or None if the sheet has no data validations
+    """
+    root = _root_start(xml_data)
+    if root < 0:
+        return None
+    name = _TAG_NAME.match(xml_data, root)
+    if name is None or name.group(2) != b"worksheet":
+        return None
+    head = xml_data[root : xml_data.find(b">", root)]
+    namespaces = b"".join(match.group(0) for match in _NS_DECLARATION.finditer(head))
+    # The root's own prefix must be bound to the spreadsheet namespace
+    if not any(
+        match.group(1) == name.group(1)
+        and (match.group(2) or match.group(3) or b"").decode() == SPREADSHEET_NS
+        for match in _NS_DECLARATION.finditer(head)
+    ):
+        return None
+    prefix = name.group(1) + b":" if name.group(1) else b""
+
+    open_tag = b"<" + prefix + b"dataValidations"
+    start = xml_data.rfind(open_tag)
+    # Skip longer names sharing the prefix
+    while start >= 0 and not _ends_name(xml_data, start + len(open_tag)):
+        start = xml_data.rfind(open_tag, 0, start)
+    if start < 0:
+        return None
+    tag_end = xml_data.find(b">", start) + 1
+    if xml_data[tag_end - 2 : tag_end] == b"/>":
+        end = tag_end
+    else:
+        close_tag = b"</" + prefix + b"dataValidations>"
+        end = xml_data.find(close_tag, tag_end)
+        if end < 0:
+            return None
+        end += len(close_tag)
+    return _DataValidationsBlock(start, end, prefix, namespaces)
+
+
+def _root_start(xml_data: bytes) -> int:
+    """Index of the root start tag, past any declaration, comments or doctype (-1 if none)."""
+    index = xml_data.find(b"<")
+    while index >= 0:
+        if xml_data.startswith(b"<?", index):
+            end = xml_data.find(b"?>", index)
+        elif xml_data.startswith(b"<!--", index):
+            end = xml_data.find(b"-->", index)
+        elif xml_data.startswith(b"<!", index):
+            end = xml_data.find(b">", index)
+        else:
+            return index
+        if end < 0:
+            return -1
+        index = xml_data.find(b"<", end)
+    return -1
 
-    # Replace original with modified
-    shutil.move(tmp_path, output_file)
 
+def _ends_name(xml_data: bytes, index: int) -> bool:
+    return xml_data[index : index + 1] in (b" ", b"\t", b"\r", b"\n", b">", b"/")
 
-def _update_sheet_dropdowns(
-    xml_data: bytes, dropdowns: list[DropdownValidation], ns: str
-) -> bytes:
+
+def _update_sheet_dropdowns(xml_data: bytes, dropdowns: list[DropdownValidation]) -> bytes:
     """Update data validation dropdown values in sheet XML.
 
-    Finds dataValidation elements and updates their formula1 with translated values.
+    Rewrites only the ``formula1`` of the matching ``dataValidation`` elements,
+    found by their ``sqref``, in the raw bytes of the ``<dataValidations>`` block.
+    The rest of the sheet, which can be hundreds of MB, is copied through as is,
+    keeping its namespace prefixes and formatting.
     """
-    from xml.etree import ElementTree as ET
-
-    ET.register_namespace("", ns)
-    root = ET.fromstring(xml_data)
+    from xml.sax.saxutils import escape, unescape
 
     # Build a map of cell_range -> translated values
     dropdown_map: dict[str, list[str]] = {}
@@ -613,59 +1133,62 @@ def _update_sheet_dropdowns(
         if dropdown.translated_values:
             dropdown_map[dropdown.cell_range] = dropdown.translated_values
 
-    # Find and update data validations
-    for dv in root.findall(f".//{{{ns}}}dataValidation"):
-        sqref = dv.get("sqref")
-        if sqref in dropdown_map:
-            formula1 = dv.find(f"{{{ns}}}formula1")
-            if formula1 is not None:
-                # Build the new formula with translated values
-                translated_values = dropdown_map[sqref]
-                new_formula = '"' + ",".join(translated_values) + '"'
-                formula1.text = new_formula
+    block = _find_data_validations(xml_data)
+    if block is None or not dropdown_map:
+        return xml_data
+
+    prefix = re.escape(block.prefix)
+    validation = re.compile(
+        rb"<" + prefix + rb"dataValidation\b([^>]*?)(/>|>.*?</" + prefix + rb"dataValidation>)",
+        re.DOTALL,
+    )
+    # The start tag up to its end, so its attributes are kept, then the rest of the element
+    formula1 = re.compile(
+        rb"(<" + prefix + rb"formula1\b[^>]*?)(?:/>|>.*?</" + prefix + rb"formula1>)", re.DOTALL
+    )
+    close_formula1 = b"</" + block.prefix + b"formula1>"
+
+    def update(match: "re.Match[bytes]") -> bytes:
+        element: bytes = match.group(0)
+        sqref = _SQREF.search(match.group(1))
+        if sqref is None:
+            return element
+        cell_range = unescape((sqref.group(1) or sqref.group(2) or b"").decode(), {"&quot;": '"'})
+        if cell_range not in dropdown_map:
+            return element
+        # Build the new formula with translated values
+        new_formula = escape('"' + ",".join(dropdown_map[cell_range]) + '"').encode()
+        return formula1.sub(
+            lambda start: start.group(1) + b">" + new_formula + close_formula1,
+            element,
+            count=1,
+        )
 
-    return ET.tostring(root, encoding="UTF-8", xml_declaration=True)
+    updated = validation.sub(update, xml_data[block.start : block.end])
+    return xml_data[: block.start] + updated + xml_data[block.end :]
 
 
-def _update_shared_strings(xml_data: bytes, updates: dict[int, "Cell"]) -> bytes:
-    """Update shared strings while preserving rich text formatting.
+def _update_shared_string_item(si: "ET.Element", cell: Cell, ns: str) -> None:
+    """Update one shared string item while preserving rich text formatting.
 
     For plain text entries (<si><t>text</t></si>), simply update the text.
     For rich text entries (<si><r>...</r><r>...</r></si>), use the pre-translated
     runs from the Cell object to preserve exact formatting boundaries.
     """
-    from xml.etree import ElementTree as ET
-
-    ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
-    ET.register_namespace("", ns)
-
-    root = ET.fromstring(xml_data)
-
-    # Find all <si> elements (shared string items)
-    si_elements = root.findall(f"{{{ns}}}si")
-
-    for index, cell in updates.items():
-        if index >= len(si_elements):
-            continue
-
-        si = si_elements[index]
-
-        # Check if this is plain text or rich text
-        plain_t = si.find(f"{{{ns}}}t")
-        runs = si.findall(f"{{{ns}}}r")
-
-        if runs and cell.rich_text_runs:
-            # Rich text with pre-translated runs - use exact translations
-            _update_rich_text_runs(runs, cell.rich_text_runs, ns)
-        elif runs:
-            # Rich text but no pre-translated runs - use full translated value
-            # (fallback, shouldn't normally happen)
-            _update_rich_text_runs_fallback(runs, cell.value, ns)
-        elif plain_t is not None:
-            # Plain text: simply update
-            plain_t.text = cell.value
-
-    return ET.tostring(root, encoding="UTF-8", xml_declaration=True)
+    # Check if this is plain text or rich text
+    plain_t = si.find(f"{{{ns}}}t")
+    runs = si.findall(f"{{{ns}}}r")
+
+    if runs and cell.rich_text_runs:
+        # Rich text with pre-translated runs - use exact translations
+        _update_rich_text_runs(runs, cell.rich_text_runs, ns)
+    elif runs:
+        # Rich text but no pre-translated runs - use full translated value
+        # (fallback, shouldn't normally happen)
+        _update_rich_text_runs_fallback(runs, cell.value, ns)
+    elif plain_t is not None:
+        # Plain text: simply update
+        plain_t.text = cell.value
 
 
 def _update_rich_text_runs(runs, translated_runs: list["RichTextRun"], ns: str) -> None:
@@ -0,0 +1,290 @@
+"""Local stand-in for the Anthropic Messages API, for load and latency testing.
+
+The server answers the prompts built by ``Translator._build_prompt`` with
+deterministic translations (``"[french] Hello"``), over real HTTP, so the SDK's
+connection pool, retries and timeouts are exercised as they are in production.
+It can simulate:
+
+- response times drawn from a latency distribution, plus generation time per
+  output token
+- rate limiting (429) and overload (529) errors with a ``retry-after`` header,
+  at random or from a requests-per-minute limit
+- truncated responses (``stop_reason`` ``max_tokens``) and malformed numbering
+
+Point Rosetta at it with ``ROSETTA_API_BASE_URL``::
+
+    python -m rosetta.mock_api --port 8787 --latency lognormal:1.5,0.6 --rate-limited 0.05
+    ROSETTA_API_BASE_URL=http://127.0.0.1:8787 ANTHROPIC_API_KEY=mock rosetta data.xlsx -t french
+
+Faults are drawn from a seeded generator: a sequential run is reproducible.
+"""
+
+import asyncio
+import itertools
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+import click
+
+from rosetta.services.estimator import estimate_tokens
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+TEXTS_START = "Texts to translate:\n"
+TEXTS_END = "\n\nReturn only the numbered translations"
+TARGET = re.compile(r"^Translate the following text from .+? to (.+?)\.$", re.MULTILINE)
+NUMBERED = re.compile(r"^(\d+)\. ", re.MULTILINE)
+
+# Error types of the Messages API, by status code
+ERROR_TYPES = {429: "rate_limit_error", 529: "overloaded_error"}
+
+MODELS = ("claude-sonnet-4-20250514", "claude-3-5-haiku-20241022")
+
+
+def mock_translation(prompt: str) -> str:
+    """Return the numbered translations of a translation prompt.
+
+    Each text is prefixed with the target language in brackets, keeping its
+    number, so the response parses exactly like a well-behaved model's.
+
+    Raises:
+        ValueError: If the prompt is not in the format of ``Translator._build_prompt``
+    """
+    target = TARGET.search(prompt)
+    start, end = prompt.find(TEXTS_START), prompt.rfind(TEXTS_END)
+    if target is None or start < 0 or end < start:
+        raise ValueError("Not a translation prompt")
+    texts = prompt[start + len(TEXTS_START) : end]
+    return NUMBERED.sub(rf"\1. [{target.group(1)}] ", texts)
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Parse a latency distribution into a sampler of seconds.
+
+    Accepted forms: ``0.5`` or ``fixed:0.5``, ``uniform:LOW,HIGH``,
+    ``normal:MEAN,STDDEV``, ``lognormal:MEDIAN,SIGMA`` (long tail) and
+    ``exponential:MEAN``. Samples are never negative.
+
+    Raises:
+        ValueError: If the specification is not understood
+    """
+    kind, _, args = spec.partition(":") if ":" in spec else ("fixed", "", spec)
+    try:
+        params = [float(arg) for arg in args.split(",")]
+    except ValueError:
+        raise ValueError(f"Invalid latency parameters: {spec!r}") from None
+    samplers: dict[tuple[str, int], Callable[..., float]] = {
+        ("fixed", 1): lambda rng, value: value,
+        ("uniform", 2): lambda rng, low, high: rng.uniform(low, high),
+        ("normal", 2): lambda rng, mean, stddev: rng.gauss(mean, stddev),
+        ("lognormal", 2): lambda rng, median, sigma: rng.lognormvariate(math.log(median), sigma),
+        ("exponential", 1): lambda rng, mean: rng.expovariate(1 / mean),
+    }
+    sampler = samplers.get((kind, len(params)))
+    if sampler is None:
+        raise ValueError(f"Unknown latency distribution: {spec!r}")
+    if any(param < 0 for param in params) or (
+        kind in ("lognormal", "exponential") and not params[0]
+    ):
+        raise ValueError(f"Latency parameters must be positive: {spec!r}")
+    return lambda rng: max(0.0, sampler(rng, *params))
+
+
+@dataclass
+class MockSettings:
+    """Behavior of the mock server."""
+
+    latency: str = "0"  # Distribution of the time to the response (see parse_latency)
+    seconds_per_token: float = 0.0  # Added generation time per output token
+    rate_limited: float = 0.0  # Share of requests answered 429
+    overloaded: float = 0.0  # Share of requests answered 529
+    requests_per_minute: int = 0  # Answer 429 beyond this rate (0: no limit)
+    retry_after: float = 1.0  # Seconds in the retry-after header of random errors
+    truncated: float = 0.0  # Share of responses cut short with stop_reason max_tokens
+    malformed: float = 0.0  # Share of responses with one translation missing its number
+    seed: int = 0
+
+
+class MockAPI:
+    """State of the mock server: settings, random generator, limiter and counters."""
+
+    def __init__(self, settings: MockSettings) -> None:
+        self.settings = settings
+        self.latency = parse_latency(settings.latency)
+        self.rng = random.Random(settings.seed)
+        self.stats: Counter[str] = Counter()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._window: list[float] = []  # Start times of requests in the last minute
+
+    def draw(self) -> tuple[Optional[str], float]:
+        """Draw the fault of the next request (None, "truncated" or "malformed") and its latency."""
+        settings = self.settings
+        with self._lock:
+            roll = self.rng.random()
+            if roll < settings.truncated:
+                fault = "truncated"
+            elif roll < settings.truncated + settings.malformed:
+                fault = "malformed"
+            else:
+                fault = None
+            return fault, self.latency(self.rng)
+
+    def error(self) -> Optional[tuple[int, float]]:
+        """Return the status and retry-after seconds if the next request is rejected."""
+        settings = self.settings
+        with self._lock:
+            now = time.monotonic()
+            if settings.requests_per_minute:
+                self._window = [started for started in self._window if now - started < 60]
+                if len(self._window) >= settings.requests_per_minute:
+                    return 429, max(0.0, 60 - (now - self._window[0]))
+                self._window.append(now)
+            roll = self.rng.random()
+            if roll < settings.rate_limited:
+                return 429, settings.retry_after
+            if roll < settings.rate_limited + settings.overloaded:
+                return 529, settings.retry_after
+        return None
+
+    def respond(self, model: str, max_tokens: int, prompt: str, fault: Optional[str]) -> dict:
+        """Build a Messages API response body for a translation prompt."""
+        lines = mock_translation(prompt).split("\n")
+        stop_reason = "end_turn"
+        if fault == "truncated" or estimate_tokens("\n".join(lines)) > max_tokens:
+            # Keep what fits (or half the lines), ending mid-translation
+            keep = max(1, len(lines) // 2) if fault == "truncated" else len(lines)
+            while keep > 1 and estimate_tokens("\n".join(lines[:keep])) > max_tokens:
+                keep -= 1
+            lines = lines[:keep]
+            lines[-1] = lines[-1][: max(1, len(lines[-1]) // 2)]
+            stop_reason = "max_tokens"
+        elif fault == "malformed" and len(lines) > 1:
+            # Drop one number: its text runs into the previous translation
+            index = self.rng.randrange(1, len(lines))
+            lines[index] = NUMBERED.sub("", lines[index], count=1)
+        text = "\n".join(lines)
+        return {
+            "id": f"msg_mock_{next(self._ids):08d}",
+            "type": "message",
+            "role": "assistant",
+            "model": model,
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": estimate_tokens(prompt),
+                "output_tokens": estimate_tokens(text),
+            },
+        }
+
+
+def create_app(settings: Optional[MockSettings] = None) -> "FastAPI":
+    """Create the mock server's ASGI application."""
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    mock = MockAPI(settings or MockSettings())
+    app = FastAPI(title="Rosetta mock Anthropic API")
+    app.state.mock = mock
+
+    def error(
+        status: int, kind: str, message: str, headers: Optional[dict[str, str]] = None
+    ) -> JSONResponse:
+        mock.stats[f"status_{status}"] += 1
+        return JSONResponse(
+            {"type": "error", "error": {"type": kind, "message": message}},
+            status_code=status,
+            headers=headers,
+        )
+
+    @app.post("/v1/messages", response_model=None)
+    async def messages(request: Request) -> JSONResponse | dict:
+        mock.stats["requests"] += 1
+        body = await request.json()
+        rejected = mock.error()
+        if rejected is not None:
+            status, retry_after = rejected
+            return error(
+                status,
+                ERROR_TYPES[status],
+                "Simulated error",
+                headers={"retry-after": f"{retry_after:.3g}"},
+            )
+        try:
+            prompt = body["messages"][-1]["content"]
+            if not isinstance(prompt, str):
+                prompt = "".join(block.get("text", "") for block in prompt)
+            fault, latency = mock.draw()
+            response = mock.respond(body["model"], int(body["max_tokens"]), prompt, fault)
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            return error(400, "invalid_request_error", str(e))
+        await asyncio.sleep(
+            latency + response["usage"]["output_tokens"] * mock.settings.seconds_per_token
+        )
+        mock.stats["status_200"] += 1
+        if fault is not None or response["stop_reason"] == "max_tokens":
+            mock.stats[fault or "truncated"] += 1
+        return response
+
+    @app.get("/v1/models")
+    async def models() -> dict:
+        data = [
+            {
+                "type": "model",
+                "id": model,
+                "display_name": model,
+                "created_at": "2025-01-01T00:00:00Z",
+            }
+            for model in MODELS
+        ]
+        return {"data": data, "has_more": False, "first_id": MODELS[0], "last_id": MODELS[-1]}
+
+    @app.get("/stats")
+    async def stats() -> dict:
+        """Counters of answered requests, by status and fault, and the settings."""
+        return {"settings": asdict(mock.settings), **mock.stats}
+
+    return app
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8787, show_default=True)
+@click.option(
+    "--latency",
+    default="0",
+    show_default=True,
+    help="Response time: SECONDS, uniform:LOW,HIGH, normal:MEAN,SD, lognormal:MEDIAN,SIGMA "
+    "or exponential:MEAN",
+)
+@click.option(
+    "--seconds-per-token", type=float, default=0.0, help="Generation time per output token"
+)
+@click.option("--rate-limited", type=float, default=0.0, help="Share of requests answered 429")
+@click.option("--overloaded", type=float, default=0.0, help="Share of requests answered 529")
+@click.option("--requests-per-minute", type=int, default=0, help="Answer 429 beyond this rate")
+@click.option("--retry-after", type=float, default=1.0, show_default=True)
+@click.option("--truncated", type=float, default=0.0, help="Share of truncated responses")
+@click.option("--malformed", type=float, default=0.0, help="Share of responses with bad numbering")
+@click.option("--seed", type=int, default=0, show_default=True)
+def main(host: str, port: int, **settings: Any) -> None:
+    """Serve a mock Anthropic Messages API for load and latency testing."""
+    import uvicorn
+
+    try:
+        parse_latency(settings["latency"])
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--latency") from e
+    uvicorn.run(create_app(MockSettings(**settings)), host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
 """Data models for Rosetta."""
 
-from rosetta.models.cell import Cell, DropdownValidation, RichTextRun, TranslationBatch
+from rosetta.models.cell import (
+    BatchUsage,
+    Cell,
+    DropdownValidation,
+    RichTextRun,
+    TranslationBatch,
+)
 
-__all__ = ["Cell", "DropdownValidation", "RichTextRun", "TranslationBatch"]
+__all__ = ["BatchUsage", "Cell", "DropdownValidation", "RichTextRun", "TranslationBatch"]
@@ -57,6 +57,17 @@ class DropdownValidation:
     translated_values: Optional[list[str]] = None
 
 
+@dataclass
+class BatchUsage:
+    """API usage of translating one batch."""
+
+    requests: int = 0
+    sent: int = 0  # Texts sent to the API
+    cached: int = 0  # Texts served by the translation cache instead
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
 @dataclass
 class TranslationBatch:
     """A batch of cells to translate together."""
@@ -65,6 +76,8 @@ class TranslationBatch:
     source_lang: Optional[str] = None
     target_lang: str = "english"
     context: Optional[str] = None  # Additional context for more accurate translations
+    # Shared with sub-batches sent on this batch's behalf by translator wrappers
+    usage: BatchUsage = field(default_factory=BatchUsage)
 
     def __len__(self) -> int:
         return len(self.cells)
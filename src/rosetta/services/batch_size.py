@@ -0,0 +1,135 @@
+"""Adaptive batch size for translation requests (additive increase, multiplicative decrease).
+
+The best number of texts per request depends on the model's load, the languages
+and the length of the texts: requests that are too large get truncated or
+misnumbered and make the slowest batches, while requests that are too small pay
+the per-request overhead over and over. ``AdaptiveBatchSize`` learns it from the
+outcome of each request, like TCP's congestion window: it grows by a few texts
+while the time per text keeps improving and responses parse, and halves on
+failed, truncated or unusually slow requests.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from rosetta.services.metrics import BATCH_SIZE, BATCH_SIZE_CHANGES
+
+# Outcomes of a request, as reported to AdaptiveBatchSize.record
+OK = "ok"
+ERROR = "error"  # The request failed, or its response could not be parsed
+TRUNCATED = "truncated"  # The response hit the output token limit
+
+MIN_BATCH_SIZE = 5
+MAX_BATCH_SIZE = 200
+
+# Weight of the latest request in the moving averages
+_SMOOTHING = 0.3
+# Latency per text may exceed its average by this much and still count as improving
+_TOLERANCE = 1.1
+
+
+@dataclass
+class BatchSizeDecision:
+    """A change of the batch size and why it was made."""
+
+    old: int
+    new: int
+    reason: str
+
+    def __str__(self) -> str:
+        return f"Batch size {self.old} -> {self.new} ({self.reason})"
+
+
+class AdaptiveBatchSize:
+    """Thread-safe AIMD controller of the number of texts per request.
+
+    Only requests of at least the current size can make it grow, so a short last
+    batch is not mistaken for a slow one. A failure only shrinks it if the request
+    was not already larger than the current size, so requests sent before a
+    decrease do not decrease it again.
+    """
+
+    def __init__(
+        self,
+        initial: int = 50,
+        minimum: int = MIN_BATCH_SIZE,
+        maximum: int = MAX_BATCH_SIZE,
+        increase: int = 5,
+        decrease: float = 0.5,
+        spike: float = 2.0,
+        min_success: float = 0.9,
+    ) -> None:
+        """Initialize the controller.
+
+        Args:
+            initial: Starting batch size (e.g. ``Config.batch_size``)
+            minimum: Smallest batch size
+            maximum: Largest batch size
+            increase: Texts added after a request that was at least as fast per text
+            decrease: Factor applied after a failed, truncated or slow request
+            spike: A request this many times slower per text than the average is a
+                   latency spike
+            min_success: Smallest moving average of successful requests at which
+                         the size still grows
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.spike = spike
+        self.min_success = min_success
+        self._size = max(minimum, min(maximum, initial))
+        self._lock = threading.Lock()
+        self._latency: Optional[float] = None  # Moving average of seconds per text
+        self._success = 1.0  # Moving average of successful requests
+        self.decisions: list[BatchSizeDecision] = []
+        BATCH_SIZE.set(self._size)
+
+    @property
+    def size(self) -> int:
+        """Number of texts to put in the next request."""
+        return self._size
+
+    @property
+    def last_decision(self) -> Optional[BatchSizeDecision]:
+        return self.decisions[-1] if self.decisions else None
+
+    def record(self, size: int, seconds: float, outcome: str) -> Optional[BatchSizeDecision]:
+        """Adjust the batch size after a request of ``size`` texts.
+
+        Returns:
+            The change made, or None if the size stayed the same
+        """
+        with self._lock:
+            self._success += _SMOOTHING * ((outcome == OK) - self._success)
+            if outcome != OK:
+                if size > self._size:
+                    return None
+                return self._change(self._size * self.decrease, outcome)
+
+            per_text = seconds / size
+            average = self._latency
+            if size * 2 >= self._size:
+                # Short batches pay the request overhead over fewer texts: not comparable
+                self._latency = (
+                    per_text if average is None else (average + _SMOOTHING * (per_text - average))
+                )
+            if average is None or size < self._size:
+                return None
+            if per_text > self.spike * average:
+                return self._change(self._size * self.decrease, "latency spike")
+            if per_text <= _TOLERANCE * average and self._success >= self.min_success:
+                return self._change(self._size + self.increase, "faster per text")
+            return None
+
+    def _change(self, size: float, reason: str) -> Optional[BatchSizeDecision]:
+        new = max(self.minimum, min(self.maximum, int(size)))
+        if new == self._size:
+            return None
+        decision = BatchSizeDecision(self._size, new, reason)
+        self._size = new
+        self.decisions.append(decision)
+        BATCH_SIZE.set(new)
+        BATCH_SIZE_CHANGES.inc(direction="up" if new > decision.old else "down", reason=reason)
+        return decision
@@ -0,0 +1,177 @@
+"""Translate many workbooks with a shared translator, cache and concurrency limit."""
+
+import glob
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from rosetta.models import TranslationBatch
+from rosetta.services.cache import TranslationCache
+from rosetta.services.translation_service import translate_file
+from rosetta.services.translator import Translator
+
+EXCEL_SUFFIXES = (".xlsx", ".xlsm", ".xltx", ".xltm")
+
+
+@dataclass
+class FileResult:
+    """Outcome of translating one file in a bulk run."""
+
+    input_file: str
+    output_file: str
+    status: str  # "completed", "no_content" or "failed"
+    seconds: float
+    cell_count: int = 0
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class _RequestLimiter:
+    """Translator wrapper capping API requests in flight across all files."""
+
+    def __init__(self, translator: Translator, max_requests: int) -> None:
+        self.translator = translator
+        self.config = translator.config
+        self.breaker = getattr(translator, "breaker", None)
+        self._semaphore = threading.BoundedSemaphore(max_requests)
+
+    def translate_batch(self, batch: TranslationBatch) -> list[str]:
+        with self._semaphore:
+            return self.translator.translate_batch(batch)
+
+
+def collect_inputs(source: str) -> list[tuple[Path, Path]]:
+    """Find Excel files in a directory or matching a glob pattern.
+
+    Args:
+        source: A directory (its Excel files are used) or a glob such as "in/**/*.xlsx"
+
+    Returns:
+        Sorted list of (input path, path relative to the source root)
+    """
+    source_path = Path(source)
+    if source_path.is_dir():
+        root = source_path
+        paths = [p for p in source_path.iterdir() if p.is_file()]
+    else:
+        # Everything before the first wildcard is the root that outputs mirror
+        static: list[str] = []
+        for part in source_path.parts:
+            if glob.has_magic(part):
+                break
+            static.append(part)
+        root = Path(*static) if static else Path(".")
+        paths = [Path(p) for p in glob.glob(source, recursive=True) if Path(p).is_file()]
+
+    return sorted(
+        (p, p.relative_to(root))
+        for p in paths
+        # Skip Excel's lock files ("~$report.xlsx")
+        if p.suffix.lower() in EXCEL_SUFFIXES and not p.name.startswith("~$")
+    )
+
+
+def translate_files(
+    inputs: list[tuple[Path, Path]],
+    output_dir: Path,
+    target_lang: str,
+    translator: Translator,
+    source_lang: Optional[str] = None,
+    context: Optional[str] = None,
+    sheets: Optional[set[str]] = None,
+    batch_size: int = 50,
+    max_requests: int = 8,
+    max_files: int = 4,
+    resume: bool = False,
+    on_file_done: Optional[Callable[[FileResult], None]] = None,
+) -> list[FileResult]:
+    """Translate many files, sharing one translator and one translation cache.
+
+    Files are processed in parallel, but the number of API requests in flight is
+    capped globally, whatever the number of files. Text that appears in several
+    files (or several times in one) is translated once.
+
+    Args:
+        inputs: (input path, relative output path) pairs, e.g. from collect_inputs
+        output_dir: Directory receiving the translated files
+        target_lang: Target language for translation
+        translator: Translator shared by all files
+        source_lang: Source language (auto-detected if None)
+        context: Additional context for translations
+        sheets: Set of sheet names to translate (all if None)
+        batch_size: Number of cells per API batch
+        max_requests: Maximum API requests in flight across all files
+        max_files: Maximum files processed at the same time
+        resume: Resume files that have a journal from an interrupted run
+        on_file_done: Called with each file's result as soon as it finishes
+
+    Returns:
+        One FileResult per input, in input order. Failures do not stop the run.
+
+    Raises:
+        ValueError: If output_dir is an input directory or inside one
+    """
+    _check_output_dir(inputs, output_dir)
+    limited = _RequestLimiter(translator, max_requests)
+    cache = TranslationCache()
+
+    def run_one(item: tuple[Path, Path]) -> FileResult:
+        input_file, relative = item
+        output_file = output_dir / relative
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        try:
+            stats = translate_file(
+                input_file=input_file,
+                output_file=output_file,
+                target_lang=target_lang,
+                source_lang=source_lang,
+                context=context,
+                sheets=sheets,
+                batch_size=batch_size,
+                translator=limited,
+                resume=resume,
+                concurrency=max_requests,
+                cache=cache,
+            )
+            result = FileResult(
+                input_file=str(input_file),
+                output_file=str(output_file),
+                status=stats["status"],
+                seconds=time.perf_counter() - started,
+                cell_count=stats["cell_count"],
+            )
+        except Exception as e:
+            result = FileResult(
+                input_file=str(input_file),
+                output_file=str(output_file),
+                status="failed",
+                seconds=time.perf_counter() - started,
+                error=str(e),
+            )
+        if on_file_done is not None:
+            on_file_done(result)
+        return result
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, max_files), thread_name_prefix="rosetta-file"
+    ) as pool:
+        # pool.map keeps input order; on_file_done reports completion order
+        return list(pool.map(run_one, inputs))
+
+
+def _check_output_dir(inputs: list[tuple[Path, Path]], output_dir: Path) -> None:
+    """Reject an output directory where outputs could overwrite or be read as inputs."""
+    output = output_dir.resolve()
+    for input_file, relative in inputs:
+        # The directory the relative output paths are mirrored from
+        root = input_file.resolve().parents[len(relative.parts) - 1]
+        if output == root or root in output.parents:
+            raise ValueError(
+                f"Output directory {output_dir} must not be the input directory or inside it"
+            )
@@ -0,0 +1,167 @@
+"""In-memory translation cache with in-flight deduplication."""
+
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+from rosetta.core.config import Config
+from rosetta.core.exceptions import TranslationError
+from rosetta.models import Cell, TranslationBatch
+from rosetta.services.metrics import CACHE_LOOKUPS
+from rosetta.services.translator import BatchTranslator
+
+# (source_lang, target_lang, context, text)
+CacheKey = tuple[Optional[str], str, Optional[str], str]
+
+
+def cache_key(batch: TranslationBatch, text: str) -> CacheKey:
+    """Build the cache key for one text of a batch."""
+    return (batch.source_lang, batch.target_lang, batch.context, text)
+
+
+class TranslationCache:
+    """Thread-safe store of translations shared across batches, files and jobs.
+
+    Besides finished translations it tracks texts that are currently being
+    translated, so a text that appears in two concurrent batches is only sent once:
+    the second batch waits for the first one's result.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._done: dict[CacheKey, str] = {}
+        self._in_flight: dict[CacheKey, Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        """Return a finished translation, or None."""
+        with self._lock:
+            translation = self._done.get(key)
+            if translation is not None:
+                self.hits += 1
+        CACHE_LOOKUPS.inc(cache="translation", result="miss" if translation is None else "hit")
+        return translation
+
+    def claim(
+        self, keys: list[CacheKey]
+    ) -> tuple[dict[CacheKey, str], dict[CacheKey, Future], list[CacheKey]]:
+        """Split keys into finished, in flight elsewhere, and newly claimed by the caller.
+
+        The caller must call ``fulfil`` or ``fail`` for every claimed key.
+        """
+        done: dict[CacheKey, str] = {}
+        waiting: dict[CacheKey, Future] = {}
+        claimed: list[CacheKey] = []
+        with self._lock:
+            for key in keys:
+                if key in done or key in waiting or key in claimed:
+                    continue
+                if key in self._done:
+                    done[key] = self._done[key]
+                    self.hits += 1
+                elif key in self._in_flight:
+                    waiting[key] = self._in_flight[key]
+                    self.hits += 1
+                else:
+                    self._in_flight[key] = Future()
+                    claimed.append(key)
+                    self.misses += 1
+        for result, found in (("hit", done), ("coalesced", waiting), ("miss", claimed)):
+            if found:
+                CACHE_LOOKUPS.inc(len(found), cache="translation", result=result)
+        return done, waiting, claimed
+
+    def fulfil(self, key: CacheKey, translation: str) -> None:
+        """Store a translation and wake up batches waiting for it."""
+        with self._lock:
+            self._done[key] = translation
+            future = self._in_flight.pop(key, None)
+        if future is not None:
+            future.set_result(translation)
+
+    def fail(self, key: CacheKey, error: BaseException) -> None:
+        """Release a claimed key after a failed request."""
+        with self._lock:
+            future = self._in_flight.pop(key, None)
+        if future is not None:
+            future.set_exception(error)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._done)
+
+
+class CachingTranslator:
+    """Translator wrapper that deduplicates texts through a shared TranslationCache.
+
+    Only texts that are neither cached nor already being translated by another
+    batch are sent to the wrapped translator.
+    """
+
+    def __init__(self, translator: BatchTranslator, cache: TranslationCache) -> None:
+        self.translator = translator
+        self.cache = cache
+
+    @property
+    def config(self) -> Config:
+        return self.translator.config
+
+    def translate_batch(self, batch: TranslationBatch) -> list[str]:
+        """Translate a batch, sending each unique uncached text at most once."""
+        keys = [cache_key(batch, cell.value) for cell in batch.cells]
+        done, waiting, claimed = self.cache.claim(keys)
+        batch.usage.cached += len(keys) - len(claimed)
+        self._translate_claimed(batch, claimed, done)
+
+        # Texts claimed by other batches: wait for their results. If another batch
+        # failed, its error is its own: claim the text again and send it from here.
+        while waiting:
+            failed = [key for key, future in waiting.items() if future.exception() is not None]
+            done.update(
+                (key, future.result()) for key, future in waiting.items() if key not in failed
+            )
+            if not failed:
+                break
+            more_done, waiting, claimed = self.cache.claim(failed)
+            done.update(more_done)
+            batch.usage.cached -= len(claimed)
+            self._translate_claimed(batch, claimed, done)
+
+        return [done[key] for key in keys]
+
+    def _translate_claimed(
+        self, batch: TranslationBatch, claimed: list[CacheKey], done: dict[CacheKey, str]
+    ) -> None:
+        """Send the claimed texts of a batch and store their translations in ``done``."""
+        if not claimed:
+            return
+        try:
+            translations = self.translator.translate_batch(
+                TranslationBatch(
+                    cells=_first_cells(batch, claimed),
+                    source_lang=batch.source_lang,
+                    target_lang=batch.target_lang,
+                    context=batch.context,
+                    usage=batch.usage,
+                )
+            )
+            if len(translations) != len(claimed):
+                raise TranslationError(
+                    f"Expected {len(claimed)} translations, got {len(translations)}"
+                )
+        except BaseException as e:
+            for key in claimed:
+                self.cache.fail(key, e)
+            raise
+        for key, translation in zip(claimed, translations):
+            self.cache.fulfil(key, translation)
+            done[key] = translation
+
+
+def _first_cells(batch: TranslationBatch, claimed: list[CacheKey]) -> list[Cell]:
+    """Return the first cell of the batch for each claimed key, in claim order."""
+    by_text: dict[str, Cell] = {}
+    for cell in batch.cells:
+        by_text.setdefault(cell.value, cell)
+    return [by_text[key[3]] for key in claimed]
@@ -0,0 +1,232 @@
+"""Offline estimate of the requests, tokens and time a translation will take."""
+
+import heapq
+import math
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from rosetta.models import Cell, TranslationBatch
+from rosetta.services.extractor import ExcelExtractor
+from rosetta.services.incremental import PreviousTranslations
+from rosetta.services.inspector import WorkbookInspection, inspect_workbook
+from rosetta.services.translator import MAX_TOKENS, Translator
+
+# Rough tokenizer model: Latin-script text averages ~4 characters per token, while
+# CJK and similar scripts are closer to one token per character.
+CHARS_PER_TOKEN = 4.0
+WIDE_CHAR_START = 0x2E80
+
+# Translations are usually somewhat longer than their source text
+OUTPUT_EXPANSION = 1.3
+# Tokens for the "N. " prefix and newline of each numbered translation
+NUMBERING_TOKENS = 3
+
+# Latency model of one request: fixed overhead plus output generation time
+REQUEST_OVERHEAD_SECONDS = 2.0
+OUTPUT_TOKENS_PER_SECOND = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of tokens in a text without calling the API."""
+    wide = sum(1 for char in text if ord(char) >= WIDE_CHAR_START)
+    return wide + math.ceil((len(text) - wide) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class TranslationEstimate:
+    """Projected size and duration of translating a workbook."""
+
+    cell_count: int
+    rich_text_cells: int
+    dropdown_count: int
+    item_count: int  # cells, rich text runs and dropdown values
+    unique_count: int  # items left after removing duplicate text
+    reused_count: int  # items covered by a previous translation
+    batch_count: int  # = API requests
+    input_tokens: int
+    output_tokens: int
+    truncation_risk_batches: int  # batches whose output may exceed MAX_TOKENS
+    concurrency: int
+    request_seconds: float  # sum of all request durations
+    wall_seconds: float  # projected duration at the given concurrency
+    planning_seconds: float  # time this estimate took
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def estimate_file(
+    input_file: Path,
+    target_lang: str,
+    source_lang: Optional[str] = None,
+    context: Optional[str] = None,
+    sheets: Optional[set[str]] = None,
+    batch_size: int = 50,
+    concurrency: int = 4,
+    previous_source: Optional[Path] = None,
+    previous_output: Optional[Path] = None,
+    inspection: Optional[WorkbookInspection] = None,
+) -> TranslationEstimate:
+    """Estimate a translation by running inspection, dedup and batch planning locally.
+
+    No API calls are made. Token counts use a character-based approximation and the
+    duration assumes a fixed per-request overhead plus a constant output speed, so
+    the result is a projection, not a quote.
+
+    Args:
+        input_file: Path to input Excel file
+        target_lang: Target language for translation
+        source_lang: Source language (auto-detected if None)
+        context: Additional context for translations
+        sheets: Set of sheet names to translate (all if None)
+        batch_size: Number of cells per API batch
+        concurrency: Number of batches translated in parallel
+        previous_source: Earlier version of the input that was already translated
+        previous_output: Translated output of previous_source
+        inspection: Result of ``inspect_workbook`` for the same file and sheets,
+                    inspected here if None
+
+    Returns:
+        TranslationEstimate
+    """
+    started = time.perf_counter()
+
+    if (previous_source is None) != (previous_output is None):
+        raise ValueError("previous_source and previous_output must be given together")
+    previous = None
+    if previous_source is not None and previous_output is not None:
+        previous = PreviousTranslations.load(previous_source, previous_output, sheets)
+
+    stats = {"cells": 0, "rich_text_cells": 0, "dropdowns": 0}
+    if previous is not None:
+        # Matching previous translations needs cell positions, which only extraction has
+        items = _work_items(input_file, sheets, stats)
+    else:
+        items = _inspected_items(inspection or inspect_workbook(input_file, sheets), stats)
+    item_count = 0
+    reused_count = 0
+    seen: set[str] = set()
+    unique: list[Cell] = []
+    for item in items:
+        item_count += 1
+        if previous is not None and previous.lookup(item) is not None:
+            reused_count += 1
+        elif item.value not in seen:
+            # Repeated text is served by the translation cache
+            seen.add(item.value)
+            unique.append(item)
+
+    batches = [
+        TranslationBatch(
+            cells=unique[i : i + batch_size],
+            source_lang=source_lang,
+            target_lang=target_lang,
+            context=context,
+        )
+        for i in range(0, len(unique), batch_size)
+    ]
+
+    input_tokens = 0
+    output_tokens = 0
+    truncation_risk = 0
+    durations = []
+    for batch in batches:
+        input_tokens += estimate_tokens(Translator._build_prompt(batch))
+        batch_output = sum(
+            math.ceil(estimate_tokens(text) * OUTPUT_EXPANSION) + NUMBERING_TOKENS
+            for text in batch.texts
+        )
+        output_tokens += batch_output
+        if batch_output > MAX_TOKENS:
+            truncation_risk += 1
+        durations.append(REQUEST_OVERHEAD_SECONDS + batch_output / OUTPUT_TOKENS_PER_SECOND)
+
+    concurrency = max(1, concurrency)
+    return TranslationEstimate(
+        cell_count=stats["cells"],
+        rich_text_cells=stats["rich_text_cells"],
+        dropdown_count=stats["dropdowns"],
+        item_count=item_count,
+        unique_count=len(unique),
+        reused_count=reused_count,
+        batch_count=len(batches),
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        truncation_risk_batches=truncation_risk,
+        concurrency=concurrency,
+        request_seconds=round(sum(durations), 1),
+        wall_seconds=round(_schedule(durations, concurrency), 1),
+        planning_seconds=round(time.perf_counter() - started, 3),
+    )
+
+
+def _work_items(input_file: Path, sheets: Optional[set[str]], stats: dict) -> Iterator[Cell]:
+    """Yield the same items translate_file sends: cells, rich text runs, dropdown values."""
+    from rosetta.main import RichTextLookup, _extract_dropdown_validations, _is_number
+
+    lookup = RichTextLookup(input_file, with_indices=False)
+    with ExcelExtractor(input_file, sheets=sheets) as extractor:
+        for cell in extractor.extract_cells():
+            lookup.enrich(cell)
+            stats["cells"] += 1
+            yield cell
+            if cell.rich_text_runs:
+                stats["rich_text_cells"] += 1
+                for run in cell.rich_text_runs:
+                    if run.text.strip():
+                        yield Cell(
+                            sheet=cell.sheet,
+                            row=cell.row,
+                            col=cell.col,
+                            value=run.text.strip(),
+                            original_value=run.text,
+                        )
+
+    if not stats["cells"]:
+        return
+
+    dropdowns = _extract_dropdown_validations(input_file, sheets)
+    stats["dropdowns"] = len(dropdowns)
+    for dropdown in dropdowns:
+        for value in dropdown.values:
+            if value and not _is_number(value):
+                yield Cell(sheet="", row=0, col=0, value=value, original_value=value)
+
+
+def _inspected_items(inspection: WorkbookInspection, stats: dict) -> Iterator[Cell]:
+    """Yield the texts of the items _work_items would, from an inspection of the workbook."""
+    from rosetta.main import _is_number
+
+    stats["cells"] = inspection.cell_count
+    stats["rich_text_cells"] = len(inspection.rich_text_cells)
+    for position, text in enumerate(inspection.texts):
+        yield Cell(sheet="", row=0, col=0, value=text, original_value=text)
+        index = inspection.rich_text_cells.get(position)
+        if index is not None:
+            for run in inspection.rich_text_map[index]:
+                if run.text.strip():
+                    yield Cell(
+                        sheet="", row=0, col=0, value=run.text.strip(), original_value=run.text
+                    )
+
+    if not inspection.cell_count:
+        return
+
+    stats["dropdowns"] = len(inspection.dropdowns)
+    for dropdown in inspection.dropdowns:
+        for value in dropdown.values:
+            if value and not _is_number(value):
+                yield Cell(sheet="", row=0, col=0, value=value, original_value=value)
+
+
+def _schedule(durations: list[float], concurrency: int) -> float:
+    """Return the makespan of running requests in order on ``concurrency`` workers."""
+    workers = [0.0] * min(concurrency, len(durations))
+    if not workers:
+        return 0.0
+    heapq.heapify(workers)
+    for duration in durations:
+        heapq.heappush(workers, heapq.heappop(workers) + duration)
+    return max(workers)
@@ -1,13 +1,14 @@
 """Excel file extraction service."""
 
 from pathlib import Path
-from typing import Iterator, Optional
-
-from openpyxl import load_workbook
-from openpyxl.cell.cell import Cell as OpenpyxlCell
+from typing import TYPE_CHECKING, Iterator, Optional
 
 from rosetta.core.exceptions import ExcelError
 from rosetta.models import Cell
+from rosetta.services.metrics import PARSE_FAILURES, timed_iter
+
+if TYPE_CHECKING:
+    from openpyxl.cell.cell import Cell as OpenpyxlCell
 
 
 class ExcelExtractor:
@@ -23,9 +24,14 @@ class ExcelExtractor:
         """
         self.file_path = file_path
         self.sheets_filter = sheets
+        from openpyxl import load_workbook
+
         try:
-            self.workbook = load_workbook(file_path)
+            # Read-only mode streams rows from the sheet XML, so the first cells are
+            # available immediately instead of after the whole workbook is loaded
+            self.workbook = load_workbook(file_path, read_only=True)
         except Exception as e:
+            PARSE_FAILURES.inc(kind="workbook")
             raise ExcelError(f"Failed to load Excel file: {e}") from e
 
     @property
@@ -41,7 +47,12 @@ class ExcelExtractor:
         - Are not formulas
         - Are not empty
         - Are in the selected sheets (if filter is specified)
+
+        The time spent reading cells is recorded as the "extract" stage.
         """
+        return timed_iter("extract", self._iter_cells())
+
+    def _iter_cells(self) -> Iterator[Cell]:
         for sheet_name in self.workbook.sheetnames:
             # Skip sheets not in the filter (if filter is specified)
             # Use stripped comparison to handle whitespace differences
@@ -68,7 +79,7 @@ class ExcelExtractor:
                 return True
         return False
 
-    def _is_translatable(self, cell: OpenpyxlCell) -> bool:
+    def _is_translatable(self, cell: "OpenpyxlCell") -> bool:
         """Check if a cell contains translatable content."""
         # Skip empty cells
         if cell.value is None:
@@ -88,7 +99,7 @@ class ExcelExtractor:
 
         return True
 
-    def _to_cell_model(self, openpyxl_cell: OpenpyxlCell, sheet_name: str) -> Cell:
+    def _to_cell_model(self, openpyxl_cell: "OpenpyxlCell", sheet_name: str) -> Cell:
         """Convert openpyxl cell to our Cell model."""
         return Cell(
             sheet=sheet_name,
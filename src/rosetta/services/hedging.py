@@ -0,0 +1,145 @@
+"""Hedged requests: send a slow request a second time and use the first answer.
+
+With several batches in flight, a translation lasts as long as its slowest
+batch, and now and then one request takes many times the usual latency (a busy
+replica, a stalled connection). ``Hedger`` sends a second copy of a request that
+is still running after a percentile of the recent latencies, and returns
+whichever copy answers first. The number of hedges is capped at a share of all
+requests, so a general slowdown cannot double the spend.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional, TypeVar
+
+from rosetta.services.metrics import HEDGES
+
+T = TypeVar("T")
+
+# Successful requests measured before any request is hedged
+MIN_SAMPLES = 20
+# Recent latencies the percentile is taken from
+_WINDOW = 200
+# Hedges that may be saved up while requests are fast, and spent in a burst
+_MAX_CREDITS = 5.0
+
+
+class Hedger:
+    """Runs requests on a thread pool and hedges the slow ones.
+
+    Each request earns ``budget`` credits and each hedge costs one. The
+    synchronous SDK cannot abort a request in flight: a copy that has not started
+    yet is cancelled, otherwise it is left to finish in the background and its
+    result is handed to ``on_discarded`` (e.g. to count its tokens). Until
+    ``min_samples`` requests have succeeded, requests run on the caller's thread
+    and nothing is hedged.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget: float = 0.05,
+        min_samples: int = MIN_SAMPLES,
+        max_workers: int = 32,
+    ) -> None:
+        """Initialize the hedger.
+
+        Args:
+            percentile: Hedge a request still running after this percentile of the
+                        latencies of recent successful requests
+            budget: Hedges allowed per request (0.05: at most 5% more requests)
+            min_samples: Successful requests measured before hedging starts
+            max_workers: Threads running requests and their hedges
+
+        Raises:
+            ValueError: If the percentile is not between 0 and 100
+        """
+        if not 0 < percentile < 100:
+            raise ValueError(f"Hedging percentile must be between 0 and 100, got {percentile}")
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self._latencies: deque[float] = deque(maxlen=_WINDOW)
+        self._credits = 0.0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rosetta-hedge")
+
+    def delay(self) -> Optional[float]:
+        """Seconds after which a request is hedged, or None while there are too few samples."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[max(0, math.ceil(self.percentile / 100 * len(ordered)) - 1)]
+
+    def call(
+        self, request: Callable[[], T], on_discarded: Optional[Callable[[T], None]] = None
+    ) -> T:
+        """Run ``request``, sending it again if it is slow; return the first answer.
+
+        Args:
+            request: Sends the request and returns its response; must be safe to
+                     call twice at the same time
+            on_discarded: Called with the response of the copy that lost
+
+        Raises:
+            The primary request's exception if no copy succeeded
+        """
+        delay = self.delay()
+        with self._lock:
+            self._credits = min(_MAX_CREDITS, self._credits + self.budget)
+        if delay is None:
+            return self._timed(request)
+
+        primary = self._pool.submit(self._timed, request)
+        if wait([primary], timeout=delay).done:
+            return primary.result()
+        with self._lock:
+            allowed = self._credits >= 1
+            if allowed:
+                self._credits -= 1
+        if not allowed:
+            HEDGES.inc(result="over_budget")
+            return primary.result()
+
+        hedge = self._pool.submit(self._timed, request)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # If both finished together, prefer the primary
+            for future in (primary, hedge):
+                if future in done and future.exception() is None:
+                    HEDGES.inc(result="primary" if future is primary else "hedge")
+                    other = hedge if future is primary else primary
+                    _discard(other, on_discarded)
+                    return future.result()
+        HEDGES.inc(result="failed")
+        return primary.result()
+
+    def close(self) -> None:
+        """Stop the thread pool, without waiting for discarded requests."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _timed(self, request: Callable[[], T]) -> T:
+        """Run the request, recording its latency if it succeeds."""
+        started = time.perf_counter()
+        result = request()
+        seconds = time.perf_counter() - started
+        with self._lock:
+            self._latencies.append(seconds)
+        return result
+
+
+def _discard(future: Future, on_discarded: Optional[Callable]) -> None:
+    """Cancel a losing copy if it has not started, or pass its result on once it arrives."""
+    if future.cancel() or on_discarded is None:
+        return
+
+    def done(future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            on_discarded(future.result())
+
+    future.add_done_callback(done)
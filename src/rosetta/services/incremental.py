@@ -0,0 +1,162 @@
+"""Reuse translations from a previous source/output pair for incremental re-translation."""
+
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+from rosetta.core.exceptions import ExcelError
+from rosetta.models import Cell
+from rosetta.services.extractor import ExcelExtractor
+from rosetta.services.inspector import SPREADSHEET_NS
+
+
+def _read_shared_string_texts(zf: zipfile.ZipFile) -> list[tuple[str, list[str]]]:
+    """Return (full text, run texts) for every shared string item, in table order."""
+    from xml.etree import ElementTree as ET
+
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+
+    items = []
+    root = ET.fromstring(zf.read("xl/sharedStrings.xml"))
+    for si in root.findall(f"{{{SPREADSHEET_NS}}}si"):
+        runs = [t.text or "" for t in si.findall(f"{{{SPREADSHEET_NS}}}r/{{{SPREADSHEET_NS}}}t")]
+        if runs:
+            items.append(("".join(runs), runs))
+        else:
+            t = si.find(f"{{{SPREADSHEET_NS}}}t")
+            items.append(((t.text or "") if t is not None else "", []))
+    return items
+
+
+class PreviousTranslations:
+    """Translations recovered from an earlier run on a previous version of a workbook.
+
+    The translated output written by Rosetta keeps the original package layout, so
+    the previous source and output can be aligned:
+
+    - by sheet and cell reference: a cell whose text is unchanged since the previous
+      source reuses the text found at the same place in the previous output;
+    - by shared string index: the previous output's shared strings table has the
+      same order as the source's, giving a content -> translation mapping (also per
+      rich text run) that still applies when unchanged text moved to another cell;
+    - by dropdown range, for inline dropdown values.
+
+    The previous run may have translated only some sheets, so text is only reused
+    from the sheets it processed (those with a cell whose text changed), or where
+    the output differs from the source.
+
+    Only cells whose text is new or changed need to be sent to the API.
+    """
+
+    def __init__(self) -> None:
+        # (sheet, cell ref) -> (previous source text, previous translation)
+        self.by_cell: dict[tuple[str, str], tuple[str, str]] = {}
+        # source text -> previous translation
+        self.by_text: dict[str, str] = {}
+
+    @classmethod
+    def load(
+        cls,
+        previous_source: Path,
+        previous_output: Path,
+        sheets: Optional[set[str]] = None,
+    ) -> "PreviousTranslations":
+        """Align a previous source workbook with its translated output.
+
+        Args:
+            previous_source: The workbook that was translated last time
+            previous_output: The translated output produced from it
+            sheets: Optional set of sheet names to align (all if None)
+
+        Raises:
+            ExcelError: If either workbook cannot be read
+        """
+        previous = cls()
+        try:
+            processed = previous._align_cells(previous_source, previous_output, sheets)
+            previous._align_shared_strings(previous_source, previous_output)
+            previous._align_dropdowns(previous_source, previous_output, sheets, processed)
+        except ExcelError:
+            raise
+        except Exception as e:
+            raise ExcelError(f"Failed to read previous translation: {e}") from e
+        return previous
+
+    def _align_shared_strings(self, previous_source: Path, previous_output: Path) -> None:
+        with zipfile.ZipFile(previous_source, "r") as zf:
+            source_items = _read_shared_string_texts(zf)
+        with zipfile.ZipFile(previous_output, "r") as zf:
+            output_items = _read_shared_string_texts(zf)
+
+        # A different table size means the output was not produced from this source
+        if len(source_items) != len(output_items):
+            return
+
+        # Text of the processed sheets, translated even where the output is the same
+        processed_texts = {source for source, _ in self.by_cell.values()}
+        for (source_text, source_runs), (output_text, output_runs) in zip(
+            source_items, output_items
+        ):
+            if not source_text.strip():
+                continue
+            translated = source_text in processed_texts
+            if translated or output_text != source_text:
+                self.by_text.setdefault(source_text, output_text)
+            # Runs are translated stripped, one per formatted segment
+            if source_runs and len(source_runs) == len(output_runs):
+                for source_run, output_run in zip(source_runs, output_runs):
+                    if source_run.strip() and (translated or output_run != source_run):
+                        self.by_text.setdefault(source_run.strip(), output_run.strip())
+
+    def _align_cells(
+        self, previous_source: Path, previous_output: Path, sheets: Optional[set[str]]
+    ) -> set[str]:
+        """Align the cells of the sheets the previous run processed; return those sheets."""
+        with ExcelExtractor(previous_source, sheets=sheets) as extractor:
+            source_cells = {(c.sheet, c.coordinate): c.value for c in extractor.extract_cells()}
+        aligned: dict[tuple[str, str], tuple[str, str]] = {}
+        with ExcelExtractor(previous_output, sheets=sheets) as extractor:
+            for cell in extractor.extract_cells():
+                key = (cell.sheet, cell.coordinate)
+                if key in source_cells:
+                    aligned[key] = (source_cells[key], cell.value)
+
+        # Sheets outside the previous run's --sheets filter kept their source text
+        processed = {key[0] for key, (source, output) in aligned.items() if source != output}
+        for key, pair in aligned.items():
+            if key[0] in processed:
+                self.by_cell[key] = pair
+        return processed
+
+    def _align_dropdowns(
+        self,
+        previous_source: Path,
+        previous_output: Path,
+        sheets: Optional[set[str]],
+        processed: set[str],
+    ) -> None:
+        from rosetta.main import _extract_dropdown_validations
+
+        output_dropdowns = {
+            (d.sheet, d.cell_range): d.values
+            for d in _extract_dropdown_validations(previous_output, sheets)
+        }
+        for dropdown in _extract_dropdown_validations(previous_source, sheets):
+            output_values = output_dropdowns.get((dropdown.sheet, dropdown.cell_range))
+            if output_values and len(output_values) == len(dropdown.values):
+                for source_value, output_value in zip(dropdown.values, output_values):
+                    if source_value and (
+                        dropdown.sheet in processed or output_value != source_value
+                    ):
+                        self.by_text.setdefault(source_value, output_value)
+
+    def lookup(self, cell: Cell) -> Optional[str]:
+        """Return the previous translation for a cell's text, or None if it changed."""
+        previous = self.by_cell.get((cell.sheet, cell.coordinate))
+        if previous is not None and previous[0] == cell.value:
+            return previous[1]
+        return self.by_text.get(cell.value)
+
+    def __len__(self) -> int:
+        return len(self.by_cell) + len(self.by_text)
@@ -0,0 +1,344 @@
+"""Fast workbook inspection straight from the xlsx package, without openpyxl.
+
+Validating an upload only needs the sheet names and the number of translatable
+cells. Both are read from the package's XML parts with a streaming parser, which
+takes milliseconds where loading the workbook with openpyxl takes seconds.
+"""
+
+import zipfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Optional
+
+from rosetta.core.exceptions import ExcelError
+from rosetta.models import DropdownValidation, RichTextRun
+from rosetta.services.metrics import PARSE_FAILURES, STAGE_SECONDS
+
+if TYPE_CHECKING:
+    from xml.etree import ElementTree as ET
+
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+@dataclass
+class WorkbookInspection:
+    """The translatable content of a workbook, for one selection of sheets.
+
+    ``translate_file`` and ``estimate_file`` accept an inspection of their input so
+    the shared strings, sheet paths and dropdowns are not read again. The rich text
+    runs and dropdowns receive their translations in place, so an inspection serves
+    a single translation.
+    """
+
+    sheets: list[str]  # All sheet names, in workbook order
+    sheet_paths: dict[str, str]  # Sheet name -> XML part path
+    texts: list[str]  # Translatable cell values of the selected sheets, in extraction order
+    rich_text_map: dict[int, list[RichTextRun]]  # Shared string index -> runs (rich text only)
+    rich_text_cells: dict[int, int]  # Position in texts -> shared string index, for rich text
+    dropdowns: list[DropdownValidation]
+
+    @property
+    def cell_count(self) -> int:
+        return len(self.texts)
+
+
+def read_sheet_names(input_file: Path) -> list[str]:
+    """Return the sheet names of a workbook, reading only ``xl/workbook.xml``.
+
+    Raises:
+        ExcelError: If the file is not a readable xlsx package
+    """
+    try:
+        with zipfile.ZipFile(input_file, "r") as zf:
+            return _read_sheet_names(zf)
+    except Exception as e:
+        PARSE_FAILURES.inc(kind="workbook")
+        raise ExcelError(f"Failed to load Excel file: {e}") from e
+
+
+def inspect_workbook(input_file: Path, sheets: Optional[set[str]] = None) -> WorkbookInspection:
+    """Find the translatable cells, rich text and dropdowns of a workbook.
+
+    Cells are selected with the same rules as ``ExcelExtractor``: text values that
+    are not empty, whitespace or formulas, in the sheets matching ``sheets``.
+
+    Args:
+        input_file: Path to the Excel file
+        sheets: Optional set of sheet names to inspect (all if None)
+
+    Raises:
+        ExcelError: If the file is not a readable xlsx package
+    """
+    from rosetta.main import _read_sheet_paths
+
+    try:
+        with STAGE_SECONDS.time(stage="inspect"), zipfile.ZipFile(input_file, "r") as zf:
+            names = _read_sheet_names(zf)
+            sheet_paths = _read_sheet_paths(zf)
+            strings, rich_text_map = _read_shared_strings(zf)
+
+            texts: list[str] = []
+            rich_text_cells: dict[int, int] = {}
+            dropdowns: list[DropdownValidation] = []
+            for name in names:
+                path = sheet_paths.get(name)
+                # Cells use the extractor's stripped name comparison, dropdowns an exact one
+                with_cells = _sheet_selected(name, sheets)
+                with_dropdowns = not sheets or name in sheets
+                if path is None or path not in zf.namelist():
+                    continue
+                if not (with_cells or with_dropdowns):
+                    continue
+                cells, sheet_dropdowns = _scan_sheet(zf, path, name, strings)
+                if with_cells:
+                    for value, index in cells:
+                        if index is not None and index in rich_text_map:
+                            rich_text_cells[len(texts)] = index
+                        texts.append(value)
+                if with_dropdowns:
+                    dropdowns.extend(sheet_dropdowns)
+    except Exception as e:
+        PARSE_FAILURES.inc(kind="workbook")
+        raise ExcelError(f"Failed to load Excel file: {e}") from e
+
+    return WorkbookInspection(
+        sheets=names,
+        sheet_paths=sheet_paths,
+        texts=texts,
+        rich_text_map=rich_text_map,
+        rich_text_cells=rich_text_cells,
+        dropdowns=dropdowns,
+    )
+
+
+def _read_sheet_names(zf: zipfile.ZipFile) -> list[str]:
+    from xml.etree import ElementTree as ET
+
+    ns = SPREADSHEET_NS
+
+    sheet_tag, sheets_tag = f"{{{ns}}}sheet", f"{{{ns}}}sheets"
+    names = []
+    with zf.open("xl/workbook.xml") as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == sheet_tag:
+                names.append(elem.get("name", ""))
+            elif elem.tag == sheets_tag:
+                # Defined names, calculation settings etc. follow: not needed
+                break
+    return names
+
+
+def _read_shared_strings(
+    zf: zipfile.ZipFile,
+) -> tuple[list[str], dict[int, list[RichTextRun]]]:
+    """Return the text of every shared string, and the runs of rich text ones."""
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return [], {}
+    reader = _SharedStringsReader()
+    with zf.open("xl/sharedStrings.xml") as f:
+        _parse(f, reader)
+    return reader.strings, reader.rich_text_map
+
+
+def _scan_sheet(
+    zf: zipfile.ZipFile, path: str, sheet_name: str, strings: list[str]
+) -> tuple[list[tuple[str, Optional[int]]], list[DropdownValidation]]:
+    """Return a sheet's translatable cells (value, shared string index) and inline dropdowns."""
+    scanner = _SheetScanner(sheet_name, strings)
+    with zf.open(path) as f:
+        _parse(f, scanner)
+    return scanner.cells, scanner.dropdowns
+
+
+def _parse(source: IO[bytes], handler: "_Handler") -> None:
+    """Stream an XML part through expat, calling the handler's callbacks.
+
+    Unlike ElementTree, no element objects are built for the (many) cells, which
+    makes this several times faster on large sheets.
+    """
+    from xml.parsers import expat
+
+    parser = expat.ParserCreate(namespace_separator=" ")
+    parser.buffer_text = True
+    parser.StartElementHandler = handler.start
+    parser.EndElementHandler = handler.end
+    parser.CharacterDataHandler = handler.data
+    parser.ParseFile(source)
+
+
+def _tag(local: str) -> str:
+    """Name of a spreadsheetml element as expat reports it."""
+    return f"{SPREADSHEET_NS} {local}"
+
+
+class _Handler(ABC):
+    """Base of the expat handlers: collects character data while ``_text`` is a list."""
+
+    def __init__(self) -> None:
+        self._text: Optional[list[str]] = None
+
+    def data(self, text: str) -> None:
+        if self._text is not None:
+            self._text.append(text)
+
+    def _collect(self) -> None:
+        self._text = []
+
+    def _collected(self) -> str:
+        text = "".join(self._text or ())
+        self._text = None
+        return text
+
+    @abstractmethod
+    def start(self, name: str, attrs: dict[str, str]) -> None:
+        """Handle a start tag (expat's StartElementHandler)."""
+
+    @abstractmethod
+    def end(self, name: str) -> None:
+        """Handle an end tag (expat's EndElementHandler)."""
+
+
+class _SharedStringsReader(_Handler):
+    """Reads the shared strings table the way openpyxl and RichTextLookup do."""
+
+    SI, R, RPH, T = _tag("si"), _tag("r"), _tag("rPh"), _tag("t")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.strings: list[str] = []
+        self.rich_text_map: dict[int, list[RichTextRun]] = {}
+        self._parts: list[str] = []
+        self._runs: list[RichTextRun] = []
+        self._run_text: Optional[str] = None
+        self._in_run = False
+        self._in_phonetic = False
+
+    def start(self, name: str, attrs: dict[str, str]) -> None:
+        if name == self.T and not self._in_phonetic:
+            self._collect()
+        elif name == self.R:
+            self._in_run, self._run_text = True, None
+        elif name == self.RPH:
+            self._in_phonetic = True
+        elif name == self.SI:
+            self._parts, self._runs = [], []
+
+    def end(self, name: str) -> None:
+        if name == self.T and self._text is not None:
+            text = self._collected()
+            self._parts.append(text)
+            if self._in_run and self._run_text is None:
+                self._run_text = text
+        elif name == self.R:
+            self._runs.append(RichTextRun(text=self._run_text or ""))
+            self._in_run = False
+        elif name == self.RPH:
+            self._in_phonetic = False
+        elif name == self.SI:
+            if self._runs:
+                self.rich_text_map[len(self.strings)] = self._runs
+            # openpyxl removes this escape from shared strings only
+            self.strings.append("".join(self._parts).replace("x005F_", ""))
+
+
+class _SheetScanner(_Handler):
+    """Collects a sheet's translatable cells and inline dropdowns.
+
+    Cells follow ExcelExtractor's rules as openpyxl reads them: formulas are never
+    translated; numbers, booleans and dates have no text; shared, inline and
+    formula-less "str" strings are text, and so are errors ("#N/A").
+    """
+
+    C, F, V, IS, RPH, T = _tag("c"), _tag("f"), _tag("v"), _tag("is"), _tag("rPh"), _tag("t")
+    DATA_VALIDATION, FORMULA1 = _tag("dataValidation"), _tag("formula1")
+    TEXT_KINDS = ("s", "inlineStr", "str", "e")
+
+    def __init__(self, sheet_name: str, strings: list[str]) -> None:
+        super().__init__()
+        self.sheet_name = sheet_name
+        self.strings = strings
+        self.cells: list[tuple[str, Optional[int]]] = []
+        self.dropdowns: list[DropdownValidation] = []
+        self._kind: Optional[str] = None  # "t" of the current cell, if it may hold text
+        self._formula = False
+        self._value: Optional[str] = None
+        self._inline: list[str] = []
+        self._in_inline = False
+        self._in_phonetic = False
+        self._validation: Optional["ET.Element"] = None  # dataValidation element being read
+
+    def start(self, name: str, attrs: dict[str, str]) -> None:
+        if name == self.C:
+            kind = attrs.get("t", "n")
+            self._kind = kind if kind in self.TEXT_KINDS else None
+            self._formula, self._value, self._inline = False, None, []
+        elif self._kind is not None:
+            if name == self.F:
+                self._formula = True
+            elif name == self.V and self._value is None and self._kind != "inlineStr":
+                self._collect()
+            elif name == self.IS:
+                self._in_inline = True
+            elif name == self.RPH:
+                self._in_phonetic = True
+            elif name == self.T and self._in_inline and not self._in_phonetic:
+                self._collect()
+        elif name == self.DATA_VALIDATION:
+            from xml.etree import ElementTree as ET
+
+            self._validation = ET.Element(f"{{{SPREADSHEET_NS}}}dataValidation", attrs)
+        elif name == self.FORMULA1 and self._validation is not None:
+            self._collect()
+
+    def end(self, name: str) -> None:
+        if name == self.C:
+            if self._kind is not None and not self._formula:
+                self._add_cell()
+            self._kind = None
+        elif self._kind is not None:
+            if name == self.V and self._text is not None:
+                self._value = self._collected()
+            elif name == self.T and self._text is not None:
+                self._inline.append(self._collected())
+            elif name == self.IS:
+                self._in_inline = False
+            elif name == self.RPH:
+                self._in_phonetic = False
+        elif name == self.FORMULA1 and self._validation is not None:
+            from xml.etree import ElementTree as ET
+
+            formula1 = ET.SubElement(self._validation, f"{{{SPREADSHEET_NS}}}formula1")
+            formula1.text = self._collected()
+        elif name == self.DATA_VALIDATION and self._validation is not None:
+            from rosetta.main import _parse_dropdown
+
+            dropdown = _parse_dropdown(self._validation, self.sheet_name)
+            if dropdown is not None:
+                self.dropdowns.append(dropdown)
+            self._validation = None
+
+    def _add_cell(self) -> None:
+        index = None
+        if self._kind == "s":
+            if not self._value:
+                return
+            index = int(self._value)
+            value: Optional[str] = self.strings[index]
+        elif self._kind == "inlineStr":
+            value = "".join(self._inline)
+        else:
+            value = self._value
+        if value is not None and _is_translatable(value):
+            self.cells.append((value, index))
+
+
+def _is_translatable(value: str) -> bool:
+    """Same rules as ExcelExtractor: non-blank text that is not a formula."""
+    return bool(value.strip()) and not value.startswith("=")
+
+
+def _sheet_selected(sheet_name: str, sheets: Optional[set[str]]) -> bool:
+    if sheets is None:
+        return True
+    return sheet_name.strip() in {name.strip() for name in sheets}
@@ -0,0 +1,148 @@
+"""Checkpoint journal for resuming interrupted translations."""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from rosetta.core.config import Config
+from rosetta.core.exceptions import TranslationError
+from rosetta.models import TranslationBatch
+from rosetta.services.translator import BatchTranslator
+
+JOURNAL_SUFFIX = ".rosetta-journal"
+
+
+def journal_path_for(output_file: Path) -> Path:
+    """Return the journal path used for an output file (stored next to it)."""
+    return output_file.with_name(output_file.name + JOURNAL_SUFFIX)
+
+
+def compute_job_key(input_file: Path, **params: object) -> str:
+    """Hash the input file contents together with the translation parameters.
+
+    A journal is only reused when both the file and the parameters
+    (languages, context, sheets, model) are identical.
+    """
+    digest = hashlib.sha256()
+    with open(input_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class TranslationJournal:
+    """Append-only JSON Lines log of completed batch translations.
+
+    The first line is a header holding the job key. Every following line records
+    one completed batch as parallel lists of source texts and translations, so a
+    resumed run can skip any text that was already translated.
+    """
+
+    def __init__(self, path: Path, job_key: str) -> None:
+        """Initialize the journal.
+
+        Args:
+            path: Location of the journal file
+            job_key: Key identifying the input file and translation parameters
+        """
+        self.path = path
+        self.job_key = job_key
+        self._lock = threading.Lock()
+
+    def open(self, resume: bool = False) -> dict[str, str]:
+        """Open the journal for writing.
+
+        Args:
+            resume: If True and an existing journal matches the job key, keep it
+                    and return its completed translations. Otherwise start fresh.
+
+        Returns:
+            Mapping of source text -> translation for already completed work
+        """
+        if resume and self.path.exists():
+            completed = self._load()
+            if completed is not None:
+                return completed
+
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"job_key": self.job_key}) + "\n")
+        return {}
+
+    def _load(self) -> Optional[dict[str, str]]:
+        """Load completed translations, or None if the journal is for another job."""
+        completed: dict[str, str] = {}
+        with open(self.path, encoding="utf-8") as f:
+            header = f.readline()
+            try:
+                if json.loads(header).get("job_key") != self.job_key:
+                    return None
+            except (ValueError, AttributeError):
+                return None
+
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Partially written last line from an interrupted run
+                    continue
+                completed.update(zip(entry["texts"], entry["translations"]))
+        return completed
+
+    def record(self, texts: list[str], translations: list[str]) -> None:
+        """Append one completed batch and flush it to disk."""
+        line = json.dumps({"texts": texts, "translations": translations}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def remove(self) -> None:
+        """Delete the journal (called once the output has been written)."""
+        self.path.unlink(missing_ok=True)
+
+
+class JournalingTranslator:
+    """Translator wrapper that skips journaled texts and records new batches.
+
+    Exposes the same ``translate_batch`` interface as ``Translator`` so it can be
+    passed to every batch loop unchanged.
+    """
+
+    def __init__(
+        self, translator: BatchTranslator, journal: TranslationJournal, completed: dict[str, str]
+    ) -> None:
+        self.translator = translator
+        self.journal = journal
+        self.completed = completed
+
+    @property
+    def config(self) -> Config:
+        return self.translator.config
+
+    def translate_batch(self, batch: TranslationBatch) -> list[str]:
+        """Translate a batch, only sending texts that are not journaled yet."""
+        pending = [cell for cell in batch.cells if cell.value not in self.completed]
+
+        if pending:
+            sub_batch = TranslationBatch(
+                cells=pending,
+                source_lang=batch.source_lang,
+                target_lang=batch.target_lang,
+                context=batch.context,
+                usage=batch.usage,
+            )
+            translations = self.translator.translate_batch(sub_batch)
+            if len(translations) != len(pending):
+                raise TranslationError(
+                    f"Expected {len(pending)} translations, got {len(translations)}"
+                )
+            texts = [cell.value for cell in pending]
+            self.journal.record(texts, translations)
+            self.completed.update(zip(texts, translations))
+
+        return [self.completed[cell.value] for cell in batch.cells]
@@ -0,0 +1,435 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+Metrics are module-level singletons updated from any thread; the API serves
+``REGISTRY.render()`` at ``/metrics``. Only what Rosetta needs is implemented:
+counters, gauges (set directly or read from a callback at scrape time) and
+histograms with fixed buckets, each with optional labels.
+"""
+
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# Default buckets for durations in seconds, from a fast parse to a slow request
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# An update of a metric: its name, the method called, the value and the labels
+MetricUpdate = tuple[str, str, float, dict[str, str]]
+
+# Updates made while Registry.recording() is active, or None
+_recorded: Optional[list[MetricUpdate]] = None
+
+
+def _record(name: str, method: str, value: float, labels: dict[str, str]) -> None:
+    recorded = _recorded
+    if recorded is not None:
+        recorded.append((name, method, value, labels))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A value that only goes up, such as tokens used or requests made."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        _record(self.name, "inc", amount, labels)
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(_Metric):
+    """A value that goes up and down, such as jobs in flight.
+
+    Unlabelled gauges can instead read their value from a callback when scraped.
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], float]] = None,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self.function = function
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+        _record(self.name, "set", value, labels)
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        _record(self.name, "inc", amount, labels)
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """Read the value from ``function`` at scrape time (None: stop doing so)."""
+        self.function = function
+
+    def value(self, **labels: str) -> float:
+        if self.function is not None:
+            return self.function()
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    @contextmanager
+    def track_in_progress(self, **labels: str) -> Iterator[None]:
+        """Count the block as in progress while it runs."""
+        self.inc(1, **labels)
+        try:
+            yield
+        finally:
+            self.dec(1, **labels)
+
+    def _samples(self) -> list[str]:
+        if self.function is not None:
+            try:
+                value = float(self.function())
+            except Exception:
+                # A failing callback must not break the whole scrape
+                return []
+            return [f"{self.name} {_format_value(value)}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (durations, sizes) over fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # labels -> (count per bucket, sum, count)
+        self._values: dict[tuple[str, ...], tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+        _record(self.name, "observe", value, labels)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the block, whether or not it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            return self._values.get(self._key(labels), ([], 0.0, 0))[2]
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = sorted((key, (list(c), s, n)) for key, (c, s, n) in self._values.items())
+        lines = []
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+_M = TypeVar("_M", bound=_Metric)
+
+
+class Registry:
+    """The set of metrics exposed together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], float]] = None,
+    ) -> Gauge:
+        return self._register(Gauge(name, help, labelnames, function))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def _register(self, metric: "_M") -> "_M":
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    @contextmanager
+    def recording(self) -> Iterator[list[MetricUpdate]]:
+        """Record the metric updates made in the block, to ``apply`` them elsewhere.
+
+        A pool process has its own copy of every metric, which ``/metrics`` never
+        shows: work offloaded to one records its updates and the parent applies
+        them. Meant for a process running one task at a time; recordings do not nest.
+        """
+        global _recorded
+        updates: list[MetricUpdate] = []
+        _recorded = updates
+        try:
+            yield updates
+        finally:
+            _recorded = None
+
+    def apply(self, updates: list[MetricUpdate]) -> None:
+        """Replay updates recorded in another process on this registry's metrics."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        for name, method, value, labels in updates:
+            metric = metrics.get(name)
+            if metric is not None:
+                getattr(metric, method)(value, **labels)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Workbook processing stages: extract, rich_text, dropdowns, write
+STAGE_SECONDS = REGISTRY.histogram(
+    "rosetta_stage_duration_seconds",
+    "Time spent in each workbook processing stage.",
+    ["stage"],
+)
+PARSE_FAILURES = REGISTRY.counter(
+    "rosetta_parse_failures_total",
+    "Workbooks that could not be read and API responses that could not be parsed.",
+    ["kind"],
+)
+
+# Translation requests
+BATCH_SECONDS = REGISTRY.histogram(
+    "rosetta_batch_duration_seconds",
+    "Duration of translation requests to the API.",
+    ["model", "outcome"],
+)
+BATCH_CELLS = REGISTRY.histogram(
+    "rosetta_batch_cells",
+    "Texts per translation request.",
+    buckets=(1, 5, 10, 25, 50, 100, 200, 500),
+)
+TOKENS = REGISTRY.counter(
+    "rosetta_tokens_total",
+    "Tokens used by translation requests.",
+    ["model", "direction"],
+)
+RETRIES = REGISTRY.counter(
+    "rosetta_api_retries_total",
+    "Requests to the API that were retries of a failed attempt.",
+)
+BATCH_SIZE = REGISTRY.gauge(
+    "rosetta_batch_size",
+    "Texts per request chosen by the adaptive batch size.",
+)
+BATCH_SIZE_CHANGES = REGISTRY.counter(
+    "rosetta_batch_size_changes_total",
+    "Changes of the adaptive batch size, by direction and reason.",
+    ["direction", "reason"],
+)
+CIRCUIT_STATE = REGISTRY.gauge(
+    "rosetta_circuit_state",
+    "State of each model's circuit breaker: 0 closed, 1 half-open (probing), 2 open.",
+    ["model"],
+)
+CIRCUIT_TRANSITIONS = REGISTRY.counter(
+    "rosetta_circuit_transitions_total",
+    "Circuit breaker state changes, by model and new state.",
+    ["model", "state"],
+)
+CIRCUIT_REJECTED = REGISTRY.counter(
+    "rosetta_circuit_rejected_total",
+    "Requests not sent to a model with an open circuit, by what was done instead "
+    "(fallback or failed).",
+    ["model", "action"],
+)
+HEDGES = REGISTRY.counter(
+    "rosetta_hedged_requests_total",
+    "Slow requests sent a second time, by which copy answered first (primary or "
+    "hedge, failed if neither succeeded); over_budget counts slow requests the "
+    "hedging budget did not allow.",
+    ["result"],
+)
+HEDGE_TOKENS = REGISTRY.counter(
+    "rosetta_hedge_discarded_tokens_total",
+    "Tokens of responses discarded because the other copy of a hedged request answered first.",
+    ["direction"],
+)
+
+# Caches: the per-text translation cache and the API's whole-file result cache.
+# Hit ratio: rate of result="hit" over the rate of all results of a cache.
+CACHE_LOOKUPS = REGISTRY.counter(
+    "rosetta_cache_lookups_total",
+    "Cache lookups by cache and result (hit, miss or coalesced).",
+    ["cache", "result"],
+)
+
+# Server-wide batching of texts from concurrent translations (BatchScheduler)
+SCHEDULER_TEXTS = REGISTRY.counter(
+    "rosetta_scheduler_texts_total",
+    "Texts submitted to the batch scheduler: queued, or coalesced with an identical "
+    "text in flight.",
+    ["result"],
+)
+SCHEDULER_FLUSHES = REGISTRY.counter(
+    "rosetta_scheduler_requests_total",
+    "Requests sent by the batch scheduler, by reason (full, window or split).",
+    ["reason"],
+)
+SCHEDULER_SOURCES = REGISTRY.histogram(
+    "rosetta_scheduler_request_sources",
+    "Translations whose texts share one scheduled request.",
+    buckets=(1, 2, 3, 5, 10, 20, 50),
+)
+
+
+def timed_stage(stage: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorate a function so its duration is observed as a processing stage."""
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            with STAGE_SECONDS.time(stage=stage):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_iter(stage: str, items: Iterator[T]) -> Iterator[T]:
+    """Yield from ``items``, observing only the time spent producing them.
+
+    Time the consumer spends between items (e.g. translating them) is excluded.
+    """
+    spent = 0.0
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                spent += time.perf_counter() - started
+                return
+            spent += time.perf_counter() - started
+            yield item
+    finally:
+        STAGE_SECONDS.observe(spent, stage=stage)
@@ -0,0 +1,292 @@
+"""Pipelined extract -> translate -> write execution with bounded queues."""
+
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional
+
+from rosetta.models import Cell, TranslationBatch
+from rosetta.services.batch_size import ERROR, OK, TRUNCATED, AdaptiveBatchSize
+from rosetta.services.translator import BatchTranslator, failure_kind
+
+# Sentinel put on the result queue by each translation worker when it exits
+_DONE = object()
+
+# How often blocked stages wake up to check whether the pipeline was aborted
+_POLL_INTERVAL = 0.1
+
+
+class TranslationPipeline:
+    """Runs extraction, translation and writing as concurrent stages.
+
+    - A producer thread pulls cells from the (lazy) source iterable and groups
+      them into batches as soon as enough cells are available.
+    - A pool of worker threads sends batches to the translator.
+    - The calling thread consumes translated batches and hands them to the writer.
+
+    Stages are connected by bounded queues, so a slow stage applies backpressure
+    instead of letting extracted cells or results pile up in memory.
+
+    With a ``batch_sizer`` each new batch takes its current size, and a batch whose
+    response was truncated or could not be parsed is translated again in smaller
+    parts before the pipeline gives up.
+    """
+
+    def __init__(
+        self,
+        translator: BatchTranslator,
+        batch_size: int,
+        target_lang: str,
+        source_lang: Optional[str] = None,
+        context: Optional[str] = None,
+        concurrency: int = 1,
+        queue_size: Optional[int] = None,
+        on_dispatch: Optional[Callable[[int, list[Cell]], None]] = None,
+        resolve: Optional[Callable[[Cell], Optional[str]]] = None,
+        on_batch_done: Optional[Callable[[int, TranslationBatch, float], None]] = None,
+        on_resolved: Optional[Callable[[int], None]] = None,
+        on_dispatch_finished: Optional[Callable[[int], None]] = None,
+        batch_sizer: Optional[AdaptiveBatchSize] = None,
+    ) -> None:
+        """Initialize the pipeline.
+
+        Args:
+            translator: Translator used by the worker threads (must be thread-safe)
+            batch_size: Number of cells per API batch
+            target_lang: Target language for translation
+            source_lang: Source language (auto-detected if None)
+            context: Additional context for translations
+            concurrency: Number of batches translated in parallel
+            queue_size: Capacity of each inter-stage queue (default: 2 x concurrency)
+            on_dispatch: Called with (batch number, cells) when a batch is queued
+            resolve: Returns a known translation for a cell, or None. Resolved cells
+                     skip the translator and go straight to the consumer.
+            on_batch_done: Called on the consuming thread with (batch number, batch,
+                           seconds spent translating it) after ``on_translated``
+            on_resolved: Called on the consuming thread with the number of resolved
+                         cells handed to ``on_translated``
+            on_dispatch_finished: Called with the total number of batches once the
+                                  last one is queued
+            batch_sizer: Adapts the number of cells per batch, starting from its own
+                         initial size instead of ``batch_size``
+        """
+        self.translator = translator
+        self.batch_size = batch_size
+        self.target_lang = target_lang
+        self.source_lang = source_lang
+        self.context = context
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size or 2 * self.concurrency
+        self.on_dispatch = on_dispatch
+        self.resolve = resolve
+        self.on_batch_done = on_batch_done
+        self.on_resolved = on_resolved
+        self.on_dispatch_finished = on_dispatch_finished
+        self.batch_sizer = batch_sizer
+        self.batch_count = 0
+        self.resolved_count = 0
+
+        self._stop = threading.Event()
+        self._errors: list[BaseException] = []
+        self._errors_lock = threading.Lock()
+
+    def run(self, cells: Iterable[Cell], on_translated: Callable[[list[Cell]], None]) -> None:
+        """Translate all cells, calling ``on_translated`` for every finished batch.
+
+        Each cell's ``value`` is replaced by its translation before it is handed to
+        ``on_translated``, which always runs on the calling thread.
+
+        Raises:
+            The first exception raised by any stage.
+        """
+        batches: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        results: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        producer = threading.Thread(
+            target=self._produce,
+            args=(cells, batches, results),
+            name="rosetta-extract",
+            daemon=True,
+        )
+        workers = [
+            threading.Thread(
+                target=self._translate_worker,
+                args=(batches, results),
+                name=f"rosetta-translate-{i}",
+                daemon=True,
+            )
+            for i in range(self.concurrency)
+        ]
+        producer.start()
+        for worker in workers:
+            worker.start()
+
+        finished_workers = 0
+        while finished_workers < len(workers):
+            item = results.get()
+            if item is _DONE:
+                finished_workers += 1
+                continue
+            if self._stop.is_set():
+                # Keep draining so workers are never blocked on a full queue
+                continue
+            translated, done = item
+            try:
+                on_translated(translated)
+                if done is None:
+                    if self.on_resolved is not None:
+                        self.on_resolved(len(translated))
+                elif self.on_batch_done is not None:
+                    self.on_batch_done(*done)
+            except BaseException as e:
+                self._fail(e)
+
+        producer.join()
+        if self._errors:
+            raise self._errors[0]
+
+    def _produce(self, cells: Iterable[Cell], batches: queue.Queue, results: queue.Queue) -> None:
+        """Group cells into batches and queue them for translation.
+
+        Cells with a known translation are sent directly to the result queue. They
+        are always queued before the end markers, so the consumer sees them before
+        the last worker finishes.
+        """
+        try:
+            for batch_cells in self._chunk(self._resolve_known(cells, results)):
+                self.batch_count += 1
+                if self.on_dispatch is not None:
+                    self.on_dispatch(self.batch_count, batch_cells)
+                batch = TranslationBatch(
+                    cells=batch_cells,
+                    source_lang=self.source_lang,
+                    target_lang=self.target_lang,
+                    context=self.context,
+                )
+                if not self._put(batches, (self.batch_count, batch)):
+                    return
+            if self.on_dispatch_finished is not None:
+                self.on_dispatch_finished(self.batch_count)
+        except BaseException as e:
+            self._fail(e)
+            return
+
+        # One end marker per worker
+        for _ in range(self.concurrency):
+            if not self._put(batches, None):
+                return
+
+    def _resolve_known(self, cells: Iterable[Cell], results: queue.Queue) -> Iterator[Cell]:
+        """Yield cells that need translating; hand already known ones to the consumer."""
+        if self.resolve is None:
+            yield from cells
+            return
+
+        resolved: list[Cell] = []
+        for cell in cells:
+            translation = self.resolve(cell)
+            if translation is None:
+                yield cell
+                continue
+            cell.value = translation
+            resolved.append(cell)
+            self.resolved_count += 1
+            if len(resolved) >= self.batch_size:
+                if not self._put(results, (resolved, None)):
+                    return
+                resolved = []
+        if resolved:
+            self._put(results, (resolved, None))
+
+    def _chunk(self, cells: Iterable[Cell]) -> Iterator[list[Cell]]:
+        """Yield lists of up to batch_size cells as soon as they are available."""
+        batch_cells: list[Cell] = []
+        for cell in cells:
+            if self._stop.is_set():
+                return
+            batch_cells.append(cell)
+            size = self.batch_sizer.size if self.batch_sizer is not None else self.batch_size
+            if len(batch_cells) >= size:
+                yield batch_cells
+                batch_cells = []
+        if batch_cells:
+            yield batch_cells
+
+    def _translate_worker(self, batches: queue.Queue, results: queue.Queue) -> None:
+        """Translate queued batches until the end marker or an abort."""
+        try:
+            while not self._stop.is_set():
+                try:
+                    item = batches.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    break
+
+                number, batch = item
+                started = time.perf_counter()
+                translations = self._translate(batch)
+                seconds = time.perf_counter() - started
+                for cell, translation in zip(batch.cells, translations):
+                    cell.value = translation
+
+                if not self._put(results, (batch.cells, (number, batch, seconds))):
+                    break
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            # The consumer always drains, so this cannot block forever
+            results.put(_DONE)
+
+    def _translate(self, batch: TranslationBatch) -> list[str]:
+        """Translate a batch, reporting the outcome to the batch sizer if there is one.
+
+        A batch that was truncated or could not be parsed is split at the new batch
+        size (at most in halves) and its parts translated in turn, down to the
+        sizer's minimum. The parts share the batch's usage.
+        """
+        started = time.perf_counter()
+        try:
+            translations = self.translator.translate_batch(batch)
+        except Exception as e:
+            if self.batch_sizer is None:
+                raise
+            kind = failure_kind(e)
+            if kind == "rejected":  # Not sent: says nothing about the batch size
+                raise
+            self.batch_sizer.record(
+                len(batch), time.perf_counter() - started, TRUNCATED if kind == TRUNCATED else ERROR
+            )
+            if kind == "request" or len(batch) <= self.batch_sizer.minimum:
+                raise
+            size = min(self.batch_sizer.size, len(batch) // 2)
+            translations = []
+            for start in range(0, len(batch), size):
+                part = TranslationBatch(
+                    cells=batch.cells[start : start + size],
+                    source_lang=batch.source_lang,
+                    target_lang=batch.target_lang,
+                    context=batch.context,
+                    usage=batch.usage,
+                )
+                translations.extend(self._translate(part))
+            return translations
+        if self.batch_sizer is not None:
+            self.batch_sizer.record(len(batch), time.perf_counter() - started, OK)
+        return translations
+
+    def _put(self, q: queue.Queue, item: object) -> bool:
+        """Put an item on a bounded queue, giving up if the pipeline is aborted."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fail(self, error: BaseException) -> None:
+        """Record an error and abort all stages."""
+        with self._errors_lock:
+            self._errors.append(error)
+        self._stop.set()
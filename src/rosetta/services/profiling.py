@@ -0,0 +1,324 @@
+"""Per-stage profiling of a single translation.
+
+Unlike the process-wide metrics, a ``Profiler`` belongs to one ``translate_file``
+call. It records wall time, CPU time, peak traced memory and call counts for each
+pipeline stage and for every request sent to the API, and can dump cProfile
+statistics of the hot stages for ``pstats`` or snakeviz.
+"""
+
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, ContextManager, Iterator, Optional, TypeVar
+
+from rosetta.models import TranslationBatch
+from rosetta.services.progress import EXTRACT, WRITE
+
+if TYPE_CHECKING:
+    import cProfile
+
+    from rosetta.core.config import Config
+    from rosetta.services.translator import BatchTranslator
+
+T = TypeVar("T")
+
+# Profiled stages besides the progress stages (extract, translate, write). Extraction
+# and rich text enrichment run on the pipeline's producer thread while batches are
+# translated, so their times overlap "translate", which spans the whole pipeline.
+LOAD = "load"  # Opening the workbook with openpyxl
+RICH_TEXT = "rich_text"  # Reading the shared strings table and attaching runs to cells
+API_CALL = "api_call"  # Requests to the API, on the translation worker threads
+
+# Stages that run on one thread at a time, so a cProfile dump of them is meaningful.
+# "write" covers buffering translated cells and rewriting the package.
+DUMPED_STAGES = (LOAD, EXTRACT, RICH_TEXT, WRITE)
+
+
+@dataclass
+class StageProfile:
+    """Accumulated measurements of one stage."""
+
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0  # CPU time of the threads running the stage
+    peak_memory: int = 0  # Highest traced memory (bytes) while the stage was running
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "wall_seconds": round(self.wall_seconds, 4),
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            "peak_memory_mb": _mb(self.peak_memory),
+        }
+
+
+@dataclass
+class BatchProfile:
+    """Measurements of one request to the API."""
+
+    cells: int
+    wall_seconds: float
+    cpu_seconds: float
+    input_tokens: int
+    output_tokens: int
+    error: Optional[str] = None
+
+
+# tracemalloc traces the whole process: it is started by the first running profile
+# (unless something else started it) and stopped when the last one stops
+_tracing_lock = threading.Lock()
+_tracing_profiles = 0
+_started_tracing = False
+
+
+def _start_tracing() -> None:
+    global _tracing_profiles, _started_tracing
+    with _tracing_lock:
+        if not _tracing_profiles and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_profiles += 1
+
+
+def _stop_tracing() -> None:
+    global _tracing_profiles, _started_tracing
+    with _tracing_lock:
+        _tracing_profiles -= 1
+        if not _tracing_profiles and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+class Profiler:
+    """Collects per-stage and per-batch measurements of one translation.
+
+    Stages may overlap and run on several threads; each records the CPU time of
+    the thread it ran on. Peak memory is measured with tracemalloc, which traces
+    while any profile is running, and is attributed to every stage running when
+    the peak was reached. Traced memory and its peak are process-wide: profiles
+    running at the same time see each other's allocations, and each one resets
+    the peak when it samples it, so their peaks overlap and are upper bounds.
+
+    A disabled profiler records nothing and costs one attribute check per stage.
+    """
+
+    def __init__(self, enabled: bool = True, dump_dir: Optional[Path] = None) -> None:
+        """Initialize the profiler.
+
+        Args:
+            enabled: Record measurements; when False every method is a no-op
+            dump_dir: Directory for ``<stage>.pstats`` cProfile dumps of the stages
+                      in DUMPED_STAGES (no dumps if None)
+        """
+        self.enabled = enabled
+        self.dump_dir = dump_dir
+        self.stages: dict[str, StageProfile] = {}
+        self.batches: list[BatchProfile] = []
+        self._lock = threading.Lock()
+        self._running: dict[str, int] = {}  # Stage -> number of threads running it
+        self._profiles: dict[str, "cProfile.Profile"] = {}
+        self._profiling: Optional[str] = None  # Stage whose cProfile is enabled
+        self._tracing = False
+        self._started: Optional[tuple[float, float]] = None
+        self._report: Optional[dict] = None
+
+    def start(self) -> None:
+        """Start the overall clocks and memory tracing."""
+        if not self.enabled:
+            return
+        if not self._tracing:
+            _start_tracing()
+            self._tracing = True
+        tracemalloc.reset_peak()
+        self._started = (time.perf_counter(), time.process_time())
+
+    def stop(self) -> dict:
+        """Stop tracing, write the cProfile dumps and return the report.
+
+        Safe to call more than once; later calls return the same report.
+        """
+        if not self.enabled:
+            return {}
+        if self._report is not None:
+            return self._report
+        with self._lock:
+            peak = self._sample()
+        wall_started, cpu_started = self._started or (time.perf_counter(), time.process_time())
+        self._report = {
+            "wall_seconds": round(time.perf_counter() - wall_started, 4),
+            "cpu_seconds": round(time.process_time() - cpu_started, 4),
+            "peak_memory_mb": _mb(max([peak, *(s.peak_memory for s in self.stages.values())])),
+            "stages": {name: stage.to_dict() for name, stage in self.stages.items()},
+            "batches": [asdict(batch) for batch in self.batches],
+            "dumps": self._dump(),
+        }
+        if self._tracing:
+            _stop_tracing()
+            self._tracing = False
+        return self._report
+
+    def stage(self, name: str) -> ContextManager[None]:
+        """Measure a block of code as one call of a stage."""
+        return self._measure(name, count=True)
+
+    @contextmanager
+    def _measure(self, name: str, count: bool) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        self._enter(name)
+        profile = self._start_cprofile(name)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            if profile is not None:
+                profile.disable()
+                with self._lock:
+                    self._profiling = None
+            self._exit(name, wall, cpu, count)
+
+    def iterate(self, name: str, items: Iterator[T]) -> Iterator[T]:
+        """Yield from ``items``, measuring only the time spent producing them.
+
+        The whole iteration counts as one call; time the consumer spends between
+        items is excluded.
+        """
+        if not self.enabled:
+            yield from items
+            return
+        first = True
+        while True:
+            with self._measure(name, count=first):
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+            first = False
+            yield item
+
+    def record_batch(
+        self,
+        batch: TranslationBatch,
+        wall_seconds: float,
+        cpu_seconds: float,
+        input_tokens: int,
+        output_tokens: int,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Record one request to the API (called by ``ProfilingTranslator``)."""
+        with self._lock:
+            self.batches.append(
+                BatchProfile(
+                    cells=len(batch),
+                    wall_seconds=round(wall_seconds, 4),
+                    cpu_seconds=round(cpu_seconds, 4),
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    error=str(error) if error is not None else None,
+                )
+            )
+
+    def _enter(self, name: str) -> None:
+        with self._lock:
+            self._sample()
+            self.stages.setdefault(name, StageProfile())
+            self._running[name] = self._running.get(name, 0) + 1
+
+    def _exit(self, name: str, wall: float, cpu: float, count: bool) -> None:
+        with self._lock:
+            self._sample()
+            stage = self.stages[name]
+            stage.calls += count
+            stage.wall_seconds += wall
+            stage.cpu_seconds += cpu
+            self._running[name] -= 1
+            if not self._running[name]:
+                del self._running[name]
+
+    def _sample(self) -> int:
+        """Attribute the memory peak since the last sample to the running stages."""
+        if not tracemalloc.is_tracing():
+            return 0
+        peak = tracemalloc.get_traced_memory()[1]
+        for name in self._running:
+            stage = self.stages[name]
+            stage.peak_memory = max(stage.peak_memory, peak)
+        tracemalloc.reset_peak()
+        return peak
+
+    def _start_cprofile(self, name: str) -> Optional["cProfile.Profile"]:
+        """Enable the stage's cProfile, unless dumps are off or another stage has it."""
+        if self.dump_dir is None or name not in DUMPED_STAGES:
+            return None
+        import cProfile
+
+        with self._lock:
+            # Only one profiler can be active at a time
+            if self._profiling is not None:
+                return None
+            self._profiling = name
+            profile = self._profiles.setdefault(name, cProfile.Profile())
+        try:
+            profile.enable()
+        except ValueError:  # Another profiling tool (e.g. a debugger) is active
+            with self._lock:
+                self._profiling = None
+            return None
+        return profile
+
+    def _dump(self) -> dict[str, str]:
+        if self.dump_dir is None or not self._profiles:
+            return {}
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        dumps = {}
+        for name, profile in self._profiles.items():
+            path = self.dump_dir / f"{name}.pstats"
+            profile.dump_stats(path)
+            dumps[name] = str(path)
+        return dumps
+
+
+class ProfilingTranslator:
+    """Translator wrapper that records each request to the API with a Profiler.
+
+    Wraps the translator that calls the API, inside the journal and cache
+    wrappers, so only texts actually sent are measured.
+    """
+
+    def __init__(self, translator: "BatchTranslator", profiler: Profiler) -> None:
+        self.translator = translator
+        self.profiler = profiler
+
+    @property
+    def config(self) -> "Config":
+        return self.translator.config
+
+    def translate_batch(self, batch: TranslationBatch) -> list[str]:
+        """Translate a batch, recording its wall and CPU time, tokens and outcome."""
+        input_tokens, output_tokens = batch.usage.input_tokens, batch.usage.output_tokens
+        wall, cpu = time.perf_counter(), time.thread_time()
+        error: Optional[BaseException] = None
+        try:
+            with self.profiler.stage(API_CALL):
+                return self.translator.translate_batch(batch)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.profiler.record_batch(
+                batch,
+                time.perf_counter() - wall,
+                time.thread_time() - cpu,
+                batch.usage.input_tokens - input_tokens,
+                batch.usage.output_tokens - output_tokens,
+                error,
+            )
+
+
+def _mb(size: float) -> float:
+    return round(size / (1024 * 1024), 2)
@@ -0,0 +1,250 @@
+"""Structured progress events emitted while a workbook is translated."""
+
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Iterator, Optional
+
+from rosetta.models import TranslationBatch
+from rosetta.services.batch_size import AdaptiveBatchSize
+from rosetta.services.translator import CLOSED, CircuitBreaker
+
+# Event kinds
+STAGE_STARTED = "stage_started"
+STAGE_FINISHED = "stage_finished"
+BATCH_DONE = "batch_done"
+INFO = "info"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Stages. Extraction and translation overlap: batches are translated while later
+# cells are still being extracted.
+EXTRACT = "extract"
+TRANSLATE = "translate"
+WRITE = "write"
+
+
+@dataclass
+class ProgressEvent:
+    """One progress update from ``translate_file``.
+
+    Every event carries the running totals, so a consumer that only looks at the
+    latest event still knows the overall state.
+    """
+
+    kind: str
+    message: str
+    elapsed: float
+    stage: Optional[str] = None
+    # batch_done only
+    batch: Optional[int] = None
+    batch_cells: Optional[int] = None
+    batch_seconds: Optional[float] = None
+    # Running totals
+    batches_done: int = 0
+    batches_total: Optional[int] = None  # Known once the last batch is queued
+    items_done: int = 0
+    items_total: Optional[int] = None  # Known once extraction has finished
+    reused: int = 0  # Items resolved from a previous run, the journal or the cache
+    cache_hits: int = 0  # Items in batches served by the translation cache
+    input_tokens: int = 0
+    output_tokens: int = 0
+    eta_seconds: Optional[float] = None
+    batch_size: Optional[int] = None  # Current size, when the batch size adapts
+    circuit: Optional[str] = None  # State of the model's circuit breaker
+    # completed / failed only
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    @property
+    def is_final(self) -> bool:
+        return self.kind in (COMPLETED, FAILED)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class ProgressReporter:
+    """Keeps running totals and turns pipeline callbacks into ProgressEvents.
+
+    Called from both the extraction thread and the consuming thread, so all
+    updates go through a lock. The callback is invoked while holding it, which
+    keeps events in order.
+    """
+
+    def __init__(
+        self,
+        callback: Optional[ProgressCallback],
+        batch_sizer: Optional[AdaptiveBatchSize] = None,
+    ) -> None:
+        self.callback = callback
+        self.batch_sizer = batch_sizer
+        # A shared sizer (e.g. the server's) may have decided before this translation
+        self._decisions_seen = len(batch_sizer.decisions) if batch_sizer is not None else 0
+        self.breaker: Optional[CircuitBreaker] = None
+        self._circuit_seen: Optional[str] = None
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._translate_started: Optional[float] = None
+        self.batches_done = 0
+        self.batches_total: Optional[int] = None
+        self.items_done = 0
+        self.items_total: Optional[int] = None
+        self.reused = 0
+        self.cache_hits = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def info(self, message: str) -> None:
+        self._emit(INFO, message)
+
+    def watch_circuit(self, breaker: CircuitBreaker) -> None:
+        """Report the breaker's state on every event, and its changes as info events."""
+        with self._lock:
+            self.breaker = breaker
+            self._circuit_seen = breaker.state
+        if breaker.state != CLOSED:
+            self.info(breaker.describe())
+
+    def stage_started(self, stage: str, message: str) -> None:
+        if stage == TRANSLATE:
+            self._translate_started = time.perf_counter()
+        self._emit(STAGE_STARTED, message, stage=stage)
+
+    def stage_finished(self, stage: str, message: str) -> None:
+        self._emit(STAGE_FINISHED, message, stage=stage)
+
+    def extraction_finished(self, items_total: int) -> None:
+        with self._lock:
+            self.items_total = items_total
+        self.stage_finished(EXTRACT, f"Found {items_total} items to translate")
+
+    def dispatch_finished(self, batches_total: int) -> None:
+        """Record the final number of batches, from which the ETA is extrapolated."""
+        with self._lock:
+            self.batches_total = batches_total
+
+    def items_resolved(self, count: int) -> None:
+        """Count items that were translated without a request (reused translations)."""
+        with self._lock:
+            self.reused += count
+            self.items_done += count
+
+    def batch_done(self, number: int, batch: TranslationBatch, seconds: float) -> None:
+        with self._lock:
+            self.batches_done += 1
+            self.items_done += len(batch)
+            self.cache_hits += batch.usage.cached
+            self.input_tokens += batch.usage.input_tokens
+            self.output_tokens += batch.usage.output_tokens
+        self._emit(
+            BATCH_DONE,
+            f"Batch {number} done ({len(batch)} cells, {seconds:.1f}s)",
+            stage=TRANSLATE,
+            batch=number,
+            batch_cells=len(batch),
+            batch_seconds=seconds,
+        )
+        self._report_decisions()
+        self._report_circuit()
+
+    def _report_decisions(self) -> None:
+        """Emit an info event for each batch size change since the last batch."""
+        if self.batch_sizer is None:
+            return
+        decisions = self.batch_sizer.decisions
+        with self._lock:
+            new = decisions[self._decisions_seen : len(decisions)]
+            self._decisions_seen += len(new)
+        for decision in new:
+            self.info(str(decision))
+
+    def _report_circuit(self) -> None:
+        if self.breaker is None:
+            return
+        with self._lock:
+            state = self.breaker.state
+            changed = state != self._circuit_seen
+            self._circuit_seen = state
+        if changed:
+            self.info(self.breaker.describe())
+
+    def completed(self, result: dict) -> None:
+        self._emit(COMPLETED, "Translation complete", result=result)
+
+    def failed(self, error: BaseException) -> None:
+        self._emit(FAILED, f"Translation failed: {error}", error=str(error))
+
+    def _eta(self) -> Optional[float]:
+        """Remaining time, extrapolated from the average time per finished batch."""
+        if self.batches_total is None or self._translate_started is None:
+            return None
+        remaining = self.batches_total - self.batches_done
+        if remaining <= 0:
+            return 0.0
+        if not self.batches_done:
+            return None
+        per_batch = (time.perf_counter() - self._translate_started) / self.batches_done
+        return round(per_batch * remaining, 1)
+
+    def _emit(self, kind: str, message: str, **fields: Any) -> None:
+        if self.callback is None:
+            return
+        with self._lock:
+            event = ProgressEvent(
+                kind=kind,
+                message=message,
+                elapsed=round(time.perf_counter() - self._started, 3),
+                batches_done=self.batches_done,
+                batches_total=self.batches_total,
+                items_done=self.items_done,
+                items_total=self.items_total,
+                reused=self.reused,
+                cache_hits=self.cache_hits,
+                input_tokens=self.input_tokens,
+                output_tokens=self.output_tokens,
+                eta_seconds=self._eta(),
+                batch_size=self.batch_sizer.size if self.batch_sizer is not None else None,
+                circuit=self.breaker.state if self.breaker is not None else None,
+                **fields,
+            )
+            self.callback(event)
+
+
+def iter_progress(
+    run: Callable[[ProgressCallback], Any],
+) -> Iterator[ProgressEvent]:
+    """Run a translation in a background thread and yield its progress events.
+
+    Args:
+        run: Called with the progress callback to use, e.g.
+             ``lambda on_progress: translate_file(..., on_progress=on_progress)``
+
+    Yields:
+        Progress events, ending with a ``completed`` or ``failed`` event
+
+    Raises:
+        The exception raised by ``run``, after its ``failed`` event was yielded.
+    """
+    events: queue.Queue = queue.Queue()
+    outcome: dict[str, BaseException] = {}
+
+    def target() -> None:
+        try:
+            run(events.put)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            events.put(None)
+
+    thread = threading.Thread(target=target, name="rosetta-progress", daemon=True)
+    thread.start()
+    while (event := events.get()) is not None:
+        yield event
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
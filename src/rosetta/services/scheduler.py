@@ -0,0 +1,245 @@
+"""Server-wide batching of translation requests across concurrent translations.
+
+Each translation splits its workbook into batches on its own, so many small
+uploads make many small, half-empty requests, and texts common to many workbooks
+("Total", "Date") are sent by several of them at the same moment. A
+``BatchScheduler`` sits between every translation of a server and the translator:
+it collects texts with the same languages and context into full-size requests
+within a short window, and sends a text that is already in flight only once.
+"""
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from typing import Optional
+
+from rosetta.core.config import Config
+from rosetta.core.exceptions import TranslationError
+from rosetta.models import BatchUsage, Cell, TranslationBatch
+from rosetta.services.batch_size import ERROR, OK, TRUNCATED, AdaptiveBatchSize
+from rosetta.services.metrics import SCHEDULER_FLUSHES, SCHEDULER_SOURCES, SCHEDULER_TEXTS
+from rosetta.services.translator import CircuitBreaker, Translator, failure_kind
+
+# (source_lang, target_lang, context): texts are only batched with texts of the same group
+GroupKey = tuple[Optional[str], str, Optional[str]]
+
+
+@dataclass
+class _Item:
+    """A text waiting to be sent, and the usage of the batch that submitted it."""
+
+    text: str
+    future: Future
+    usage: BatchUsage
+
+
+@dataclass
+class _Group:
+    """Texts of one group waiting for a request, sent when full or at the deadline."""
+
+    deadline: float
+    items: list[_Item] = field(default_factory=list)
+
+
+class BatchScheduler:
+    """Translator wrapper that coalesces batches of concurrent translations.
+
+    ``translate_batch`` queues the batch's texts and blocks until they are
+    translated. A request is sent as soon as a group holds ``batch_size`` texts, or
+    once its oldest text has waited ``window`` seconds. There is no dispatcher
+    thread: the caller that fills a group, or that finds it expired while waiting,
+    sends the request on its own thread.
+
+    The tokens of a request are shared among the batches it served, in proportion
+    to their texts. Texts coalesced with an identical one already in flight count
+    as cached. If a request mixing several batches fails, each batch's texts are
+    sent again on their own, so a text that breaks the response only fails the
+    translation it came from.
+
+    With a ``batch_sizer`` the size of the requests adapts to their outcomes, and
+    a request that was truncated or could not be parsed is sent again in smaller
+    requests.
+    """
+
+    def __init__(
+        self,
+        translator: Translator,
+        batch_size: Optional[int] = None,
+        window: float = 0.05,
+        batch_sizer: Optional[AdaptiveBatchSize] = None,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            translator: Thread-safe translator sending the requests
+            batch_size: Texts per request (default: the translator's config)
+            window: Seconds a text may wait for others before its request is sent
+            batch_sizer: Adapts the texts per request instead of ``batch_size``
+        """
+        self.translator = translator
+        self.batch_size = batch_size or translator.config.batch_size
+        self.window = window
+        self.batch_sizer = batch_sizer
+        self._lock = threading.Lock()
+        self._groups: dict[GroupKey, _Group] = {}
+        self._in_flight: dict[tuple[GroupKey, str], Future] = {}
+
+    @property
+    def config(self) -> Config:
+        return self.translator.config
+
+    @property
+    def breaker(self) -> Optional[CircuitBreaker]:
+        return getattr(self.translator, "breaker", None)
+
+    def translate_batch(self, batch: TranslationBatch) -> list[str]:
+        """Translate a batch together with the texts of other concurrent batches."""
+        if not batch.cells:
+            return []
+
+        key: GroupKey = (batch.source_lang, batch.target_lang, batch.context)
+        futures: dict[str, Future] = {}
+        full: list[list[_Item]] = []
+        coalesced = 0
+        with self._lock:
+            for text in batch.texts:
+                if text in futures:
+                    continue
+                future = self._in_flight.get((key, text))
+                if future is None:
+                    future = self._in_flight[(key, text)] = Future()
+                    group = self._groups.get(key)
+                    if group is None:
+                        group = self._groups[key] = _Group(time.monotonic() + self.window)
+                    group.items.append(_Item(text, future, batch.usage))
+                    if len(group.items) >= self._target_size():
+                        full.append(self._groups.pop(key).items)
+                else:
+                    coalesced += 1
+                futures[text] = future
+            batch.usage.cached += coalesced
+        SCHEDULER_TEXTS.inc(len(futures) - coalesced, result="queued")
+        if coalesced:
+            SCHEDULER_TEXTS.inc(coalesced, result="coalesced")
+
+        for items in full:
+            self._send(key, items, "full")
+        self._wait(key, list(futures.values()))
+        return [futures[text].result() for text in batch.texts]
+
+    def _target_size(self) -> int:
+        return self.batch_sizer.size if self.batch_sizer is not None else self.batch_size
+
+    def _wait(self, key: GroupKey, futures: list[Future]) -> None:
+        """Wait for the futures, sending the group's request once its window is over."""
+        while True:
+            pending = [future for future in futures if not future.done()]
+            if not pending:
+                return
+            with self._lock:
+                group = self._groups.get(key)
+                timeout = None if group is None else group.deadline - time.monotonic()
+                if group is not None and timeout is not None and timeout <= 0:
+                    del self._groups[key]
+                else:
+                    group = None  # Not due yet, or already sent
+            if group is not None:
+                self._send(key, group.items, "window")
+            else:
+                wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+    def _send(self, key: GroupKey, items: list[_Item], reason: str) -> None:
+        """Translate the items in one request and resolve their futures."""
+        source_lang, target_lang, context = key
+        batch = TranslationBatch(
+            cells=[Cell(sheet="", row=0, col=0, value=item.text) for item in items],
+            source_lang=source_lang,
+            target_lang=target_lang,
+            context=context,
+        )
+        SCHEDULER_FLUSHES.inc(reason=reason)
+        sources = Counter(id(item.usage) for item in items)
+        SCHEDULER_SOURCES.observe(len(sources))
+        started = time.perf_counter()
+        try:
+            translations = self.translator.translate_batch(batch)
+            if len(translations) != len(items):
+                raise TranslationError(
+                    f"Expected {len(items)} translations, got {len(translations)}"
+                )
+        except Exception as e:
+            self._account(items, batch.usage)
+            kind = failure_kind(e)
+            if self.batch_sizer is not None and kind != "rejected":
+                self.batch_sizer.record(
+                    len(items),
+                    time.perf_counter() - started,
+                    TRUNCATED if kind == TRUNCATED else ERROR,
+                )
+            if kind in ("response", TRUNCATED):
+                if len(sources) > 1:
+                    # Do not let texts of one translation fail another: send each alone
+                    for usage_id in sources:
+                        self._send(key, [i for i in items if id(i.usage) == usage_id], "split")
+                    return
+                if self.batch_sizer is not None and len(items) > self.batch_sizer.minimum:
+                    # Smaller requests may succeed where this one was cut off or misnumbered
+                    size = min(self.batch_sizer.size, len(items) // 2)
+                    for start in range(0, len(items), size):
+                        self._send(key, items[start : start + size], "split")
+                    return
+            self._resolve(key, items, error=e)
+            return
+        except BaseException as e:
+            self._resolve(key, items, error=e)
+            raise
+        if self.batch_sizer is not None:
+            self.batch_sizer.record(len(items), time.perf_counter() - started, OK)
+        self._account(items, batch.usage)
+        self._resolve(key, items, translations)
+
+    def _account(self, items: list[_Item], usage: BatchUsage) -> None:
+        """Share a request's usage among the batches of its items."""
+        if not usage.requests:  # No response
+            return
+        by_usage: dict[int, tuple[BatchUsage, int]] = {}
+        for item in items:
+            owner, count = by_usage.get(id(item.usage), (item.usage, 0))
+            by_usage[id(item.usage)] = (owner, count + 1)
+        counts = [count for _, count in by_usage.values()]
+        input_tokens = _share(usage.input_tokens, counts)
+        output_tokens = _share(usage.output_tokens, counts)
+        with self._lock:
+            for (owner, count), inputs, outputs in zip(
+                by_usage.values(), input_tokens, output_tokens
+            ):
+                owner.requests += usage.requests
+                owner.sent += count
+                owner.input_tokens += inputs
+                owner.output_tokens += outputs
+
+    def _resolve(
+        self,
+        key: GroupKey,
+        items: list[_Item],
+        translations: Optional[list[str]] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            for item in items:
+                self._in_flight.pop((key, item.text), None)
+        for index, item in enumerate(items):
+            if translations is not None:
+                item.future.set_result(translations[index])
+            else:
+                item.future.set_exception(error)
+
+
+def _share(total: int, counts: list[int]) -> list[int]:
+    """Split ``total`` in proportion to ``counts``; the first share takes the remainder."""
+    items = sum(counts)
+    shares = [total * count // items for count in counts]
+    shares[0] += total - sum(shares)
+    return shares
@@ -1,11 +1,31 @@
 """High-level translation service for the API."""
 
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 from rosetta.core.config import Config
-from rosetta.models import TranslationBatch
+from rosetta.models import Cell, DropdownValidation, RichTextRun
 from rosetta.services import ExcelExtractor, Translator
+from rosetta.services.batch_size import AdaptiveBatchSize
+from rosetta.services.cache import CachingTranslator, TranslationCache
+from rosetta.services.incremental import PreviousTranslations
+from rosetta.services.inspector import WorkbookInspection, inspect_workbook, read_sheet_names
+from rosetta.services.journal import (
+    JournalingTranslator,
+    TranslationJournal,
+    compute_job_key,
+    journal_path_for,
+)
+from rosetta.services.pipeline import TranslationPipeline
+from rosetta.services.profiling import LOAD, RICH_TEXT, Profiler, ProfilingTranslator
+from rosetta.services.progress import (
+    EXTRACT,
+    TRANSLATE,
+    WRITE,
+    ProgressCallback,
+    ProgressReporter,
+)
+from rosetta.services.translator import BatchTranslator, CircuitBreaker
 
 
 def translate_file(
@@ -16,6 +36,18 @@ def translate_file(
     context: Optional[str] = None,
     sheets: Optional[set[str]] = None,
     batch_size: int = 50,
+    translator: Optional[BatchTranslator] = None,
+    checkpoint: bool = True,
+    resume: bool = False,
+    on_progress: Optional[ProgressCallback] = None,
+    concurrency: Optional[int] = None,
+    previous_source: Optional[Path] = None,
+    previous_output: Optional[Path] = None,
+    cache: Optional[TranslationCache] = None,
+    inspection: Optional[WorkbookInspection] = None,
+    profile: bool = False,
+    profile_dir: Optional[Path] = None,
+    batch_sizer: Optional[AdaptiveBatchSize] = None,
 ) -> dict:
     """Translate an Excel file.
 
@@ -27,84 +59,307 @@ def translate_file(
         context: Additional context for translations
         sheets: Set of sheet names to translate (all if None)
         batch_size: Number of cells per API batch
+        translator: Shared translator to reuse (e.g. the API server's
+                    application-scoped one, or a ``BatchScheduler`` around it).
+                    Created from the environment if None.
+        checkpoint: Write a journal of completed batches next to the output
+                    so an interrupted run can be resumed. Removed on success.
+        resume: Reuse translations from an existing matching journal
+        on_progress: Optional callback receiving ProgressEvents (stages, finished
+                     batches with token usage and latency, running totals and ETA),
+                     ending with a ``completed`` or ``failed`` event
+        concurrency: Number of batches translated in parallel (default from config)
+        previous_source: Earlier version of the input that was already translated
+        previous_output: Translated output of previous_source. Translations of
+                         unchanged text are reused; only new or changed text is sent.
+        cache: Translation cache shared with other files or jobs. Each unique text
+               is translated once per cache; a private cache is used if None.
+        inspection: Result of ``inspect_workbook`` for the same file and sheets (e.g.
+                    from validating an upload). Its shared strings, sheet paths and
+                    dropdowns are reused instead of being read again.
+        profile: Measure wall time, CPU time, peak memory and calls of each stage
+                 and API request, returned under the ``profile`` key of the stats
+        profile_dir: With ``profile``, write cProfile dumps of the stages that run
+                     on one thread (load, extract, rich_text, write) to this directory
+        batch_sizer: Adapt the batch size to the outcome of each request, starting
+                     from the sizer's initial size instead of ``batch_size``. Its
+                     changes are reported as ``info`` events. A translator adapting
+                     its own requests (``BatchScheduler``) reports its sizer's.
 
     Returns:
         Dict with translation stats
     """
+    reported_sizer = batch_sizer
+    translator_sizer = getattr(translator, "batch_sizer", None)
+    if reported_sizer is None and isinstance(translator_sizer, AdaptiveBatchSize):
+        reported_sizer = translator_sizer
+    progress = ProgressReporter(on_progress, batch_sizer=reported_sizer)
+    profiler = Profiler(enabled=profile, dump_dir=profile_dir)
+    profiler.start()
+    try:
+        result = _translate_file(
+            input_file,
+            output_file,
+            target_lang,
+            source_lang=source_lang,
+            context=context,
+            sheets=sheets,
+            batch_size=batch_size,
+            translator=translator,
+            checkpoint=checkpoint,
+            resume=resume,
+            progress=progress,
+            concurrency=concurrency,
+            previous_source=previous_source,
+            previous_output=previous_output,
+            cache=cache,
+            inspection=inspection,
+            profiler=profiler,
+            batch_sizer=batch_sizer,
+        )
+        if profile:
+            result["profile"] = profiler.stop()
+    except BaseException as e:
+        profiler.stop()
+        progress.failed(e)
+        raise
+    progress.completed(result)
+    return result
+
+
+def _translate_file(
+    input_file: Path,
+    output_file: Path,
+    target_lang: str,
+    source_lang: Optional[str],
+    context: Optional[str],
+    sheets: Optional[set[str]],
+    batch_size: int,
+    translator: Optional[BatchTranslator],
+    checkpoint: bool,
+    resume: bool,
+    progress: ProgressReporter,
+    concurrency: Optional[int],
+    previous_source: Optional[Path],
+    previous_output: Optional[Path],
+    cache: Optional[TranslationCache],
+    inspection: Optional[WorkbookInspection],
+    profiler: Profiler,
+    batch_sizer: Optional[AdaptiveBatchSize],
+) -> dict:
+    """Body of translate_file, reporting to ``progress`` and measuring with ``profiler``."""
     from rosetta.main import (
+        RichTextLookup,
+        TranslationWriter,
         _extract_dropdown_validations,
-        _extract_rich_text_info,
-        _translate_dropdowns,
-        _translate_rich_text_runs,
-        write_translations,
+        _is_number,
+        _split_whitespace,
     )
 
-    config = Config.from_env()
-    config.batch_size = batch_size
-    translator = Translator(config)
+    if (previous_source is None) != (previous_output is None):
+        raise ValueError("previous_source and previous_output must be given together")
 
-    # Extract cells
-    with ExcelExtractor(input_file, sheets=sheets) as extractor:
-        cells = list(extractor.extract_cells())
-
-    # Enrich with rich text info
-    _extract_rich_text_info(input_file, cells, sheets)
-
-    if not cells:
+    if inspection is not None and not inspection.cell_count:
+        # Known to be empty: skip loading the workbook
         return {"cell_count": 0, "status": "no_content"}
 
-    # Translate in batches
-    translated_cells = []
-    for i in range(0, len(cells), config.batch_size):
-        batch_cells = cells[i : i + config.batch_size]
-        batch = TranslationBatch(
-            cells=batch_cells,
-            source_lang=source_lang,
+    if translator is None:
+        config = Config.from_env()
+        config.batch_size = batch_size
+        translator = Translator(config)
+    if concurrency is None:
+        concurrency = translator.config.concurrency
+    # A shared translator may be wrapped (e.g. in a BatchScheduler) and forward it
+    breaker = getattr(translator, "breaker", None)
+    if isinstance(breaker, CircuitBreaker):
+        progress.watch_circuit(breaker)
+    if profiler.enabled:
+        translator = ProfilingTranslator(translator, profiler)
+
+    # Journal completed batches so an interrupted run can pick up where it stopped
+    journal = None
+    completed: dict[str, str] = {}
+    if checkpoint:
+        job_key = compute_job_key(
+            input_file,
             target_lang=target_lang,
+            source_lang=source_lang,
             context=context,
+            sheets=sorted(sheets) if sheets else None,
+            model=translator.config.model,
         )
-        translations = translator.translate_batch(batch)
-
-        for cell, translation in zip(batch_cells, translations):
-            cell.value = translation
-            translated_cells.append(cell)
-
-    # Translate rich text runs
-    rich_text_cells = [c for c in translated_cells if c.rich_text_runs]
-    if rich_text_cells:
-        _translate_rich_text_runs(
-            rich_text_cells,
-            translator,
-            source_lang,
-            target_lang,
-            config.batch_size,
-            context,
-        )
+        journal = TranslationJournal(journal_path_for(output_file), job_key)
+        completed = journal.open(resume=resume)
+        if completed:
+            progress.info(f"Resuming: {len(completed)} translations already completed")
+        translator = JournalingTranslator(translator, journal, completed)
 
-    # Translate dropdowns
-    dropdowns = _extract_dropdown_validations(input_file, sheets)
-    if dropdowns:
-        _translate_dropdowns(
-            dropdowns,
-            translator,
-            source_lang,
-            target_lang,
-            config.batch_size,
-            context,
-        )
+    # Translate each unique text once, even when it is in flight in another batch
+    if cache is None:
+        cache = TranslationCache()
+    translator = CachingTranslator(translator, cache)
+
+    # Reuse translations of text that did not change since a previous run
+    previous = None
+    if previous_source is not None and previous_output is not None:
+        previous = PreviousTranslations.load(previous_source, previous_output, sheets)
+        progress.info(f"Loaded {len(previous)} previous translations")
+
+    def resolve(cell: Cell) -> Optional[str]:
+        """Return a translation that is already known, so the cell is not sent."""
+        if previous is not None:
+            translation = previous.lookup(cell)
+            if translation is not None:
+                return translation
+        if cell.value in completed:
+            return completed[cell.value]
+        return cache.get((source_lang, target_lang, context, cell.value))
+
+    with profiler.stage(RICH_TEXT):
+        lookup = RichTextLookup(input_file, inspection)
+    stats = {"cells": 0, "rich_text_cells": 0}
+    dropdowns: list[DropdownValidation] = []
+    dropdown_translations: dict[str, str] = {}
+    # Items that are not workbook cells, keyed by id(): rich text runs and dropdown values
+    run_targets: dict[int, tuple[RichTextRun, str, str]] = {}
+    dropdown_cells: dict[int, str] = {}  # -> source value
+
+    def work_items() -> Iterator[Cell]:
+        """Stream cells, their rich text runs and dropdown values to the pipeline."""
+        items = 0
+        for item in extract_items():
+            items += 1
+            yield item
+        progress.extraction_finished(items)
+
+    def extract_items() -> Iterator[Cell]:
+        progress.stage_started(EXTRACT, f"Extracting cells from {input_file}")
+        with profiler.stage(LOAD):
+            extractor = ExcelExtractor(input_file, sheets=sheets)
+        with extractor:
+            for cell in profiler.iterate(EXTRACT, extractor.extract_cells()):
+                with profiler.stage(RICH_TEXT):
+                    lookup.enrich(cell)
+                stats["cells"] += 1
+                yield cell
+
+                # Each formatted segment of a rich text cell is translated separately
+                if cell.rich_text_runs:
+                    stats["rich_text_cells"] += 1
+                    for run in cell.rich_text_runs:
+                        if run.text.strip():
+                            leading_ws, trailing_ws = _split_whitespace(run.text)
+                            run_cell = Cell(
+                                sheet=cell.sheet,
+                                row=cell.row,
+                                col=cell.col,
+                                value=run.text.strip(),  # Send stripped text
+                                original_value=run.text,
+                            )
+                            run_targets[id(run_cell)] = (run, leading_ws, trailing_ws)
+                            yield run_cell
+
+        if not stats["cells"]:
+            return
+        progress.info(f"Found {stats['cells']} cells to translate")
+
+        if inspection is not None:
+            dropdowns.extend(inspection.dropdowns)
+        else:
+            dropdowns.extend(_extract_dropdown_validations(input_file, sheets))
+        if dropdowns:
+            progress.info(f"Translating {len(dropdowns)} dropdown lists...")
+        for dropdown in dropdowns:
+            for value in dropdown.values:
+                if value and not _is_number(value) and value not in dropdown_translations:
+                    dropdown_translations[value] = value  # placeholder
+                    dropdown_cell = Cell(
+                        sheet="", row=0, col=0, value=value, original_value=value
+                    )
+                    dropdown_cells[id(dropdown_cell)] = value
+                    yield dropdown_cell
+
+    writer = TranslationWriter(input_file, output_file)
+
+    def on_translated(batch_cells: list[Cell]) -> None:
+        """Route translated items to the writer, their rich text run or dropdown."""
+        cells = []
+        for item in batch_cells:
+            if id(item) in run_targets:
+                run, leading_ws, trailing_ws = run_targets.pop(id(item))
+                # Restore the original leading/trailing whitespace
+                run.translated_text = leading_ws + item.value.strip() + trailing_ws
+            elif id(item) in dropdown_cells:
+                dropdown_translations[dropdown_cells.pop(id(item))] = item.value
+            else:
+                cells.append(item)
+        if cells:
+            with profiler.stage(WRITE):
+                writer.add_cells(cells)
+
+    pipeline = TranslationPipeline(
+        translator,
+        batch_size=batch_size,
+        source_lang=source_lang,
+        target_lang=target_lang,
+        context=context,
+        concurrency=concurrency,
+        resolve=resolve,
+        on_batch_done=progress.batch_done,
+        on_resolved=progress.items_resolved,
+        on_dispatch_finished=progress.dispatch_finished,
+        batch_sizer=batch_sizer,
+    )
+    progress.stage_started(TRANSLATE, f"Translating to {target_lang}")
+    with profiler.stage(TRANSLATE):
+        pipeline.run(work_items(), on_translated)
+    progress.stage_finished(TRANSLATE, f"Translated {pipeline.batch_count} batches")
+
+    if not stats["cells"]:
+        if journal is not None:
+            journal.remove()
+        return {"cell_count": 0, "status": "no_content"}
+
+    if pipeline.resolved_count:
+        progress.info(f"Reused {pipeline.resolved_count} existing translations")
+
+    # Map translations back to dropdowns
+    for dropdown in dropdowns:
+        dropdown.translated_values = [
+            dropdown_translations.get(v, v) if not _is_number(v) else v
+            for v in dropdown.values
+        ]
 
     # Write output
-    write_translations(input_file, output_file, translated_cells, dropdowns)
+    progress.stage_started(WRITE, f"Writing translations to {output_file}...")
+    with profiler.stage(WRITE):
+        writer.save(dropdowns)
+    progress.stage_finished(WRITE, f"Wrote {output_file}")
+
+    if journal is not None:
+        journal.remove()
 
     return {
-        "cell_count": len(translated_cells),
-        "rich_text_cells": len(rich_text_cells),
-        "dropdown_count": len(dropdowns) if dropdowns else 0,
+        "cell_count": stats["cells"],
+        "rich_text_cells": stats["rich_text_cells"],
+        "dropdown_count": len(dropdowns),
+        "batch_count": pipeline.batch_count,
+        "reused_count": pipeline.resolved_count,
+        "input_tokens": progress.input_tokens,
+        "output_tokens": progress.output_tokens,
         "status": "completed",
     }
 
 
 def count_cells(input_file: Path, sheets: Optional[set[str]] = None) -> int:
-    """Count translatable cells in a file (for validation before translation)."""
-    with ExcelExtractor(input_file, sheets=sheets) as extractor:
-        return sum(1 for _ in extractor.extract_cells())
+    """Count translatable cells in a file (for validation before translation).
+
+    Reads the package XML directly; pass ``inspect_workbook``'s result to
+    ``translate_file`` instead when the file is translated afterwards.
+    """
+    return inspect_workbook(input_file, sheets).cell_count
+
+
+def list_sheets(input_file: Path) -> list[str]:
+    """Return the sheet names of a workbook, in workbook order."""
+    return read_sheet_names(input_file)
@@ -1,21 +1,236 @@
 """Translation service using Claude API."""
 
-from typing import Optional
-
-from anthropic import Anthropic
+import threading
+import time
+from typing import TYPE_CHECKING, Optional, Protocol
 
 from rosetta.core.config import Config
-from rosetta.core.exceptions import TranslationError
+from rosetta.core.exceptions import CircuitOpenError, TranslationError, TruncatedResponseError
 from rosetta.models import TranslationBatch
+from rosetta.services.hedging import Hedger
+from rosetta.services.metrics import (
+    BATCH_CELLS,
+    BATCH_SECONDS,
+    CIRCUIT_REJECTED,
+    CIRCUIT_STATE,
+    CIRCUIT_TRANSITIONS,
+    HEDGE_TOKENS,
+    PARSE_FAILURES,
+    RETRIES,
+    TOKENS,
+)
+
+if TYPE_CHECKING:
+    import httpx
+    from anthropic import Anthropic
+    from anthropic.types import Message
+
+# Output token limit of each translation request
+MAX_TOKENS = 4096
+
+# Circuit breaker states, with their value in the rosetta_circuit_state gauge
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class BatchTranslator(Protocol):
+    """What the pipeline needs of a translator.
+
+    Satisfied by ``Translator``, by the wrappers around it (caching, journaling,
+    profiling, rate limiting) and by ``BatchScheduler``, which all forward the
+    configuration of the translator they wrap.
+    """
+
+    @property
+    def config(self) -> Config: ...
+
+    def translate_batch(self, batch: TranslationBatch) -> list[str]: ...
+
+
+class CircuitBreaker:
+    """Stops sending requests to a model that keeps failing, and probes it to recover.
+
+    While closed, requests go through and consecutive failures are counted. After
+    ``threshold`` failures in a row the circuit opens: ``allow`` refuses requests,
+    which the translator then fails at once or sends to its fallback model. Once
+    ``cooldown`` seconds have passed, one request is let through as a probe
+    (half-open): its success closes the circuit, its failure opens it again. A
+    probe whose outcome is not recorded within another ``cooldown`` (it hangs, or
+    its caller died) is replaced by a new one.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        threshold: int = 5,
+        cooldown: float = 30.0,
+        fallback: Optional[str] = None,
+    ) -> None:
+        """Initialize the breaker.
+
+        Args:
+            model: Model whose requests are guarded (the metrics label)
+            threshold: Consecutive failures that open the circuit
+            cooldown: Seconds the circuit stays open before a probe
+            fallback: Model used while the circuit is open, for ``describe``
+        """
+        self.model = model
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.fallback = fallback
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probed_at = 0.0
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.set(_STATE_VALUES[CLOSED], model=model)
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def failures(self) -> int:
+        """Consecutive failed requests."""
+        return self._failures
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe (0 unless the circuit is open)."""
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; the first one after the cooldown is the probe."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            now = time.monotonic()
+            if self._state == OPEN and now - self._opened_at >= self.cooldown:
+                self._probed_at = now
+                self._set(HALF_OPEN)
+                return True
+            if self._state == HALF_OPEN and now - self._probed_at >= self.cooldown:
+                # The probe never reported back: let another one through
+                self._probed_at = now
+                return True
+            return False
+
+    def record(self, ok: bool) -> None:
+        """Record the outcome of an allowed request."""
+        with self._lock:
+            if ok:
+                self._failures = 0
+                if self._state != CLOSED:
+                    self._set(CLOSED)
+                return
+            self._failures += 1
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._failures >= self.threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._set(OPEN)
+
+    def describe(self) -> str:
+        """The current state as a sentence for progress output."""
+        if self._state == OPEN:
+            instead = f"using {self.fallback}" if self.fallback else "failing batches"
+            return (
+                f"{self.model} is unavailable after {self._failures} failed requests: "
+                f"{instead} and trying it again in {self.retry_in():.0f}s"
+            )
+        if self._state == HALF_OPEN:
+            return f"Trying {self.model} again"
+        return f"{self.model} is available again"
+
+    def _set(self, state: str) -> None:
+        self._state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], model=self.model)
+        CIRCUIT_TRANSITIONS.inc(model=self.model, state=state)
 
 
 class Translator:
-    """Translates text using Claude API."""
+    """Translates text using Claude API.
 
-    def __init__(self, config: Config) -> None:
-        """Initialize the translator with configuration."""
+    With ``Config.hedge_percentile`` set, a request still running after that
+    percentile of recent latencies is sent a second time (see ``Hedger``). The
+    batch's usage counts the answer that was used; the tokens of the other copy
+    only show in the metrics.
+
+    Requests to ``Config.model`` go through a ``CircuitBreaker``: after
+    ``Config.breaker_threshold`` consecutive overload, server or connection errors,
+    batches go to ``Config.fallback_model`` or fail at once with
+    ``CircuitOpenError`` until a probe succeeds.
+    """
+
+    def __init__(self, config: Config, client: Optional["Anthropic"] = None) -> None:
+        """Initialize the translator with configuration.
+
+        Args:
+            config: Application configuration
+            client: Optional pre-built Anthropic client. If None, a client with a
+                    connection pool sized from the config is created.
+        """
         self.config = config
-        self.client = Anthropic(api_key=config.anthropic_api_key)
+        self.client = client or self._build_client(config)
+        self.hedger: Optional[Hedger] = None
+        if config.hedge_percentile:
+            self.hedger = Hedger(
+                config.hedge_percentile,
+                budget=config.hedge_budget,
+                max_workers=2 * config.max_connections,
+            )
+        self.breaker: Optional[CircuitBreaker] = None
+        if config.breaker_threshold > 0:
+            self.breaker = CircuitBreaker(
+                config.model,
+                config.breaker_threshold,
+                config.breaker_cooldown,
+                fallback=config.fallback_model,
+            )
+
+    @staticmethod
+    def _build_client(config: Config) -> "Anthropic":
+        """Create an Anthropic client with a tuned, thread-safe connection pool."""
+        # The SDK takes most of the CLI's import time: load it when a client is needed
+        import httpx
+        from anthropic import Anthropic, DefaultHttpxClient
+
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        )
+        return Anthropic(
+            api_key=config.anthropic_api_key,
+            base_url=config.base_url,
+            max_retries=config.max_retries,
+            http_client=DefaultHttpxClient(
+                limits=limits, event_hooks={"request": [_count_retries]}
+            ),
+        )
+
+    def warmup(self) -> bool:
+        """Open a pooled connection to the API so the first batch skips TCP/TLS setup.
+
+        Uses the models listing endpoint, which consumes no tokens.
+
+        Returns:
+            True if the API was reachable, False otherwise
+        """
+        try:
+            self.client.with_options(max_retries=0).models.list(limit=1)
+            return True
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        if self.hedger is not None:
+            self.hedger.close()
+        self.client.close()
 
     def translate_batch(self, batch: TranslationBatch) -> list[str]:
         """Translate a batch of text strings.
@@ -27,31 +242,85 @@ class Translator:
             List of translated strings in the same order as input
 
         Raises:
+            CircuitOpenError: If the model's circuit is open and there is no fallback
             TranslationError: If translation fails
         """
         if not batch.cells:
             return []
 
+        model = self.config.model
+        breaker = self.breaker
+        if breaker is not None and not breaker.allow():
+            if not self.config.fallback_model:
+                CIRCUIT_REJECTED.inc(model=model, action="failed")
+                raise CircuitOpenError(
+                    f"Translation failed: {breaker.describe()}", retry_after=breaker.retry_in()
+                )
+            CIRCUIT_REJECTED.inc(model=model, action="fallback")
+            # Only requests to the guarded model count towards its circuit
+            model, breaker = self.config.fallback_model, None
+
         prompt = self._build_prompt(batch)
+        BATCH_CELLS.observe(len(batch))
+        started = time.perf_counter()
+        outcome = "error"
 
-        try:
-            response = self.client.messages.create(
-                model=self.config.model,
-                max_tokens=4096,
+        def create() -> "Message":
+            return self.client.messages.create(
+                model=model,
+                max_tokens=MAX_TOKENS,
                 messages=[{"role": "user", "content": prompt}],
             )
 
+        response = None
+        available = False  # Outcome for the breaker: whether the model answered
+        try:
+            if self.hedger is None:
+                response = create()
+            else:
+                response = self.hedger.call(
+                    create, on_discarded=lambda discarded: _count_discarded(discarded, model)
+                )
+            available = True
+
+            batch.usage.requests += 1
+            batch.usage.sent += len(batch)
+            batch.usage.input_tokens += response.usage.input_tokens
+            batch.usage.output_tokens += response.usage.output_tokens
+            TOKENS.inc(response.usage.input_tokens, model=model, direction="input")
+            TOKENS.inc(response.usage.output_tokens, model=model, direction="output")
+
+            # A cut-off response may still parse, with its last translation incomplete
+            if getattr(response, "stop_reason", None) == "max_tokens":
+                PARSE_FAILURES.inc(kind="truncated")
+                raise TruncatedResponseError(
+                    f"Response truncated at {MAX_TOKENS} output tokens ({len(batch)} texts)"
+                )
+
             # Extract text from response
             translated_text = response.content[0].text
 
             # Parse the translations (one per line)
-            translations = self._parse_translations(translated_text, len(batch))
+            try:
+                translations = self._parse_translations(translated_text, len(batch))
+            except TranslationError:
+                PARSE_FAILURES.inc(kind="response")
+                raise
+            outcome = "ok"
             return translations
 
         except Exception as e:
+            if response is None:
+                available = not _is_unavailable(e)
             raise TranslationError(f"Translation failed: {e}") from e
+        finally:
+            # Even when a BaseException escapes, so a probe is never left in flight
+            if breaker is not None:
+                breaker.record(ok=available)
+            BATCH_SECONDS.observe(time.perf_counter() - started, model=model, outcome=outcome)
 
-    def _build_prompt(self, batch: TranslationBatch) -> str:
+    @staticmethod
+    def _build_prompt(batch: TranslationBatch) -> str:
         """Build the translation prompt for Claude."""
         source_lang = batch.source_lang or "the source language"
         target_lang = batch.target_lang
@@ -130,3 +399,47 @@ Return only the numbered translations, nothing else."""
                 )
 
         return result
+
+
+def failure_kind(error: BaseException) -> str:
+    """Classify an error of ``Translator.translate_batch``.
+
+    Returns:
+        "truncated" if the response hit the output token limit, "response" if it
+        could not be parsed, "rejected" if the request was not sent because the
+        model's circuit is open, or "request" if no usable response was received
+    """
+    if isinstance(error, CircuitOpenError):
+        return "rejected"
+    cause = error.__cause__ if isinstance(error, TranslationError) else None
+    if isinstance(error, TruncatedResponseError) or isinstance(cause, TruncatedResponseError):
+        return "truncated"
+    if isinstance(error, TranslationError) and (
+        cause is None or isinstance(cause, TranslationError)
+    ):
+        return "response"
+    return "request"
+
+
+def _is_unavailable(error: Exception) -> bool:
+    """Whether a request failed because the API is overloaded, failing or unreachable."""
+    # The SDK is loaded by now: a request was sent
+    from anthropic import APIConnectionError, APIStatusError
+
+    if isinstance(error, APIStatusError):
+        return error.status_code >= 500  # Including 529 overloaded
+    return isinstance(error, APIConnectionError)  # Including timeouts
+
+
+def _count_discarded(response: "Message", model: str) -> None:
+    """Count the tokens of a response discarded because its hedged copy answered first."""
+    TOKENS.inc(response.usage.input_tokens, model=model, direction="input")
+    TOKENS.inc(response.usage.output_tokens, model=model, direction="output")
+    HEDGE_TOKENS.inc(response.usage.input_tokens, direction="input")
+    HEDGE_TOKENS.inc(response.usage.output_tokens, direction="output")
+
+
+def _count_retries(request: "httpx.Request") -> None:
+    """Count requests the SDK sends again after a failed attempt (rate limits, overload)."""
+    if request.headers.get("x-stainless-retry-count", "0") != "0":
+        RETRIES.inc()
@@ -1,5 +1,6 @@
 """Pytest fixtures for Rosetta tests."""
 
+import zipfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -32,6 +33,7 @@ def mock_translator(mock_config):
     """
     with patch.object(Translator, "__init__", lambda self, config: None):
         translator = Translator(mock_config)
+        translator.config = mock_config
 
         def mock_translate_batch(batch: TranslationBatch) -> list[str]:
             """Mock translation: prepend [TR] to each text."""
@@ -121,3 +123,137 @@ def excel_with_multiple_sheets(tmp_path):
 
     wb.save(file_path)
     return file_path
+
+
+SHARED_STRINGS_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>\n'
+    '<Default Extension="xml" ContentType="application/xml"/>\n'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>\n'
+    "{sheet_overrides}"
+    '<Override PartName="/xl/sharedStrings.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>\n'
+    "</Types>"
+)
+
+SHARED_STRINGS_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\n'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>\n'
+    "</Relationships>"
+)
+
+SHARED_STRINGS_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">\n'
+    "<sheets>{sheets}</sheets>\n"
+    "</workbook>"
+)
+
+SHARED_STRINGS_SHEET_OVERRIDE = (
+    '<Override PartName="/xl/worksheets/sheet{number}.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>\n'
+)
+
+SHARED_STRINGS_SHEET_RELATIONSHIP = (
+    '<Relationship Id="rId{number}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{number}.xml"/>\n'
+)
+
+SHARED_STRINGS_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\n'
+    "{sheet_relationships}"
+    '<Relationship Id="rIdStrings" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" '
+    'Target="sharedStrings.xml"/>\n'
+    "</Relationships>"
+)
+
+
+def write_shared_strings_workbook(path: Path, strings: list[str], cells: dict[str, int]) -> Path:
+    """Write a minimal xlsx whose text cells use the shared strings table, like Excel does.
+
+    Args:
+        path: Output path
+        strings: Shared string items; raw <si> XML if it starts with "<", else plain text
+        cells: Cell reference -> shared string index (on Sheet1 unless the reference
+               names its sheet, e.g. "Sheet2!A1"; column-major order ok)
+    """
+    items = "".join(s if s.startswith("<") else f"<si><t>{s}</t></si>" for s in strings)
+    shared_strings = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        f'count="{len(cells)}" uniqueCount="{len(strings)}">{items}</sst>'
+    )
+
+    # Sheet name -> row number -> cell XML
+    sheets: dict[str, dict[int, list[str]]] = {"Sheet1": {}}
+    for qualified_ref, index in cells.items():
+        sheet_name, _, ref = qualified_ref.rpartition("!")
+        row = int("".join(ch for ch in ref if ch.isdigit()))
+        rows = sheets.setdefault(sheet_name or "Sheet1", {})
+        rows.setdefault(row, []).append(f'<c r="{ref}" t="s"><v>{index}</v></c>')
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        numbers = range(1, len(sheets) + 1)
+        zf.writestr(
+            "[Content_Types].xml",
+            SHARED_STRINGS_CONTENT_TYPES.format(
+                sheet_overrides="".join(
+                    SHARED_STRINGS_SHEET_OVERRIDE.format(number=n) for n in numbers
+                )
+            ),
+        )
+        zf.writestr("_rels/.rels", SHARED_STRINGS_ROOT_RELS)
+        zf.writestr(
+            "xl/workbook.xml",
+            SHARED_STRINGS_WORKBOOK.format(
+                sheets="".join(
+                    f'<sheet name="{name}" sheetId="{n}" r:id="rId{n}"/>'
+                    for n, name in zip(numbers, sheets)
+                )
+            ),
+        )
+        zf.writestr(
+            "xl/_rels/workbook.xml.rels",
+            SHARED_STRINGS_WORKBOOK_RELS.format(
+                sheet_relationships="".join(
+                    SHARED_STRINGS_SHEET_RELATIONSHIP.format(number=n) for n in numbers
+                )
+            ),
+        )
+        for n, rows in zip(numbers, sheets.values()):
+            sheet_data = "".join(
+                f'<row r="{row}">{"".join(sorted(row_cells))}</row>'
+                for row, row_cells in sorted(rows.items())
+            )
+            zf.writestr(
+                f"xl/worksheets/sheet{n}.xml",
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                f"<sheetData>{sheet_data}</sheetData></worksheet>",
+            )
+        zf.writestr("xl/sharedStrings.xml", shared_strings)
+    return path
+
+
+@pytest.fixture
+def excel_with_shared_strings(tmp_path):
+    """Create an Excel file using a shared strings table, including a rich text entry."""
+    return write_shared_strings_workbook(
+        tmp_path / "shared_strings.xlsx",
+        strings=[
+            "Hello",
+            "World",
+            '<si><r><rPr><b/></rPr><t>Bold</t></r><r><t xml:space="preserve"> text</t></r></si>',
+        ],
+        cells={"A1": 0, "A2": 1, "A3": 2, "B1": 0},
+    )
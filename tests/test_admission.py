@@ -0,0 +1,103 @@
+"""Tests for admission control."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from rosetta.api.admission import AdmissionController
+from rosetta.core.exceptions import OverloadedError, QuotaExceededError
+
+
+class TestTokenBudget:
+    """Tests for the global budget of in-flight tokens."""
+
+    def test_waits_until_tokens_are_released(self):
+        """A translation that does not fit should start once another finishes."""
+        controller = AdmissionController(token_budget=1000, client_quota=0)
+        order = []
+
+        async def main():
+            first = await controller.admit(600)
+            waiting = asyncio.create_task(controller.admit(600))
+            await asyncio.sleep(0.05)
+            order.append(("waiting", controller.waiting, waiting.done()))
+            first.release()
+            second = await waiting
+            order.append(("admitted", controller.in_flight_tokens))
+            second.release()
+            await asyncio.sleep(0)
+            order.append(("idle", controller.in_flight_tokens))
+
+        asyncio.run(main())
+
+        assert order == [("waiting", 1, False), ("admitted", 600), ("idle", 0)]
+
+    def test_oversized_translation_admitted_when_idle(self):
+        """A translation larger than the budget should run alone rather than never."""
+        controller = AdmissionController(token_budget=1000, client_quota=0)
+
+        async def main():
+            admitted = await controller.admit(5000)
+            assert controller.in_flight_tokens == 1000
+            admitted.release()
+
+        asyncio.run(main())
+
+    def test_rejects_when_too_many_are_waiting(self):
+        """Beyond max_waiting, translations should be rejected at once."""
+        controller = AdmissionController(token_budget=1000, client_quota=0, max_waiting=1)
+
+        async def main():
+            await controller.admit(1000)
+            waiting = asyncio.create_task(controller.admit(500))
+            await asyncio.sleep(0)
+            with pytest.raises(OverloadedError) as excinfo:
+                await controller.admit(500)
+            waiting.cancel()
+            return excinfo.value
+
+        error = asyncio.run(main())
+        assert error.retry_after == 30.0
+
+    def test_rejects_after_max_wait(self):
+        """Waiting longer than max_wait should fail and leave the queue."""
+        controller = AdmissionController(token_budget=1000, client_quota=0, max_wait=0.05)
+
+        async def main():
+            await controller.admit(1000)
+            with pytest.raises(OverloadedError):
+                await controller.admit(500)
+            assert controller.waiting == 0
+
+        asyncio.run(main())
+
+
+class TestClientQuota:
+    """Tests for per-client token quotas."""
+
+    def test_quota_exceeded_until_refilled(self):
+        """A client over its quota should be told when to come back."""
+        controller = AdmissionController(token_budget=0, client_quota=1000, quota_window=100)
+
+        with patch("rosetta.api.admission.time.monotonic", return_value=0.0):
+            controller.charge("ip:1", 800)
+            with pytest.raises(QuotaExceededError) as excinfo:
+                controller.charge("ip:1", 500)
+            # Other clients are not affected
+            controller.charge("ip:2", 800)
+
+        # 300 tokens missing at 10 tokens per second
+        assert excinfo.value.retry_after == 30
+
+        with patch("rosetta.api.admission.time.monotonic", return_value=30.0):
+            controller.charge("ip:1", 500)
+
+    def test_settle_refunds_overestimates(self):
+        """Tokens charged but not used should go back to the client."""
+        controller = AdmissionController(token_budget=0, client_quota=1000, quota_window=100)
+
+        with patch("rosetta.api.admission.time.monotonic", return_value=0.0):
+            controller.charge("ip:1", 900)
+            controller.settle("ip:1", charged=900, used=100)
+            controller.charge("ip:1", 900)
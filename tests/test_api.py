@@ -1,15 +1,32 @@
 """Tests for the Rosetta API."""
 
+import asyncio
+import concurrent.futures
+import hashlib
+import importlib
 import io
+import json
+import os
 import tempfile
+import threading
+import time
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from openpyxl import Workbook
+from starlette.background import BackgroundTask
 
 from rosetta.api import app
+from rosetta.api.admission import AdmissionController
+from rosetta.api.recaptcha import RecaptchaVerifier
+from rosetta.api.results import ResultCache
+from rosetta.api.storage import TemporaryFileResponse, Workspace
+
+# The package re-exports the FastAPI instance under the module's name
+app_module = importlib.import_module("rosetta.api.app")
 
 
 @pytest.fixture
@@ -18,9 +35,49 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def cpu_work_in_threads(monkeypatch):
+    """Run CPU-bound work on threads, where mocks patched in this process apply."""
+    monkeypatch.setattr(app_module.offloader, "cpu_workers", 0)
+
+
+@pytest.fixture(autouse=True)
+def jobs_dir(tmp_path, monkeypatch):
+    """Keep each test's job store in its own directory."""
+    path = tmp_path / "jobs"
+    monkeypatch.setattr(app_module, "JOBS_DIR", path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    """Keep each test's request working directories in its own directory."""
+    path = tmp_path / "work"
+    monkeypatch.setattr(app_module, "workspace", Workspace(path))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def result_cache(tmp_path, monkeypatch):
+    """Give each test an empty result cache."""
+    cache = ResultCache(tmp_path / "results", max_bytes=10 * 1024 * 1024, ttl=3600)
+    monkeypatch.setattr(app_module, "results", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def admission(monkeypatch):
+    """Give each test fresh admission limits."""
+    controller = AdmissionController(token_budget=1_000_000, client_quota=1_000_000)
+    monkeypatch.setattr(app_module, "admission", controller)
+    return controller
+
+
 def create_mock_translate_file(sample_excel_bytes):
     """Create a mock translate_file that creates an actual output file."""
-    def mock_translate(input_file, output_file, target_lang, source_lang=None, context=None, sheets=None):
+    def mock_translate(
+        input_file, output_file, target_lang, source_lang=None, context=None, sheets=None, **kwargs
+    ):
         # Create an actual output file (copy of input)
         wb = Workbook()
         ws = wb.active
@@ -172,11 +229,31 @@ class TestTranslateEndpoint:
         call_kwargs = mock_translate.call_args.kwargs
         assert call_kwargs["context"] == "Medical terminology"
 
-    @patch("rosetta.api.app.count_cells")
     @patch("rosetta.api.app.translate_file")
-    def test_translation_with_sheets(self, mock_translate, mock_count, client, sample_excel_bytes):
+    def test_translation_reuses_inspection(self, mock_translate, client, sample_excel_bytes):
+        """The inspection made to validate the upload should be passed to translate_file."""
+        mock_translate.side_effect = create_mock_translate_file(sample_excel_bytes)
+
+        response = client.post(
+            "/translate",
+            files={"file": ("test.xlsx", sample_excel_bytes)},
+            data={"target_lang": "french"},
+        )
+
+        assert response.status_code == 200
+        inspection = mock_translate.call_args.kwargs["inspection"]
+        assert inspection.texts == ["Hello", "World"]
+
+    @patch("rosetta.api.app.inspect_workbook")
+    @patch("rosetta.api.app.estimate_file")
+    @patch("rosetta.api.app.translate_file")
+    def test_translation_with_sheets(
+        self, mock_translate, mock_estimate, mock_inspect, client, sample_excel_bytes
+    ):
         """POST /translate with sheets param should filter sheets."""
-        mock_count.return_value = 2  # Pretend we found cells
+        # Pretend we found cells
+        mock_inspect.return_value = MagicMock(cell_count=2)
+        mock_estimate.return_value = MagicMock(cell_count=2, input_tokens=100, output_tokens=50)
         mock_translate.side_effect = create_mock_translate_file(sample_excel_bytes)
 
         response = client.post(
@@ -224,6 +301,18 @@ class TestFileSizeLimits:
         assert response.status_code == 400
         assert "File too large" in response.json()["detail"]
 
+    def test_rejection_carries_cors_headers(self, client):
+        """A browser on an allowed origin should be able to read the size error."""
+        response = client.post(
+            "/translate",
+            files={"file": ("large.xlsx", b"x" * (51 * 1024 * 1024))},
+            data={"target_lang": "french"},
+            headers={"Origin": "http://localhost:3000"},
+        )
+
+        assert response.status_code == 400
+        assert response.headers["Access-Control-Allow-Origin"] == "http://localhost:3000"
+
 
 class TestSheetsEndpoint:
     """Tests for the /sheets endpoint."""
@@ -290,3 +379,876 @@ class TestSheetsEndpoint:
         assert "File too large" in response.json()["detail"]
 
 
+class TestSharedTranslator:
+    """Tests for the application-scoped translator."""
+
+    def test_lifespan_creates_shared_translator(self, monkeypatch):
+        """Startup should build one translator and warm it up."""
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+
+        with patch("rosetta.api.app.Translator.warmup", return_value=True) as mock_warmup:
+            with TestClient(app) as client:
+                translator = client.app.state.translator
+                assert translator is not None
+                assert client.get("/").status_code == 200
+
+        mock_warmup.assert_called_once()
+        assert app.state.translator is None
+
+    def test_lifespan_without_api_key(self, monkeypatch):
+        """Startup should not fail when no API key is configured."""
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+
+        with TestClient(app) as client:
+            assert client.app.state.translator is None
+
+    @patch("rosetta.api.app.translate_file")
+    def test_translate_passes_shared_translator(
+        self, mock_translate, monkeypatch, sample_excel_bytes
+    ):
+        """/translate should send batches through the shared translator's scheduler."""
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        mock_translate.side_effect = create_mock_translate_file(sample_excel_bytes)
+
+        with patch("rosetta.api.app.Translator.warmup", return_value=True):
+            with TestClient(app) as client:
+                for target_lang in ("french", "german"):
+                    response = client.post(
+                        "/translate",
+                        files={"file": ("test.xlsx", sample_excel_bytes)},
+                        data={"target_lang": target_lang},
+                    )
+                    assert response.status_code == 200
+
+                shared = client.app.state.translator
+                scheduler = client.app.state.scheduler
+
+        translators = [call.kwargs["translator"] for call in mock_translate.call_args_list]
+        assert translators == [scheduler, scheduler]
+        assert scheduler.translator is shared
+
+
+class TestEstimateEndpoint:
+    """Tests for the /estimate endpoint."""
+
+    def test_estimate_returns_projection(self, client, sample_excel_bytes):
+        """POST /estimate should plan the translation without calling the API."""
+        with patch("rosetta.services.translator.Translator.translate_batch") as mock_batch:
+            response = client.post(
+                "/estimate",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french", "concurrency": "2"},
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["cell_count"] == 2
+        assert data["batch_count"] == 1
+        assert data["concurrency"] == 2
+        assert data["input_tokens"] > 0
+        assert data["exceeds_cell_limit"] is False
+        mock_batch.assert_not_called()
+
+    def test_estimate_invalid_file_type(self, client):
+        """POST /estimate with non-Excel file should return 400."""
+        response = client.post(
+            "/estimate",
+            files={"file": ("test.txt", b"Hello world")},
+            data={"target_lang": "french"},
+        )
+
+        assert response.status_code == 400
+
+
+def translate_with_progress(sample_excel_bytes):
+    """Create a mock translate_file that reports progress and writes an output file."""
+    from rosetta.services.progress import ProgressReporter
+
+    write_output = create_mock_translate_file(sample_excel_bytes)
+
+    def translate(input_file, output_file, target_lang, on_progress=None, **kwargs):
+        progress = ProgressReporter(on_progress)
+        progress.info("Working")
+        result = write_output(input_file, output_file, target_lang)
+        progress.completed(result)
+        return result
+
+    return translate
+
+
+def wait_for_job(client, job_id, timeout=5.0):
+    """Poll a job until it has finished."""
+    import time
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+class TestJobs:
+    """Tests for background jobs."""
+
+    @patch("rosetta.api.app.translate_file")
+    def test_job_streams_progress_and_serves_result(
+        self, mock_translate, monkeypatch, sample_excel_bytes
+    ):
+        """A job should stream its events and then serve the translated file."""
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        mock_translate.side_effect = translate_with_progress(sample_excel_bytes)
+
+        with TestClient(app) as client:
+            response = client.post(
+                "/jobs",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french"},
+            )
+            assert response.status_code == 202
+            job = response.json()
+            assert job["status"] == "queued"
+            assert job["input_sha256"] == hashlib.sha256(sample_excel_bytes).hexdigest()
+
+            events = client.get(job["events_url"])
+            assert events.headers["content-type"].startswith("text/event-stream")
+            assert "event: info" in events.text
+            assert events.text.rstrip().split("\n\n")[-1].startswith("event: completed")
+
+            status = client.get(job["status_url"]).json()
+            assert status["status"] == "completed"
+            assert status["result"]["cell_count"] == 2
+
+            result = client.get(job["result_url"])
+            assert result.status_code == 200
+            assert result.headers["X-Cells-Translated"] == "2"
+
+    @patch("rosetta.api.app.translate_file")
+    def test_failed_job_reports_error(self, mock_translate, sample_excel_bytes):
+        """A failing translation should mark the job failed, with no result."""
+        mock_translate.side_effect = RuntimeError("API down")
+
+        with TestClient(app) as client:
+            job = client.post(
+                "/jobs",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french"},
+            ).json()
+
+            status = wait_for_job(client, job["job_id"])
+            assert status["status"] == "failed"
+            assert status["error"] == "API down"
+            assert client.get(job["result_url"]).status_code == 409
+
+    def test_queue_full_returns_503(self, sample_excel_bytes, monkeypatch):
+        """Submissions beyond the worker pool and queue should be rejected."""
+        monkeypatch.setattr(app_module, "MAX_QUEUED_JOBS", 0)
+        monkeypatch.setattr(app_module, "JOB_WORKERS", 1)
+        release = threading.Event()
+
+        def blocked(*args, **kwargs):
+            release.wait(5)
+            raise RuntimeError("stopped")
+
+        with patch("rosetta.api.app.translate_file", side_effect=blocked):
+            with TestClient(app) as client:
+                first = client.post(
+                    "/jobs",
+                    files={"file": ("test.xlsx", sample_excel_bytes)},
+                    data={"target_lang": "french"},
+                )
+                second = client.post(
+                    "/jobs",
+                    files={"file": ("test.xlsx", sample_excel_bytes)},
+                    data={"target_lang": "french"},
+                )
+                release.set()
+
+        assert first.status_code == 202
+        assert second.status_code == 503
+        assert second.headers["Retry-After"]
+
+    @patch("rosetta.api.app.translate_file")
+    def test_unfinished_jobs_resume_after_restart(
+        self, mock_translate, jobs_dir, sample_excel_bytes
+    ):
+        """Jobs left queued by a previous process should run on startup."""
+        from rosetta.api.jobs import QUEUED, JobRecord, JobStore
+
+        store = JobStore(jobs_dir)
+        store.workdir("old").mkdir()
+        store.input_path("old").write_bytes(sample_excel_bytes)
+        store.add(JobRecord(id="old", status=QUEUED, filename="old.xlsx", target_lang="french"))
+        store.close()
+        mock_translate.side_effect = translate_with_progress(sample_excel_bytes)
+
+        with TestClient(app) as client:
+            status = wait_for_job(client, "old")
+
+        assert status["status"] == "completed"
+
+    @patch("rosetta.api.app.translate_file")
+    def test_finished_job_events_released(self, mock_translate, sample_excel_bytes):
+        """Live events should be dropped once a job ends; its final event stays available."""
+        import time
+
+        mock_translate.side_effect = translate_with_progress(sample_excel_bytes)
+
+        with TestClient(app) as client:
+            job = client.post(
+                "/jobs",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french"},
+            ).json()
+            wait_for_job(client, job["job_id"])
+            deadline = time.monotonic() + 5
+            while app.state.jobs.events(job["job_id"]) is not None:
+                assert time.monotonic() < deadline
+                time.sleep(0.02)
+
+            events = client.get(job["events_url"])
+
+        assert events.text.startswith("event: completed")
+
+    def test_expired_jobs_deleted(self, jobs_dir, monkeypatch, sample_excel_bytes):
+        """Finished jobs older than ROSETTA_JOB_TTL should be deleted with their files."""
+        import time
+
+        from rosetta.api.jobs import JobRecord, JobStore
+
+        monkeypatch.setattr(app_module, "JOB_TTL", 3600)
+        store = JobStore(jobs_dir)
+        now = time.time()
+        for job_id, status, updated_at in [
+            ("old", "completed", now - 7200),
+            ("recent", "failed", now - 60),
+        ]:
+            store.workdir(job_id).mkdir()
+            store.output_path(job_id).write_bytes(sample_excel_bytes)
+            store.add(
+                JobRecord(
+                    id=job_id,
+                    status=status,
+                    filename=f"{job_id}.xlsx",
+                    target_lang="french",
+                    created_at=updated_at,
+                    updated_at=updated_at,
+                )
+            )
+        store.close()
+
+        with TestClient(app) as client:
+            assert client.get("/jobs/old").status_code == 404
+            assert client.get("/jobs/recent").status_code == 200
+
+        assert not store.workdir("old").exists()
+        assert store.output_path("recent").exists()
+
+    def test_unknown_job(self):
+        """Unknown job ids should return 404."""
+        with TestClient(app) as client:
+            assert client.get("/jobs/nope").status_code == 404
+            assert client.get("/jobs/nope/result").status_code == 404
+
+
+class TestOffloading:
+    """Tests for running blocking work off the event loop."""
+
+    def test_sheets_parsed_in_process_pool(self, monkeypatch, sample_excel_bytes):
+        """Workbook parsing should work in a pool process and report its CPU time."""
+        monkeypatch.setattr(app_module.offloader, "cpu_workers", 1)
+
+        with TestClient(app) as client:
+            response = client.post("/sheets", files={"file": ("test.xlsx", sample_excel_bytes)})
+
+        assert response.status_code == 200
+        assert response.json()["sheets"] == ["Sheet"]
+        assert response.headers["Server-Timing"].startswith("cpu;dur=")
+
+    def test_pool_process_metrics_reach_metrics_endpoint(self, monkeypatch, sample_excel_bytes):
+        """Stage timings and parse failures recorded in a pool process should be served."""
+        from rosetta.services.metrics import PARSE_FAILURES, STAGE_SECONDS
+
+        monkeypatch.setattr(app_module.offloader, "cpu_workers", 1)
+        inspections = STAGE_SECONDS.count(stage="inspect")
+        failures = PARSE_FAILURES.value(kind="workbook")
+
+        with TestClient(app) as client:
+            estimated = client.post(
+                "/estimate",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french"},
+            )
+            broken = client.post(
+                "/estimate",
+                files={"file": ("broken.xlsx", b"PK\x03\x04 not a workbook")},
+                data={"target_lang": "french"},
+            )
+            metrics = client.get("/metrics").text
+
+        assert estimated.status_code == 200
+        assert broken.status_code == 500
+        assert STAGE_SECONDS.count(stage="inspect") == inspections + 2
+        assert PARSE_FAILURES.value(kind="workbook") == failures + 1
+        assert 'rosetta_stage_duration_seconds_count{stage="inspect"}' in metrics
+
+    def test_event_loop_stays_responsive(self, sample_excel_bytes):
+        """A slow translation should not block other requests."""
+        release = threading.Event()
+
+        def slow_translate(*args, **kwargs):
+            release.wait(5)
+            raise RuntimeError("stopped")
+
+        with patch("rosetta.api.app.translate_file", side_effect=slow_translate):
+            with TestClient(app) as client:
+                with concurrent.futures.ThreadPoolExecutor(1) as pool:
+                    pending = pool.submit(
+                        client.post,
+                        "/translate",
+                        files={"file": ("test.xlsx", sample_excel_bytes)},
+                        data={"target_lang": "french"},
+                    )
+                    # The health check answers while the translation is still running
+                    assert client.get("/").status_code == 200
+                    assert not pending.done()
+                    release.set()
+                    assert pending.result().status_code == 500
+
+
+class TestStorage:
+    """Tests for request file cleanup and the disk usage gauge."""
+
+    @patch("rosetta.api.app.translate_file")
+    def test_files_removed_after_download(
+        self, mock_translate, client, sample_excel_bytes, work_dir
+    ):
+        """The upload and the translated file should be deleted once sent."""
+        mock_translate.side_effect = create_mock_translate_file(sample_excel_bytes)
+
+        response = client.post(
+            "/translate",
+            files={"file": ("test.xlsx", sample_excel_bytes)},
+            data={"target_lang": "french"},
+        )
+
+        assert response.status_code == 200
+        assert response.content[:2] == b"PK"
+        assert list(work_dir.iterdir()) == []
+        assert app_module.workspace.active == 0
+
+    @patch("rosetta.api.app.translate_file")
+    def test_files_removed_after_failure(
+        self, mock_translate, client, sample_excel_bytes, work_dir
+    ):
+        """A failed translation should not leave its files behind."""
+        mock_translate.side_effect = Exception("API error")
+
+        response = client.post(
+            "/translate",
+            files={"file": ("test.xlsx", sample_excel_bytes)},
+            data={"target_lang": "french"},
+        )
+
+        assert response.status_code == 500
+        assert list(work_dir.iterdir()) == []
+
+    def test_storage_reports_disk_usage(self, client, work_dir):
+        """GET /storage should report the space used by request and job files."""
+        workdir = app_module.workspace.create()
+        (workdir / "input.xlsx").write_bytes(b"x" * 1000)
+
+        response = client.get("/storage")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["active_workdirs"] == 1
+        assert body["work"]["used_bytes"] == 1000
+        assert body["work"]["files"] == 1
+        assert body["work"]["free_bytes"] > 0
+        assert body["jobs"]["used_bytes"] == 0
+
+    def test_cleanup_runs_when_client_disconnects(self, tmp_path):
+        """The background task should run even if sending the file fails."""
+        path = tmp_path / "output.xlsx"
+        path.write_bytes(b"x" * 1000)
+        cleaned = []
+        response = TemporaryFileResponse(
+            path, background=BackgroundTask(lambda: cleaned.append(True))
+        )
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                raise OSError("Connection reset")
+
+        scope = {"type": "http", "method": "GET", "headers": [], "asgi": {"spec_version": "2.4"}}
+        with pytest.raises(OSError):
+            asyncio.run(response(scope, receive, send))
+
+        assert cleaned == [True]
+
+
+class TestResultCache:
+    """Tests for reusing the results of identical /translate requests."""
+
+    @patch("rosetta.api.app.translate_file")
+    def test_identical_request_served_from_cache(
+        self, mock_translate, client, sample_excel_bytes
+    ):
+        """Repeating a request should return the cached file without translating."""
+        mock_translate.side_effect = create_mock_translate_file(sample_excel_bytes)
+
+        def post():
+            return client.post(
+                "/translate",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french", "context": "Finance"},
+            )
+
+        first = post()
+        second = post()
+
+        assert mock_translate.call_count == 1
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.headers["X-Cells-Translated"] == "2"
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert second.headers["Cache-Control"] == "private, max-age=3600"
+        assert second.content == first.content
+
+    @patch("rosetta.api.app.translate_file")
+    def test_different_options_are_not_shared(self, mock_translate, client, sample_excel_bytes):
+        """Changing any translation option should translate again."""
+        mock_translate.side_effect = create_mock_translate_file(sample_excel_bytes)
+
+        for context in ("Finance", "Medical"):
+            response = client.post(
+                "/translate",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french", "context": context},
+            )
+            assert response.headers["X-Cache"] == "MISS"
+
+        assert mock_translate.call_count == 2
+
+    @patch("rosetta.api.app.translate_file")
+    def test_concurrent_identical_requests_share_one_translation(
+        self, mock_translate, client, sample_excel_bytes
+    ):
+        """Requests arriving while an identical one is running should wait for it."""
+        release = threading.Event()
+        translate = create_mock_translate_file(sample_excel_bytes)
+
+        def slow_translate(*args, **kwargs):
+            release.wait(5)
+            return translate(*args, **kwargs)
+
+        mock_translate.side_effect = slow_translate
+
+        def post():
+            return client.post(
+                "/translate",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french"},
+            )
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(post) for _ in range(3)]
+            # Let every request reach the cache before the translation finishes
+            time.sleep(0.5)
+            release.set()
+            responses = [future.result() for future in futures]
+
+        assert mock_translate.call_count == 1
+        assert all(response.status_code == 200 for response in responses)
+        assert sorted(response.headers["X-Cache"] for response in responses) == [
+            "COALESCED",
+            "COALESCED",
+            "MISS",
+        ]
+
+    @patch("rosetta.api.app.translate_file")
+    def test_failures_are_not_cached(self, mock_translate, client, sample_excel_bytes):
+        """A failed translation should be retried by the next request."""
+        translate = create_mock_translate_file(sample_excel_bytes)
+        calls = []
+
+        def fail_once(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise Exception("API error")
+            return translate(*args, **kwargs)
+
+        mock_translate.side_effect = fail_once
+
+        def post():
+            return client.post(
+                "/translate",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french"},
+            )
+
+        assert post().status_code == 500
+        response = post()
+        assert response.status_code == 200
+        assert response.headers["X-Cache"] == "MISS"
+
+
+    @patch("rosetta.api.app.translate_file")
+    def test_stale_cache_hint_still_validated(self, mock_translate, client, sample_excel_bytes):
+        """An entry evicted after a lookup said it was cached should be handled as a miss."""
+        mock_translate.side_effect = create_mock_translate_file(sample_excel_bytes)
+
+        with patch.object(ResultCache, "contains", return_value=True):
+            response = client.post(
+                "/translate",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french"},
+            )
+
+        assert response.headers["X-Cache"] == "MISS"
+        # The workbook was inspected (and its cells counted) before translating
+        assert mock_translate.call_args.kwargs["inspection"].cell_count == 2
+
+    def test_waiter_does_not_share_producer_failure(self, tmp_path):
+        """A request waiting on one that failed (e.g. over its quota) should produce itself."""
+        cache = ResultCache(tmp_path / "cache", max_bytes=10_000, ttl=60)
+        started, fail = threading.Event(), threading.Event()
+
+        def failing(output):
+            started.set()
+            fail.wait(5)
+            raise RuntimeError("Token quota exceeded for another client")
+
+        def producing(output):
+            output.write_bytes(b"xlsx")
+            return {"cell_count": 1}
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(cache.fetch, "a", tmp_path / "first.xlsx", failing)
+            started.wait(5)
+            second = pool.submit(cache.fetch, "a", tmp_path / "second.xlsx", producing)
+            time.sleep(0.2)  # Let the second request start waiting
+            fail.set()
+
+            with pytest.raises(RuntimeError):
+                first.result()
+            assert second.result() == ({"cell_count": 1}, "MISS")
+
+
+class TestResultCacheEviction:
+    """Tests for the size and age limits of the result cache."""
+
+    def produce(self, size):
+        def write(output):
+            output.write_bytes(b"x" * size)
+            return {"cell_count": 1}
+
+        return write
+
+    def test_least_recently_used_entries_evicted(self, tmp_path):
+        """Entries beyond the size limit should be dropped, oldest access first."""
+        cache = ResultCache(tmp_path / "cache", max_bytes=2500, ttl=3600)
+
+        for key in ["a", "b", "c"]:
+            cache.fetch(key, tmp_path / f"{key}.xlsx", self.produce(1000))
+            if key == "b":
+                # Use "a" again, so "b" becomes the least recently used entry
+                os.utime(cache._data_path("a"), (time.time() + 10, time.time() + 10))
+
+        assert cache.contains("a")
+        assert not cache.contains("b")
+        assert cache.contains("c")
+
+    def test_expired_entries_are_produced_again(self, tmp_path):
+        """Entries older than the TTL should not be served."""
+        cache = ResultCache(tmp_path / "cache", max_bytes=10_000, ttl=60)
+        cache.fetch("a", tmp_path / "first.xlsx", self.produce(10))
+
+        with patch("rosetta.api.results.time.time", return_value=time.time() + 120):
+            _, status = cache.fetch("a", tmp_path / "second.xlsx", self.produce(10))
+
+        assert status == "MISS"
+
+
+class TestRecaptcha:
+    """Tests for reCAPTCHA checks on translation endpoints."""
+
+    def test_rejected_token_returns_400(self, monkeypatch, sample_excel_bytes):
+        """A token the verifier rejects should fail the request before any work."""
+
+        async def handle(request):
+            return httpx.Response(200, json={"success": False})
+
+        monkeypatch.setattr(app_module, "RECAPTCHA_SECRET_KEY", "secret")
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+
+        with TestClient(app) as client:
+            client.app.state.recaptcha = RecaptchaVerifier(
+                "secret",
+                verify_url="https://stub/verify",
+                client=httpx.AsyncClient(transport=httpx.MockTransport(handle)),
+            )
+            response = client.post(
+                "/translate",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french", "recaptcha_token": "expired"},
+            )
+
+        assert response.status_code == 400
+        assert "reCAPTCHA" in response.json()["detail"]
+
+
+class TestAdmission:
+    """Tests for admission control on /translate and /jobs."""
+
+    @patch("rosetta.api.app.translate_file")
+    def test_client_over_quota_gets_429(
+        self, mock_translate, client, sample_excel_bytes, admission
+    ):
+        """A client that used up its quota should be told when to retry."""
+        translate = create_mock_translate_file(sample_excel_bytes)
+
+        def translate_with_usage(*args, **kwargs):
+            return {**translate(*args, **kwargs), "input_tokens": 400, "output_tokens": 100}
+
+        mock_translate.side_effect = translate_with_usage
+        admission.client_quota = 500
+
+        def post(target_lang):
+            return client.post(
+                "/translate",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": target_lang},
+            )
+
+        assert post("french").status_code == 200
+        response = post("german")
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+        assert mock_translate.call_count == 1
+
+    @patch("rosetta.api.app.translate_file")
+    def test_busy_server_returns_503(self, mock_translate, client, sample_excel_bytes, admission):
+        """When the token budget is in use and nobody may wait, requests are rejected."""
+        admission.max_waiting = 0
+        admission.in_flight_tokens = admission.token_budget  # Another translation runs
+
+        response = client.post(
+            "/translate",
+            files={"file": ("test.xlsx", sample_excel_bytes)},
+            data={"target_lang": "french"},
+        )
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "30"
+        mock_translate.assert_not_called()
+
+    @patch("rosetta.api.app.translate_file")
+    def test_job_records_estimated_cost(self, mock_translate, sample_excel_bytes):
+        """Jobs should be charged their estimated tokens and run once admitted."""
+        mock_translate.side_effect = translate_with_progress(sample_excel_bytes)
+
+        with TestClient(app) as client:
+            job = client.post(
+                "/jobs",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french"},
+            ).json()
+            wait_for_job(client, job["job_id"])
+            record = client.app.state.jobs.get(job["job_id"])
+
+        assert record.status == "completed"
+        assert record.estimated_tokens > 0
+        assert record.client.startswith("ip:")
+
+    @patch("rosetta.api.app.translate_file")
+    def test_failed_translation_refunds_quota(
+        self, mock_translate, client, sample_excel_bytes, admission
+    ):
+        """A translation that fails should give the client back the tokens it was charged."""
+        mock_translate.side_effect = RuntimeError("API error")
+
+        response = client.post(
+            "/translate",
+            files={"file": ("test.xlsx", sample_excel_bytes)},
+            data={"target_lang": "french"},
+        )
+
+        assert response.status_code == 500
+        mock_translate.assert_called_once()
+        assert admission._refill("ip:testclient") == admission.client_quota
+        assert admission.in_flight_tokens == 0
+
+    @patch("rosetta.api.app.translate_file")
+    def test_failed_job_refunds_quota(self, mock_translate, sample_excel_bytes, admission):
+        """A background job that fails should give its client's charge back."""
+        mock_translate.side_effect = RuntimeError("Could not parse the workbook")
+
+        with TestClient(app) as client:
+            job = client.post(
+                "/jobs",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french"},
+            ).json()
+            assert wait_for_job(client, job["job_id"])["status"] == "failed"
+            record = client.app.state.jobs.get(job["job_id"])
+
+        assert record.estimated_tokens > 0
+        assert admission._refill(record.client) == admission.client_quota
+
+    def test_job_that_cannot_start_refunds_quota(self, sample_excel_bytes, admission):
+        """A job dropped after its charge, whatever the error, should give the charge back."""
+        with TestClient(app) as client:
+            with patch.object(
+                client.app.state.jobs.store, "update", side_effect=OSError("disk full")
+            ):
+                response = client.post(
+                    "/jobs",
+                    files={"file": ("test.xlsx", sample_excel_bytes)},
+                    data={"target_lang": "french"},
+                )
+
+        assert response.status_code == 500
+        assert admission._refill("ip:testclient") == admission.client_quota
+
+
+class TestMetrics:
+    """Tests for the /metrics endpoint."""
+
+    @patch("rosetta.api.app.translate_file")
+    def test_metrics_after_translations(self, mock_translate, client, sample_excel_bytes):
+        """Result cache lookups and gauges should be exposed in the Prometheus format."""
+        mock_translate.side_effect = create_mock_translate_file(sample_excel_bytes)
+        lookups = app_module.CACHE_LOOKUPS
+        misses = lookups.value(cache="result", result="miss")
+        hits = lookups.value(cache="result", result="hit")
+
+        for _ in range(2):
+            response = client.post(
+                "/translate",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french"},
+            )
+            assert response.status_code == 200
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert lookups.value(cache="result", result="miss") == misses + 1
+        assert lookups.value(cache="result", result="hit") == hits + 1
+        assert "# TYPE rosetta_stage_duration_seconds histogram" in response.text
+        assert "rosetta_translate_requests_in_flight 0" in response.text
+        assert "rosetta_admission_tokens_in_flight 0" in response.text
+        assert "rosetta_active_workdirs 0" in response.text
+
+
+PROFILE = {
+    "wall_seconds": 1.5,
+    "cpu_seconds": 1.2,
+    "peak_memory_mb": 12.0,
+    "stages": {
+        "load": {"calls": 1, "wall_seconds": 0.25, "cpu_seconds": 0.2, "peak_memory_mb": 4.0}
+    },
+    "batches": [{"cells": 2, "wall_seconds": 0.8}],
+    "dumps": {},
+}
+
+
+def translate_with_profile(sample_excel_bytes):
+    """Create a mock translate_file that adds a profile to its stats when asked to."""
+    write_output = create_mock_translate_file(sample_excel_bytes)
+
+    def translate(input_file, output_file, target_lang, on_progress=None, profile=False, **kwargs):
+        result = write_output(input_file, output_file, target_lang)
+        if profile:
+            result["profile"] = PROFILE
+        if on_progress is not None:
+            from rosetta.services.progress import ProgressReporter
+
+            ProgressReporter(on_progress).completed(result)
+        return result
+
+    return translate
+
+
+class TestProfiling:
+    """Tests for profiling requested with the X-Rosetta-Profile header."""
+
+    @pytest.fixture(autouse=True)
+    def allow_profiling(self, monkeypatch):
+        """Let anonymous test clients ask for profiles."""
+        monkeypatch.setattr(app_module, "ALLOW_PROFILING", True)
+
+    @patch("rosetta.api.app.translate_file")
+    def test_profiled_translation(self, mock_translate, client, sample_excel_bytes):
+        """A profiled request should bypass the cache and return the profile in headers."""
+        mock_translate.side_effect = translate_with_profile(sample_excel_bytes)
+
+        def post(**headers):
+            return client.post(
+                "/translate",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french"},
+                headers=headers,
+            )
+
+        plain = post()
+        profiled = post(**{"X-Rosetta-Profile": "1"})
+
+        assert mock_translate.call_count == 2
+        assert "X-Rosetta-Profile" not in plain.headers
+        assert profiled.headers["X-Cache"] == "BYPASS"
+        summary = json.loads(profiled.headers["X-Rosetta-Profile"])
+        assert summary["stages"] == PROFILE["stages"]
+        assert "batches" not in summary
+        assert "load;dur=250.0" in profiled.headers["Server-Timing"]
+        assert profiled.headers["Server-Timing"].startswith("cpu;dur=")
+
+    @patch("rosetta.api.app.translate_file")
+    def test_profiled_job(self, mock_translate, sample_excel_bytes):
+        """A profiled job should keep the full profile in its result."""
+        mock_translate.side_effect = translate_with_profile(sample_excel_bytes)
+
+        with TestClient(app) as client:
+            job = client.post(
+                "/jobs",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french"},
+                headers={"X-Rosetta-Profile": "1"},
+            ).json()
+            status = wait_for_job(client, job["job_id"])
+
+        assert status["status"] == "completed"
+        assert status["result"]["profile"] == PROFILE
+        assert mock_translate.call_args.kwargs["profile"] is True
+
+    @patch("rosetta.api.app.translate_file")
+    def test_profiling_needs_api_key(
+        self, mock_translate, client, sample_excel_bytes, monkeypatch
+    ):
+        """Unless profiling is open to everyone, only clients with an API key get profiles."""
+        mock_translate.side_effect = translate_with_profile(sample_excel_bytes)
+        monkeypatch.setattr(app_module, "ALLOW_PROFILING", False)
+        monkeypatch.setattr(app_module, "API_KEYS", {"secret"})
+
+        def post(**headers):
+            return client.post(
+                "/translate",
+                files={"file": ("test.xlsx", sample_excel_bytes)},
+                data={"target_lang": "french"},
+                headers={"X-Rosetta-Profile": "1", **headers},
+            )
+
+        anonymous = post()
+        keyed = post(**{"X-API-Key": "secret"})
+
+        assert "X-Rosetta-Profile" not in anonymous.headers
+        assert anonymous.headers["X-Cache"] == "MISS"
+        assert keyed.headers["X-Cache"] == "BYPASS"
+        assert "X-Rosetta-Profile" in keyed.headers
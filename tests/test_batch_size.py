@@ -0,0 +1,190 @@
+"""Tests for the adaptive batch size and its use by the pipeline."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from rosetta.core.exceptions import TranslationError, TruncatedResponseError
+from rosetta.models import Cell, TranslationBatch
+from rosetta.services import Translator
+from rosetta.services.batch_size import ERROR, OK, TRUNCATED, AdaptiveBatchSize
+from rosetta.services.metrics import BATCH_SIZE, BATCH_SIZE_CHANGES, PARSE_FAILURES
+from rosetta.services.pipeline import TranslationPipeline
+from rosetta.services.progress import INFO, ProgressReporter
+from rosetta.services.translator import failure_kind
+
+
+def make_cells(count: int) -> list[Cell]:
+    return [Cell(sheet="Sheet1", row=i + 1, col=1, value=f"text {i}") for i in range(count)]
+
+
+class TestAdaptiveBatchSize:
+    """Tests for AdaptiveBatchSize."""
+
+    def test_grows_while_faster_per_text(self):
+        """Full batches at least as fast per text should add texts to the next one."""
+        sizer = AdaptiveBatchSize(50, increase=5)
+
+        assert sizer.record(50, 5.0, OK) is None  # First measurement: nothing to compare
+        decision = sizer.record(50, 4.5, OK)
+
+        assert (decision.old, decision.new, decision.reason) == (50, 55, "faster per text")
+        assert sizer.size == 55
+        assert BATCH_SIZE.value() == 55
+        assert str(decision) == "Batch size 50 -> 55 (faster per text)"
+
+    def test_shrinks_on_errors_and_truncation(self):
+        """Failed and truncated requests should halve the size, down to the minimum."""
+        sizer = AdaptiveBatchSize(40, minimum=8)
+        changes = BATCH_SIZE_CHANGES.value(direction="down", reason=TRUNCATED)
+
+        assert sizer.record(40, 1.0, ERROR).new == 20
+        assert sizer.record(20, 1.0, TRUNCATED).new == 10
+        assert sizer.record(10, 1.0, ERROR).new == 8
+        assert sizer.record(8, 1.0, ERROR) is None
+        assert BATCH_SIZE_CHANGES.value(direction="down", reason=TRUNCATED) == changes + 1
+
+    def test_failure_of_older_larger_batch_ignored(self):
+        """A batch sent before a decrease should not decrease the size again."""
+        sizer = AdaptiveBatchSize(40)
+        sizer.record(40, 1.0, ERROR)
+
+        assert sizer.record(40, 1.0, ERROR) is None
+        assert sizer.size == 20
+
+    def test_latency_spike(self):
+        """A batch much slower per text than the average should halve the size."""
+        sizer = AdaptiveBatchSize(50)
+        sizer.record(50, 1.0, OK)
+
+        decision = sizer.record(50, 3.0, OK)
+
+        assert (decision.new, decision.reason) == (25, "latency spike")
+
+    def test_short_batches_do_not_grow(self):
+        """The short last batch of a file should neither grow nor skew the average."""
+        sizer = AdaptiveBatchSize(50)
+        sizer.record(50, 5.0, OK)
+
+        assert sizer.record(10, 0.1, OK) is None
+        assert sizer.record(50, 5.4, OK).reason == "faster per text"
+
+    def test_no_growth_after_recent_failures(self):
+        """The size should not grow again while many recent requests failed."""
+        sizer = AdaptiveBatchSize(50, decrease=1.0)
+        sizer.record(50, 5.0, OK)
+        sizer.record(50, 5.0, ERROR)
+
+        assert sizer.record(50, 4.0, OK) is None
+
+
+class TestTruncation:
+    """Tests for detecting truncated responses in the translator."""
+
+    def test_max_tokens_response_is_truncated(self, mock_config):
+        """A response stopped by the token limit should fail even if it parses."""
+        response = MagicMock()
+        response.content = [MagicMock(text="1. Bonjour\n2. Mon")]
+        response.usage.input_tokens = 10
+        response.usage.output_tokens = 5
+        response.stop_reason = "max_tokens"
+        client = MagicMock()
+        client.messages.create.return_value = response
+        batch = TranslationBatch(cells=make_cells(2), target_lang="french")
+        failures = PARSE_FAILURES.value(kind="truncated")
+
+        with pytest.raises(TranslationError, match="truncated") as raised:
+            Translator(mock_config, client=client).translate_batch(batch)
+
+        assert failure_kind(raised.value) == "truncated"
+        assert PARSE_FAILURES.value(kind="truncated") == failures + 1
+
+    def test_failure_kind(self):
+        """Errors should be told apart by whether a usable response was received."""
+        parse_error = TranslationError("Translation failed: Missing translation for item 2")
+        parse_error.__cause__ = TranslationError("Missing translation for item 2")
+        request_error = TranslationError("Translation failed: Connection error")
+        request_error.__cause__ = ConnectionError()
+
+        assert failure_kind(parse_error) == "response"
+        assert failure_kind(request_error) == "request"
+        assert failure_kind(TruncatedResponseError("cut off")) == "truncated"
+
+
+class TestAdaptivePipeline:
+    """Tests for the pipeline with an adaptive batch size."""
+
+    @staticmethod
+    def _truncating_translator(limit: int) -> MagicMock:
+        """A translator whose responses are truncated for batches above ``limit`` texts."""
+        translator = MagicMock()
+        translator.sizes = []
+
+        def translate(batch):
+            translator.sizes.append(len(batch))
+            batch.usage.requests += 1
+            if len(batch) > limit:
+                raise TranslationError("Translation failed") from TruncatedResponseError("cut")
+            return [f"[TR] {cell.value}" for cell in batch.cells]
+
+        translator.translate_batch.side_effect = translate
+        return translator
+
+    def test_truncated_batches_split_and_retried(self):
+        """A truncated batch should be translated again in smaller parts."""
+        translator = self._truncating_translator(limit=10)
+        # The mock answers in microseconds: timing noise must not count as a spike
+        sizer = AdaptiveBatchSize(40, minimum=5, spike=float("inf"))
+        batches = []
+        consumed: list[Cell] = []
+
+        pipeline = TranslationPipeline(
+            translator,
+            batch_size=50,
+            target_lang="french",
+            batch_sizer=sizer,
+            on_batch_done=lambda number, batch, seconds: batches.append(batch),
+        )
+        pipeline.run(iter(make_cells(40)), consumed.extend)
+
+        assert translator.sizes == [40, 20, 10, 10, 20, 10, 10]
+        assert sorted(c.row for c in consumed) == list(range(1, 41))
+        assert all(c.value.startswith("[TR] ") for c in consumed)
+        assert [str(d) for d in sizer.decisions] == [
+            "Batch size 40 -> 20 (truncated)",
+            "Batch size 20 -> 10 (truncated)",
+        ]
+        # The retries count towards the original batch
+        assert [(len(b), b.usage.requests) for b in batches] == [(40, 7)]
+
+    def test_request_errors_not_retried(self):
+        """A request that got no response should fail without splitting the batch."""
+        translator = MagicMock()
+        translator.translate_batch.side_effect = TranslationError("Translation failed: timeout")
+        translator.translate_batch.side_effect.__cause__ = TimeoutError()
+        sizer = AdaptiveBatchSize(20)
+
+        pipeline = TranslationPipeline(
+            translator, batch_size=20, target_lang="french", batch_sizer=sizer
+        )
+        with pytest.raises(TranslationError, match="timeout"):
+            pipeline.run(iter(make_cells(20)), lambda cells: None)
+
+        assert translator.translate_batch.call_count == 1
+        assert sizer.size == 10
+
+    def test_decisions_reported_as_progress(self):
+        """Size changes should appear as info events, and the size on every event."""
+        events = []
+        sizer = AdaptiveBatchSize(40)
+        sizer.record(40, 1.0, ERROR)  # Before this translation: not reported
+        progress = ProgressReporter(events.append, batch_sizer=sizer)
+        batch = TranslationBatch(cells=make_cells(20), target_lang="french")
+
+        sizer.record(20, 1.0, TRUNCATED)
+        progress.batch_done(1, batch, 1.0)
+
+        assert [(e.kind, e.message) for e in events[1:]] == [
+            (INFO, "Batch size 20 -> 10 (truncated)")
+        ]
+        assert [e.batch_size for e in events] == [10, 10]
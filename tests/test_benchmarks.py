@@ -0,0 +1,80 @@
+"""Tests for the benchmark workbook generator and offline backend."""
+
+import zipfile
+
+from benchmarks.offline import offline_translator
+from benchmarks.run import compare, run_case
+from benchmarks.workbook import WorkbookSpec, generate_workbook
+from rosetta.models import Cell, TranslationBatch
+from rosetta.services.inspector import inspect_workbook
+from rosetta.services.translation_service import translate_file
+
+
+class TestWorkbookGenerator:
+    """Tests for generate_workbook."""
+
+    def test_shape(self, tmp_path):
+        """The workbook should have the requested sheets, cells, rich text, dropdowns and images."""
+        spec = WorkbookSpec(sheets=2, rows=50, cols=4, rich_text_ratio=0.5, dropdowns=3, images=2)
+
+        path = generate_workbook(spec, tmp_path / "bench.xlsx")
+        inspection = inspect_workbook(path)
+
+        assert inspection.sheets == ["Sheet1", "Sheet2"]
+        assert inspection.cell_count == spec.cell_count
+        assert inspection.rich_text_cells
+        assert len(inspection.dropdowns) == 6
+        with zipfile.ZipFile(path) as zf:
+            assert sum(name.startswith("xl/media/") for name in zf.namelist()) == 4
+
+    def test_duplicates_and_determinism(self, tmp_path):
+        """The duplicate ratio should hold roughly, and the same spec give the same file."""
+        spec = WorkbookSpec(rows=400, cols=5, duplicate_ratio=0.5)
+
+        first = generate_workbook(spec, tmp_path / "first.xlsx")
+        second = generate_workbook(spec, tmp_path / "second.xlsx")
+        texts = inspect_workbook(first).texts
+
+        assert 0.4 < 1 - len(set(texts)) / len(texts) < 0.6
+        assert inspect_workbook(second).texts == texts
+
+
+class TestOfflineBackend:
+    """Tests for the offline translator and the benchmark runner."""
+
+    def test_offline_translation(self, tmp_path):
+        """The offline client should answer with parseable, numbered translations."""
+        translator = offline_translator()
+        batch = TranslationBatch(
+            cells=[
+                Cell(sheet="S", row=1, col=1, value="Hello"),
+                Cell(sheet="S", row=2, col=1, value="10. World"),
+            ],
+            target_lang="french",
+        )
+
+        assert translator.translate_batch(batch) == ["[french] Hello", "[french] 10. World"]
+        assert batch.usage.input_tokens > 0
+
+    def test_translate_generated_workbook(self, tmp_path):
+        """A generated workbook should translate end to end with the offline backend."""
+        path = generate_workbook(WorkbookSpec(rows=20, cols=3), tmp_path / "bench.xlsx")
+
+        result = translate_file(
+            path, tmp_path / "out.xlsx", "french", translator=offline_translator(), checkpoint=False
+        )
+
+        assert result["status"] == "completed"
+        assert inspect_workbook(tmp_path / "out.xlsx").texts[0].startswith("[french] ")
+
+    def test_run_case_and_compare(self, tmp_path):
+        """A case should report its duration, throughput and memory, comparable to a baseline."""
+        path = generate_workbook(WorkbookSpec(rows=20, cols=3), tmp_path / "bench.xlsx")
+
+        result = run_case("write", path)
+        results = {"results": {"write": result}}
+        baseline = {"results": {"write": {**result, "seconds": result["seconds"] * 2}}}
+
+        assert result["items"] == 60
+        assert result["items_per_second"] > 0
+        assert compare(results, baseline) == {"write": 0.5}
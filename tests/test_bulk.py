@@ -0,0 +1,191 @@
+"""Tests for translating many files with a shared cache."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+from openpyxl import load_workbook
+
+from rosetta.core.exceptions import TranslationError
+from rosetta.main import cli
+from rosetta.models import Cell, TranslationBatch
+from rosetta.services.bulk import collect_inputs, translate_files
+from rosetta.services.cache import CachingTranslator, TranslationCache
+from tests.conftest import write_shared_strings_workbook
+
+
+def _make_inputs(root):
+    write_shared_strings_workbook(
+        root / "a.xlsx", strings=["Hello", "World"], cells={"A1": 0, "A2": 1}
+    )
+    (root / "sub").mkdir()
+    write_shared_strings_workbook(root / "sub" / "b.xlsx", strings=["Hello"], cells={"A1": 0})
+    (root / "~$a.xlsx").write_bytes(b"lock")
+    (root / "notes.txt").write_text("not a workbook")
+
+
+class TestCollectInputs:
+    """Tests for finding input files."""
+
+    def test_directory_is_not_recursive(self, tmp_path):
+        """A directory source should use only its own Excel files."""
+        _make_inputs(tmp_path)
+
+        inputs = collect_inputs(str(tmp_path))
+
+        assert [str(relative) for _, relative in inputs] == ["a.xlsx"]
+
+    def test_glob_keeps_relative_paths(self, tmp_path):
+        """A recursive glob should mirror sub-directories below its static prefix."""
+        _make_inputs(tmp_path)
+
+        inputs = collect_inputs(str(tmp_path / "**" / "*.xlsx"))
+
+        assert sorted(str(relative) for _, relative in inputs) == ["a.xlsx", "sub/b.xlsx"]
+
+
+class TestTranslateFiles:
+    """Tests for the bulk translation run."""
+
+    def test_text_shared_across_files_is_translated_once(self, tmp_path, mock_translator):
+        """Duplicate text across files should hit the shared cache."""
+        source = tmp_path / "in"
+        source.mkdir()
+        _make_inputs(source)
+        sent = []
+
+        def translate(batch):
+            sent.extend(cell.value for cell in batch.cells)
+            return [f"[TR] {cell.value}" for cell in batch.cells]
+
+        mock_translator.translate_batch.side_effect = translate
+
+        results = translate_files(
+            collect_inputs(str(source / "**" / "*.xlsx")),
+            tmp_path / "out",
+            "french",
+            translator=mock_translator,
+            max_files=2,
+        )
+
+        assert [r.status for r in results] == ["completed", "completed"]
+        assert sorted(sent) == ["Hello", "World"]
+        wb = load_workbook(tmp_path / "out" / "sub" / "b.xlsx")
+        assert wb.active["A1"].value == "[TR] Hello"
+        wb.close()
+
+    def test_failure_does_not_stop_other_files(self, tmp_path, mock_translator):
+        """A broken file should be reported without aborting the run."""
+        source = tmp_path / "in"
+        source.mkdir()
+        good = write_shared_strings_workbook(source / "good.xlsx", strings=["Hi"], cells={"A1": 0})
+        bad = source / "bad.xlsx"
+        bad.write_bytes(b"not a zip")
+
+        results = translate_files(
+            [(bad, bad.relative_to(source)), (good, good.relative_to(source))],
+            tmp_path / "out",
+            "french",
+            translator=mock_translator,
+        )
+
+        assert results[0].status == "failed"
+        assert results[0].error
+        assert results[1].status == "completed"
+        assert results[1].cell_count == 1
+
+    def test_output_inside_input_rejected(self, tmp_path, mock_translator):
+        """Outputs must not overwrite inputs or be picked up by the next run's glob."""
+        _make_inputs(tmp_path)
+        inputs = collect_inputs(str(tmp_path / "**" / "*.xlsx"))
+
+        for output_dir in (tmp_path, tmp_path / "sub", tmp_path / "out"):
+            with pytest.raises(ValueError, match="must not be the input directory"):
+                translate_files(inputs, output_dir, "french", translator=mock_translator)
+        assert mock_translator.translate_batch.call_count == 0
+
+    def test_waiters_retry_after_another_batch_fails(self):
+        """A batch waiting on a text whose request failed elsewhere should send it itself."""
+        cache = TranslationCache()
+        key = (None, "french", None, "Hello")
+        cache.claim([key])  # Claimed by a batch of another file
+        claim = cache.claim
+
+        def claim_then_fail(keys):
+            found = claim(keys)
+            if found[1]:  # The other batch fails while this one waits
+                cache.fail(key, TranslationError("bad file"))
+            return found
+
+        cache.claim = claim_then_fail
+        translator = MagicMock()
+        translator.translate_batch.return_value = ["Bonjour"]
+        batch = TranslationBatch(
+            cells=[Cell(sheet="Sheet1", row=1, col=1, value="Hello")], target_lang="french"
+        )
+
+        assert CachingTranslator(translator, cache).translate_batch(batch) == ["Bonjour"]
+        assert translator.translate_batch.call_count == 1
+        assert batch.usage.cached == 0
+        assert cache.get(key) == "Bonjour"
+
+    def test_cache_claims_each_text_once(self):
+        """A text already claimed should make later batches wait instead of re-sending it."""
+        cache = TranslationCache()
+        key = (None, "french", None, "Hello")
+
+        done, waiting, claimed = cache.claim([key, key])
+        assert claimed == [key] and not done and not waiting
+
+        _, waiting, claimed = cache.claim([key])
+        assert key in waiting and not claimed
+
+        cache.fulfil(key, "Bonjour")
+        assert waiting[key].result() == "Bonjour"
+        assert cache.get(key) == "Bonjour"
+
+
+class TestTranslateDirCommand:
+    """Tests for the translate-dir CLI command."""
+
+    def test_writes_report(self, tmp_path, mock_translator):
+        """The command should translate files and write a JSON report."""
+        source = tmp_path / "in"
+        source.mkdir()
+        _make_inputs(source)
+        report = tmp_path / "report.json"
+        mock_translator.close = MagicMock()
+
+        with (
+            patch("rosetta.main.Config.from_env", return_value=mock_translator.config),
+            patch("rosetta.main.Translator", return_value=mock_translator),
+        ):
+            result = CliRunner().invoke(
+                cli,
+                [
+                    "translate-dir",
+                    str(source),
+                    str(tmp_path / "out"),
+                    "-t",
+                    "french",
+                    "--report",
+                    str(report),
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        data = json.loads(report.read_text())
+        assert data["succeeded"] == 1
+        assert data["files"][0]["cell_count"] == 2
+
+    def test_single_file_is_the_default_command(self, simple_excel_file, mock_translator):
+        """``rosetta INPUT -t LANG`` should still translate a single file."""
+        with (
+            patch("rosetta.main.Config.from_env", return_value=mock_translator.config),
+            patch("rosetta.main.Translator", return_value=mock_translator),
+        ):
+            result = CliRunner().invoke(cli, [str(simple_excel_file), "-t", "french"])
+
+        assert result.exit_code == 0, result.output
+        assert (simple_excel_file.parent / "simple_translated.xlsx").exists()
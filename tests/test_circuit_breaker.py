@@ -0,0 +1,184 @@
+"""Tests for the translator's circuit breaker and fallback model."""
+
+import time
+from unittest.mock import MagicMock
+
+import anthropic
+import httpx
+import pytest
+
+from rosetta.core.config import Config
+from rosetta.core.exceptions import CircuitOpenError, OverloadedError, TranslationError
+from rosetta.models import Cell, TranslationBatch
+from rosetta.services import Translator
+from rosetta.services.metrics import CIRCUIT_REJECTED, CIRCUIT_STATE
+from rosetta.services.progress import INFO, ProgressReporter
+from rosetta.services.translator import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, failure_kind
+
+
+def _batch(*texts: str) -> TranslationBatch:
+    cells = [Cell(sheet="Sheet1", row=i + 1, col=1, value=text) for i, text in enumerate(texts)]
+    return TranslationBatch(cells=cells, target_lang="french")
+
+
+def _overloaded() -> anthropic.APIStatusError:
+    response = httpx.Response(529, request=httpx.Request("POST", "https://api.test/v1/messages"))
+    return anthropic.InternalServerError("Overloaded", response=response, body=None)
+
+
+def _response(text: str) -> MagicMock:
+    response = MagicMock()
+    response.content = [MagicMock(text=text)]
+    response.usage.input_tokens = 10
+    response.usage.output_tokens = 5
+    response.stop_reason = "end_turn"
+    return response
+
+
+def _translator(client: MagicMock, **settings) -> Translator:
+    config = Config(
+        anthropic_api_key="test", model="primary", breaker_threshold=2, breaker_cooldown=0.1
+    )
+    for name, value in settings.items():
+        setattr(config, name, value)
+    return Translator(config, client=client)
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker."""
+
+    def test_opens_probes_and_closes(self):
+        """Consecutive failures should open the circuit until a probe succeeds."""
+        breaker = CircuitBreaker("test-model", threshold=2, cooldown=0.05)
+
+        breaker.record(ok=False)
+        assert breaker.state == CLOSED
+        breaker.record(ok=False)
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert CIRCUIT_STATE.value(model="test-model") == 2
+
+        time.sleep(0.06)
+        assert breaker.allow()  # The probe
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()  # Only one probe at a time
+        breaker.record(ok=True)
+        assert breaker.state == CLOSED
+        assert breaker.failures == 0
+
+    def test_failed_probe_reopens(self):
+        """A failed probe should open the circuit for another cooldown."""
+        breaker = CircuitBreaker("test-model", threshold=1, cooldown=0.05)
+        breaker.record(ok=False)
+        time.sleep(0.06)
+
+        assert breaker.allow()
+        breaker.record(ok=False)
+
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert 0 < breaker.retry_in() <= 0.05
+
+    def test_lost_probe_replaced(self):
+        """A probe that never records its outcome should not keep the circuit half-open."""
+        breaker = CircuitBreaker("test-model", threshold=1, cooldown=0.05)
+        breaker.record(ok=False)
+        time.sleep(0.06)
+        assert breaker.allow()  # This probe's caller never records
+
+        assert not breaker.allow()
+        time.sleep(0.06)
+        assert breaker.allow()
+        breaker.record(ok=True)
+        assert breaker.state == CLOSED
+
+
+class TestTranslatorCircuit:
+    """Tests for the circuit breaker in the translator."""
+
+    def test_fails_fast_when_open(self):
+        """Without a fallback, batches should fail at once while the circuit is open."""
+        client = MagicMock()
+        client.messages.create.side_effect = _overloaded()
+        translator = _translator(client)
+        rejected = CIRCUIT_REJECTED.value(model="primary", action="failed")
+
+        for _ in range(2):
+            with pytest.raises(TranslationError, match="Overloaded"):
+                translator.translate_batch(_batch("Hello"))
+        with pytest.raises(CircuitOpenError, match="primary is unavailable") as raised:
+            translator.translate_batch(_batch("Hello"))
+
+        assert client.messages.create.call_count == 2
+        assert isinstance(raised.value, OverloadedError)
+        assert raised.value.retry_after <= 0.1
+        assert failure_kind(raised.value) == "rejected"
+        assert CIRCUIT_REJECTED.value(model="primary", action="failed") == rejected + 1
+
+    def test_routes_to_fallback_and_recovers(self):
+        """While open, batches should use the fallback model; a probe should close it."""
+        overloaded = {"primary": True}
+
+        def create(model, **kwargs):
+            if model == "primary" and overloaded["primary"]:
+                raise _overloaded()
+            return _response(f"1. [{model}] Bonjour")
+
+        client = MagicMock()
+        client.messages.create.side_effect = create
+        translator = _translator(client, fallback_model="fallback")
+        for _ in range(2):
+            with pytest.raises(TranslationError):
+                translator.translate_batch(_batch("Hello"))
+
+        assert translator.translate_batch(_batch("Hello")) == ["[fallback] Bonjour"]
+        assert translator.breaker.state == OPEN
+
+        overloaded["primary"] = False
+        time.sleep(0.11)
+        assert translator.translate_batch(_batch("Hello")) == ["[primary] Bonjour"]
+        assert translator.breaker.state == CLOSED
+
+    def test_interrupted_probe_recorded(self):
+        """A probe interrupted by a BaseException should reopen the circuit, not block it."""
+        client = MagicMock()
+        client.messages.create.side_effect = _overloaded()
+        translator = _translator(client, breaker_threshold=1)
+        with pytest.raises(TranslationError):
+            translator.translate_batch(_batch("Hello"))
+        time.sleep(0.11)
+
+        client.messages.create.side_effect = KeyboardInterrupt()
+        with pytest.raises(KeyboardInterrupt):
+            translator.translate_batch(_batch("Hello"))
+
+        assert translator.breaker.state == OPEN
+        assert translator.breaker.retry_in() > 0
+
+    def test_parse_failures_do_not_trip(self):
+        """Responses that cannot be parsed should not count as the model being unavailable."""
+        client = MagicMock()
+        client.messages.create.return_value = _response("Bonjour")
+        translator = _translator(client)
+
+        for _ in range(3):
+            with pytest.raises(TranslationError, match="Missing translation"):
+                translator.translate_batch(_batch("Hello", "World"))
+
+        assert translator.breaker.state == CLOSED
+
+    def test_state_in_progress(self):
+        """Progress events should carry the circuit state and report its changes."""
+        events = []
+        breaker = CircuitBreaker("primary", threshold=1, cooldown=30, fallback="fallback")
+        progress = ProgressReporter(events.append)
+        progress.watch_circuit(breaker)
+
+        breaker.record(ok=False)
+        progress.batch_done(1, _batch("Hello"), 1.0)
+
+        assert [e.circuit for e in events] == [OPEN, OPEN]
+        assert events[1].kind == INFO
+        assert events[1].message.startswith(
+            "primary is unavailable after 1 failed requests: using fallback"
+        )
@@ -0,0 +1,66 @@
+"""Tests for the offline translation estimator."""
+
+from openpyxl import Workbook
+
+from rosetta.services.estimator import _schedule, estimate_file, estimate_tokens
+
+
+class TestEstimateFile:
+    """Tests for estimate_file."""
+
+    def test_duplicates_are_sent_once(self, tmp_path):
+        """Repeated text should not add requests or tokens."""
+        file_path = tmp_path / "dupes.xlsx"
+        wb = Workbook()
+        ws = wb.active
+        for row in range(1, 101):
+            ws.cell(row=row, column=1, value="Same text")
+            ws.cell(row=row, column=2, value=f"Item {row}")
+        wb.save(file_path)
+
+        estimate = estimate_file(file_path, "french", batch_size=50, concurrency=2)
+
+        assert estimate.cell_count == 200
+        assert estimate.unique_count == 101
+        assert estimate.batch_count == 3
+        assert estimate.output_tokens > 0
+        assert 0 < estimate.wall_seconds < estimate.request_seconds
+
+    def test_counts_rich_text_runs_and_dropdowns(
+        self, excel_with_shared_strings, excel_with_dropdown
+    ):
+        """Rich text runs and dropdown values are planned like translate_file sends them."""
+        rich = estimate_file(excel_with_shared_strings, "french")
+        assert rich.rich_text_cells == 1
+        assert rich.item_count == rich.cell_count + 2  # "Bold" and "text" runs
+
+        dropdown = estimate_file(excel_with_dropdown, "french")
+        assert dropdown.dropdown_count == 1
+        assert dropdown.item_count > dropdown.cell_count
+
+    def test_empty_workbook(self, tmp_path):
+        """A workbook without text needs no requests."""
+        file_path = tmp_path / "empty.xlsx"
+        wb = Workbook()
+        wb.active["A1"] = 42
+        wb.save(file_path)
+
+        estimate = estimate_file(file_path, "french")
+
+        assert estimate.batch_count == 0
+        assert estimate.wall_seconds == 0
+
+
+class TestEstimateHelpers:
+    """Tests for the token and scheduling models."""
+
+    def test_wide_characters_count_as_one_token_each(self):
+        """CJK text should not be divided by the Latin characters-per-token ratio."""
+        assert estimate_tokens("abcdefgh") == 2
+        assert estimate_tokens("日本語") == 3
+
+    def test_schedule_respects_concurrency(self):
+        """Requests should be spread over the available workers."""
+        assert _schedule([1.0, 1.0, 1.0, 1.0], 2) == 2.0
+        assert _schedule([1.0, 1.0], 8) == 1.0
+        assert _schedule([], 4) == 0.0
@@ -2,9 +2,15 @@
 
 import pytest
 
-from rosetta.main import _extract_dropdown_validations, _extract_rich_text_info
+from rosetta.main import (
+    RichTextLookup,
+    TranslationWriter,
+    _extract_dropdown_validations,
+    _extract_rich_text_info,
+)
 from rosetta.models import Cell
 from rosetta.services import ExcelExtractor
+from tests.conftest import write_shared_strings_workbook
 
 
 class TestExcelExtractor:
@@ -83,3 +89,22 @@ class TestRichTextExtraction:
         # Simple cells created with openpyxl won't have rich text formatting
         for cell in cells:
             assert cell.rich_text_runs is None
+
+    def test_plain_shared_strings_written_as_they_arrive(self, tmp_path):
+        """Without rich text, cells should still carry their index so the writer applies them."""
+        input_file = write_shared_strings_workbook(
+            tmp_path / "plain.xlsx", strings=["Hello", "World"], cells={"A1": 0, "A2": 1}
+        )
+        lookup = RichTextLookup(input_file)
+        writer = TranslationWriter(input_file, tmp_path / "output.xlsx")
+        with ExcelExtractor(input_file) as extractor:
+            cells = list(extractor.extract_cells())
+        for cell in cells:
+            lookup.enrich(cell)
+            cell.value = f"[TR] {cell.value}"
+
+        writer.add_cells(cells)
+
+        assert [cell.shared_string_index for cell in cells] == [0, 1]
+        assert not writer._unresolved
+        assert writer._shared_strings_updated
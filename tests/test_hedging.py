@@ -0,0 +1,156 @@
+"""Tests for hedged requests."""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from rosetta.core.config import Config
+from rosetta.models import Cell, TranslationBatch
+from rosetta.services import Translator
+from rosetta.services.hedging import Hedger
+from rosetta.services.metrics import HEDGE_TOKENS, HEDGES
+
+
+def _warmed_up(budget: float = 1.0) -> Hedger:
+    """A hedger that hedges any request still running after a few milliseconds."""
+    hedger = Hedger(percentile=50, budget=budget, min_samples=3)
+    for _ in range(3):
+        hedger.call(lambda: time.sleep(0.005))
+    return hedger
+
+
+def _slow_then_fast(slow: float = 0.5):
+    """A request whose first call is slow and later calls answer at once."""
+    calls = []
+    lock = threading.Lock()
+
+    def request() -> str:
+        with lock:
+            calls.append(threading.current_thread().name)
+            number = len(calls)
+        if number == 1:
+            time.sleep(slow)
+            return "slow"
+        return "fast"
+
+    request.calls = calls
+    return request
+
+
+class TestHedger:
+    """Tests for Hedger."""
+
+    def test_not_hedged_without_samples(self):
+        """Requests should run on the caller's thread until latencies were measured."""
+        hedger = Hedger(percentile=95, min_samples=20)
+        request = _slow_then_fast(slow=0.05)
+
+        assert hedger.delay() is None
+        assert hedger.call(request) == "slow"
+        assert request.calls == [threading.current_thread().name]
+
+    def test_slow_request_hedged(self):
+        """A slow request should be sent again and the faster copy's answer used."""
+        hedger = _warmed_up()
+        request = _slow_then_fast()
+        discarded = threading.Event()
+        results = []
+        wins = HEDGES.value(result="hedge")
+
+        def on_discarded(result):
+            results.append(result)
+            discarded.set()
+
+        started = time.perf_counter()
+        assert hedger.call(request, on_discarded=on_discarded) == "fast"
+        assert time.perf_counter() - started < 0.4
+        assert len(request.calls) == 2
+        assert HEDGES.value(result="hedge") == wins + 1
+        # The primary is not aborted: its answer arrives later and is discarded
+        assert discarded.wait(timeout=5)
+        assert results == ["slow"]
+
+    def test_budget_caps_hedges(self):
+        """Without budget left, a slow request should just be waited for."""
+        hedger = _warmed_up(budget=0.01)
+        request = _slow_then_fast(slow=0.1)
+        skipped = HEDGES.value(result="over_budget")
+
+        assert hedger.call(request) == "slow"
+        assert len(request.calls) == 1
+        assert HEDGES.value(result="over_budget") == skipped + 1
+
+    def test_primary_error_when_both_fail(self):
+        """If no copy succeeds, the primary request's error should be raised."""
+        hedger = _warmed_up()
+        calls = []
+
+        def request():
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(0.1)
+                raise ValueError("primary")
+            raise ValueError("hedge")
+
+        with pytest.raises(ValueError, match="primary"):
+            hedger.call(request)
+
+    def test_invalid_percentile(self):
+        """Percentiles outside (0, 100) should be rejected."""
+        with pytest.raises(ValueError):
+            Hedger(percentile=100)
+
+
+class TestTranslatorHedging:
+    """Tests for hedging in the translator."""
+
+    def test_hedged_translation(self):
+        """The batch should use the hedge's answer; the primary's tokens go to the metrics."""
+
+        def response(text: str, output_tokens: int) -> MagicMock:
+            result = MagicMock()
+            result.content = [MagicMock(text=text)]
+            result.usage.input_tokens = 10
+            result.usage.output_tokens = output_tokens
+            result.stop_reason = "end_turn"
+            return result
+
+        slow = _slow_then_fast()
+
+        def create(**kwargs):
+            if slow() == "slow":
+                return response("1. Lent", 7)
+            return response("1. Rapide", 3)
+
+        client = MagicMock()
+        client.messages.create.side_effect = create
+        config = Config(anthropic_api_key="test", hedge_percentile=50, hedge_budget=1.0)
+        translator = Translator(config, client=client)
+        translator.hedger = _warmed_up()
+        batch = TranslationBatch(
+            cells=[Cell(sheet="Sheet1", row=1, col=1, value="Fast")], target_lang="french"
+        )
+        discarded = HEDGE_TOKENS.value(direction="output")
+
+        assert translator.translate_batch(batch) == ["Rapide"]
+        assert (batch.usage.requests, batch.usage.output_tokens) == (1, 3)
+        deadline = time.monotonic() + 5
+        while HEDGE_TOKENS.value(direction="output") == discarded and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert HEDGE_TOKENS.value(direction="output") == discarded + 7
+        translator.close()
+
+    def test_hedging_from_env(self, monkeypatch):
+        """ROSETTA_HEDGE_PERCENTILE should enable hedging; it is off by default."""
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        monkeypatch.delenv("ROSETTA_HEDGE_PERCENTILE", raising=False)
+        assert Config.from_env().hedge_percentile is None
+
+        monkeypatch.setenv("ROSETTA_HEDGE_PERCENTILE", "95")
+        monkeypatch.setenv("ROSETTA_HEDGE_BUDGET", "0.1")
+        config = Config.from_env()
+
+        assert (config.hedge_percentile, config.hedge_budget) == (95.0, 0.1)
+        assert Translator(config, client=MagicMock()).hedger.percentile == 95.0
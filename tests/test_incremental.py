@@ -0,0 +1,133 @@
+"""Tests for incremental re-translation against a previous output."""
+
+import pytest
+from openpyxl import load_workbook
+
+from rosetta.services.incremental import PreviousTranslations
+from rosetta.services.translation_service import translate_file
+from tests.conftest import write_shared_strings_workbook
+
+RICH_TEXT = '<si><r><rPr><b/></rPr><t>Bold</t></r><r><t xml:space="preserve"> text</t></r></si>'
+
+
+class TestIncrementalTranslation:
+    """Tests for reusing a previous translation of an older workbook version."""
+
+    def test_only_changed_text_is_sent(self, tmp_path, mock_translator):
+        """Unchanged strings should be copied from the previous output."""
+        old_source = write_shared_strings_workbook(
+            tmp_path / "old.xlsx",
+            strings=["Hello", "World", RICH_TEXT],
+            cells={"A1": 0, "A2": 1, "A3": 2},
+        )
+        old_output = tmp_path / "old_fr.xlsx"
+        translate_file(old_source, old_output, "french", translator=mock_translator)
+
+        # "World" changed to "Earth" and a new cell was added
+        new_source = write_shared_strings_workbook(
+            tmp_path / "new.xlsx",
+            strings=["Hello", "Earth", RICH_TEXT, "New row"],
+            cells={"A1": 0, "A2": 1, "A3": 2, "A4": 3},
+        )
+        sent = []
+
+        def translate_new(batch):
+            # Make fresh translations distinguishable from reused ones
+            sent.extend(cell.value for cell in batch.cells)
+            return [f"[NEW] {cell.value}" for cell in batch.cells]
+
+        mock_translator.translate_batch.side_effect = translate_new
+
+        output_file = tmp_path / "new_fr.xlsx"
+        result = translate_file(
+            new_source,
+            output_file,
+            "french",
+            translator=mock_translator,
+            previous_source=old_source,
+            previous_output=old_output,
+        )
+
+        assert sorted(sent) == ["Earth", "New row"]
+        assert result["reused_count"] == 4  # Hello, the rich cell and its two runs
+
+        wb = load_workbook(output_file, rich_text=True)
+        ws = wb["Sheet1"]
+        assert ws["A1"].value == "[TR] Hello"
+        assert ws["A2"].value == "[NEW] Earth"
+        assert ws["A4"].value == "[NEW] New row"
+        assert [getattr(run, "text", run) for run in ws["A3"].value] == ["[TR] Bold", " [TR] text"]
+        wb.close()
+
+    def test_moved_text_is_reused_by_content(self, tmp_path, mock_translator):
+        """A string moved to another cell should still be found by its content."""
+        old_source = write_shared_strings_workbook(
+            tmp_path / "old.xlsx", strings=["Hello"], cells={"A1": 0}
+        )
+        old_output = tmp_path / "old_fr.xlsx"
+        translate_file(old_source, old_output, "french", translator=mock_translator)
+
+        new_source = write_shared_strings_workbook(
+            tmp_path / "new.xlsx", strings=["Hello"], cells={"C7": 0}
+        )
+        previous = PreviousTranslations.load(old_source, old_output)
+        assert previous.by_text["Hello"] == "[TR] Hello"
+
+        mock_translator.translate_batch.reset_mock()
+        result = translate_file(
+            new_source,
+            tmp_path / "new_fr.xlsx",
+            "french",
+            translator=mock_translator,
+            previous_source=old_source,
+            previous_output=old_output,
+        )
+
+        assert result["reused_count"] == 1
+        assert mock_translator.translate_batch.call_count == 0
+
+    def test_sheets_skipped_last_time_are_translated(self, tmp_path, mock_translator):
+        """Text of sheets outside the previous run's filter should not count as translated."""
+        source = write_shared_strings_workbook(
+            tmp_path / "old.xlsx",
+            strings=["Hello", "World", "Bonjour"],
+            cells={"A1": 0, "Sheet2!A1": 1, "Sheet2!A2": 2},
+        )
+        old_output = tmp_path / "old_fr.xlsx"
+        translate_file(source, old_output, "french", translator=mock_translator, sheets={"Sheet1"})
+
+        previous = PreviousTranslations.load(source, old_output)
+        assert previous.by_text == {"Hello": "[TR] Hello"}
+        assert ("Sheet2", "A1") not in previous.by_cell
+
+        sent = []
+
+        def translate_new(batch):
+            sent.extend(cell.value for cell in batch.cells)
+            return [f"[NEW] {cell.value}" for cell in batch.cells]
+
+        mock_translator.translate_batch.side_effect = translate_new
+        result = translate_file(
+            source,
+            tmp_path / "new_fr.xlsx",
+            "french",
+            translator=mock_translator,
+            previous_source=source,
+            previous_output=old_output,
+        )
+
+        assert sorted(sent) == ["Bonjour", "World"]
+        assert result["reused_count"] == 1
+
+    def test_previous_arguments_must_be_paired(
+        self, simple_excel_file, tmp_path, mock_translator
+    ):
+        """Giving only one of the previous files is an error."""
+        with pytest.raises(ValueError):
+            translate_file(
+                simple_excel_file,
+                tmp_path / "out.xlsx",
+                "french",
+                translator=mock_translator,
+                previous_source=simple_excel_file,
+            )
@@ -0,0 +1,129 @@
+"""Tests for the openpyxl-free workbook inspector."""
+
+import datetime
+from unittest.mock import patch
+
+import pytest
+from openpyxl import Workbook
+
+from rosetta.core.exceptions import ExcelError
+from rosetta.services.extractor import ExcelExtractor
+from rosetta.services.inspector import inspect_workbook, read_sheet_names
+from rosetta.services.translation_service import count_cells, list_sheets, translate_file
+
+
+@pytest.fixture
+def mixed_workbook(tmp_path):
+    """A workbook with text next to formulas, numbers, booleans, dates and blanks."""
+    file_path = tmp_path / "mixed.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.title = " Data "
+    ws["A1"] = "Hello"
+    ws["A2"] = "=SUM(1,2)"
+    ws["A3"] = 5
+    ws["A4"] = "   "
+    ws["A5"] = True
+    ws["A6"] = datetime.date(2024, 1, 1)
+    ws["B1"] = "Hello"
+    ws["B2"] = "#N/A"
+    other = wb.create_sheet("Other")
+    other["A1"] = "Bonjour"
+    wb.create_sheet("Empty")
+    wb.save(file_path)
+    return file_path
+
+
+def _extracted(file_path, sheets=None):
+    with ExcelExtractor(file_path, sheets=sheets) as extractor:
+        return [cell.value for cell in extractor.extract_cells()]
+
+
+class TestInspectWorkbook:
+    """Tests for inspect_workbook and read_sheet_names."""
+
+    def test_sheet_names(self, excel_with_multiple_sheets):
+        """Sheet names should come from workbook.xml, in workbook order."""
+        assert read_sheet_names(excel_with_multiple_sheets) == ["Sheet1", "Sheet2", "Sheet3"]
+        assert list_sheets(excel_with_multiple_sheets) == ["Sheet1", "Sheet2", "Sheet3"]
+
+    @pytest.mark.parametrize("sheets", [None, {"Data"}, {"Other", "Empty"}, set()])
+    def test_cells_match_extractor(self, mixed_workbook, sheets):
+        """Translatable cells should be the ones ExcelExtractor yields, in the same order."""
+        inspection = inspect_workbook(mixed_workbook, sheets)
+
+        assert inspection.texts == _extracted(mixed_workbook, sheets)
+        assert count_cells(mixed_workbook, sheets) == inspection.cell_count
+
+    def test_shared_strings_and_rich_text(self, excel_with_shared_strings):
+        """Shared string cells should resolve to their text, rich text keeping its runs."""
+        inspection = inspect_workbook(excel_with_shared_strings)
+
+        assert inspection.texts == _extracted(excel_with_shared_strings)
+        assert inspection.rich_text_cells == {3: 2}
+        assert [run.text for run in inspection.rich_text_map[2]] == ["Bold", " text"]
+
+    def test_dropdowns(self, excel_with_dropdown):
+        """Inline dropdowns of the selected sheets should be collected."""
+        assert inspect_workbook(excel_with_dropdown).dropdowns[0].values == [
+            "Yes",
+            "No",
+            "Maybe",
+        ]
+        assert inspect_workbook(excel_with_dropdown, {"Other"}).dropdowns == []
+
+    def test_invalid_file(self, tmp_path):
+        """A file that is not an xlsx package should raise ExcelError."""
+        file_path = tmp_path / "broken.xlsx"
+        file_path.write_bytes(b"not a zip file")
+
+        with pytest.raises(ExcelError):
+            inspect_workbook(file_path)
+        with pytest.raises(ExcelError):
+            read_sheet_names(file_path)
+
+
+class TestInspectionReuse:
+    """Tests for translate_file reusing an inspection."""
+
+    def test_translation_reuses_inspection(self, excel_with_dropdown, tmp_path, mock_translator):
+        """Rich text tables and dropdowns should not be read a second time."""
+        inspection = inspect_workbook(excel_with_dropdown)
+
+        with (
+            patch("rosetta.main._read_rich_text_map") as mock_rich_text,
+            patch("rosetta.main._extract_dropdown_validations") as mock_dropdowns,
+        ):
+            result = translate_file(
+                excel_with_dropdown,
+                tmp_path / "output.xlsx",
+                "french",
+                translator=mock_translator,
+                checkpoint=False,
+                inspection=inspection,
+            )
+
+        assert result["cell_count"] == 2
+        assert result["dropdown_count"] == 1
+        mock_rich_text.assert_not_called()
+        mock_dropdowns.assert_not_called()
+
+    def test_empty_inspection_skips_loading(self, tmp_path, mock_translator):
+        """A workbook known to be empty should not be loaded at all."""
+        file_path = tmp_path / "empty.xlsx"
+        wb = Workbook()
+        wb.active["A1"] = 42
+        wb.save(file_path)
+        inspection = inspect_workbook(file_path)
+
+        with patch("openpyxl.load_workbook") as mock_load:
+            result = translate_file(
+                file_path,
+                tmp_path / "output.xlsx",
+                "french",
+                translator=mock_translator,
+                inspection=inspection,
+            )
+
+        assert result == {"cell_count": 0, "status": "no_content"}
+        mock_load.assert_not_called()
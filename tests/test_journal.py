@@ -0,0 +1,112 @@
+"""Tests for checkpointing and resuming translations."""
+
+import pytest
+
+from rosetta.core.exceptions import TranslationError
+from rosetta.models import TranslationBatch
+from rosetta.services.journal import TranslationJournal, compute_job_key, journal_path_for
+from rosetta.services.translation_service import translate_file
+
+
+class TestTranslationJournal:
+    """Tests for the append-only journal."""
+
+    def test_resume_returns_recorded_translations(self, tmp_path):
+        """Recorded batches should be returned when resuming the same job."""
+        path = tmp_path / "out.xlsx.rosetta-journal"
+        journal = TranslationJournal(path, "key-1")
+        assert journal.open() == {}
+        journal.record(["Hello", "World"], ["Bonjour", "Monde"])
+
+        resumed = TranslationJournal(path, "key-1")
+        assert resumed.open(resume=True) == {"Hello": "Bonjour", "World": "Monde"}
+
+    def test_different_job_key_starts_fresh(self, tmp_path):
+        """A journal written for other parameters must not be reused."""
+        path = tmp_path / "out.xlsx.rosetta-journal"
+        journal = TranslationJournal(path, "key-1")
+        journal.open()
+        journal.record(["Hello"], ["Bonjour"])
+
+        other = TranslationJournal(path, "key-2")
+        assert other.open(resume=True) == {}
+
+    def test_ignores_partially_written_line(self, tmp_path):
+        """A line truncated by a crash should be skipped."""
+        path = tmp_path / "out.xlsx.rosetta-journal"
+        journal = TranslationJournal(path, "key-1")
+        journal.open()
+        journal.record(["Hello"], ["Bonjour"])
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"texts": ["World"], "transl')
+
+        assert TranslationJournal(path, "key-1").open(resume=True) == {"Hello": "Bonjour"}
+
+    def test_job_key_depends_on_parameters(self, simple_excel_file):
+        """Changing the target language should change the job key."""
+        french = compute_job_key(simple_excel_file, target_lang="french")
+        german = compute_job_key(simple_excel_file, target_lang="german")
+        assert french != german
+        assert french == compute_job_key(simple_excel_file, target_lang="french")
+
+
+class TestResumeTranslateFile:
+    """Tests for resuming translate_file from a journal."""
+
+    def test_resume_skips_completed_batches(self, simple_excel_file, tmp_path, mock_translator):
+        """After a failure, --resume should only translate the remaining cells."""
+        output_file = tmp_path / "output.xlsx"
+        calls = []
+
+        def flaky_translate(batch: TranslationBatch) -> list[str]:
+            calls.append([cell.value for cell in batch.cells])
+            if len(calls) == 2:
+                raise TranslationError("network down")
+            return [f"[TR] {cell.value}" for cell in batch.cells]
+
+        mock_translator.translate_batch.side_effect = flaky_translate
+
+        with pytest.raises(TranslationError):
+            translate_file(
+                simple_excel_file, output_file, "french", batch_size=2, translator=mock_translator
+            )
+        assert journal_path_for(output_file).exists()
+
+        mock_translator.translate_batch.reset_mock()
+        mock_translator.translate_batch.side_effect = lambda batch: [
+            f"[TR] {cell.value}" for cell in batch.cells
+        ]
+        result = translate_file(
+            simple_excel_file,
+            output_file,
+            "french",
+            batch_size=2,
+            translator=mock_translator,
+            resume=True,
+        )
+
+        assert result["cell_count"] == 4
+        # Only the second batch of two cells was sent again
+        sent = [
+            cell.value
+            for call in mock_translator.translate_batch.call_args_list
+            for cell in call.args[0].cells
+        ]
+        assert len(sent) == 2
+        assert not journal_path_for(output_file).exists()
+
+    def test_no_journal_without_checkpoint(self, simple_excel_file, tmp_path, mock_translator):
+        """checkpoint=False should not write anything next to the output."""
+        output_file = tmp_path / "output.xlsx"
+        mock_translator.translate_batch.side_effect = TranslationError("boom")
+
+        with pytest.raises(TranslationError):
+            translate_file(
+                simple_excel_file,
+                output_file,
+                "french",
+                translator=mock_translator,
+                checkpoint=False,
+            )
+
+        assert not journal_path_for(output_file).exists()
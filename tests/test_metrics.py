@@ -0,0 +1,193 @@
+"""Tests for the metrics registry and the pipeline's instrumentation."""
+
+import time
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from rosetta.core.exceptions import TranslationError
+from rosetta.main import write_translations
+from rosetta.models import Cell, TranslationBatch
+from rosetta.services import Translator
+from rosetta.services.cache import TranslationCache, cache_key
+from rosetta.services.extractor import ExcelExtractor
+from rosetta.services.metrics import (
+    BATCH_CELLS,
+    BATCH_SECONDS,
+    CACHE_LOOKUPS,
+    PARSE_FAILURES,
+    REGISTRY,
+    RETRIES,
+    STAGE_SECONDS,
+    TOKENS,
+    Registry,
+    timed_iter,
+)
+from rosetta.services.translator import _count_retries
+
+
+def _response(text: str, input_tokens: int = 10, output_tokens: int = 5) -> MagicMock:
+    response = MagicMock()
+    response.content = [MagicMock(text=text)]
+    response.usage.input_tokens = input_tokens
+    response.usage.output_tokens = output_tokens
+    return response
+
+
+def _batch(*texts: str) -> TranslationBatch:
+    cells = [Cell(sheet="Sheet1", row=i + 1, col=1, value=text) for i, text in enumerate(texts)]
+    return TranslationBatch(cells=cells, target_lang="french")
+
+
+class TestRegistry:
+    """Tests for the Prometheus text exposition."""
+
+    def test_render_counter_and_gauge(self):
+        """Counters and gauges should render with HELP, TYPE and labelled samples."""
+        registry = Registry()
+        counter = registry.counter("test_events_total", "Events.", ["kind"])
+        gauge = registry.gauge("test_queue", "Queue length.")
+        counter.inc(kind="a")
+        counter.inc(2, kind="b")
+        gauge.set(3)
+
+        lines = registry.render().splitlines()
+
+        assert lines == [
+            "# HELP test_events_total Events.",
+            "# TYPE test_events_total counter",
+            'test_events_total{kind="a"} 1',
+            'test_events_total{kind="b"} 2',
+            "# HELP test_queue Queue length.",
+            "# TYPE test_queue gauge",
+            "test_queue 3",
+        ]
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Bucket counts should include every smaller bucket, ending with +Inf."""
+        registry = Registry()
+        histogram = registry.histogram("test_seconds", "Durations.", buckets=(1, 5))
+        for value in (0.5, 2, 10):
+            histogram.observe(value)
+
+        rendered = registry.render()
+
+        assert 'test_seconds_bucket{le="1"} 1' in rendered
+        assert 'test_seconds_bucket{le="5"} 2' in rendered
+        assert 'test_seconds_bucket{le="+Inf"} 3' in rendered
+        assert "test_seconds_sum 12.5" in rendered
+        assert "test_seconds_count 3" in rendered
+
+    def test_callback_gauge_and_invalid_labels(self):
+        """Callback gauges should be read when rendered; wrong labels should be refused."""
+        registry = Registry()
+        pending = [4]
+        registry.gauge("test_pending", "Pending work.", function=lambda: pending[0])
+        counter = registry.counter("test_total", "Things.", ["kind"])
+
+        pending[0] = 7
+
+        assert "test_pending 7" in registry.render()
+        with pytest.raises(ValueError):
+            counter.inc(other="x")
+        with pytest.raises(ValueError):
+            registry.counter("test_total", "Again.")
+
+    def test_timed_iter_excludes_consumer_time(self):
+        """Only the time spent producing items should be observed."""
+        for _ in timed_iter("test_iter", iter(range(3))):
+            time.sleep(0.05)
+
+        rendered = REGISTRY.render()
+
+        assert 'rosetta_stage_duration_seconds_count{stage="test_iter"} 1' in rendered
+        # 0.15s were spent consuming, none of it producing
+        assert 'rosetta_stage_duration_seconds_bucket{stage="test_iter",le="0.05"} 1' in rendered
+
+
+class TestPipelineMetrics:
+    """Tests for the metrics recorded by extraction, translation and writing."""
+
+    def test_stages_recorded(self, simple_excel_file, tmp_path):
+        """Extracting and writing a workbook should record both stages."""
+        before = {stage: STAGE_SECONDS.count(stage=stage) for stage in ("extract", "write")}
+        extractor = ExcelExtractor(simple_excel_file)
+        cells = list(extractor.extract_cells())
+        extractor.close()
+
+        write_translations(simple_excel_file, tmp_path / "out.xlsx", cells)
+
+        assert STAGE_SECONDS.count(stage="extract") == before["extract"] + 1
+        assert STAGE_SECONDS.count(stage="write") == before["write"] + 1
+
+    def test_batch_tokens_and_duration(self, mock_config):
+        """A translated batch should record its size, duration and tokens."""
+        client = MagicMock()
+        client.messages.create.return_value = _response("1. Bonjour\n2. Monde", 12, 7)
+        translator = Translator(mock_config, client=client)
+        model = mock_config.model
+        sizes = BATCH_CELLS.count()
+        batches = BATCH_SECONDS.count(model=model, outcome="ok")
+        input_tokens = TOKENS.value(model=model, direction="input")
+        output_tokens = TOKENS.value(model=model, direction="output")
+
+        translator.translate_batch(_batch("Hello", "World"))
+
+        assert BATCH_CELLS.count() == sizes + 1
+        assert BATCH_SECONDS.count(model=model, outcome="ok") == batches + 1
+        assert TOKENS.value(model=model, direction="input") == input_tokens + 12
+        assert TOKENS.value(model=model, direction="output") == output_tokens + 7
+
+    def test_parse_failure_counted(self, mock_config):
+        """A response missing translations should count as a failed parse and batch."""
+        client = MagicMock()
+        client.messages.create.return_value = _response("1. Bonjour")
+        translator = Translator(mock_config, client=client)
+        failures = PARSE_FAILURES.value(kind="response")
+        errors = BATCH_SECONDS.count(model=mock_config.model, outcome="error")
+
+        with pytest.raises(TranslationError):
+            translator.translate_batch(_batch("Hello", "World"))
+
+        assert PARSE_FAILURES.value(kind="response") == failures + 1
+        assert BATCH_SECONDS.count(model=mock_config.model, outcome="error") == errors + 1
+
+    def test_retries_counted(self):
+        """Only requests the SDK sends again should count as retries."""
+        before = RETRIES.value()
+
+        _count_retries(httpx.Request("POST", "https://api.test/v1/messages"))
+        _count_retries(
+            httpx.Request(
+                "POST", "https://api.test/v1/messages", headers={"x-stainless-retry-count": "0"}
+            )
+        )
+        _count_retries(
+            httpx.Request(
+                "POST", "https://api.test/v1/messages", headers={"x-stainless-retry-count": "2"}
+            )
+        )
+
+        assert RETRIES.value() == before + 1
+
+    def test_translation_cache_lookups(self):
+        """Claims should count hits, in-flight (coalesced) texts and misses."""
+        cache = TranslationCache()
+        batch = _batch("a", "b", "c")
+        done, in_flight, new = (cache_key(batch, text) for text in ("a", "b", "c"))
+        cache.claim([done, in_flight])
+        cache.fulfil(done, "A")
+        before = {
+            result: CACHE_LOOKUPS.value(cache="translation", result=result)
+            for result in ("hit", "coalesced", "miss")
+        }
+
+        cache.claim([done, in_flight, new])
+
+        assert CACHE_LOOKUPS.value(cache="translation", result="hit") == before["hit"] + 1
+        assert (
+            CACHE_LOOKUPS.value(cache="translation", result="coalesced")
+            == before["coalesced"] + 1
+        )
+        assert CACHE_LOOKUPS.value(cache="translation", result="miss") == before["miss"] + 1
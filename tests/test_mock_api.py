@@ -0,0 +1,123 @@
+"""Tests for the mock Anthropic API server."""
+
+import random
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+
+from rosetta.core.config import Config
+from rosetta.core.exceptions import TranslationError
+from rosetta.mock_api import MockSettings, create_app, mock_translation, parse_latency
+from rosetta.models import Cell, TranslationBatch
+from rosetta.services.translator import Translator
+
+
+def _batch(*texts: str) -> TranslationBatch:
+    cells = [Cell(sheet="Sheet1", row=i + 1, col=1, value=text) for i, text in enumerate(texts)]
+    return TranslationBatch(cells=cells, target_lang="french")
+
+
+@pytest.fixture
+def mock_server():
+    """Start mock servers on free ports; yield a factory returning (translator, stats)."""
+    servers = []
+
+    def start(max_retries: int = 2, **settings) -> tuple[Translator, dict]:
+        app = create_app(MockSettings(**settings))
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+        thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+        thread.start()
+        servers.append((server, thread))
+        while not server.started:
+            time.sleep(0.01)
+        config = Config(
+            anthropic_api_key="mock",
+            max_retries=max_retries,
+            base_url=f"http://127.0.0.1:{sock.getsockname()[1]}",
+        )
+        return Translator(config), app.state.mock.stats
+
+    yield start
+    for server, thread in servers:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+class TestMockTranslation:
+    """Tests for the mock's translations and latency distributions."""
+
+    def test_mock_translation(self):
+        """Every numbered text should be prefixed with the target language."""
+        prompt = Translator._build_prompt(_batch("Hello", "10. World"))
+
+        assert mock_translation(prompt) == "1. [french] Hello\n2. [french] 10. World"
+        with pytest.raises(ValueError):
+            mock_translation("Hello")
+
+    def test_parse_latency(self):
+        """Latency specifications should give non-negative samples from their distribution."""
+        rng = random.Random(0)
+
+        assert parse_latency("0.25")(rng) == 0.25
+        assert 1 <= parse_latency("uniform:1,2")(rng) <= 2
+        assert all(parse_latency("normal:0,1")(rng) >= 0 for _ in range(100))
+        assert parse_latency("lognormal:1,0.5")(rng) > 0
+        for spec in ("gamma:1", "uniform:1", "fixed:x", "exponential:0"):
+            with pytest.raises(ValueError):
+                parse_latency(spec)
+
+
+class TestMockServer:
+    """Tests for the translator talking to the mock server over HTTP."""
+
+    def test_translates_over_http(self, mock_server):
+        """The translator should reach the server through Config.base_url."""
+        translator, stats = mock_server(latency="0.1")
+        batch = _batch("Hello", "World")
+
+        started = time.perf_counter()
+        assert translator.translate_batch(batch) == ["[french] Hello", "[french] World"]
+        assert time.perf_counter() - started >= 0.1
+        assert batch.usage.input_tokens > 0
+        assert translator.warmup()
+        assert stats["status_200"] == 1
+
+    def test_rate_limit_retried(self, mock_server):
+        """A 429 should be retried by the SDK after the retry-after delay."""
+        # With this seed the first request is rejected and the second answered
+        translator, stats = mock_server(rate_limited=0.5, retry_after=0.05, seed=1)
+
+        assert translator.translate_batch(_batch("Hello")) == ["[french] Hello"]
+        assert (stats["status_429"], stats["status_200"]) == (1, 1)
+
+    def test_overload_exhausts_retries(self, mock_server):
+        """Sustained 529s should fail the batch after Config.max_retries retries."""
+        translator, stats = mock_server(max_retries=1, overloaded=1.0, retry_after=0.01)
+
+        with pytest.raises(TranslationError, match="529"):
+            translator.translate_batch(_batch("Hello"))
+        assert stats["status_529"] == 2
+
+    @pytest.mark.parametrize(
+        "fault, message",
+        [("truncated", "Response truncated"), ("malformed", "Missing translation")],
+    )
+    def test_faulty_responses_fail_parsing(self, mock_server, fault, message):
+        """Truncated and badly numbered responses should fail the batch."""
+        translator, stats = mock_server(**{fault: 1.0})
+
+        with pytest.raises(TranslationError, match=message):
+            translator.translate_batch(_batch("Hello", "World", "Again"))
+        assert stats[fault] == 1
+
+    def test_base_url_from_env(self, monkeypatch):
+        """ROSETTA_API_BASE_URL should set Config.base_url."""
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "mock")
+        monkeypatch.setenv("ROSETTA_API_BASE_URL", "http://127.0.0.1:8787")
+
+        assert Config.from_env().base_url == "http://127.0.0.1:8787"
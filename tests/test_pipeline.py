@@ -0,0 +1,118 @@
+"""Tests for the pipelined extract -> translate -> write flow."""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from openpyxl import load_workbook
+
+from rosetta.core.exceptions import TranslationError
+from rosetta.models import Cell, TranslationBatch
+from rosetta.services.pipeline import TranslationPipeline
+from rosetta.services.translation_service import translate_file
+
+
+def make_cells(count: int) -> list[Cell]:
+    return [Cell(sheet="Sheet1", row=i + 1, col=1, value=f"text {i}") for i in range(count)]
+
+
+def prefix_translator() -> MagicMock:
+    translator = MagicMock()
+    translator.translate_batch.side_effect = lambda batch: [
+        f"[TR] {cell.value}" for cell in batch.cells
+    ]
+    return translator
+
+
+class TestTranslationPipeline:
+    """Tests for TranslationPipeline."""
+
+    @pytest.mark.parametrize("concurrency", [1, 4])
+    def test_translates_all_cells(self, concurrency):
+        """Every cell should be translated and handed to the consumer exactly once."""
+        cells = make_cells(23)
+        consumed: list[Cell] = []
+
+        pipeline = TranslationPipeline(
+            prefix_translator(), batch_size=5, target_lang="french", concurrency=concurrency
+        )
+        pipeline.run(iter(cells), consumed.extend)
+
+        assert pipeline.batch_count == 5
+        assert sorted(c.row for c in consumed) == list(range(1, 24))
+        assert all(c.value.startswith("[TR] text") for c in consumed)
+
+    def test_dispatches_before_extraction_finishes(self):
+        """The first batch should be translated while the source is still producing."""
+        first_batch_translated = threading.Event()
+
+        def translate(batch: TranslationBatch) -> list[str]:
+            first_batch_translated.set()
+            return [cell.value for cell in batch.cells]
+
+        def slow_source():
+            yield from make_cells(2)
+            # Extraction only continues once the first batch has reached the translator
+            assert first_batch_translated.wait(timeout=5)
+            yield from make_cells(2)
+
+        translator = MagicMock()
+        translator.translate_batch.side_effect = translate
+        consumed: list[Cell] = []
+
+        TranslationPipeline(translator, batch_size=2, target_lang="french").run(
+            slow_source(), consumed.extend
+        )
+
+        assert len(consumed) == 4
+
+    def test_translator_error_is_raised(self):
+        """A failing batch should abort the pipeline and surface the error."""
+        translator = MagicMock()
+        translator.translate_batch.side_effect = TranslationError("API down")
+
+        pipeline = TranslationPipeline(
+            translator, batch_size=2, target_lang="french", concurrency=3
+        )
+        with pytest.raises(TranslationError, match="API down"):
+            pipeline.run(iter(make_cells(50)), lambda cells: None)
+
+    def test_consumer_error_is_raised(self):
+        """An error while writing results should abort the pipeline."""
+
+        def failing_consumer(cells):
+            raise OSError("disk full")
+
+        pipeline = TranslationPipeline(prefix_translator(), batch_size=2, target_lang="french")
+        with pytest.raises(OSError, match="disk full"):
+            pipeline.run(iter(make_cells(50)), failing_consumer)
+
+
+class TestPipelinedTranslateFile:
+    """End-to-end tests of translate_file on shared string workbooks."""
+
+    def test_writes_plain_and_rich_text(self, excel_with_shared_strings, tmp_path, mock_translator):
+        """Plain cells and each rich text run should be translated in the output."""
+        output_file = tmp_path / "output.xlsx"
+
+        result = translate_file(
+            excel_with_shared_strings,
+            output_file,
+            "french",
+            batch_size=2,
+            translator=mock_translator,
+            concurrency=2,
+        )
+
+        assert result["status"] == "completed"
+        assert result["cell_count"] == 4
+        assert result["rich_text_cells"] == 1
+
+        wb = load_workbook(output_file, rich_text=True)
+        ws = wb["Sheet1"]
+        assert ws["A1"].value == "[TR] Hello"
+        assert ws["B1"].value == "[TR] Hello"
+        assert ws["A2"].value == "[TR] World"
+        runs = [str(run.text) if hasattr(run, "text") else str(run) for run in ws["A3"].value]
+        assert runs == ["[TR] Bold", " [TR] text"]
+        wb.close()
@@ -0,0 +1,177 @@
+"""Tests for per-stage profiling of translations."""
+
+import json
+import pstats
+import tracemalloc
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from rosetta.core.exceptions import TranslationError
+from rosetta.main import cli
+from rosetta.models import Cell, TranslationBatch
+from rosetta.services.profiling import API_CALL, Profiler, ProfilingTranslator
+from rosetta.services.translation_service import translate_file
+
+
+def _batch(*texts: str) -> TranslationBatch:
+    cells = [Cell(sheet="Sheet1", row=i + 1, col=1, value=text) for i, text in enumerate(texts)]
+    return TranslationBatch(cells=cells, target_lang="french")
+
+
+class TestProfiler:
+    """Tests for the Profiler."""
+
+    def test_stages_and_iteration(self):
+        """Stages should count calls; an iteration should count once and skip consumer time."""
+        profiler = Profiler()
+        profiler.start()
+        for _ in range(3):
+            with profiler.stage("work"):
+                data = [0] * 100_000
+        consumed = list(profiler.iterate("produce", iter(range(5))))
+        report = profiler.stop()
+
+        assert consumed == [0, 1, 2, 3, 4]
+        assert report["stages"]["work"]["calls"] == 3
+        assert report["stages"]["produce"]["calls"] == 1
+        assert report["stages"]["work"]["peak_memory_mb"] >= len(data) * 8 / (1024 * 1024)
+        assert report["wall_seconds"] >= report["stages"]["work"]["wall_seconds"]
+        assert profiler.stop() is report
+
+    def test_overlapping_profiles_share_tracing(self):
+        """Tracing should keep running until the last of several overlapping profiles stops."""
+        first, second = Profiler(), Profiler()
+
+        first.start()
+        second.start()
+        first.stop()
+        assert tracemalloc.is_tracing()
+        with second.stage("work"):
+            [0] * 200_000  # 1.5 MB of pointers, freed at once: only the peak sees it
+        report = second.stop()
+
+        assert not tracemalloc.is_tracing()
+        assert report["stages"]["work"]["peak_memory_mb"] > 1
+
+    def test_disabled_profiler_records_nothing(self):
+        """A disabled profiler should pass work through and report nothing."""
+        profiler = Profiler(enabled=False)
+        profiler.start()
+        with profiler.stage("work"):
+            pass
+
+        assert list(profiler.iterate("produce", iter([1, 2]))) == [1, 2]
+        assert profiler.stop() == {}
+        assert profiler.stages == {}
+
+    def test_cprofile_dumps(self, tmp_path):
+        """Hot stages should be dumped as pstats files when a directory is given."""
+        profiler = Profiler(dump_dir=tmp_path / "dumps")
+        profiler.start()
+        with profiler.stage("write"):
+            sorted(range(1000), key=lambda x: -x)
+        with profiler.stage("translate"):  # Not a dumped stage
+            pass
+        report = profiler.stop()
+
+        assert list(report["dumps"]) == ["write"]
+        assert pstats.Stats(report["dumps"]["write"]).total_calls > 0
+
+    def test_profiling_translator_records_batches(self):
+        """Each request should be recorded with its size, tokens and outcome."""
+        inner = MagicMock()
+
+        def translate(batch):
+            batch.usage.input_tokens += 10
+            batch.usage.output_tokens += 4
+            if len(batch) == 1:
+                raise TranslationError("bad response")
+            return [f"[TR] {cell.value}" for cell in batch.cells]
+
+        inner.translate_batch.side_effect = translate
+        profiler = Profiler()
+        profiler.start()
+        translator = ProfilingTranslator(inner, profiler)
+
+        translator.translate_batch(_batch("Hello", "World"))
+        with pytest.raises(TranslationError):
+            translator.translate_batch(_batch("Oops"))
+        report = profiler.stop()
+
+        assert translator.config is inner.config
+        assert report["stages"][API_CALL]["calls"] == 2
+        assert [(b["cells"], b["input_tokens"], b["error"]) for b in report["batches"]] == [
+            (2, 10, None),
+            (1, 10, "bad response"),
+        ]
+
+
+class TestTranslateFileProfile:
+    """Tests for the profile returned by translate_file and the CLI."""
+
+    def test_profile_in_stats(self, excel_with_shared_strings, tmp_path, mock_translator):
+        """The stats should include every stage and the API requests."""
+        result = translate_file(
+            excel_with_shared_strings,
+            tmp_path / "output.xlsx",
+            "french",
+            translator=mock_translator,
+            checkpoint=False,
+            profile=True,
+        )
+
+        profile = result["profile"]
+        assert set(profile["stages"]) == {
+            "load",
+            "extract",
+            "rich_text",
+            "translate",
+            "api_call",
+            "write",
+        }
+        assert profile["stages"]["load"]["calls"] == 1
+        assert len(profile["batches"]) == profile["stages"]["api_call"]["calls"]
+        assert json.loads(json.dumps(profile)) == profile
+
+    def test_no_profile_by_default(self, simple_excel_file, tmp_path, mock_translator):
+        """Without profile=True the stats should not change."""
+        result = translate_file(
+            simple_excel_file,
+            tmp_path / "output.xlsx",
+            "french",
+            translator=mock_translator,
+            checkpoint=False,
+        )
+
+        assert "profile" not in result
+
+    def test_cli_profile(self, simple_excel_file, tmp_path, mock_translator):
+        """--profile should print the stages; --profile-dir should save the report and dumps."""
+        profile_dir = tmp_path / "profile"
+
+        with (
+            patch("rosetta.main.Config.from_env", return_value=mock_translator.config),
+            patch("rosetta.main.Translator", return_value=mock_translator),
+        ):
+            result = CliRunner().invoke(
+                cli,
+                [
+                    str(simple_excel_file),
+                    "-t",
+                    "french",
+                    "-o",
+                    str(tmp_path / "output.xlsx"),
+                    "--profile",
+                    "--profile-dir",
+                    str(profile_dir),
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert "Profile:" in result.output
+        assert "  write " in result.output
+        report = json.loads((profile_dir / "profile.json").read_text())
+        assert (profile_dir / "write.pstats").exists()
+        assert report["dumps"]["write"] == str(profile_dir / "write.pstats")
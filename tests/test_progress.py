@@ -0,0 +1,67 @@
+"""Tests for structured progress events."""
+
+import pytest
+
+from rosetta.core.exceptions import TranslationError
+from rosetta.services.progress import BATCH_DONE, COMPLETED, FAILED, iter_progress
+from rosetta.services.translation_service import translate_file
+
+
+class TestProgressEvents:
+    """Tests for the on_progress callback of translate_file."""
+
+    def test_events_cover_stages_batches_and_result(
+        self, simple_excel_file, tmp_path, mock_translator
+    ):
+        """A run should report stages, each batch and a final result with totals."""
+        events = []
+
+        result = translate_file(
+            simple_excel_file,
+            tmp_path / "out.xlsx",
+            "french",
+            batch_size=2,
+            translator=mock_translator,
+            on_progress=events.append,
+        )
+
+        kinds = [event.kind for event in events]
+        assert kinds[-1] == COMPLETED
+        assert events[-1].result == result
+        assert {(e.kind, e.stage) for e in events} >= {
+            ("stage_started", "extract"),
+            ("stage_finished", "extract"),
+            ("stage_started", "write"),
+            ("stage_finished", "write"),
+        }
+
+        batches = [event for event in events if event.kind == BATCH_DONE]
+        assert [event.batch_cells for event in batches] == [2, 2]
+        assert batches[-1].batches_done == 2
+        assert batches[-1].items_done == 4
+        assert events[-1].items_total == 4
+        assert events[-1].batches_total == 2
+        assert events[-1].eta_seconds == 0.0
+
+    def test_iter_progress_yields_failure_then_raises(
+        self, simple_excel_file, tmp_path, mock_translator
+    ):
+        """The iterator form should end with a failed event and re-raise the error."""
+        mock_translator.translate_batch.side_effect = TranslationError("boom")
+
+        events = []
+        with pytest.raises(TranslationError):
+            for event in iter_progress(
+                lambda on_progress: translate_file(
+                    simple_excel_file,
+                    tmp_path / "out.xlsx",
+                    "french",
+                    translator=mock_translator,
+                    checkpoint=False,
+                    on_progress=on_progress,
+                )
+            ):
+                events.append(event)
+
+        assert events[-1].kind == FAILED
+        assert events[-1].error == "boom"
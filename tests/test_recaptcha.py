@@ -0,0 +1,145 @@
+"""Tests for reCAPTCHA verification."""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from rosetta.api.recaptcha import RecaptchaVerifier
+
+
+class StubVerifier:
+    """Stands in for Google's siteverify endpoint: tokens starting with "ok" pass."""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False) -> None:
+        self.delay = delay
+        self.fail = fail
+        self.calls: list[str] = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        token = parse_qs(request.content.decode())["response"][0]
+        self.calls.append(token)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"success": token.startswith("ok")})
+
+    def verifier(self) -> RecaptchaVerifier:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+        return RecaptchaVerifier("secret", verify_url="https://stub/verify", client=client)
+
+
+def run(verifier: RecaptchaVerifier, *tokens: str) -> list[bool]:
+    """Verify tokens concurrently on a fresh event loop."""
+
+    async def main() -> list[bool]:
+        try:
+            return list(await asyncio.gather(*(verifier.verify(t) for t in tokens)))
+        finally:
+            await verifier.aclose()
+
+    return asyncio.run(main())
+
+
+class TestRecaptchaVerifier:
+    """Tests for RecaptchaVerifier."""
+
+    def test_without_secret_everything_passes(self):
+        """Verification should be skipped when no secret key is configured."""
+        assert asyncio.run(RecaptchaVerifier(None).verify(None)) is True
+
+    def test_valid_and_invalid_tokens(self):
+        """Tokens should be accepted or rejected as the endpoint says."""
+        stub = StubVerifier()
+
+        assert run(stub.verifier(), "ok-1", "bad-1", "") == [True, False, False]
+        assert sorted(stub.calls) == ["bad-1", "ok-1"]
+
+    def test_outcomes_are_cached(self):
+        """A token checked before should not be sent again."""
+        stub = StubVerifier()
+        verifier = stub.verifier()
+
+        async def main() -> list[bool]:
+            first = await verifier.verify("ok-1")
+            second = await verifier.verify("ok-1")
+            await verifier.aclose()
+            return [first, second]
+
+        assert asyncio.run(main()) == [True, True]
+        assert stub.calls == ["ok-1"]
+
+    def test_concurrent_checks_share_one_call(self):
+        """Requests carrying the same token at once should make one HTTP call."""
+        stub = StubVerifier(delay=0.1)
+
+        assert run(stub.verifier(), *["ok-1"] * 5) == [True] * 5
+        assert stub.calls == ["ok-1"]
+
+    def test_endpoint_errors_reject_without_caching(self):
+        """Errors should reject the token, but a later check should try again."""
+        stub = StubVerifier(fail=True)
+        verifier = stub.verifier()
+
+        async def main() -> list[bool]:
+            first = await verifier.verify("ok-1")
+            stub.fail = False
+            second = await verifier.verify("ok-1")
+            await verifier.aclose()
+            return [first, second]
+
+        assert asyncio.run(main()) == [False, True]
+        assert stub.calls == ["ok-1", "ok-1"]
+
+    def test_failures_are_logged(self, caplog):
+        """Rejections and endpoint errors should be reported through the module logger."""
+        stub = StubVerifier()
+
+        with caplog.at_level("WARNING", logger="rosetta.api.recaptcha"):
+            run(stub.verifier(), "bad-1")
+            stub.fail = True
+            run(stub.verifier(), "ok-1")
+
+        assert [record.name for record in caplog.records] == ["rosetta.api.recaptcha"] * 2
+        assert "verification failed" in caplog.records[0].getMessage()
+        assert "verification error" in caplog.records[1].getMessage()
+
+
+@pytest.fixture
+def stub_server():
+    """A local HTTP stub of the siteverify endpoint."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            token = parse_qs(self.rfile.read(length).decode())["response"][0]
+            body = json.dumps({"success": token.startswith("ok")}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/siteverify"
+    server.shutdown()
+    server.server_close()
+
+
+class TestLocalStub:
+    """Tests against a stub verifier served over HTTP."""
+
+    def test_verifies_over_http(self, stub_server):
+        """The pooled client should talk to the configured endpoint."""
+        verifier = RecaptchaVerifier("secret", verify_url=stub_server)
+
+        assert run(verifier, "ok-1", "bad-1") == [True, False]
@@ -0,0 +1,112 @@
+"""Tests for the server-wide batch scheduler."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from rosetta.core.config import Config
+from rosetta.core.exceptions import TranslationError
+from rosetta.models import Cell, TranslationBatch
+from rosetta.services.batch_size import AdaptiveBatchSize
+from rosetta.services.scheduler import BatchScheduler
+
+
+def _batch(*texts: str, target_lang: str = "french") -> TranslationBatch:
+    cells = [Cell(sheet="Sheet1", row=i + 1, col=1, value=text) for i, text in enumerate(texts)]
+    return TranslationBatch(cells=cells, target_lang=target_lang)
+
+
+@pytest.fixture
+def inner():
+    """A translator recording the texts of each request; "bad" breaks a response."""
+    translator = MagicMock()
+    translator.config = Config(anthropic_api_key="test", batch_size=10)
+    translator.requests = []
+    lock = threading.Lock()
+
+    def translate(batch):
+        with lock:
+            translator.requests.append(batch.texts)
+        batch.usage.requests += 1
+        batch.usage.input_tokens += 10 * len(batch)
+        batch.usage.output_tokens += 5 * len(batch)
+        if "bad" in batch.texts:
+            raise TranslationError("Missing translation for item 2")
+        return [f"[{batch.target_lang}] {text}" for text in batch.texts]
+
+    translator.translate_batch.side_effect = translate
+    return translator
+
+
+def _run_together(scheduler: BatchScheduler, batches: list[TranslationBatch]) -> list:
+    """Translate batches on concurrent threads; return each result or exception."""
+
+    def run(batch):
+        try:
+            return scheduler.translate_batch(batch)
+        except TranslationError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=len(batches)) as pool:
+        return list(pool.map(run, batches))
+
+
+class TestBatchScheduler:
+    """Tests for BatchScheduler."""
+
+    def test_coalesces_concurrent_batches(self, inner):
+        """Small batches arriving within the window should share one request."""
+        scheduler = BatchScheduler(inner, window=0.2)
+        batches = [_batch("Total", f"Item {i}") for i in range(3)]
+
+        results = _run_together(scheduler, batches)
+
+        assert results == [["[french] Total", f"[french] Item {i}"] for i in range(3)]
+        assert len(inner.requests) == 1
+        assert sorted(inner.requests[0]) == ["Item 0", "Item 1", "Item 2", "Total"]
+        # "Total" was sent once, by one batch; the two others waited for it
+        assert sorted(batch.usage.cached for batch in batches) == [0, 1, 1]
+        assert sum(batch.usage.input_tokens for batch in batches) == 40
+        assert sum(batch.usage.sent for batch in batches) == 4
+
+    def test_full_batch_sent_without_waiting(self, inner):
+        """A batch filling a request should be sent at once, not after the window."""
+        scheduler = BatchScheduler(inner, batch_size=2, window=10)
+
+        started = time.perf_counter()
+        assert scheduler.translate_batch(_batch("Yes", "No")) == ["[french] Yes", "[french] No"]
+        assert time.perf_counter() - started < 1
+
+    def test_groups_by_language(self, inner):
+        """Texts for different target languages should not share a request."""
+        scheduler = BatchScheduler(inner, window=0.1)
+
+        results = _run_together(scheduler, [_batch("Date"), _batch("Date", target_lang="german")])
+
+        assert results == [["[french] Date"], ["[german] Date"]]
+        assert len(inner.requests) == 2
+
+    def test_failed_request_split_by_translation(self, inner):
+        """A response broken by one translation's text should not fail the others."""
+        scheduler = BatchScheduler(inner, window=0.2)
+
+        good, bad = _run_together(scheduler, [_batch("Name"), _batch("bad")])
+
+        assert good == ["[french] Name"]
+        assert isinstance(bad, TranslationError)
+        assert len(inner.requests) == 3  # The mixed request, then each part alone
+
+    def test_adaptive_size_splits_failed_request(self, inner):
+        """With a batch sizer, requests should take its size and failures be split."""
+        sizer = AdaptiveBatchSize(4, minimum=1)
+        scheduler = BatchScheduler(inner, window=10, batch_sizer=sizer)
+
+        results = _run_together(scheduler, [_batch("A", "B", "C", "bad")])
+
+        assert isinstance(results[0], TranslationError)
+        # The full request failed; its halves were sent, then the failing half's
+        assert inner.requests == [["A", "B", "C", "bad"], ["A", "B"], ["C", "bad"], ["C"], ["bad"]]
+        assert [(d.new, d.reason) for d in sizer.decisions] == [(2, "error"), (1, "error")]
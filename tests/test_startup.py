@@ -0,0 +1,80 @@
+"""Startup-time checks for the CLI: heavy dependencies must load on first use."""
+
+import subprocess
+import sys
+from unittest.mock import patch
+
+from rosetta.core.config import Config, load_env
+from rosetta.services import Translator
+
+# Dependencies that dominate import time and are only needed once work starts
+DEFERRED_MODULES = ("anthropic", "openpyxl", "dotenv")
+
+# Cumulative import time budget for rosetta.main. The deferred modules alone take
+# over a second, so a regression that imports them eagerly fails this clearly.
+IMPORT_BUDGET_SECONDS = 0.5
+
+
+def _run(code: str, *options: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *options, "-c", code], capture_output=True, text=True, check=True
+    )
+
+
+def _cumulative_import_seconds(importtime_log: str, module: str) -> float:
+    """Read a module's cumulative time from ``python -X importtime`` output."""
+    for line in importtime_log.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1_000_000
+    raise AssertionError(f"{module} not found in import time log")
+
+
+class TestStartup:
+    """Tests for what importing the CLI loads, and how long it takes."""
+
+    def test_heavy_dependencies_deferred(self):
+        """Importing the CLI and rendering its help should not load the SDK or openpyxl."""
+        result = _run(
+            "import sys\n"
+            "from rosetta.main import cli\n"
+            "try:\n"
+            "    cli(['--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+        )
+
+        assert result.stdout.splitlines()[-1] == ""
+
+    def test_import_time_budget(self):
+        """Importing rosetta.main should stay within the startup budget."""
+        # Best of a few runs, so a busy machine does not fail the check
+        timings = []
+        for _ in range(3):
+            result = _run("import rosetta.main", "-X", "importtime")
+            timings.append(_cumulative_import_seconds(result.stderr, "rosetta.main"))
+
+        assert min(timings) < IMPORT_BUDGET_SECONDS, f"import took {min(timings):.3f}s"
+
+    def test_translator_loads_sdk_on_demand(self, mock_config):
+        """Building a Translator without a client should import the SDK then."""
+        translator = Translator(mock_config)
+
+        assert type(translator.client).__module__.startswith("anthropic")
+        translator.close()
+
+
+class TestLoadEnv:
+    """Tests for on-demand .env loading."""
+
+    def test_loaded_once(self, monkeypatch):
+        """The .env file should be read on the first from_env call only."""
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        load_env.cache_clear()
+        with patch("dotenv.load_dotenv") as mock_load:
+            Config.from_env()
+            Config.from_env()
+
+        mock_load.assert_called_once()
+        load_env.cache_clear()
@@ -7,11 +7,14 @@ import pytest
 from openpyxl import load_workbook
 
 from rosetta.main import (
+    _extract_dropdown_validations,
     _translate_dropdowns,
     _translate_rich_text_runs,
+    _update_sheet_dropdowns,
     write_translations,
 )
 from rosetta.models import Cell, DropdownValidation, RichTextRun
+from rosetta.services.translation_service import translate_file
 
 
 class TestTranslateDropdowns:
@@ -248,3 +251,123 @@ class TestWriteTranslations:
             assert "Oui" in formula1.text
             assert "Non" in formula1.text
             assert "Peut-être" in formula1.text
+
+
+class TestUpdateSheetDropdowns:
+    """Tests for the byte-level rewrite of dropdown formulas in sheet XML."""
+
+    SHEET = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<x:worksheet xmlns:x="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:xr="http://schemas.microsoft.com/office/spreadsheetml/2014/revision">'
+        '<x:sheetData><x:row r="1"><x:c r="A1" t="s"><x:v>0</x:v></x:c></x:row></x:sheetData>'
+        '<x:dataValidations count="2">'
+        '<x:dataValidation type="list" sqref="A2:A10" xr:uid="{1}">'
+        '<x:formula1>"Yes,No"</x:formula1></x:dataValidation>'
+        "<x:dataValidation type='list' sqref='B2:B10'><x:formula1>\"Red,Blue\"</x:formula1>"
+        "</x:dataValidation></x:dataValidations>"
+        '<x:extLst><x14:dataValidations xmlns:x14="urn:x14"><x14:dataValidation>'
+        "<x14:formula1>Lists!A1</x14:formula1><xm:sqref>A2:A10</xm:sqref>"
+        "</x14:dataValidation></x14:dataValidations></x:extLst></x:worksheet>"
+    ).encode()
+
+    def test_rewrites_only_matching_formulas(self):
+        """Only the formula of the matching range should change, byte for byte."""
+        dropdown = DropdownValidation(
+            sheet="Sheet1",
+            cell_range="B2:B10",
+            values=["Red", "Blue"],
+            translated_values=["Rouge & Co", "Bleu"],
+        )
+
+        updated = _update_sheet_dropdowns(self.SHEET, [dropdown])
+
+        assert updated == self.SHEET.replace(
+            b'\"Red,Blue\"', b'"Rouge &amp; Co,Bleu"'
+        )
+
+    def test_sheet_without_validations_unchanged(self):
+        """A sheet without data validations should be returned as is."""
+        sheet = self.SHEET[: self.SHEET.index(b"<x:dataValidations")] + b"</x:worksheet>"
+        dropdown = DropdownValidation(
+            sheet="Sheet1", cell_range="A2:A10", values=["Yes"], translated_values=["Oui"]
+        )
+
+        assert _update_sheet_dropdowns(sheet, [dropdown]) is sheet
+
+    def test_formula_attributes_kept(self):
+        """The formula's start tag should keep its attributes, even when self-closing."""
+        sheet = self.SHEET.replace(
+            b'<x:formula1>"Yes', b'<x:formula1 xml:space="preserve">"Yes'
+        ).replace(b'<x:formula1>"Red,Blue"</x:formula1>', b'<x:formula1 xr:id="2"/>')
+        dropdowns = [
+            DropdownValidation(
+                sheet="Sheet1", cell_range="A2:A10", values=["Yes"], translated_values=["Oui"]
+            ),
+            DropdownValidation(
+                sheet="Sheet1", cell_range="B2:B10", values=["Red"], translated_values=["Rouge"]
+            ),
+        ]
+
+        updated = _update_sheet_dropdowns(sheet, dropdowns)
+
+        assert b'<x:formula1 xml:space="preserve">"Oui"</x:formula1>' in updated
+        assert b'<x:formula1 xr:id="2">"Rouge"</x:formula1>' in updated
+
+    def test_root_found_after_prolog(self):
+        """The prefixed root should be found past comments that mention the worksheet."""
+        declaration, body = self.SHEET.split(b"\n", 1)
+        sheet = declaration + b"\n<!-- worksheet saved by a script -->\n" + body
+        dropdown = DropdownValidation(
+            sheet="Sheet1", cell_range="A2:A10", values=["Yes", "No"], translated_values=["Oui"]
+        )
+
+        updated = _update_sheet_dropdowns(sheet, [dropdown])
+
+        assert updated == sheet.replace(b'"Yes,No"', b'"Oui"')
+
+    def test_extract_prefixed_validations(self, tmp_path):
+        """Dropdowns of a sheet using a namespace prefix should be read from the block."""
+        path = tmp_path / "prefixed.xlsx"
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr(
+                "xl/workbook.xml",
+                '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>',
+            )
+            zf.writestr(
+                "xl/_rels/workbook.xml.rels",
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+                'relationships"><Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+                'worksheet"/></Relationships>',
+            )
+            zf.writestr("xl/worksheets/sheet1.xml", self.SHEET)
+
+        dropdowns = _extract_dropdown_validations(path, None)
+
+        assert [(d.cell_range, d.values) for d in dropdowns] == [
+            ("A2:A10", ["Yes", "No"]),
+            ("B2:B10", ["Red", "Blue"]),
+        ]
+
+
+class TestTranslateFile:
+    """Tests for the high-level translate_file service."""
+
+    def test_uses_provided_translator(
+        self, simple_excel_file, tmp_path, mock_translator, monkeypatch
+    ):
+        """A shared translator should be used without reading the environment."""
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        output_file = tmp_path / "output.xlsx"
+
+        result = translate_file(
+            simple_excel_file, output_file, "french", translator=mock_translator
+        )
+
+        assert result["status"] == "completed"
+        assert result["cell_count"] == 4
+        assert mock_translator.translate_batch.call_count == 1
+        assert output_file.exists()
@@ -0,0 +1,102 @@
+"""Tests for streamed upload handling."""
+
+import asyncio
+import hashlib
+import io
+import json
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from rosetta.api.uploads import BodySizeLimitMiddleware, UploadTooLargeError, save_upload
+
+
+class TestSaveUpload:
+    """Tests for copying uploads to disk."""
+
+    def test_copies_and_hashes(self, tmp_path):
+        """The file should be copied unchanged with its SHA-256."""
+        data = b"x" * (3 * 1024 * 1024 + 5)
+
+        upload = save_upload(io.BytesIO(data), max_size=len(data), destination=tmp_path / "in.xlsx")
+
+        assert upload.path.read_bytes() == data
+        assert upload.size == len(data)
+        assert upload.sha256 == hashlib.sha256(data).hexdigest()
+
+    def test_rejects_oversized_upload_and_removes_partial_file(self, tmp_path):
+        """Crossing the limit should fail and leave nothing behind."""
+        destination = tmp_path / "in.xlsx"
+
+        with pytest.raises(UploadTooLargeError):
+            save_upload(io.BytesIO(b"x" * 2048), max_size=1024, destination=destination)
+
+        assert not destination.exists()
+
+
+@pytest.fixture
+def limited_client():
+    """A small app accepting uploads of at most 1 KB in total."""
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_body_size=1024, detail="File too large")
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)) -> dict:
+        return {"size": len(await file.read())}
+
+    return TestClient(app)
+
+
+class TestBodySizeLimitMiddleware:
+    """Tests for rejecting large bodies while they are received."""
+
+    def test_small_upload_passes(self, limited_client):
+        """Bodies under the limit should reach the endpoint."""
+        response = limited_client.post("/upload", files={"file": ("a.xlsx", b"x" * 100)})
+
+        assert response.status_code == 200
+        assert response.json() == {"size": 100}
+
+    def test_declared_length_over_limit_is_rejected(self, limited_client):
+        """A Content-Length over the limit should be rejected before reading."""
+        response = limited_client.post("/upload", files={"file": ("a.xlsx", b"x" * 4096)})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "File too large"
+
+    def test_chunked_body_over_limit_is_cut_off(self, limited_client):
+        """A body without Content-Length should be stopped once it crosses the limit."""
+
+        def chunks():
+            for _ in range(100):
+                yield b"x" * 512
+
+        response = limited_client.post(
+            "/upload",
+            content=chunks(),
+            headers={"Content-Type": "multipart/form-data; boundary=abc"},
+        )
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "File too large"
+
+    def test_malformed_length_is_rejected(self):
+        """A Content-Length that is not a number should be a 400, not a server error."""
+        sent = []
+
+        async def endpoint(scope, receive, send):
+            raise AssertionError("The request should not reach the app")
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = BodySizeLimitMiddleware(endpoint, max_body_size=1024, detail="File too large")
+        scope = {"type": "http", "method": "POST", "headers": [(b"content-length", b"12x")]}
+        asyncio.run(middleware(scope, receive, send))
+
+        assert sent[0]["status"] == 400
+        assert json.loads(sent[1]["body"]) == {"detail": "Invalid Content-Length header"}